@@ -17,26 +17,42 @@ Flow-By-Sector files are loaded when running these functions
 """
 import os
 import pprint
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
 from esupy.processed_data_mgmt import load_preprocessed_output, \
     download_from_remote
 from flowsa.common import load_yaml_dict
+from flowsa.fbastore import load_fba_parquet, load_fba_cached, \
+    find_latest_output
 from flowsa.settings import log, sourceconfigpath, flowbysectormethodpath, \
     paths, fbaoutputpath, fbsoutputpath, \
     biboutputpath, DEFAULT_DOWNLOAD_IF_MISSING
 from flowsa.metadata import set_fb_meta
-from flowsa.flowbyfunctions import collapse_fbs_sectors, filter_by_geoscale
+from flowsa.flowbyfunctions import collapse_fbs_sectors
 from flowsa.validation import check_for_nonetypes_in_sector_col, \
     check_for_negative_flowamounts
 import flowsa.flowbyactivity
 import flowsa.flowbysector
-from flowsa.bibliography import generate_fbs_bibliography
-from flowsa.datavisualization import FBSscatterplot
+
+
+def __getattr__(name):
+    # bibtexparser and the plotting libraries are imported when first used
+    if name == 'generate_fbs_bibliography':
+        from flowsa.bibliography import generate_fbs_bibliography
+        return generate_fbs_bibliography
+    if name == 'FBSscatterplot':
+        from flowsa.datavisualization import FBSscatterplot
+        return FBSscatterplot
+    raise AttributeError(f"module 'flowsa' has no attribute '{name}'")
 
 
 def getFlowByActivity(datasource, year, flowclass=None, geographic_level=None,
-                      download_FBA_if_missing=DEFAULT_DOWNLOAD_IF_MISSING):
+                      download_FBA_if_missing=DEFAULT_DOWNLOAD_IF_MISSING,
+                      location_prefix=None, activities=None, flownames=None,
+                      selection_fields=None, columns=None, use_cache=False):
     """
-    Retrieves stored data in the FlowByActivity format
+    Retrieves stored data in the FlowByActivity format. Filters are applied
+    while reading the parquet, so only matching rows are loaded.
     :param datasource: str, the code of the datasource.
     :param year: int, a year, e.g. 2012
     :param flowclass: str or list, a 'Class' of the flow. Optional. E.g.
@@ -45,20 +61,36 @@ def getFlowByActivity(datasource, year, flowclass=None, geographic_level=None,
                              Optional. E.g. 'national', 'state', 'county'.
     :param download_FBA_if_missing: bool, if True will attempt to load from
         remote server prior to generating if file not found locally
+    :param location_prefix: str, optional start of the Location FIPS, e.g.
+        '06' for California and its counties
+    :param activities: list, optional activities, loads rows where either
+        ActivityProducedBy or ActivityConsumedBy are in the list
+    :param flownames: list, optional FlowName values
+    :param selection_fields: dictionary, optional column names and lists of
+        values to load
+    :param columns: list, optional columns to load
+    :param use_cache: bool, if True the whole FBA is read once into the
+        in-process FBA store (FBA_CACHE_MAX_MEMORY in settings.py) and
+        filtered in memory, for FBAs loaded repeatedly
     :return: a pandas DataFrame in FlowByActivity format
     """
+    load = load_fba_cached if use_cache else load_fba_parquet
     # Set fba metadata
     name = flowsa.flowbyactivity.set_fba_name(datasource, year)
     fba_meta = set_fb_meta(name, "FlowByActivity")
+    load_kwargs = dict(geographic_level=geographic_level, columns=columns,
+                       flowclass=flowclass, location_prefix=location_prefix,
+                       activities=activities, flownames=flownames,
+                       selection_fields=selection_fields)
 
     # Try to load a local version of FBA
-    fba = load_preprocessed_output(fba_meta, paths)
+    fba, n_rows = load(fba_meta, **load_kwargs)
     # If that didn't work, try to download a remote version of FBA
     if fba is None and download_FBA_if_missing:
         log.info(f'{datasource} {str(year)} not found in {fbaoutputpath}, '
                  'downloading from remote source')
         download_from_remote(fba_meta, paths)
-        fba = load_preprocessed_output(fba_meta, paths)
+        fba, n_rows = load(fba_meta, **load_kwargs)
     # If that didn't work or wasn't allowed, try to construct the FBA
     if fba is None:
         log.info(f'{datasource} {str(year)} not found in {fbaoutputpath}, '
@@ -66,7 +98,7 @@ def getFlowByActivity(datasource, year, flowclass=None, geographic_level=None,
         # Generate the fba
         flowsa.flowbyactivity.main(year=year, source=datasource)
         # Now load the fba
-        fba = load_preprocessed_output(fba_meta, paths)
+        fba, n_rows = load(fba_meta, **load_kwargs)
     # If none of the above worked, log an error message
     if fba is None:
         raise flowsa.exceptions.FBANotAvailableError(method=datasource,
@@ -76,26 +108,87 @@ def getFlowByActivity(datasource, year, flowclass=None, geographic_level=None,
     else:
         log.info(f'Loaded {datasource} {str(year)} from {fbaoutputpath}')
 
-    if len(fba) ==0:
+    if n_rows == 0:
         raise flowsa.exceptions.FBANotAvailableError(
             message=f"Error generating {datasource} for {str(year)}")
 
-    # Address optional parameters
-    if flowclass is not None:
-        # subset df by single class or list of classes
-        if isinstance(flowclass, str):
-            fba = fba[fba['Class'] == flowclass]
-        else:
-            fba = fba[fba['Class'].isin(flowclass)]
-    # if geographic level specified, only load rows in geo level
-    if geographic_level is not None:
-        fba = filter_by_geoscale(fba, geographic_level)
+    # if geographic level specified, raise an error if no rows at the level
+    if geographic_level is not None and len(fba) == 0:
+        raise flowsa.exceptions.FBSMethodConstructionError(
+            message="No flows found in the flow dataset at "
+            f"the {geographic_level} scale")
     return fba
 
 
+def _fba_request_key(datasource, year, kwargs):
+    """Hashable key of a getFlowByActivities() request"""
+    def hashable(value):
+        if isinstance(value, dict):
+            return tuple(sorted((k, hashable(v)) for k, v in value.items()))
+        if isinstance(value, (list, tuple, set)):
+            return tuple(hashable(v) for v in value)
+        return value
+    if not kwargs:
+        return datasource, year
+    return datasource, year, hashable(kwargs)
+
+
+def getFlowByActivities(requests, n_jobs=4, concat=False,
+                        download_FBA_if_missing=DEFAULT_DOWNLOAD_IF_MISSING):
+    """
+    Retrieves several FlowByActivity datasets. Identical requests are
+    loaded once and each FBA is read once, into the in-process FBA store
+    (FBA_CACHE_MAX_MEMORY in settings.py), then filtered in memory for
+    each request. FBAs are read in parallel threads. FBAs not found locally
+    are downloaded or generated one at a time first.
+    :param requests: list of (datasource, year) tuples, or of (datasource,
+        year, kwargs) tuples where kwargs is a dictionary of filters of
+        getFlowByActivity(), e.g. {'flowclass': 'Water',
+        'geographic_level': 'state'}
+    :param n_jobs: int, number of threads reading FBAs
+    :param concat: bool, if True return a single df of the requests
+    :param download_FBA_if_missing: bool, if True will attempt to load
+        FBAs from remote server prior to generating if not found locally
+    :return: dictionary of FlowByActivity dfs keyed by request, the
+        (datasource, year) tuple, with a third item of the sorted
+        (filter, value) tuples for requests with filters. If concat, a df
+        of the distinct requests in request order
+    """
+    # distinct requests grouped by FBA, in request order
+    fbas = {}
+    for request in requests:
+        datasource, year, kwargs = (*request, {})[:3]
+        key = _fba_request_key(datasource, year, kwargs)
+        fbas.setdefault((datasource, str(year)), {})[key] = kwargs
+
+    for datasource, year in fbas:
+        name = flowsa.flowbyactivity.set_fba_name(datasource, year)
+        if find_latest_output(name, 'FlowByActivity') is None:
+            getFlowByActivity(datasource, year, use_cache=True,
+                              download_FBA_if_missing=download_FBA_if_missing)
+
+    def load(fba):
+        datasource, year = fba
+        return {key: getFlowByActivity(datasource, year, use_cache=True,
+                                       **kwargs)
+                for key, kwargs in fbas[fba].items()}
+
+    results = {}
+    with ThreadPoolExecutor(max_workers=n_jobs) as executor:
+        for dfs in executor.map(load, fbas):
+            results.update(dfs)
+    # return the requests in request order
+    keys = list(dict.fromkeys(_fba_request_key(*(*r, {})[:3])
+                              for r in requests))
+    if concat:
+        return pd.concat([results[k] for k in keys], ignore_index=True)
+    return {k: results[k] for k in keys}
+
+
 def getFlowBySector(methodname, fbsconfigpath=None,
                     download_FBAs_if_missing=DEFAULT_DOWNLOAD_IF_MISSING,
-                    download_FBS_if_missing=DEFAULT_DOWNLOAD_IF_MISSING):
+                    download_FBS_if_missing=DEFAULT_DOWNLOAD_IF_MISSING,
+                    n_jobs=None):
     """
     Loads stored FlowBySector output or generates it if it doesn't exist,
     then loads
@@ -107,6 +200,8 @@ def getFlowBySector(methodname, fbsconfigpath=None,
         file not found locally
     :param download_FBS_if_missing: bool, if True will attempt to load from
         remote server prior to generating if file not found locally
+    :param n_jobs: int, number of workers used to attribute activity sets in
+        parallel if the FBS is generated, default runs sequentially
     :return: dataframe in flow by sector format
     """
     fbs_meta = set_fb_meta(methodname, "FlowBySector")
@@ -130,7 +225,8 @@ def getFlowBySector(methodname, fbsconfigpath=None,
         flowsa.flowbysector.main(
             method=methodname,
             fbsconfigpath=fbsconfigpath,
-            download_FBAs_if_missing=download_FBAs_if_missing
+            download_FBAs_if_missing=download_FBAs_if_missing,
+            n_jobs=n_jobs
         )
         # Now load the fbs
         fbs = load_preprocessed_output(fbs_meta, paths)
@@ -171,6 +267,7 @@ def writeFlowBySectorBibliography(methodname):
     :param methodname: string, FBS methodname for which to create .bib file
     :return: .bib file save to local directory
     """
+    from flowsa.bibliography import generate_fbs_bibliography
     # Generate a single .bib file for a list of Flow-By-Sector method names
     # and save file to local directory
     log.info('Write bibliography to %s%s.bib', biboutputpath, methodname)
@@ -238,6 +335,6 @@ def generateFBSplot(method_dict, plottype, sector_length_display=None,
     are subset by all sectors that "start with" the values in this list
     :return: graphic displaying results of FBS models
     """
-
+    from flowsa.datavisualization import FBSscatterplot
     FBSscatterplot(method_dict, plottype, sector_length_display,
                    sectors_to_include, plot_title)
@@ -9,6 +9,7 @@ import pandas as pd
 from flowsa.common import fbs_activity_fields, sector_level_key, \
     load_crosswalk, check_activities_sector_like
 from flowsa.settings import log, vLogDetailed
+from flowsa.profiler import profile_stage
 from flowsa.dataclean import replace_NoneType_with_empty_cells, \
     replace_strings_with_NoneType
 from flowsa.flowbyfunctions import sector_aggregation, aggregator, \
@@ -220,6 +221,7 @@ def proportional_allocation_by_location_and_activity(df_load, sectorcolumn):
     return allocation_df
 
 
+@profile_stage
 def equally_allocate_parent_to_child_naics(
         df_load, method, overwritetargetsectorlevel=None):
     """
@@ -344,7 +346,8 @@ def equal_allocation(fba_load):
     from flowsa.flowbyfunctions import assign_columns_of_sector_levels
 
     # aggregate df
-    aggcols = list(fba_load.select_dtypes(include=['object', 'int']).columns)
+    aggcols = list(fba_load.select_dtypes(
+        include=['object', 'string', 'int']).columns)
     fba = aggregator(fba_load, aggcols)
 
     # first check that all sector lengths are the same
@@ -376,7 +379,7 @@ def equal_allocation(fba_load):
         return fba
 
     # create groupby cols by which to determine allocation
-    fba_cols = fba.select_dtypes([object]).columns.to_list()
+    fba_cols = fba.select_dtypes([object, 'string']).columns.to_list()
     groupcols = [e for e in fba_cols if e not in
                  ['SectorProducedBy', 'SectorConsumedBy', 'Description']]
     # create counts of rows
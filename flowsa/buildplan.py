@@ -0,0 +1,336 @@
+# buildplan.py (flowsa)
+# !/usr/bin/env python3
+# coding=utf-8
+"""
+Plan and run the generation of FlowBySector datasets together with the
+FlowByActivity datasets they depend on.
+
+The FBS method yamls are read to build a dependency graph where each node
+is either an FBA (source and year) or an FBS method. Every FBA in the graph
+is generated, or loaded/downloaded if it already exists, exactly once, and
+FBS methods that do not depend on one another are generated concurrently.
+
+Example: "python -m flowsa.buildplan -m Water_national_2015_m1
+    Land_national_2012 -w 4"
+"""
+
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+import flowsa
+import flowsa.exceptions
+from flowsa.common import load_yaml_dict, str2bool, \
+    load_fbs_methods_additional_fbas_config, \
+    load_functions_loading_fbas_config
+from flowsa.settings import log, set_log_files, DEFAULT_DOWNLOAD_IF_MISSING
+
+
+def parse_args():
+    """
+    Make method parameters
+    :return: dictionary, 'methods', 'n_jobs', 'download_FBAs_if_missing',
+        'force_rebuild'
+    """
+    ap = argparse.ArgumentParser()
+    ap.add_argument("-m", "--methods", nargs='+', required=False,
+                    help="FBS methods to generate, defaults to all FBS "
+                         "methods in flowsa.")
+    ap.add_argument("-w", "--workers", dest="n_jobs",
+                    type=int, required=False,
+                    help="Number of FBA or FBS datasets to generate at the "
+                         "same time.")
+    ap.add_argument("-d", "--download_FBAs_if_missing",
+                    type=str2bool, required=False,
+                    help="Option to download any FBAs not saved locally "
+                         "rather than generating the FBAs in FLOWSA.")
+    ap.add_argument("-f", "--force_rebuild",
+                    type=str2bool, required=False,
+                    help="Option to regenerate the FBS even if none of "
+                         "the inputs changed since it was last generated.")
+    args = vars(ap.parse_args())
+    return args
+
+
+def fba_node(source, year):
+    """
+    :param source: str, FBA source name
+    :param year: int or str, FBA year
+    :return: tuple, graph node of the FBA
+    """
+    return 'FBA', source, str(year)
+
+
+def fbs_node(method):
+    """
+    :param method: str, FBS method name
+    :return: tuple, graph node of the FBS
+    """
+    return 'FBS', method
+
+
+def list_fbs_method_dependencies(methodname, fbsconfigpath=None):
+    """
+    Determine the FBAs, FBSs and values from the literature that are used
+    to generate a FlowBySector, including the FBAs loaded within functions
+    listed in fbs_methods_additional_fbas.yaml
+    :param methodname: str, FBS method
+    :param fbsconfigpath: str, optional path to an FBS method outside flowsa
+        repo
+    :return: list, graph nodes in the order they are found in the method
+    """
+    fbs_yaml = load_yaml_dict(methodname, flowbytype='FBS',
+                              filepath=fbsconfigpath)
+    nodes = []
+    for k, v in fbs_yaml.get('source_names', {}).items():
+        data_format = v.get('data_format')
+        if data_format == 'FBS':
+            nodes.append(fbs_node(k))
+        elif data_format == 'FBA' and v.get('year') is not None:
+            nodes.append(fba_node(k, v['year']))
+        # FBA sources in method files only used through !include do not
+        # have a year, the including method sets the year
+        # 'FBS_outside_flowsa' sources are generated by other packages
+
+        for attr in (v.get('activity_sets') or {}).values():
+            for s, y in [(attr.get('allocation_source'),
+                          attr.get('allocation_source_year')),
+                         (attr.get('helper_source'),
+                          attr.get('helper_source_year'))]:
+                # allocation sources can be functions rather than datasets
+                if isinstance(s, str) and s != 'None' and \
+                        y not in (None, 'None'):
+                    nodes.append(fba_node(s, y))
+            for s, y in (attr.get('literature_sources') or {}).items():
+                nodes.append(('Literature', s, str(y)))
+
+    # FBAs loaded within functions called in the method
+    fbas = load_fbs_methods_additional_fbas_config().get(methodname, {})
+    fxn_fbas = load_functions_loading_fbas_config()
+    for acts_info in fbas.values():
+        for fxn_info in acts_info.values():
+            for fxn, fba_info in fxn_info.items():
+                for fba, y in fba_info.items():
+                    nodes.append(fba_node(fxn_fbas[fxn][fba]['source'], y))
+
+    return list(dict.fromkeys(nodes))
+
+
+def list_buildable_methods():
+    """
+    List the FBS methods in flowsa that can be generated, skipping yamls
+    that are only included in other methods, which have no sources or
+    sources without a year
+    :return: list, FBS method names
+    """
+    methods = []
+    for m in flowsa.seeAvailableFlowByModels("FBS", print_method=False):
+        sources = load_yaml_dict(m, flowbytype='FBS').get('source_names')
+        if sources and all(v.get('year') is not None
+                           for v in sources.values()
+                           if v.get('data_format') == 'FBA'):
+            methods.append(m)
+    return methods
+
+
+def build_dependency_graph(methods, fbsconfigpath=None):
+    """
+    Build the dependency graph for a list of FBS methods. FBS methods
+    used as a source in another method are added to the graph.
+    :param methods: list, FBS method names
+    :param fbsconfigpath: str, optional path to the FBS methods outside
+        flowsa repo
+    :return: dictionary, graph nodes mapped to the list of nodes they
+        depend on
+    """
+    graph = {}
+    pending = [fbs_node(m) for m in methods]
+    while pending:
+        node = pending.pop(0)
+        if node in graph:
+            continue
+        if node[0] == 'FBS':
+            graph[node] = list_fbs_method_dependencies(node[1], fbsconfigpath)
+            pending.extend(graph[node])
+        else:
+            graph[node] = []
+    check_for_cycles(graph)
+    return graph
+
+
+def check_for_cycles(graph):
+    """
+    Raise an error if FBS methods depend on one another
+    :param graph: dictionary, nodes mapped to the nodes they depend on
+    """
+    remaining = {n: set(d) for n, d in graph.items()}
+    while remaining:
+        ready = [n for n, d in remaining.items() if not d]
+        if not ready:
+            raise flowsa.exceptions.FBSMethodConstructionError(
+                message="Circular dependency between FBS methods: "
+                        f"{', '.join(n[1] for n in remaining)}")
+        for n in ready:
+            del remaining[n]
+        for d in remaining.values():
+            d.difference_update(ready)
+
+
+def node_name(node):
+    """
+    :param node: tuple, graph node
+    :return: str, name of the dataset, e.g. 'USGS_NWIS_WU_2015'
+    """
+    return '_'.join(str(x) for x in node[1:])
+
+
+def build_node(node, fbsconfigpath=None,
+               download_FBA_if_missing=DEFAULT_DOWNLOAD_IF_MISSING,
+               force_rebuild=False, log_suffix=None):
+    """
+    Generate the dataset for a graph node. FBAs are only generated if they
+    are not found locally (or downloaded). An FBS is skipped if none of its
+    inputs changed since it was last generated, unless force_rebuild.
+    :param node: tuple, graph node
+    :param fbsconfigpath: str, optional path to an FBS method outside flowsa
+        repo
+    :param download_FBA_if_missing: bool, if True will download FBAs from
+       Data Commons
+    :param force_rebuild: bool, if True regenerate the FBS even if its
+        inputs are unchanged
+    :param log_suffix: str, if defined, log to separate files named with
+        the suffix while the node is built, used when nodes are built in
+        parallel processes
+    """
+    if log_suffix is not None:
+        set_log_files(log_suffix)
+    try:
+        if node[0] == 'FBA':
+            flowsa.getFlowByActivity(
+                datasource=node[1], year=node[2],
+                download_FBA_if_missing=download_FBA_if_missing)
+        elif node[0] == 'FBS':
+            flowsa.flowbysector.main(
+                method=node[1], fbsconfigpath=fbsconfigpath,
+                download_FBAs_if_missing=download_FBA_if_missing,
+                force_rebuild=force_rebuild)
+    finally:
+        if log_suffix is not None:
+            set_log_files()
+
+
+def run_build_plan(graph, fbsconfigpath=None,
+                   download_FBA_if_missing=DEFAULT_DOWNLOAD_IF_MISSING,
+                   n_jobs=None, force_rebuild=False):
+    """
+    Build the nodes of a dependency graph once all the nodes they depend
+    on are built. A node is skipped if a node it depends on failed.
+    :param graph: dictionary, nodes mapped to the nodes they depend on
+    :param fbsconfigpath: str, optional path to an FBS method outside flowsa
+        repo
+    :param download_FBA_if_missing: bool, if True will download FBAs from
+       Data Commons
+    :param n_jobs: int, number of nodes to build at the same time, builds in
+        the main process if None or 1. Nodes are built in processes started
+        with the default start method of the platform, each logging to
+        files named for its node
+    :param force_rebuild: bool, if True regenerate FBS with unchanged
+        inputs
+    :return: dictionary, nodes mapped to 'built', 'failed' or 'skipped'
+    """
+    # values from the literature are stored in flowsa, nothing to build
+    status = {n: 'built' for n in graph if n[0] == 'Literature'}
+    remaining = {n: set(d) for n, d in graph.items() if n not in status}
+
+    def ready_nodes():
+        # skip the dependents of failed nodes, until no more are skipped
+        skipped = True
+        while skipped:
+            skipped = [n for n, d in remaining.items() if any(
+                status.get(x) in ('failed', 'skipped') for x in d)]
+            for n in skipped:
+                log.error('Skipping %s, a dataset it depends on failed',
+                          n[1])
+                status[n] = 'skipped'
+                del remaining[n]
+        ready = [n for n, d in remaining.items()
+                 if all(status.get(x) == 'built' for x in d)]
+        for n in ready:
+            del remaining[n]
+        return ready
+
+    def record(n, fxn, *args):
+        try:
+            fxn(*args)
+            status[n] = 'built'
+        except Exception as e:
+            log.exception('Error generating %s: %s', n[1], e)
+            status[n] = 'failed'
+
+    if n_jobs is None or n_jobs <= 1:
+        while remaining:
+            for n in ready_nodes():
+                record(n, build_node, n, fbsconfigpath,
+                       download_FBA_if_missing, force_rebuild)
+        return status
+
+    # fork is not safe on all platforms (e.g. macOS), so processes are
+    # started with the default method of the platform
+    executor = ProcessPoolExecutor(max_workers=n_jobs,
+                                   mp_context=multiprocessing.get_context())
+    log.info(f"Building {len(graph)} datasets on {n_jobs} workers, see "
+             "the flowsa_<dataset>.log files")
+    with executor:
+        running = {}
+        while remaining or running:
+            for n in ready_nodes():
+                running[executor.submit(
+                    build_node, n, fbsconfigpath, download_FBA_if_missing,
+                    force_rebuild, log_suffix=node_name(n))] = n
+            if not running:
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for f in done:
+                record(running.pop(f), f.result)
+    return status
+
+
+def main(**kwargs):
+    """
+    Generate FBS methods and the FBAs they depend on
+    :param kwargs: dictionary of arguments:
+        "methods": list, FBS methods, defaults to all FBS methods in flowsa
+        "fbsconfigpath": str, optional path to the FBS methods outside
+            flowsa repo
+        "download_FBAs_if_missing": bool, if True will download FBAs from
+            Data Commons
+        "n_jobs": int, number of datasets to generate at the same time
+        "force_rebuild": bool, if True regenerate FBS even if none of their
+            inputs changed
+    :return: dictionary, nodes mapped to 'built', 'failed' or 'skipped'
+    """
+    if len(kwargs) == 0:
+        kwargs = parse_args()
+
+    methods = kwargs.get('methods')
+    if methods is None:
+        methods = list_buildable_methods()
+    fbsconfigpath = kwargs.get('fbsconfigpath')
+    download_FBA_if_missing = kwargs.get('download_FBAs_if_missing')
+    if download_FBA_if_missing is None:
+        download_FBA_if_missing = DEFAULT_DOWNLOAD_IF_MISSING
+
+    graph = build_dependency_graph(methods, fbsconfigpath)
+    log.info('Build plan: %s FBAs, %s FBS',
+             sum(n[0] == 'FBA' for n in graph),
+             sum(n[0] == 'FBS' for n in graph))
+    status = run_build_plan(graph, fbsconfigpath, download_FBA_if_missing,
+                            kwargs.get('n_jobs'),
+                            force_rebuild=bool(kwargs.get('force_rebuild')))
+    failed = [n[1] for n, s in status.items() if s != 'built']
+    if failed:
+        log.error('Datasets not generated: %s', ', '.join(failed))
+    return status
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+# checkpoint.py (flowsa)
+# !/usr/bin/env python3
+# coding=utf-8
+"""
+On-disk store of the intermediate FBS dataframes created for each source
+and activity set of an FBS method, so an FBS build only attributes the
+activity sets without a valid checkpoint, whether the previous build was
+interrupted or its inputs changed. The checkpoints of a method are kept
+once its FBS is saved, checkpoints with keys not used by that build are
+pruned.
+
+Checkpoints are saved to FBSCheckpoints/<method>/ in the local flowsa
+directory, as a parquet (a pickle if the dataframe has object columns of
+mixed types) with a JSON file of the key (fingerprint of the activity set
+inputs) it was generated with.
+"""
+
+import json
+import os
+import shutil
+import pandas as pd
+from flowsa.settings import checkpointpath
+
+
+def checkpoint_name(k, aset=None):
+    """
+    :param k: str, source name
+    :param aset: str, activity set name, None for sources not split into
+        activity sets
+    :return: str, name of the checkpoint
+    """
+    return k if aset is None else f'{k}_{aset}'
+
+
+def _checkpoint_file(method_name, name, ext):
+    return f'{checkpointpath}{method_name}/{name}.{ext}'
+
+
+def find_checkpoint(method_name, name, key):
+    """
+    Return the checkpoint metadata if a checkpoint exists for the key
+    :param method_name: str, FBS method name
+    :param name: str, checkpoint name
+    :param key: str, fingerprint of the inputs
+    :return: dictionary, checkpoint metadata, None if there is no
+        checkpoint for the key
+    """
+    try:
+        with open(_checkpoint_file(method_name, name, 'json'), 'r') as f:
+            meta = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+    if meta.get('key') != key:
+        return None
+    if not meta['empty'] and not os.path.isfile(
+            _checkpoint_file(method_name, name, meta['format'])):
+        return None
+    return meta
+
+
+def write_checkpoint(df, method_name, name, key):
+    """
+    Save a dataframe to the checkpoint store. The JSON is written last so
+    a checkpoint is only found once the parquet is complete.
+    :param df: df, FBS of the activity set, None if no data
+    :param method_name: str, FBS method name
+    :param name: str, checkpoint name
+    :param key: str, fingerprint of the inputs
+    """
+    os.makedirs(f'{checkpointpath}{method_name}', exist_ok=True)
+    meta_file = _checkpoint_file(method_name, name, 'json')
+    for f in [meta_file] + [_checkpoint_file(method_name, name, ext)
+                            for ext in ('parquet', 'pkl')]:
+        if os.path.isfile(f):
+            os.remove(f)
+    fmt = 'parquet'
+    if df is not None:
+        data_file = _checkpoint_file(method_name, name, fmt)
+        try:
+            df.to_parquet(f'{data_file}.tmp', index=False)
+        except (TypeError, ValueError):
+            # object columns with mixed types can not be saved to parquet
+            fmt = 'pkl'
+            data_file = _checkpoint_file(method_name, name, fmt)
+            df.to_pickle(f'{data_file}.tmp')
+        os.replace(f'{data_file}.tmp', data_file)
+    meta = {'key': key, 'empty': df is None, 'format': fmt,
+            'rows': 0 if df is None else len(df)}
+    with open(f'{meta_file}.tmp', 'w') as f:
+        json.dump(meta, f)
+    os.replace(f'{meta_file}.tmp', meta_file)
+
+
+def load_checkpoints(method_name, names):
+    """
+    Generator of the dataframes in the checkpoint store, skipping
+    checkpoints of activity sets without data
+    :param method_name: str, FBS method name
+    :param names: list, checkpoint names
+    :return: generator of dfs
+    """
+    for name in names:
+        parquet_file = _checkpoint_file(method_name, name, 'parquet')
+        if os.path.isfile(parquet_file):
+            yield pd.read_parquet(parquet_file)
+        elif os.path.isfile(_checkpoint_file(method_name, name, 'pkl')):
+            yield pd.read_pickle(_checkpoint_file(method_name, name, 'pkl'))
+
+
+def clear_checkpoints(method_name):
+    """
+    Delete all checkpoints of an FBS method
+    :param method_name: str, FBS method name
+    """
+    shutil.rmtree(f'{checkpointpath}{method_name}', ignore_errors=True)
+
+
+def prune_checkpoints(method_name, keys):
+    """
+    Delete the checkpoints of an FBS method that are not valid for the
+    keys, such as checkpoints of renamed or removed activity sets
+    :param method_name: str, FBS method name
+    :param keys: dictionary, checkpoint name: key of the checkpoints to keep
+    """
+    method_path = f'{checkpointpath}{method_name}'
+    if not os.path.isdir(method_path):
+        return
+    for file in os.listdir(method_path):
+        name, ext = os.path.splitext(file)
+        if ext == '.tmp' or (
+                ext in ('.json', '.parquet', '.pkl') and (
+                name not in keys or
+                find_checkpoint(method_name, name, keys[name]) is None)):
+            os.remove(f'{method_path}/{file}')
@@ -6,6 +6,7 @@
 
 import shutil
 import os
+from collections import OrderedDict
 import yaml
 import pandas as pd
 import numpy as np
@@ -18,7 +19,7 @@ from flowsa.schema import flow_by_activity_fields, flow_by_sector_fields, \
     flow_by_activity_wsec_fields, flow_by_activity_mapped_wsec_fields, \
     activity_fields
 from flowsa.settings import datapath, MODULEPATH, logoutputpath, \
-    sourceconfigpath, log, flowbysectormethodpath, methodpath
+    sourceconfigpath, log, flowbysectormethodpath, methodpath, get_log_files
 
 
 # Sets default Sector Source Name
@@ -65,27 +66,87 @@ def load_env_file_key(env_file, key):
     return value
 
 
+# in-process registry of crosswalks loaded from the flowsa data directory,
+# so each csv is only parsed once per session. Frames are stored once and
+# copies are returned so callers can modify them freely.
+CROSSWALK_CACHE_MAXSIZE = 32
+_crosswalk_cache = OrderedDict()
+_crosswalk_cache_stats = {'hits': 0, 'misses': 0}
+
+crosswalk_dict = {'sector_timeseries': 'NAICS_Crosswalk_TimeSeries',
+                  'sector_length': 'NAICS_2012_Crosswalk',
+                  'sector_name': 'Sector_2012_Names',
+                  'household': 'Household_SectorCodes',
+                  'government': 'Government_SectorCodes',
+                  'BEA': 'NAICS_to_BEA_Crosswalk'
+                  }
+
+
+def get_cached_crosswalk(key, load_fxn, copy=True):
+    """
+    Return a crosswalk from the in-process registry, loading and storing
+    the crosswalk on first request. The least recently used crosswalk is
+    dropped when the registry exceeds CROSSWALK_CACHE_MAXSIZE.
+    :param key: str, name used to store the crosswalk in the registry
+    :param load_fxn: function, called with no arguments to load the
+        crosswalk if it is not already stored
+    :param copy: bool, False to return the stored object itself, for
+        objects compiled from crosswalks that are not modified by callers
+    :return: df, copy of the stored crosswalk
+    """
+    if key in _crosswalk_cache:
+        _crosswalk_cache_stats['hits'] += 1
+        _crosswalk_cache.move_to_end(key)
+    else:
+        _crosswalk_cache_stats['misses'] += 1
+        _crosswalk_cache[key] = load_fxn()
+        while len(_crosswalk_cache) > CROSSWALK_CACHE_MAXSIZE:
+            _crosswalk_cache.popitem(last=False)
+    if not copy:
+        return _crosswalk_cache[key]
+    return _crosswalk_cache[key].copy()
+
+
+def clear_crosswalk_cache(key=None):
+    """
+    Drop crosswalks from the in-process registry, necessary if the crosswalk
+    csvs are modified during a session
+    :param key: str, optional, name of single crosswalk to drop. If None,
+        all crosswalks are dropped and the hit/miss counters are reset
+    """
+    if key is None:
+        _crosswalk_cache.clear()
+        _crosswalk_cache_stats.update({'hits': 0, 'misses': 0})
+    else:
+        _crosswalk_cache.pop(key, None)
+
+
+def crosswalk_cache_info():
+    """
+    Return counters for the in-process crosswalk registry
+    :return: dictionary, 'hits', 'misses', and 'size' of the registry
+    """
+    return {**_crosswalk_cache_stats, 'size': len(_crosswalk_cache)}
+
+
 def load_crosswalk(crosswalk_name):
     """
     Load NAICS crosswalk between the years 2007, 2012, 2017
     :return: df, NAICS crosswalk over the years
     """
+    fn = crosswalk_dict.get(crosswalk_name)
 
-    cw_dict = {'sector_timeseries': 'NAICS_Crosswalk_TimeSeries',
-               'sector_length': 'NAICS_2012_Crosswalk',
-               'sector_name': 'Sector_2012_Names',
-               'household': 'Household_SectorCodes',
-               'government': 'Government_SectorCodes',
-               'BEA': 'NAICS_to_BEA_Crosswalk'
-               }
+    return get_cached_crosswalk(
+        crosswalk_name,
+        lambda: pd.read_csv(f'{datapath}{fn}.csv', dtype="str"))
 
-    fn = cw_dict.get(crosswalk_name)
 
-    cw = pd.read_csv(f'{datapath}{fn}.csv', dtype="str")
-    return cw
+def load_sector_length_cw_melt():
+    return get_cached_crosswalk('sector_length_melt',
+                                _melt_sector_length_cw)
 
 
-def load_sector_length_cw_melt():
+def _melt_sector_length_cw():
     cw_load = load_crosswalk('sector_length')
     cw_melt = cw_load.melt(var_name="SectorLength", value_name='Sector'
                            ).drop_duplicates().reset_index(drop=True)
@@ -117,8 +178,10 @@ def return_bea_codes_used_as_naics():
 def load_yaml_dict(filename, flowbytype=None, filepath=None):
     """
     Load the information in a yaml file, from source_catalog, or FBA,
-    or FBS files
-    :return: dictionary containing all information in yaml
+    or FBS files. Files are parsed once while they and the files they
+    include are unmodified
+    :return: dictionary containing all information in yaml, a copy that
+        can be modified
     """
     if filename in ['source_catalog']:
         folder = datapath
@@ -139,8 +202,7 @@ def load_yaml_dict(filename, flowbytype=None, filepath=None):
     yaml_path = folder + filename + '.yaml'
 
     try:
-        with open(yaml_path, 'r') as f:
-            config = flowsa_yaml.load(f, filepath)
+        config = flowsa_yaml.load_file(yaml_path, filepath)
     except FileNotFoundError:
         raise flowsa.exceptions.FlowsaMethodNotFoundError(
             method_type=flowbytype, method=filename)
@@ -298,8 +360,12 @@ def rename_log_file(filename, fb_meta):
     :param fb_meta: metadata for parquet
     :return: modified log file name
     """
-    # original log file name - all log statements
-    log_file = f'{logoutputpath}{"flowsa.log"}'
+    # current log file names - all log statements and validation
+    log_file, vlog_file = get_log_files()
+    # log files are only created when the first record is written
+    for file in (log_file, vlog_file):
+        if not os.path.exists(file):
+            open(file, 'a').close()
     # generate new log name
     new_log_name = (f'{logoutputpath}{filename}_v'
                     f'{fb_meta.tool_version}'
@@ -310,8 +376,6 @@ def rename_log_file(filename, fb_meta):
     # rename the standard log file name (os.rename throws error if file
     # already exists)
     shutil.copy(log_file, new_log_name)
-    # original log file name - validation
-    log_file = f'{logoutputpath}{"validation_flowsa.log"}'
     # generate new log name
     new_log_name = (f'{logoutputpath}{filename}_v'
                     f'{fb_meta.tool_version}'
@@ -321,7 +385,7 @@ def rename_log_file(filename, fb_meta):
     create_paths_if_missing(logoutputpath)
     # rename the standard log file name (os.rename throws error if file
     # already exists)
-    shutil.copy(log_file, new_log_name)
+    shutil.copy(vlog_file, new_log_name)
 
 
 def return_true_source_catalog_name(sourcename):
@@ -174,7 +174,7 @@ def subset_BEA_table(df_load, attr, **_):
         df2 = pd.concat([df, df2])
 
     # aggregate cols
-    df3 = aggregator(df2, list(df2.select_dtypes(include=['object',
+    df3 = aggregator(df2, list(df2.select_dtypes(include=['object', 'string',
                                                           'int']).columns))
 
     return df3
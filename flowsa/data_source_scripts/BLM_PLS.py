@@ -8,12 +8,11 @@ Bureau of Land Management Public Land Statistics data
 """
 
 import re
-import io
-from tabula.io import read_pdf
 import pandas as pd
 from flowsa.location import get_all_state_FIPS_2
 from flowsa.common import WITHDRAWN_KEYWORD
 from flowsa.settings import log
+from flowsa.pdftables import read_pdf_pages
 
 
 def split(row, header, sub_header, next_line):
@@ -483,6 +482,12 @@ def blm_pls_call(*, resp, year, **_):
         log.error('Missing code specifying sub-headers, '
                   'add code to blm_pls_call()')
 
+    # extract all the pages at once, pages are listed under several headers
+    tables = read_pdf_pages(
+        resp.content, sorted({p for h in sub_headers.values()
+                              for pg in h.values() for p in pg}),
+        stream=True, guess=False)
+
     for header in sub_headers:
         for sub_header in sub_headers[header]:
             pg = sub_headers[header][sub_header]
@@ -490,9 +495,7 @@ def blm_pls_call(*, resp, year, **_):
             for page_number in pg:
                 found_header = False
 
-                pdf_page = read_pdf(io.BytesIO(resp.content),
-                                    pages=page_number, stream=True,
-                                    guess=False)[0]
+                pdf_page = tables[page_number][0].copy()
 
                 if pdf_page.shape[1] == 1:
                     pdf_page.columns = ["one"]
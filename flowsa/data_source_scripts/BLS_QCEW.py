@@ -161,7 +161,8 @@ def bls_clean_allocation_fba_w_sec(df_w_sec, **kwargs):
     dictionary of FBA method yaml parameters
     :return: df, BLS QCEW FBA with estimated suppressed data
     """
-    groupcols = list(df_w_sec.select_dtypes(include=['object', 'int']).columns)
+    groupcols = list(df_w_sec.select_dtypes(
+        include=['object', 'string', 'int']).columns)
     # estimate supressed data
     df = equally_allocate_suppressed_parent_to_child_naics(
         df_w_sec, kwargs['method'], 'SectorProducedBy', groupcols)
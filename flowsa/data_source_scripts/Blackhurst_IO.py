@@ -8,7 +8,6 @@ Includes supporting functions for Blackhurst paper data.
 """
 
 import io
-from tabula.io import read_pdf
 import pandas as pd
 import numpy as np
 from flowsa.allocation import \
@@ -18,6 +17,7 @@ from flowsa.flowbyfunctions import assign_fips_location_system, \
     load_fba_w_standardized_units
 from flowsa.sectormapping import add_sectors_to_flowbyactivity
 from flowsa.settings import externaldatapath
+from flowsa.pdftables import read_pdf_pages
 from flowsa.validation import compare_df_units
 
 
@@ -31,11 +31,10 @@ def bh_parse(*, df_list, **_):
 
     # load pdf from externaldatapath directory
     pages = range(5, 13)
-    bh_df_list = []
-    for x in pages:
-        bh_df = read_pdf(f'{externaldatapath}Blackhurst_WatWithdrawalsforUSIndustrialSectorsSI.pdf',
-                         pages=x, stream=True)[0]
-        bh_df_list.append(bh_df)
+    with open(f'{externaldatapath}Blackhurst_WatWithdrawals'
+              'forUSIndustrialSectorsSI.pdf', 'rb') as f:
+        tables = read_pdf_pages(f.read(), pages, stream=True)
+    bh_df_list = [tables[x][0] for x in pages]
 
     df = pd.concat(bh_df_list, sort=False)
     df = df.rename(columns={"I-O code": "ActivityConsumedBy",
@@ -7,7 +7,6 @@
 https://www.eia.gov/consumption/commercial/reports/2012/energyusage/index.php
 Last updated: Monday, August 17, 2020
 """
-import io
 import pandas as pd
 import numpy as np
 from flowsa.location import US_FIPS, get_region_and_division_codes
@@ -18,6 +17,7 @@ from flowsa.flowbyfunctions import assign_fips_location_system, aggregator
 from flowsa.literature_values import \
     get_commercial_and_manufacturing_floorspace_to_land_area_ratio
 from flowsa.validation import calculate_flowamount_diff_between_dfs
+from flowsa.workbook import read_workbook
 
 
 def eia_cbecs_land_URL_helper(*, build_url, config, **_):
@@ -52,10 +52,9 @@ def eia_cbecs_land_call(*, resp, url, **_):
     :return: pandas dataframe of original source data
     """
     # Convert response to dataframe
-    df_raw_data = pd.read_excel(io.BytesIO(resp.content),
-                                sheet_name='data')
-    df_raw_rse = pd.read_excel(io.BytesIO(resp.content),
-                               sheet_name='rse')
+    workbook = read_workbook(resp.content)
+    df_raw_data = workbook.sheet('data')
+    df_raw_rse = workbook.sheet('rse')
 
     if "b5.xlsx" in url:
         # skip rows and remove extra rows at end of dataframe
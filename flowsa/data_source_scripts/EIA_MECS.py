@@ -8,7 +8,6 @@ https://www.eia.gov/consumption/manufacturing/data/2014/
 Last updated: 8 Sept. 2020
 """
 from functools import reduce
-import io
 import math
 
 import pandas as pd
@@ -17,6 +16,7 @@ from flowsa.allocation import equally_allocate_parent_to_child_naics
 from flowsa.location import US_FIPS
 from flowsa.common import WITHDRAWN_KEYWORD, load_crosswalk
 from flowsa.settings import vLogDetailed
+from flowsa.workbook import read_workbook
 from flowsa.flowbyfunctions import assign_fips_location_system, sector_aggregation
 from flowsa.dataclean import replace_strings_with_NoneType, \
     replace_NoneType_with_empty_cells
@@ -69,10 +69,9 @@ def eia_mecs_land_call(*, resp, year, **_):
     :return: pandas dataframe of original source data
     """
     # Convert response to dataframe
-    df_raw_data = pd.read_excel(io.BytesIO(resp.content),
-                                sheet_name='Table 9.1')
-    df_raw_rse = pd.read_excel(io.BytesIO(resp.content),
-                               sheet_name='RSE 9.1')
+    workbook = read_workbook(resp.content)
+    df_raw_data = workbook.sheet('Table 9.1')
+    df_raw_rse = workbook.sheet('RSE 9.1')
     if year == "2014":
         # skip rows and remove extra rows at end of dataframe
         df_rse = pd.DataFrame(df_raw_rse.loc[12:93]).reindex()
@@ -248,10 +247,9 @@ def eia_mecs_energy_call(*, resp, year, config, **_):
 
     # read raw data into dataframe
     # (include both Sheet 1 (data) and Sheet 2 (relative standard errors))
-    df_raw_data = pd.read_excel(io.BytesIO(resp.content),
-                                sheet_name=0, header=None)
-    df_raw_rse = pd.read_excel(io.BytesIO(resp.content),
-                               sheet_name=1, header=None)
+    workbook = read_workbook(resp.content)
+    df_raw_data = workbook.sheet(0, header=None)
+    df_raw_rse = workbook.sheet(1, header=None)
 
     # retrieve table name from cell A3 of Excel file
     table = df_raw_data.iloc[2][0]
@@ -10,7 +10,6 @@ Last updated: 2018-11-07
 """
 
 import pandas as pd
-from tabula.io import read_pdf
 import re
 import os
 from flowsa.location import US_FIPS
@@ -18,6 +17,7 @@ from flowsa.settings import externaldatapath, log
 from flowsa.flowbyfunctions import assign_fips_location_system, aggregator
 from flowsa.dataclean import standardize_units
 from flowsa.schema import flow_by_activity_mapped_fields
+from flowsa.workbook import read_workbook
 
 
 def call_cddpath_model(*, resp, year, config, **_):
@@ -52,27 +52,27 @@ def call_cddpath_model(*, resp, year, config, **_):
         sheet_name = f"Final Results {year}"
 
     # Convert response to dataframe
-    df1 = (pd.read_excel(source_data,
-                         sheet_name=sheet_name,
-                         # exclude extraneous rows & cols
-                         header=2, nrows=30, usecols="A, B",
-                         # give columns tidy names
-                         names=["FlowName", "Landfill"],
-                         # specify data types
-                         dtype={'a': str, 'b': float})
+    workbook = read_workbook(source_data)
+    df1 = (workbook.sheet(sheet_name,
+                          # exclude extraneous rows & cols
+                          header=2, nrows=30, usecols="A, B",
+                          # give columns tidy names
+                          names=["FlowName", "Landfill"],
+                          # specify data types
+                          dtype={'a': str, 'b': float})
            .dropna()  # drop NaN's produced by Excel cell merges
            .melt(id_vars=["FlowName"],
                  var_name="ActivityConsumedBy",
                  value_name="FlowAmount"))
 
-    df2 = (pd.read_excel(source_data,
-                         sheet_name=sheet_name,
-                         # exclude extraneous rows & cols
-                         header=2, nrows=30, usecols="A, C, D",
-                         # give columns tidy names
-                         names=["FlowName", "ActivityConsumedBy", "FlowAmount"],
-                         # specify data types
-                         dtype={'a': str, 'c': str, 'd': float})
+    df2 = (workbook.sheet(sheet_name,
+                          # exclude extraneous rows & cols
+                          header=2, nrows=30, usecols="A, C, D",
+                          # give columns tidy names
+                          names=["FlowName", "ActivityConsumedBy",
+                                 "FlowAmount"],
+                          # specify data types
+                          dtype={'a': str, 'c': str, 'd': float})
            .fillna(method='ffill'))
     df = pd.concat([df1, df2], ignore_index=True)
 
@@ -141,6 +141,7 @@ def combine_cdd_path(*, resp, year, config, **_):
 
 def call_generation_by_source(file_dict):
     """Extraction generation by source data from pdf"""
+    from tabula.io import read_pdf
     pg = file_dict.get('pg')
     url = file_dict.get('url')
     df = read_pdf(url, pages=pg, stream=True, guess=True)[0]
@@ -6,12 +6,11 @@ Scrapes data from EPA's Facts and Figures Data table PDF. Includes
 supporting functions.
 """
 
-import io
-from tabula.io import read_pdf
 import pandas as pd
 import numpy as np
 from flowsa.location import US_FIPS
 from flowsa.flowbyfunctions import assign_fips_location_system
+from flowsa.pdftables import read_pdf_pages
 
 
 def ff_call(*, resp, year, **_):
@@ -28,11 +27,9 @@ def ff_call(*, resp, year, **_):
     if year == '2018':
         pages = [6, 8, 9]
     pdf_pages = []
+    tables = read_pdf_pages(resp.content, pages, stream=True, guess=True)
     for page_number in pages:
-        pdf_page = read_pdf(io.BytesIO(resp.content),
-                            pages=page_number,
-                            stream=True,
-                            guess=True)[0]
+        pdf_page = tables[page_number][0]
         if page_number == 6:
             # skip the first few rows
             pg = pdf_page.loc[2:33].reset_index(drop=True)
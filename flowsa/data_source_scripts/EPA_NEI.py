@@ -12,6 +12,9 @@ import pandas as pd
 from flowsa.flowbyfunctions import assign_fips_location_system
 from flowsa.dataclean import standardize_units
 
+# rows of the NEI csv files read at a time
+NEI_CHUNKSIZE = 500000
+
 
 def epa_nei_url_helper(*, build_url, year, config, **_):
     """
@@ -34,52 +37,70 @@ def epa_nei_url_helper(*, build_url, year, config, **_):
     return [url]
 
 
-def epa_nei_call(*, resp, **_):
+def epa_nei_call(*, resp, year, config, **_):
     """
-    Convert response for calling _1 to pandas dataframe
-    :param _1: string, url (unused)
+    Convert response for calling url to pandas dataframe. The csv files of
+    the zip archive are read in chunks of NEI_CHUNKSIZE rows, and only the
+    columns in the FBA method are kept, so the raw county level files are
+    never held in memory at once
     :param resp: df, response from url call
-    :param _2: dictionary, arguments specified when running
-        flowbyactivity.py ('year' and 'source') (unused)
+    :param year: year
+    :param config: dictionary, items in FBA method yaml, the columns kept
+        are the values of config['col_dict'][year]
     :return: pandas dataframe of original source data
     """
+    col_dict = config['col_dict'][year]
+    df_list = []
     with ZipFile(io.BytesIO(resp.content)) as z:
-        # Read in all .csv files from the zip archive as a list of dataframes
-        df_list = [pd.read_csv(z.open(name)) for name in z.namelist()
-                   if path.splitext(name)[1] == '.csv']
-    return pd.concat(df_list)
-
-
-def epa_nei_global_parse(*, df_list, source, year, config, **_):
+        # Read in all .csv files from the zip archive
+        for name in z.namelist():
+            if path.splitext(name)[1] != '.csv':
+                continue
+            with z.open(name) as f:
+                for chunk in pd.read_csv(
+                        f, usecols=lambda c: c in col_dict.values(),
+                        dtype={col_dict['Location']: str},
+                        chunksize=NEI_CHUNKSIZE):
+                    df_list.append(epa_nei_chunk_parse(chunk, col_dict))
+    return pd.concat(df_list, ignore_index=True)
+
+
+def epa_nei_chunk_parse(df, col_dict):
     """
-    Combine, parse, and format the provided dataframes
-    :param df_list: list of dataframes to concat and format
-    :param year: year
-    :param config: dictionary, items in FBA method yaml
-    :return: df, parsed and partially formatted to flowbyactivity
-        specifications
+    Rename, filter and convert the units of a chunk of NEI data
+    :param df: df, rows of an NEI csv file
+    :param col_dict: dictionary, FBA and NEI column names for the year
+    :return: df, FBA columns of the records kept
     """
-    df = pd.concat(df_list, sort=True)
-
     # rename columns to match flowbyactivity format
-    col_dict = {value: key for (key, value) in config['col_dict'][year].items()}
-    df = df.rename(columns=col_dict)
+    df = df.rename(columns={value: key for (key, value) in col_dict.items()})
 
     # make sure FIPS are string and 5 digits
-    df['Location'] = df['Location'].astype('str').apply('{:0>5}'.format)
+    df['Location'] = df['Location'].astype('str').str.zfill(5)
     # remove records from certain FIPS
     excluded_fips = ['78', '85', '88']
-    df = df[~df['Location'].str[0:2].isin(excluded_fips)]
     excluded_fips2 = ['777']
-    df = df[~df['Location'].str[-3:].isin(excluded_fips2)]
+    df = df[~(df['Location'].str[0:2].isin(excluded_fips) |
+              df['Location'].str[-3:].isin(excluded_fips2))]
 
     # drop all other columns
-    df.drop(columns=df.columns.difference(
-        list(config['col_dict'][year].keys())), inplace=True)
+    df = df[[c for c in df.columns if c in col_dict]].copy()
 
     # to align with other processed NEI data (Point from StEWI), units are
     # converted during FBA creation instead of maintained
-    df = standardize_units(df)
+    return standardize_units(df)
+
+
+def epa_nei_global_parse(*, df_list, source, year, **_):
+    """
+    Combine, parse, and format the provided dataframes
+    :param df_list: list of dataframes to concat and format, renamed,
+        filtered and converted by epa_nei_call()
+    :param year: year
+    :return: df, parsed and partially formatted to flowbyactivity
+        specifications
+    """
+    df = pd.concat(df_list, sort=True, ignore_index=True)
 
     # add hardcoded data
     df['FlowType'] = "ELEMENTARY_FLOW"
@@ -12,8 +12,8 @@ https://agupubs.onlinelibrary.wiley.com/doi/10.1029/2019JG005110
 
 Years = 2002, 2007, 2012
 """
-import io
 import pandas as pd
+from flowsa.workbook import read_workbook
 
 
 def name_and_unit_split(df_legend):
@@ -121,17 +121,14 @@ def ni_call(*, resp, year, **_):
         flowbyactivity.py ('year' and 'source')
     :return: pandas dataframe of original source data
     """
-    df_legend = pd.io.excel.read_excel(io.BytesIO(resp.content),
-                                       sheet_name='Legend')
+    workbook = read_workbook(resp.content)
+    df_legend = workbook.sheet('Legend')
     if year == '2002':
-        df_raw = pd.io.excel.read_excel(io.BytesIO(resp.content),
-                                        sheet_name='2002')
+        df_raw = workbook.sheet('2002')
     elif year == '2007':
-        df_raw = pd.io.excel.read_excel(io.BytesIO(resp.content),
-                                        sheet_name='2007')
+        df_raw = workbook.sheet('2007')
     else:
-        df_raw = pd.io.excel.read_excel(io.BytesIO(resp.content),
-                                        sheet_name='2012')
+        df_raw = workbook.sheet('2012')
 
     for col_name in df_raw.columns:
         for i in range(len(df_legend)):
@@ -12,8 +12,8 @@ FLOWSA
 Years = 2002, 2007, 2012
 """
 
-import io
 import pandas as pd
+from flowsa.workbook import read_workbook
 
 
 def name_and_unit_split(df_legend):
@@ -96,13 +96,12 @@ def pi_call(*, resp, year, **_):
     :param year: year
     :return: pandas dataframe of original source data
     """
-    df_legend = pd.io.excel.read_excel(io.BytesIO(resp.content),
-                                       sheet_name='Legend')
+    workbook = read_workbook(resp.content)
+    df_legend = workbook.sheet('Legend')
     df_legend = pd.DataFrame(df_legend.loc[0:18]).reindex()
     df_legend.columns = ["HUC_8", "HUC8 CODE"]
     if year == '2002':
-        df_raw = pd.io.excel.read_excel(io.BytesIO(resp.content),
-                                        sheet_name='2002')
+        df_raw = workbook.sheet('2002')
         df_raw = df_raw.rename(
             columns={'P_deposition': '2P_deposition',
                      'livestock_Waste_2007': 'livestock_Waste',
@@ -110,8 +109,7 @@ def pi_call(*, resp, year, **_):
                      'livestock_production_2007': 'livestock_production',
                      '02P_Hi_P': 'P_Hi_P', 'Surplus_2002': 'surplus'})
     elif year == '2007':
-        df_raw = pd.io.excel.read_excel(io.BytesIO(resp.content),
-                                        sheet_name='2007')
+        df_raw = workbook.sheet('2007')
         df_raw = df_raw.rename(
             columns={'P_deposition': '2P_deposition',
                      'Crop_removal_2007': 'Crop_removal',
@@ -120,8 +118,7 @@ def pi_call(*, resp, year, **_):
                      'livestock_production_2007': 'livestock_production',
                      '02P_Hi_P': 'P_Hi_P', 'Surplus_2007': 'surplus'})
     else:
-        df_raw = pd.io.excel.read_excel(io.BytesIO(resp.content),
-                                        sheet_name='2012')
+        df_raw = workbook.sheet('2012')
         df_raw = df_raw.rename(
             columns={'P_deposition': '2P_deposition',
                      'Crop_removal_2012': 'Crop_removal',
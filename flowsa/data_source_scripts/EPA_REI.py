@@ -148,7 +148,8 @@ def primary_factors_parse(*, df_list, year, **_):
                                df2['FlowName'])
 
     # address trailing white space
-    string_cols = list(df2.select_dtypes(include=['object', 'int']).columns)
+    string_cols = list(df2.select_dtypes(
+        include=['object', 'string', 'int']).columns)
     for s in string_cols:
         df2[s] = df2[s].str.strip()
 
@@ -11,6 +11,7 @@ import os
 from flowsa.settings import externaldatapath, log
 from flowsa.flowbyfunctions import assign_fips_location_system
 from flowsa.location import apply_county_FIPS
+from flowsa.workbook import read_workbook
 
 def epa_sit_parse(*, source, year, config, **_):
 
@@ -23,6 +24,7 @@ def epa_sit_parse(*, source, year, config, **_):
 
     if not os.path.exists(filepath):
         raise FileNotFoundError(f'SIT file not found in {filepath}')
+    workbook = read_workbook(filepath)
 
     # for each sheet in the Excel file containing data...
     for sheet, sheet_dict in config.get('sheet_dict').items():
@@ -35,13 +37,12 @@ def epa_sit_parse(*, source, year, config, **_):
         tablename = sheet_dict.get('tablename', sheetname)
         log.debug(f'Loading data from: {sheetname}...')
         # read in data from Excel sheet
-        df = pd.read_excel(filepath,
-                           sheet_name = sheetname,
-                           header=sheet_dict.get('header', 2),
-                           skiprows=range(sheet_dict.get('skiprowstart', 0),
-                                          sheet_dict.get('skiprowend', 0)),
-                           usecols="B:AG",
-                           nrows=sheet_dict.get('nrows'))
+        df = workbook.sheet(sheetname,
+                            header=sheet_dict.get('header', 2),
+                            skiprows=range(sheet_dict.get('skiprowstart', 0),
+                                           sheet_dict.get('skiprowend', 0)),
+                            usecols="B:AG",
+                            nrows=sheet_dict.get('nrows'))
         df.columns = df.columns.map(str)
         df['ActivityProducedBy'] = df.iloc[:,0]
 
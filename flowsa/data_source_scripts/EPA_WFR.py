@@ -5,13 +5,12 @@
 Scrapes data from 2018 Wasted Food Report.
 """
 
-import io
 import pandas as pd
 import numpy as np
 from string import ascii_uppercase
-from tabula.io import read_pdf
 from flowsa.flowbyfunctions import assign_fips_location_system, aggregator
 from flowsa.location import US_FIPS
+from flowsa.pdftables import read_pdf_pages
 from flowsa.schema import flow_by_activity_mapped_fields
 
 
@@ -30,9 +29,9 @@ def epa_wfr_call(*, resp, **_):
     result = pd.DataFrame()
     df = pd.DataFrame()
     pages = range(41, 43)
+    tables = read_pdf_pages(resp.content, pages, stream=True)
     for x in pages:
-        df_l = read_pdf(io.BytesIO(resp.content),
-                        pages=x, stream=True)
+        df_l = tables[x]
         if len(df_l[0].columns) == 12:
             df = df_l[0].set_axis(
                 ['Management Pathway', 'Manufacturing/Processing',
@@ -386,7 +385,8 @@ def foodwaste_use(fba, source_dict):
     outputs = fba.loc[fba['ActivityConsumedBy'].isin(use)].reset_index(drop=True)
     outputs['ActivityProducedBy'] = outputs['ActivityConsumedBy']
     outputs = outputs.drop(columns='ActivityConsumedBy')
-    groupcols = list(outputs.select_dtypes(include=['object', 'int']).columns)
+    groupcols = list(outputs.select_dtypes(
+        include=['object', 'string', 'int']).columns)
     outputs2 = aggregator(outputs, groupcols)
 
     # load fw treatment dictoinary
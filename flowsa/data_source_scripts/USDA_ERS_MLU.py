@@ -200,7 +200,8 @@ def allocate_usda_ers_mlu_land_in_urban_areas(*, flow_subset_mapped,
 
     # aggregate because multiple rows to household data due to residential
     # land area and highway fee shares
-    groupcols = list(df.select_dtypes(include=['object', 'int']).columns)
+    groupcols = list(df.select_dtypes(
+        include=['object', 'string', 'int']).columns)
     allocated_urban_areas_df_2 = aggregator(allocated_urban_areas_df,
                                             groupcols)
 
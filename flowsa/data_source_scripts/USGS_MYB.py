@@ -1,4 +1,3 @@
-import io
 import math
 import numpy as np
 import pandas as pd
@@ -7,6 +6,7 @@ from flowsa.settings import log
 from flowsa.common import WITHDRAWN_KEYWORD
 from flowsa.flowbyfunctions import assign_fips_location_system
 from flowsa.location import US_FIPS
+from flowsa.workbook import read_workbook, extract_tables
 
 YEARS_COVERED = {
     "asbestos": "2014-2018",
@@ -133,6 +133,143 @@ def usgs_myb_remove_digits(value_string):
     return return_string
 
 
+def usgs_myb_labels(df, column="Production", strip_digits=False):
+    """
+    Row labels of a table returned by a usgs_*_call function
+    :param df: df, table
+    :param column: str, column of row labels
+    :param strip_digits: bool, also remove the footnote digits
+    :return: pandas Series of str, missing labels are 'nan'
+    """
+    labels = df[column].astype(str).str.strip()
+    if strip_digits:
+        labels = labels.str.translate(str.maketrans('', '', digits))
+    return labels
+
+
+def usgs_myb_label_state(labels, mapping, default="", carry=True):
+    """
+    Value set by the header rows of a table, e.g. the product "imports" of
+    the rows following an "Imports for consumption:" row
+    :param labels: pandas Series, row labels
+    :param mapping: dictionary, row labels and the values they set
+    :param default: str or pandas Series, value of the rows before the first
+        header row
+    :param carry: bool, False if a value only applies to the row setting it
+    :return: pandas Series
+    """
+    state = labels.map(mapping)
+    if carry:
+        state = state.ffill()
+    return state.fillna(default)
+
+
+def usgs_myb_flow_amount(values, zero=(), withdrawn=(), remove_chars=""):
+    """
+    FlowAmount strings of a year column
+    :param values: pandas Series, year column
+    :param zero: list, values meaning zero, e.g. "--"
+    :param withdrawn: list, values replaced with WITHDRAWN_KEYWORD, e.g. "W"
+    :param remove_chars: str, characters removed from the values
+    :return: pandas Series of str
+    """
+    amount = values.astype(str)
+    if remove_chars:
+        amount = amount.str.translate(str.maketrans('', '', remove_chars))
+    return amount.mask(amount.isin(list(zero)), "0").mask(
+        amount.isin(list(withdrawn)), WITHDRAWN_KEYWORD)
+
+
+def usgs_myb_fba(df, source, year):
+    """
+    Add the columns shared by all USGS_MYB Flow-By-Activity rows
+    :param df: df, FlowName, FlowAmount, Unit, Description and
+        ActivityProducedBy of the rows
+    :param source: str, source name
+    :param year: str, year
+    :return: df, parsed and partially formatted to flowbyactivity
+        specifications
+    """
+    static = {k: v for k, v in usgs_myb_static_variables().items()
+              if k not in df}
+    df = df.assign(**static, SourceName=source, Year=str(year))
+    return assign_fips_location_system(df.reset_index(drop=True), str(year))
+
+
+def usgs_myb_parse_table(df_list, source, year, *, years, rows=None,
+                         products=None, product="", carry_product=True,
+                         name=None, names=None, description=None,
+                         descriptions=None, carry_description=False,
+                         flowname_descriptions=(), activity=None,
+                         unit="Metric Tons", column=None, zero=(),
+                         withdrawn=(), remove_chars="", drop=(),
+                         drop_products=(), strip_digits=False):
+    """
+    Parse the tables returned by a usgs_*_call function, from a spec of the
+    rows to use and the header rows setting the product of the rows below.
+    A row is used when its label, the stripped "Production" value, is in
+    'rows'. The FlowName of a row is "<name> <product>", its Description
+    and ActivityProducedBy are the name.
+    :param df_list: list of dataframes to concat and format
+    :param source: source
+    :param year: year
+    :param years: str, key of YEARS_COVERED, sets the year column
+    :param rows: list, labels of the rows to use, None to use all rows
+    :param products: dictionary, labels and the products they set
+    :param product: str, product of rows before the first product label
+    :param carry_product: bool, False if a product label only sets the
+        product of its own row, other rows getting 'product'
+    :param name: str, default is the name of the source
+    :param names: dictionary, labels setting the name of the rows below
+    :param description: str, Description, default is the name
+    :param descriptions: dictionary, labels and their Description
+    :param carry_description: bool, a description label also sets the
+        Description of the rows below
+    :param flowname_descriptions: list, descriptions appended to FlowName
+    :param activity: str, ActivityProducedBy, default is the name
+    :param unit: str, Unit
+    :param column: str, column of the FlowAmount, default is the column of
+        the year
+    :param zero: list, values set to 0
+    :param withdrawn: list, values set to WITHDRAWN_KEYWORD
+    :param remove_chars: str, characters removed from the values
+    :param drop: list, values of rows that are not used
+    :param drop_products: list, products of rows that are not used
+    :param strip_digits: bool, remove digits from labels before matching
+    :return: df, parsed and partially formatted to flowbyactivity
+        specifications
+    """
+    if name is None:
+        name = usgs_myb_name(source)
+    column = column or usgs_myb_year(YEARS_COVERED[years], year)
+    frames = []
+    for df in df_list:
+        labels = usgs_myb_labels(df, strip_digits=strip_digits)
+        prod = usgs_myb_label_state(labels, products or {}, product,
+                                    carry_product)
+        row_name = usgs_myb_label_state(labels, names or {}, name)
+        des = usgs_myb_label_state(
+            labels, descriptions or {},
+            row_name if description is None else description,
+            carry_description)
+        amount = usgs_myb_flow_amount(df[column], zero, withdrawn,
+                                      remove_chars)
+        flowname = row_name + " " + prod
+        flowname = flowname.mask(des.isin(list(flowname_descriptions)),
+                                 flowname + " " + des)
+        use = ~amount.isin(list(drop)) & ~prod.isin(list(drop_products))
+        if rows is not None:
+            use &= labels.isin(rows)
+        frames.append(pd.DataFrame(
+            {"Unit": unit,
+             "FlowName": flowname,
+             "Description": des,
+             "ActivityProducedBy": row_name if activity is None
+             else activity,
+             "FlowAmount": amount}, index=df.index)[use])
+    return usgs_myb_fba(pd.concat(frames), source, year)
+
+
 def usgs_myb_url_helper(*, build_url, **_):
     """
     This helper function uses the "build_url" input from flowbyactivity.py,
@@ -158,8 +295,7 @@ def usgs_asbestos_call(*, resp, year, **_):
     :param year: year
     :return: pandas dataframe of original source data
     """
-    df_raw_data = pd.io.excel.read_excel(io.BytesIO(resp.content),
-                                         sheet_name='T1')
+    df_raw_data = read_workbook(resp.content).sheet('T1')
     df_data = pd.DataFrame(df_raw_data.loc[4:11]).reindex()
     df_data = df_data.reset_index()
     del df_data["index"]
@@ -192,41 +328,11 @@ def usgs_asbestos_parse(*, df_list, source, year, **_):
     :return: df, parsed and partially formatted to flowbyactivity
         specifications
     """
-    data = {}
-    row_to_use = ["Quantity"]
-    product = ""
-    name = usgs_myb_name(source)
-    des = name
-    dataframe = pd.DataFrame()
-    col_name = usgs_myb_year(YEARS_COVERED['asbestos'], year)
-    for df in df_list:
-        for index, row in df.iterrows():
-            if df.iloc[index]["Production"].strip() == \
-                    "Imports for consumption:":
-                product = "imports"
-            elif df.iloc[index]["Production"].strip() == \
-                    "Exports and reexports:":
-                product = "exports"
-
-            if df.iloc[index]["Production"].strip() in row_to_use:
-                data = usgs_myb_static_variables()
-                data["SourceName"] = source
-                data["Year"] = str(year)
-                data["Unit"] = "Metric Tons"
-                data['FlowName'] = name + " " + product
-                data["Description"] = name
-                data["ActivityProducedBy"] = name
-                col_name = usgs_myb_year(YEARS_COVERED['asbestos'], year)
-                if str(df.iloc[index][col_name]) == "--":
-                    data["FlowAmount"] = str(0)
-                elif str(df.iloc[index][col_name]) == "nan":
-                    data["FlowAmount"] = WITHDRAWN_KEYWORD
-                else:
-                    data["FlowAmount"] = str(df.iloc[index][col_name])
-                dataframe = dataframe.append(data, ignore_index=True)
-                dataframe = assign_fips_location_system(dataframe,
-                                                        str(year))
-    return dataframe
+    return usgs_myb_parse_table(
+        df_list, source, year, years='asbestos', rows=["Quantity"],
+        products={"Imports for consumption:": "imports",
+                  "Exports and reexports:": "exports"},
+        zero=["--"], withdrawn=["nan"])
 
 
 def usgs_barite_call(*, resp, year, **_):
@@ -239,8 +345,7 @@ def usgs_barite_call(*, resp, year, **_):
         flowbyactivity.py ('year' and 'source')
     :return: pandas dataframe of original source data
     """
-    df_raw_data = pd.io.excel.read_excel(
-        io.BytesIO(resp.content), sheet_name='T1')
+    df_raw_data = read_workbook(resp.content).sheet('T1')
     df_data = pd.DataFrame(df_raw_data.loc[7:14]).reindex()
     df_data = df_data.reset_index()
     del df_data["index"]
@@ -268,42 +373,12 @@ def usgs_barite_parse(*, df_list, source, year, **_):
     :return: df, parsed and partially formatted to flowbyactivity
         specifications
     """
-    data = {}
-    row_to_use = ["Quantity"]
-    prod = ""
-    name = usgs_myb_name(source)
-    des = name
-    dataframe = pd.DataFrame()
-    col_name = usgs_myb_year(YEARS_COVERED['barite'], year)
-    for df in df_list:
-        for index, row in df.iterrows():
-            if df.iloc[index]["Production"].strip() == \
-                    "Imports for consumption:3":
-                product = "imports"
-            elif df.iloc[index]["Production"].strip() == \
-                    "Crude, sold or used by producers:":
-                product = "production"
-            elif df.iloc[index]["Production"].strip() == "Exports:2":
-                product = "exports"
-
-            if df.iloc[index]["Production"].strip() in row_to_use:
-                data = usgs_myb_static_variables()
-                data["SourceName"] = source
-                data["Year"] = str(year)
-                data["Unit"] = "Metric Tons"
-                data['FlowName'] = name + " " + product
-                data["Description"] = name
-                data["ActivityProducedBy"] = name
-                col_name = usgs_myb_year(YEARS_COVERED['barite'], year)
-                if str(df.iloc[index][col_name]) == "--" or \
-                        str(df.iloc[index][col_name]) == "(3)":
-                    data["FlowAmount"] = str(0)
-                else:
-                    data["FlowAmount"] = str(df.iloc[index][col_name])
-                dataframe = dataframe.append(data, ignore_index=True)
-                dataframe = assign_fips_location_system(
-                    dataframe, str(year))
-    return dataframe
+    return usgs_myb_parse_table(
+        df_list, source, year, years='barite', rows=["Quantity"],
+        products={"Imports for consumption:3": "imports",
+                  "Crude, sold or used by producers:": "production",
+                  "Exports:2": "exports"},
+        zero=["--", "(3)"])
 
 
 def usgs_bauxite_call(*, resp, year, **_):
@@ -314,8 +389,7 @@ def usgs_bauxite_call(*, resp, year, **_):
     :param year: year
     :return: pandas dataframe of original source data
     """
-    df_raw_data_one = pd.io.excel.read_excel(io.BytesIO(resp.content),
-                                             sheet_name='T1')
+    df_raw_data_one = read_workbook(resp.content).sheet('T1')
     df_data_one = pd.DataFrame(df_raw_data_one.loc[6:14]).reindex()
     df_data_one = df_data_one.reset_index()
     del df_data_one["index"]
@@ -349,43 +423,12 @@ def usgs_bauxite_parse(*, df_list, source, year, **_):
     :return: df, parsed and partially formatted to flowbyactivity
         specifications
     """
-    data = {}
-    row_to_use = ["Production", "Total"]
-    prod = ""
-    name = usgs_myb_name(source)
-    des = name
-    dataframe = pd.DataFrame()
-    col_name = usgs_myb_year(YEARS_COVERED['bauxite'], year)
-    for df in df_list:
-        for index, row in df.iterrows():
-            if df.iloc[index]["Production"].strip() == "Production":
-                prod = "production"
-            elif df.iloc[index]["Production"].strip() == \
-                    "Imports for consumption, as shipped:":
-                prod = "import"
-            elif df.iloc[index]["Production"].strip() == \
-                    "Exports, as shipped:":
-                prod = "export"
-
-            if df.iloc[index]["Production"].strip() in row_to_use:
-                product = df.iloc[index]["Production"].strip()
-                data = usgs_myb_static_variables()
-                data["SourceName"] = source
-                data["Year"] = str(year)
-                data["Unit"] = "Metric Tons"
-
-                flow_amount = str(df.iloc[index][col_name])
-                if str(df.iloc[index][col_name]) == "W":
-                    data["FlowAmount"] = WITHDRAWN_KEYWORD
-                else:
-                    data["FlowAmount"] = flow_amount
-                data["Description"] = des
-                data["ActivityProducedBy"] = name
-                data['FlowName'] = name + " " + prod
-                dataframe = dataframe.append(data, ignore_index=True)
-                dataframe = assign_fips_location_system(
-                    dataframe, str(year))
-    return dataframe
+    return usgs_myb_parse_table(
+        df_list, source, year, years='bauxite', rows=["Production", "Total"],
+        products={"Production": "production",
+                  "Imports for consumption, as shipped:": "import",
+                  "Exports, as shipped:": "export"},
+        withdrawn=["W"])
 
 
 def usgs_beryllium_call(*, resp, year, **_):
@@ -398,11 +441,9 @@ def usgs_beryllium_call(*, resp, year, **_):
         flowbyactivity.py ('year' and 'source')
     :return: pandas dataframe of original source data
     """
-    df_raw_data = pd.io.excel.read_excel(io.BytesIO(resp.content),
-                                         sheet_name='T4')
+    df_raw_data = read_workbook(resp.content).sheet('T4')
 
-    df_raw_data_two = pd.io.excel.read_excel(io.BytesIO(resp.content),
-                                             sheet_name='T1')
+    df_raw_data_two = read_workbook(resp.content).sheet('T1')
 
     df_data_1 = pd.DataFrame(df_raw_data_two.loc[6:9]).reindex()
     df_data_1 = df_data_1.reset_index()
@@ -449,38 +490,13 @@ def usgs_beryllium_parse(*, df_list, source, year, **_):
     :return: df, parsed and partially formatted to flowbyactivity
         specifications
     """
-    data = {}
-    row_to_use = ["United States6", "Mine shipments1",
-                  "Imports for consumption, beryl2"]
-    prod = ""
-    name = usgs_myb_name(source)
-    des = name
-    dataframe = pd.DataFrame()
-    col_name = usgs_myb_year(YEARS_COVERED['beryllium'], year)
-    for df in df_list:
-
-        for index, row in df.iterrows():
-            prod = "production"
-            if df.iloc[index]["Production"].strip() == \
-                    "Imports for consumption, beryl2":
-                prod = "imports"
-
-            if df.iloc[index]["Production"].strip() in row_to_use:
-                remove_digits = str.maketrans('', '', digits)
-                product = df.iloc[index][
-                    "Production"].strip().translate(remove_digits)
-                data = usgs_myb_static_variables()
-                data["SourceName"] = source
-                data["Year"] = str(year)
-                data["Unit"] = "Thousand Metric Tons"
-                data["Description"] = name
-                data["ActivityProducedBy"] = name
-                data['FlowName'] = name + " " + prod
-                data["FlowAmount"] = str(df.iloc[index][col_name])
-                dataframe = dataframe.append(data, ignore_index=True)
-                dataframe = assign_fips_location_system(
-                    dataframe, str(year))
-    return dataframe
+    return usgs_myb_parse_table(
+        df_list, source, year, years='beryllium',
+        rows=["United States6", "Mine shipments1",
+              "Imports for consumption, beryl2"],
+        products={"Imports for consumption, beryl2": "imports"},
+        product="production", carry_product=False,
+        unit="Thousand Metric Tons")
 
 
 def usgs_boron_call(*, resp, year, **_):
@@ -493,8 +509,7 @@ def usgs_boron_call(*, resp, year, **_):
         flowbyactivity.py ('year' and 'source')
     :return: pandas dataframe of original source data
     """
-    df_raw_data = pd.io.excel.read_excel(io.BytesIO(resp.content),
-                                         sheet_name='T1')
+    df_raw_data = read_workbook(resp.content).sheet('T1')
     df_data_one = pd.DataFrame(df_raw_data.loc[8:8]).reindex()
     df_data_one = df_data_one.reset_index()
     del df_data_one["index"]
@@ -542,48 +557,14 @@ def usgs_boron_parse(*, df_list, source, year, **_):
     :return: df, parsed and partially formatted to flowbyactivity
         specifications
     """
-    data = {}
-    row_to_use = ["B2O3 content", "Quantity"]
-    prod = ""
-    name = usgs_myb_name(source)
-    des = name
-    dataframe = pd.DataFrame()
-    col_name = usgs_myb_year(YEARS_COVERED['boron'], year)
-
-    for df in df_list:
-        for index, row in df.iterrows():
-
-            if df.iloc[index]["Production"].strip() == "B2O3 content" or \
-                    df.iloc[index]["Production"].strip() == "Quantity":
-                product = "production"
-
-            if df.iloc[index]["Production"].strip() == "Colemanite:4":
-                des = "Colemanite"
-            elif df.iloc[index]["Production"].strip() == "Ulexite:4":
-                des = "Ulexite"
-
-            if df.iloc[index]["Production"].strip() in row_to_use:
-                data = usgs_myb_static_variables()
-                data["SourceName"] = source
-                data["Year"] = str(year)
-                data["Unit"] = "Metric Tons"
-                if des == name:
-                    data['FlowName'] = name + " " + product
-                else:
-                    data['FlowName'] = name + " " + product + " " + des
-                data["Description"] = des
-                data["ActivityProducedBy"] = name
-                if str(df.iloc[index][col_name]) == "--" or \
-                        str(df.iloc[index][col_name]) == "(3)":
-                    data["FlowAmount"] = str(0)
-                elif str(df.iloc[index][col_name]) == "W":
-                    data["FlowAmount"] = WITHDRAWN_KEYWORD
-                else:
-                    data["FlowAmount"] = str(df.iloc[index][col_name])
-                dataframe = dataframe.append(data, ignore_index=True)
-                dataframe = assign_fips_location_system(
-                    dataframe, str(year))
-    return dataframe
+    return usgs_myb_parse_table(
+        df_list, source, year, years='boron',
+        rows=["B2O3 content", "Quantity"],
+        products={"B2O3 content": "production", "Quantity": "production"},
+        descriptions={"Colemanite:4": "Colemanite", "Ulexite:4": "Ulexite"},
+        carry_description=True,
+        flowname_descriptions=["Colemanite", "Ulexite"],
+        zero=["--", "(3)"], withdrawn=["W"])
 
 
 def usgs_chromium_call(*, resp, year, **_):
@@ -596,8 +577,7 @@ def usgs_chromium_call(*, resp, year, **_):
         flowbyactivity.py ('year' and 'source')
     :return: pandas dataframe of original source data
     """
-    df_raw_data = pd.io.excel.read_excel(io.BytesIO(resp.content),
-                                         sheet_name='T1')
+    df_raw_data = read_workbook(resp.content).sheet('T1')
     df_data = pd.DataFrame(df_raw_data.loc[4:24]).reindex()
     df_data = df_data.reset_index()
     del df_data["index"]
@@ -629,157 +609,27 @@ def usgs_chromium_parse(*, df_list, source, year, **_):
     :return: df, parsed and partially formatted to flowbyactivity
         specifications
     """
-    data = {}
-    row_to_use = ["Secondary2", "Total"]
-    prod = ""
-    name = usgs_myb_name(source)
-    des = name
-    dataframe = pd.DataFrame()
-    col_name = usgs_myb_year(YEARS_COVERED['chromium'], year)
-    for df in df_list:
-        for index, row in df.iterrows():
-            if df.iloc[index]["Production"].strip() == "Imports:":
-                product = "imports"
-            elif df.iloc[index]["Production"].strip() == "Secondary2":
-                product = "production"
-            elif df.iloc[index]["Production"].strip() == "Exports:":
-                product = "exports"
-
-            if df.iloc[index]["Production"].strip() in row_to_use:
-                data = usgs_myb_static_variables()
-                data["SourceName"] = source
-                data["Year"] = str(year)
-                data["Unit"] = "Metric Tons"
-                data['FlowName'] = name + " " + product
-                data["Description"] = name
-                data["ActivityProducedBy"] = name
-                col_name = usgs_myb_year(YEARS_COVERED['chromium'], year)
-                if str(df.iloc[index][col_name]) == "--" or \
-                        str(df.iloc[index][col_name]) == "(3)":
-                    data["FlowAmount"] = str(0)
-                else:
-                    data["FlowAmount"] = str(df.iloc[index][col_name])
-                dataframe = dataframe.append(data, ignore_index=True)
-                dataframe = assign_fips_location_system(
-                    dataframe, str(year))
-    return dataframe
+    return usgs_myb_parse_table(
+        df_list, source, year, years='chromium',
+        rows=["Secondary2", "Total"],
+        products={"Imports:": "imports", "Secondary2": "production",
+                  "Exports:": "exports"},
+        zero=["--", "(3)"])
 
 
-def usgs_clay_call(*, resp, year, **_):
+def usgs_clay_call(*, resp, year, config, **_):
     """
     Convert response for calling url to pandas dataframe, begin parsing
     df into FBA format
-    :param url: string, url
     :param resp: df, response from url call
-    :param args: dictionary, arguments specified when running
-        flowbyactivity.py ('year' and 'source')
+    :param year: year
+    :param config: dictionary, items in FBA method yaml, 'tables' declares
+        the tables read from the workbook
     :return: pandas dataframe of original source data
     """
-    df_raw_data_ball = pd.io.excel.read_excel(io.BytesIO(resp.content),
-                                              sheet_name='T3')
-    df_data_ball = pd.DataFrame(df_raw_data_ball.loc[19:19]).reindex()
-    df_data_ball = df_data_ball.reset_index()
-    del df_data_ball["index"]
-
-    df_raw_data_bentonite = pd.io.excel.read_excel(io.BytesIO(resp.content),
-                                                   sheet_name='T4 ')
-    df_data_bentonite = pd.DataFrame(
-        df_raw_data_bentonite.loc[28:28]).reindex()
-    df_data_bentonite = df_data_bentonite.reset_index()
-    del df_data_bentonite["index"]
-
-    df_raw_data_common = pd.io.excel.read_excel(io.BytesIO(resp.content),
-                                                sheet_name='T5 ')
-    df_data_common = pd.DataFrame(df_raw_data_common.loc[40:40]).reindex()
-    df_data_common = df_data_common.reset_index()
-    del df_data_common["index"]
-
-    df_raw_data_fire = pd.io.excel.read_excel(io.BytesIO(resp.content),
-                                              sheet_name='T6 ')
-    df_data_fire = pd.DataFrame(df_raw_data_fire.loc[12:12]).reindex()
-    df_data_fire = df_data_fire.reset_index()
-    del df_data_fire["index"]
-
-    df_raw_data_fuller = pd.io.excel.read_excel(io.BytesIO(resp.content),
-                                                sheet_name='T7 ')
-    df_data_fuller = pd.DataFrame(df_raw_data_fuller.loc[17:17]).reindex()
-    df_data_fuller = df_data_fuller.reset_index()
-    del df_data_fuller["index"]
-
-    df_raw_data_kaolin = pd.io.excel.read_excel(io.BytesIO(resp.content),
-                                                sheet_name='T8 ')
-    df_data_kaolin = pd.DataFrame(df_raw_data_kaolin.loc[18:18]).reindex()
-    df_data_kaolin = df_data_kaolin.reset_index()
-    del df_data_kaolin["index"]
-
-    df_raw_data_export = pd.io.excel.read_excel(io.BytesIO(resp.content),
-                                                sheet_name='T13')
-    df_data_export = pd.DataFrame(df_raw_data_export.loc[6:15]).reindex()
-    df_data_export = df_data_export.reset_index()
-    del df_data_export["index"]
-
-    df_raw_data_import = pd.io.excel.read_excel(io.BytesIO(resp.content),
-                                                sheet_name='T14')
-    df_data_import = pd.DataFrame(df_raw_data_import.loc[6:13]).reindex()
-    df_data_import = df_data_import.reset_index()
-    del df_data_import["index"]
-
-    df_data_ball.columns = ["Production", "space_1", "year_1", "space_2",
-                            "value_1", "space_3", "year_2", "space_4",
-                            "value_2"]
-    df_data_bentonite.columns = ["Production", "space_1", "year_1", "space_2",
-                                 "value_1", "space_3", "year_2", "space_4",
-                                 "value_2"]
-    df_data_common.columns = ["Production", "space_1", "year_1", "space_2",
-                              "value_1", "space_3", "year_2", "space_4",
-                              "value_2"]
-    df_data_fire.columns = ["Production", "space_1", "year_1", "space_2",
-                            "value_1", "space_3", "year_2", "space_4",
-                            "value_2"]
-    df_data_fuller.columns = ["Production", "space_1", "year_1", "space_2",
-                              "value_1", "space_3", "year_2", "space_4",
-                              "value_2"]
-    df_data_kaolin.columns = ["Production", "space_1", "year_1", "space_2",
-                              "value_1", "space_3", "year_2", "space_4",
-                              "value_2"]
-    df_data_export.columns = ["Production", "space_1", "year_1", "space_2",
-                              "value_1", "space_3", "year_2", "space_4",
-                              "value_2", "space_5", "extra"]
-    df_data_import.columns = ["Production", "space_1", "year_1", "space_2",
-                              "value_1", "space_3", "year_2", "space_4",
-                              "value_2", "space_5", "extra"]
-
-    df_data_ball["type"] = "Ball clay"
-    df_data_bentonite["type"] = "Bentonite"
-    df_data_common["type"] = "Common clay"
-    df_data_fire["type"] = "Fire clay"
-    df_data_fuller["type"] = "Fuller’s earth"
-    df_data_kaolin["type"] = "Kaolin"
-    df_data_export["type"] = "export"
-    df_data_import["type"] = "import"
-
-    col_to_use = ["Production", "type"]
-    col_to_use.append(usgs_myb_year(YEARS_COVERED['clay'], year))
-    for col in df_data_import.columns:
-        if col not in col_to_use:
-            del df_data_import[col]
-            del df_data_export[col]
-
-    for col in df_data_ball.columns:
-        if col not in col_to_use:
-            del df_data_ball[col]
-            del df_data_bentonite[col]
-            del df_data_common[col]
-            del df_data_fire[col]
-            del df_data_fuller[col]
-            del df_data_kaolin[col]
-
-    frames = [df_data_import, df_data_export, df_data_ball, df_data_bentonite,
-              df_data_common, df_data_fire, df_data_fuller, df_data_kaolin]
-    df_data = pd.concat(frames)
-    df_data = df_data.reset_index()
-    del df_data["index"]
-    return df_data
+    col_to_use = ["Production", "type",
+                  usgs_myb_year(YEARS_COVERED['clay'], year)]
+    return extract_tables(resp.content, config['tables'], columns=col_to_use)
 
 
 def usgs_clay_parse(*, df_list, source, year, **_):
@@ -791,50 +641,29 @@ def usgs_clay_parse(*, df_list, source, year, **_):
     :return: df, parsed and partially formatted to flowbyactivity
         specifications
     """
-    data = {}
     row_to_use = ["Ball clay", "Bentonite", "Fire clay", "Kaolin",
                   "Fuller’s earth", "Total", "Grand total",
                   "Artificially activated clay and earth",
-                  "Clays, not elsewhere classified",
                   "Clays, not elsewhere classified"]
-    dataframe = pd.DataFrame()
+    col_name = usgs_myb_year(YEARS_COVERED['clay'], year)
+    frames = []
     for df in df_list:
-        for index, row in df.iterrows():
-            if df.iloc[index]["type"].strip() == "import":
-                product = "imports"
-            elif df.iloc[index]["type"].strip() == "export":
-                product = "exports"
-            else:
-                product = "production"
-
-            if str(df.iloc[index]["Production"]).strip() in row_to_use:
-                data = usgs_myb_static_variables()
-                data["SourceName"] = source
-                data["Year"] = str(year)
-                data["Unit"] = "Metric Tons"
-                if product == "production":
-                    data['FlowName'] = \
-                        df.iloc[index]["type"].strip() + " " + product
-                    data["Description"] = df.iloc[index]["type"].strip()
-                    data["ActivityProducedBy"] = df.iloc[index]["type"].strip()
-                else:
-                    data['FlowName'] = \
-                        df.iloc[index]["Production"].strip() + " " + product
-                    data["Description"] = df.iloc[index]["Production"].strip()
-                    data["ActivityProducedBy"] = \
-                        df.iloc[index]["Production"].strip()
-
-                col_name = usgs_myb_year(YEARS_COVERED['clay'], year)
-                if str(df.iloc[index][col_name]) == "--" or \
-                        str(df.iloc[index][col_name]) == "(3)" or \
-                        str(df.iloc[index][col_name]) == "(2)":
-                    data["FlowAmount"] = str(0)
-                else:
-                    data["FlowAmount"] = str(df.iloc[index][col_name])
-                dataframe = dataframe.append(data, ignore_index=True)
-                dataframe = assign_fips_location_system(
-                    dataframe, str(year))
-    return dataframe
+        labels = usgs_myb_labels(df)
+        clay_type = usgs_myb_labels(df, "type")
+        product = usgs_myb_label_state(
+            clay_type, {"import": "imports", "export": "exports"},
+            "production", carry=False)
+        # production tables are named by the clay type, trade tables by row
+        activity = clay_type.where(product == "production", labels)
+        frames.append(pd.DataFrame(
+            {"Unit": "Metric Tons",
+             "FlowName": activity + " " + product,
+             "Description": activity,
+             "ActivityProducedBy": activity,
+             "FlowAmount": usgs_myb_flow_amount(
+                 df[col_name], zero=["--", "(3)", "(2)"])}
+        )[labels.isin(row_to_use)])
+    return usgs_myb_fba(pd.concat(frames), source, year)
 
 
 def usgs_cobalt_call(*, resp, year, **_):
@@ -847,10 +676,8 @@ def usgs_cobalt_call(*, resp, year, **_):
         flowbyactivity.py ('year' and 'source')
     :return: pandas dataframe of original source data
     """
-    df_raw_data = pd.io.excel.read_excel(io.BytesIO(resp.content),
-                                         sheet_name='T8')
-    df_raw_data_two = pd.io.excel.read_excel(io.BytesIO(resp.content),
-                                             sheet_name='T1')
+    df_raw_data = read_workbook(resp.content).sheet('T8')
+    df_raw_data_two = read_workbook(resp.content).sheet('T1')
     df_data_1 = pd.DataFrame(df_raw_data_two.loc[6:11]).reindex()
     df_data_1 = df_data_1.reset_index()
     del df_data_1["index"]
@@ -897,47 +724,15 @@ def usgs_cobalt_parse(*, df_list, source, year, **_):
     :return: df, parsed and partially formatted to flowbyactivity
         specifications
     """
-    data = {}
-    name = usgs_myb_name(source)
-    des = name
-    row_to_use = ["United Statese, 16, 17", "Mine productione",
-                  "Imports for consumption", "Exports"]
-    dataframe = pd.DataFrame()
-    for df in df_list:
-
-        for index, row in df.iterrows():
-            prod = "production"
-            if df.iloc[index]["Production"].strip() == \
-                    "United Statese, 16, 17":
-                prod = "production"
-            elif df.iloc[index]["Production"].strip() == \
-                    "Imports for consumption":
-                prod = "imports"
-            elif df.iloc[index]["Production"].strip() == "Exports":
-                prod = "exports"
-
-            if df.iloc[index]["Production"].strip() in row_to_use:
-                remove_digits = str.maketrans('', '', digits)
-                product = df.iloc[index][
-                    "Production"].strip().translate(remove_digits)
-                data = usgs_myb_static_variables()
-
-                data["SourceName"] = source
-                data["Year"] = str(year)
-
-                data["Unit"] = "Thousand Metric Tons"
-                col_name = usgs_myb_year(YEARS_COVERED['cobalt'], year)
-                data["Description"] = des
-                data["ActivityProducedBy"] = name
-                data['FlowName'] = name + " " + prod
-
-                data["FlowAmount"] = str(df.iloc[index][col_name])
-                remove_rows = ["(18)", "(2)"]
-                if data["FlowAmount"] not in remove_rows:
-                    dataframe = dataframe.append(data, ignore_index=True)
-                    dataframe = assign_fips_location_system(
-                        dataframe, str(year))
-    return dataframe
+    return usgs_myb_parse_table(
+        df_list, source, year, years='cobalt',
+        rows=["United Statese, 16, 17", "Mine productione",
+              "Imports for consumption", "Exports"],
+        products={"United Statese, 16, 17": "production",
+                  "Imports for consumption": "imports",
+                  "Exports": "exports"},
+        product="production", carry_product=False,
+        unit="Thousand Metric Tons", drop=["(18)", "(2)"])
 
 
 def usgs_copper_call(*, resp, year, **_):
@@ -948,8 +743,7 @@ def usgs_copper_call(*, resp, year, **_):
     :param year: year
     :return: pandas dataframe of original source data
     """
-    df_raw_data = pd.io.excel.read_excel(io.BytesIO(resp.content),
-                                         sheet_name='T1')
+    df_raw_data = read_workbook(resp.content).sheet('T1')
     df_data_1 = pd.DataFrame(df_raw_data.loc[12:12]).reindex()
     df_data_1 = df_data_1.reset_index()
     del df_data_1["index"]
@@ -990,35 +784,11 @@ def usgs_copper_parse(*, df_list, source, year, **_):
     :return: df, parsed and partially formatted to flowbyactivity
         specifications
     """
-    data = {}
-    name = usgs_myb_name(source)
-    des = name
-    dataframe = pd.DataFrame()
-    for df in df_list:
-        for index, row in df.iterrows():
-            remove_digits = str.maketrans('', '', digits)
-            product = df.iloc[index][
-                "Production"].strip().translate(remove_digits)
-            data = usgs_myb_static_variables()
-            data["SourceName"] = source
-            data["Year"] = str(year)
-            if product == "Total":
-                prod = "production"
-            elif product == "Exports, refined":
-                prod = "exports"
-            elif product == "Imports, refined":
-                prod = "imports"
-
-            data["ActivityProducedBy"] = "Copper; Mine"
-            data['FlowName'] = name + " " + prod
-            data["Unit"] = "Metric Tons"
-            col_name = usgs_myb_year(YEARS_COVERED['copper'], year)
-            data["Description"] = "Copper; Mine"
-            data["FlowAmount"] = str(df.iloc[index][col_name])
-            dataframe = dataframe.append(data, ignore_index=True)
-            dataframe = assign_fips_location_system(
-                dataframe, str(year))
-    return dataframe
+    return usgs_myb_parse_table(
+        df_list, source, year, years='copper', strip_digits=True,
+        products={"Total": "production", "Exports, refined": "exports",
+                  "Imports, refined": "imports"},
+        description="Copper; Mine", activity="Copper; Mine")
 
 
 def usgs_diatomite_call(*, resp, year, **_):
@@ -1031,8 +801,7 @@ def usgs_diatomite_call(*, resp, year, **_):
     :return: pandas dataframe of original source data
     """
 
-    df_raw_data_one = pd.io.excel.read_excel(io.BytesIO(resp.content),
-                                             sheet_name='T1')
+    df_raw_data_one = read_workbook(resp.content).sheet('T1')
     df_data_one = pd.DataFrame(df_raw_data_one.loc[7:10]).reindex()
     df_data_one = df_data_one.reset_index()
     del df_data_one["index"]
@@ -1065,40 +834,13 @@ def usgs_diatomite_parse(*, df_list, source, year, **_):
     :return: df, parsed and partially formatted to flowbyactivity
         specifications
     """
-    data = {}
-    row_to_use = ["Quantity", "Exports2", "Imports for consumption2"]
-    prod = ""
-    name = usgs_myb_name(source)
-    des = name
-    dataframe = pd.DataFrame()
-    for df in df_list:
-        for index, row in df.iterrows():
-            if df.iloc[index]["Production"].strip() == "Exports2":
-                prod = "exports"
-            elif df.iloc[index]["Production"].strip() == \
-                    "Imports for consumption2":
-                prod = "imports"
-            elif df.iloc[index]["Production"].strip() == "Quantity":
-                prod = "production"
-
-            if df.iloc[index]["Production"].strip() in row_to_use:
-                product = df.iloc[index]["Production"].strip()
-                data = usgs_myb_static_variables()
-
-                data["SourceName"] = source
-                data["Year"] = str(year)
-
-                data["Unit"] = "Thousand metric tons"
-                col_name = usgs_myb_year(YEARS_COVERED['diatomite'], year)
-                data["FlowAmount"] = str(df.iloc[index][col_name])
-
-                data["Description"] = name
-                data["ActivityProducedBy"] = name
-                data['FlowName'] = name + " " + prod
-                dataframe = dataframe.append(data, ignore_index=True)
-                dataframe = assign_fips_location_system(
-                    dataframe, str(year))
-    return dataframe
+    return usgs_myb_parse_table(
+        df_list, source, year, years='diatomite',
+        rows=["Quantity", "Exports2", "Imports for consumption2"],
+        products={"Exports2": "exports",
+                  "Imports for consumption2": "imports",
+                  "Quantity": "production"},
+        unit="Thousand metric tons")
 
 
 def usgs_feldspar_call(*, resp, year, **_):
@@ -1110,8 +852,7 @@ def usgs_feldspar_call(*, resp, year, **_):
     :param year: year
     :return: pandas dataframe of original source data
     """
-    df_raw_data_two = pd.io.excel.read_excel(io.BytesIO(resp.content),
-                                             sheet_name='T1')
+    df_raw_data_two = read_workbook(resp.content).sheet('T1')
     df_data_two = pd.DataFrame(df_raw_data_two.loc[4:8]).reindex()
     df_data_two = df_data_two.reset_index()
     del df_data_two["index"]
@@ -1154,44 +895,16 @@ def usgs_feldspar_parse(*, df_list, source, year, **_):
     :return: df, parsed and partially formatted to flowbyactivity
         specifications
     """
-    data = {}
-    row_to_use = ["Quantity", "Quantity3"]
-    prod = ""
-    name = usgs_myb_name(source)
-    des = name
-    dataframe = pd.DataFrame()
-    for df in df_list:
-        for index, row in df.iterrows():
-            if df.iloc[index]["Production"].strip() == "Exports, feldspar:4":
-                prod = "exports"
-            elif df.iloc[index]["Production"].strip() == \
-                    "Imports for consumption:4":
-                prod = "imports"
-            elif df.iloc[index]["Production"].strip() == \
-                    "Production, feldspar:e, 2":
-                prod = "production"
-            elif df.iloc[index]["Production"].strip() == "Nepheline syenite:":
-                prod = "production"
-                des = "Nepheline syenite"
-
-            if df.iloc[index]["Production"].strip() in row_to_use:
-                product = df.iloc[index]["Production"].strip()
-                data = usgs_myb_static_variables()
-                data["SourceName"] = source
-                data["Year"] = str(year)
-                data["Unit"] = "Metric Tons"
-                col_name = usgs_myb_year(YEARS_COVERED['feldspar'], year)
-                data["FlowAmount"] = str(df.iloc[index][col_name])
-                data["Description"] = des
-                data["ActivityProducedBy"] = name
-                if name == des:
-                    data['FlowName'] = name + " " + prod
-                else:
-                    data['FlowName'] = name + " " + prod + " " + des
-                dataframe = dataframe.append(data, ignore_index=True)
-                dataframe = assign_fips_location_system(
-                    dataframe, str(year))
-    return dataframe
+    return usgs_myb_parse_table(
+        df_list, source, year, years='feldspar',
+        rows=["Quantity", "Quantity3"],
+        products={"Exports, feldspar:4": "exports",
+                  "Imports for consumption:4": "imports",
+                  "Production, feldspar:e, 2": "production",
+                  "Nepheline syenite:": "production"},
+        descriptions={"Nepheline syenite:": "Nepheline syenite"},
+        carry_description=True,
+        flowname_descriptions=["Nepheline syenite"])
 
 
 def usgs_fluorspar_call(*, resp, year, **_):
@@ -1203,16 +916,12 @@ def usgs_fluorspar_call(*, resp, year, **_):
     :param year: year
     :return: pandas dataframe of original source data
     """
-    df_raw_data_one = pd.io.excel.read_excel(io.BytesIO(resp.content),
-                                             sheet_name='T1')
+    df_raw_data_one = read_workbook(resp.content).sheet('T1')
 
     if year in YEARS_COVERED['fluorspar_inports']:
-        df_raw_data_two = pd.io.excel.read_excel(io.BytesIO(resp.content),
-                                                 sheet_name='T2')
-        df_raw_data_three = pd.io.excel.read_excel(io.BytesIO(resp.content),
-                                                   sheet_name='T7')
-        df_raw_data_four = pd.io.excel.read_excel(io.BytesIO(resp.content),
-                                                  sheet_name='T8')
+        df_raw_data_two = read_workbook(resp.content).sheet('T2')
+        df_raw_data_three = read_workbook(resp.content).sheet('T7')
+        df_raw_data_four = read_workbook(resp.content).sheet('T8')
 
     df_data_one = pd.DataFrame(df_raw_data_one.loc[5:15]).reindex()
     df_data_one = df_data_one.reset_index()
@@ -1282,51 +991,34 @@ def usgs_fluorspar_parse(*, df_list, source, year, **_):
     :return: df, parsed and partially formatted to flowbyactivity
         specifications
     """
-    data = {}
     row_to_use = ["Quantity", "Quantity3", "Total", "Hydrofluoric acid",
                   "Metallurgical", "Production"]
-    prod = ""
     name = usgs_myb_name(source)
-    dataframe = pd.DataFrame()
+    col_name = usgs_myb_year(YEARS_COVERED['fluorspar'], year)
+    frames = []
     for df in df_list:
-        for index, row in df.iterrows():
-            if df.iloc[index]["Production"].strip() == "Exports:3":
-                prod = "exports"
-                des = name
-            elif df.iloc[index]["Production"].strip() == \
-                    "Imports for consumption:3":
-                prod = "imports"
-                des = name
-            elif df.iloc[index]["Production"].strip() == "Fluorosilicic acid:":
-                prod = "production"
-                des = "Fluorosilicic acid:"
-
-            if str(df.iloc[index]["type"]).strip() == "data_two":
-                prod = "imports"
-                des = df.iloc[index]["Production"].strip()
-            elif str(df.iloc[index]["type"]).strip() == \
-                    "Aluminum Fluoride" or \
-                    str(df.iloc[index]["type"]).strip() == "Cryolite":
-                prod = "imports"
-                des = df.iloc[index]["type"].strip()
-
-            if df.iloc[index]["Production"].strip() in row_to_use:
-                data = usgs_myb_static_variables()
-                data["SourceName"] = source
-                data["Year"] = str(year)
-                data["Unit"] = "Metric Tons"
-                col_name = usgs_myb_year(YEARS_COVERED['fluorspar'], year)
-                if str(df.iloc[index][col_name]) == "W":
-                    data["FlowAmount"] = WITHDRAWN_KEYWORD
-                else:
-                    data["FlowAmount"] = str(df.iloc[index][col_name])
-                data["Description"] = des
-                data["ActivityProducedBy"] = name
-                data['FlowName'] = name + " " + prod
-                dataframe = dataframe.append(data, ignore_index=True)
-                dataframe = assign_fips_location_system(
-                    dataframe, str(year))
-    return dataframe
+        labels = usgs_myb_labels(df)
+        table = usgs_myb_labels(df, "type")
+        import_table = table.isin(["Aluminum Fluoride", "Cryolite"])
+        # rows of the import tables set the product and description of the
+        # rows below, overriding the header labels
+        prod = labels.map({"Exports:3": "exports",
+                           "Imports for consumption:3": "imports",
+                           "Fluorosilicic acid:": "production"}).mask(
+            import_table | (table == "data_two"), "imports")
+        des = labels.map({"Exports:3": name,
+                          "Imports for consumption:3": name,
+                          "Fluorosilicic acid:": "Fluorosilicic acid:"}).mask(
+            table == "data_two", labels).mask(import_table, table)
+        frames.append(pd.DataFrame(
+            {"Unit": "Metric Tons",
+             "FlowName": name + " " + prod.ffill().fillna(""),
+             "Description": des.ffill().fillna(name),
+             "ActivityProducedBy": name,
+             "FlowAmount": usgs_myb_flow_amount(df[col_name],
+                                                withdrawn=["W"])}
+        )[labels.isin(row_to_use)])
+    return usgs_myb_fba(pd.concat(frames), source, year)
 
 
 def usgs_gallium_call(*, resp, year, **_):
@@ -1339,8 +1031,7 @@ def usgs_gallium_call(*, resp, year, **_):
         flowbyactivity.py ('year' and 'source')
     :return: pandas dataframe of original source data
     """
-    df_raw_data = pd.io.excel.read_excel(io.BytesIO(resp.content),
-                                         sheet_name='T1')
+    df_raw_data = read_workbook(resp.content).sheet('T1')
     df_data = pd.DataFrame(df_raw_data.loc[5:7]).reindex()
     df_data = df_data.reset_index()
     del df_data["index"]
@@ -1373,41 +1064,12 @@ def usgs_gallium_parse(*, df_list, source, year, **_):
     :return: df, parsed and partially formatted to flowbyactivity
         specifications
     """
-    data = {}
-    row_to_use = ["Production, primary crude", "Metal"]
-    prod = ""
-    name = usgs_myb_name(source)
-    des = name
-    dataframe = pd.DataFrame()
-    col_name = usgs_myb_year(YEARS_COVERED['gallium'], year)
-    for df in df_list:
-        for index, row in df.iterrows():
-            if df.iloc[index]["Production"].strip() == \
-                    "Imports for consumption:":
-                product = "imports"
-            elif df.iloc[index]["Production"].strip() == \
-                    "Production, primary crude":
-                product = "production"
-
-            if df.iloc[index]["Production"].strip() in row_to_use:
-                data = usgs_myb_static_variables()
-                data["SourceName"] = source
-                data["Year"] = str(year)
-                data["Unit"] = "Kilograms"
-                data['FlowName'] = name + " " + product
-                data["Description"] = name
-                data["ActivityProducedBy"] = name
-                col_name = usgs_myb_year(YEARS_COVERED['gallium'], year)
-                if str(df.iloc[index][col_name]).strip() == "--":
-                    data["FlowAmount"] = str(0)
-                elif str(df.iloc[index][col_name]) == "nan":
-                    data["FlowAmount"] = WITHDRAWN_KEYWORD
-                else:
-                    data["FlowAmount"] = str(df.iloc[index][col_name])
-                dataframe = dataframe.append(data, ignore_index=True)
-                dataframe = assign_fips_location_system(
-                    dataframe, str(year))
-    return dataframe
+    return usgs_myb_parse_table(
+        df_list, source, year, years='gallium',
+        rows=["Production, primary crude", "Metal"],
+        products={"Imports for consumption:": "imports",
+                  "Production, primary crude": "production"},
+        unit="Kilograms", zero=["--"], withdrawn=["nan"])
 
 
 def usgs_garnet_call(*, resp, year, **_):
@@ -1418,8 +1080,7 @@ def usgs_garnet_call(*, resp, year, **_):
     :param year: year
     :return: pandas dataframe of original source data
     """
-    df_raw_data_two = pd.io.excel.read_excel(io.BytesIO(resp.content),
-                                             sheet_name='T1')
+    df_raw_data_two = read_workbook(resp.content).sheet('T1')
     df_data_two = pd.DataFrame(df_raw_data_two.loc[4:5]).reindex()
     df_data_two = df_data_two.reset_index()
     del df_data_two["index"]
@@ -1468,36 +1129,11 @@ def usgs_garnet_parse(*, df_list, source, year, **_):
     :return: df, parsed and partially formatted to flowbyactivity
         specifications
     """
-    data = {}
-    row_to_use = ["Quantity"]
-    prod = ""
-    name = usgs_myb_name(source)
-    des = name
-    dataframe = pd.DataFrame()
-    for df in df_list:
-        for index, row in df.iterrows():
-            if df.iloc[index]["Production"].strip() == "Exports:2":
-                prod = "exports"
-            elif df.iloc[index]["Production"].strip() == \
-                    "Imports for consumption: 3":
-                prod = "imports"
-            elif df.iloc[index]["Production"].strip() == "Crude production:":
-                prod = "production"
-            if df.iloc[index]["Production"].strip() in row_to_use:
-                product = df.iloc[index]["Production"].strip()
-                data = usgs_myb_static_variables()
-                data["SourceName"] = source
-                data["Year"] = str(year)
-                data["Unit"] = "Metric Tons"
-                col_name = usgs_myb_year(YEARS_COVERED['garnet'], year)
-                data["FlowAmount"] = str(df.iloc[index][col_name])
-                data["Description"] = des
-                data["ActivityProducedBy"] = name
-                data['FlowName'] = name + " " + prod
-                dataframe = dataframe.append(data, ignore_index=True)
-                dataframe = assign_fips_location_system(
-                    dataframe, str(year))
-    return dataframe
+    return usgs_myb_parse_table(
+        df_list, source, year, years='garnet', rows=["Quantity"],
+        products={"Exports:2": "exports",
+                  "Imports for consumption: 3": "imports",
+                  "Crude production:": "production"})
 
 
 def usgs_gold_call(*, resp, year, **_):
@@ -1510,8 +1146,7 @@ def usgs_gold_call(*, resp, year, **_):
         flowbyactivity.py ('year' and 'source')
     :return: pandas dataframe of original source data
     """
-    df_raw_data = pd.io.excel.read_excel(io.BytesIO(resp.content),
-                                         sheet_name='T1')
+    df_raw_data = read_workbook(resp.content).sheet('T1')
     df_data = pd.DataFrame(df_raw_data.loc[6:14]).reindex()
     df_data = df_data.reset_index()
     del df_data["index"]
@@ -1539,43 +1174,14 @@ def usgs_gold_parse(*, df_list, source, year, **_):
     :return: df, parsed and partially formatted to flowbyactivity
         specifications
     """
-    data = {}
-    row_to_use = ["Quantity", "Exports, refined bullion",
-                  "Imports for consumption, refined bullion"]
-    dataframe = pd.DataFrame()
-    product = "production"
-    name = usgs_myb_name(source)
-    des = name
-    for df in df_list:
-        for index, row in df.iterrows():
-
-            if df.iloc[index]["Production"].strip() == "Quantity":
-                product = "production"
-            elif df.iloc[index]["Production"].strip() == \
-                    "Exports, refined bullion":
-                product = "exports"
-            elif df.iloc[index]["Production"].strip() == \
-                    "Imports for consumption, refined bullion":
-                product = "imports"
-
-            if df.iloc[index]["Production"].strip() in row_to_use:
-                data = usgs_myb_static_variables()
-                data["SourceName"] = source
-                data["Year"] = str(year)
-                data["Unit"] = "kilograms"
-                data['FlowName'] = name + " " + product
-
-                data["Description"] = des
-                data["ActivityProducedBy"] = name
-                col_name = usgs_myb_year(YEARS_COVERED['gold'], year)
-                if str(df.iloc[index][col_name]) == "--":
-                    data["FlowAmount"] = str(0)
-                else:
-                    data["FlowAmount"] = str(df.iloc[index][col_name])
-                dataframe = dataframe.append(data, ignore_index=True)
-                dataframe = assign_fips_location_system(
-                    dataframe, str(year))
-    return dataframe
+    return usgs_myb_parse_table(
+        df_list, source, year, years='gold',
+        rows=["Quantity", "Exports, refined bullion",
+              "Imports for consumption, refined bullion"],
+        products={"Quantity": "production",
+                  "Exports, refined bullion": "exports",
+                  "Imports for consumption, refined bullion": "imports"},
+        product="production", unit="kilograms", zero=["--"])
 
 
 def usgs_graphite_call(*, resp, year, **_):
@@ -1586,8 +1192,7 @@ def usgs_graphite_call(*, resp, year, **_):
     :param year: year
     :return: pandas dataframe of original source data
     """
-    df_raw_data = pd.io.excel.read_excel(io.BytesIO(resp.content),
-                                         sheet_name='T1')
+    df_raw_data = read_workbook(resp.content).sheet('T1')
     df_data = pd.DataFrame(df_raw_data.loc[5:9]).reindex()
     df_data = df_data.reset_index()
     del df_data["index"]
@@ -1615,40 +1220,12 @@ def usgs_graphite_parse(*, df_list, source, year, **_):
     :return: df, parsed and partially formatted to flowbyactivity
         specifications
     """
-    data = {}
-    row_to_use = ["Quantiy", "Quantity"]
-    prod = ""
-    name = usgs_myb_name(source)
-    des = name
-    dataframe = pd.DataFrame()
-    col_name = usgs_myb_year(YEARS_COVERED['graphite'], year)
-    for df in df_list:
-        for index, row in df.iterrows():
-            if df.iloc[index]["Production"].strip() == \
-                    "Imports for consumption:":
-                product = "imports"
-            elif df.iloc[index]["Production"].strip() == "Exports:":
-                product = "exports"
-
-            if df.iloc[index]["Production"].strip() in row_to_use:
-                data = usgs_myb_static_variables()
-                data["SourceName"] = source
-                data["Year"] = str(year)
-                data["Unit"] = "Metric Tons"
-                data['FlowName'] = name + " " + product
-                data["Description"] = name
-                data["ActivityProducedBy"] = name
-                col_name = usgs_myb_year(YEARS_COVERED['graphite'], year)
-                if str(df.iloc[index][col_name]) == "--":
-                    data["FlowAmount"] = str(0)
-                elif str(df.iloc[index][col_name]) == "nan":
-                    data["FlowAmount"] = WITHDRAWN_KEYWORD
-                else:
-                    data["FlowAmount"] = str(df.iloc[index][col_name])
-                dataframe = dataframe.append(data, ignore_index=True)
-                dataframe = assign_fips_location_system(
-                    dataframe, str(year))
-    return dataframe
+    return usgs_myb_parse_table(
+        df_list, source, year, years='graphite',
+        rows=["Quantiy", "Quantity"],
+        products={"Imports for consumption:": "imports",
+                  "Exports:": "exports"},
+        zero=["--"], withdrawn=["nan"])
 
 
 def usgs_gypsum_call(*, resp, year, **_):
@@ -1661,8 +1238,7 @@ def usgs_gypsum_call(*, resp, year, **_):
         flowbyactivity.py ('year' and 'source')
     :return: pandas dataframe of original source data
     """
-    df_raw_data_one = pd.io.excel.read_excel(io.BytesIO(resp.content),
-                                             sheet_name='T1')
+    df_raw_data_one = read_workbook(resp.content).sheet('T1')
 
     df_data_one = pd.DataFrame(df_raw_data_one.loc[7:10]).reindex()
     df_data_one = df_data_one.reset_index()
@@ -1702,37 +1278,12 @@ def usgs_gypsum_parse(*, df_list, source, year, **_):
     :return: df, parsed and partially formatted to flowbyactivity
         specifications
     """
-    data = {}
-    row_to_use = ["Quantity", "Imports for consumption"]
-    prod = ""
-    name = usgs_myb_name(source)
-    des = name
-    dataframe = pd.DataFrame()
-    col_name = usgs_myb_year(YEARS_COVERED['gypsum'], year)
-    for df in df_list:
-        for index, row in df.iterrows():
-            if df.iloc[index]["Production"].strip() == \
-                    "Imports for consumption":
-                prod = "imports"
-            elif df.iloc[index]["Production"].strip() == "Quantity":
-                prod = "production"
-
-            if df.iloc[index]["Production"].strip() in row_to_use:
-                product = df.iloc[index]["Production"].strip()
-                data = usgs_myb_static_variables()
-                data["SourceName"] = source
-                data["Year"] = str(year)
-                data["Unit"] = "Metric Tons"
-                data["FlowAmount"] = str(df.iloc[index][col_name])
-                if str(df.iloc[index][col_name]) == "W":
-                    data["FlowAmount"] = WITHDRAWN_KEYWORD
-                data["Description"] = des
-                data["ActivityProducedBy"] = name
-                data['FlowName'] = name + " " + prod
-                dataframe = dataframe.append(data, ignore_index=True)
-                dataframe = assign_fips_location_system(
-                    dataframe, str(year))
-    return dataframe
+    return usgs_myb_parse_table(
+        df_list, source, year, years='gypsum',
+        rows=["Quantity", "Imports for consumption"],
+        products={"Imports for consumption": "imports",
+                  "Quantity": "production"},
+        withdrawn=["W"])
 
 
 def usgs_iodine_call(*, resp, year, **_):
@@ -1745,8 +1296,7 @@ def usgs_iodine_call(*, resp, year, **_):
         flowbyactivity.py ('year' and 'source')
     :return: pandas dataframe of original source data
     """
-    df_raw_data = pd.io.excel.read_excel(io.BytesIO(resp.content),
-                                         sheet_name='T1')
+    df_raw_data = read_workbook(resp.content).sheet('T1')
     df_data = pd.DataFrame(df_raw_data.loc[6:10]).reindex()
     df_data = df_data.reset_index()
     del df_data["index"]
@@ -1779,41 +1329,12 @@ def usgs_iodine_parse(*, df_list, source, year, **_):
     :return: df, parsed and partially formatted to flowbyactivity
         specifications
     """
-    data = {}
-    row_to_use = ["Production", "Quantity, for consumption", "Exports2"]
-    prod = ""
-    name = usgs_myb_name(source)
-    des = name
-    dataframe = pd.DataFrame()
-    col_name = usgs_myb_year(YEARS_COVERED['iodine'], year)
-    for df in df_list:
-        for index, row in df.iterrows():
-            if df.iloc[index]["Production"].strip() == "Imports:2":
-                product = "imports"
-            elif df.iloc[index]["Production"].strip() == "Production":
-                product = "production"
-            elif df.iloc[index]["Production"].strip() == "Exports2":
-                product = "exports"
-
-            if df.iloc[index]["Production"].strip() in row_to_use:
-                data = usgs_myb_static_variables()
-                data["SourceName"] = source
-                data["Year"] = str(year)
-                data["Unit"] = "Metric Tons"
-                data['FlowName'] = name + " " + product
-                data["Description"] = name
-                data["ActivityProducedBy"] = name
-                col_name = usgs_myb_year(YEARS_COVERED['iodine'], year)
-                if str(df.iloc[index][col_name]) == "--":
-                    data["FlowAmount"] = str(0)
-                elif str(df.iloc[index][col_name]) == "W":
-                    data["FlowAmount"] = WITHDRAWN_KEYWORD
-                else:
-                    data["FlowAmount"] = str(df.iloc[index][col_name])
-                dataframe = dataframe.append(data, ignore_index=True)
-                dataframe = assign_fips_location_system(
-                    dataframe, str(year))
-    return dataframe
+    return usgs_myb_parse_table(
+        df_list, source, year, years='iodine',
+        rows=["Production", "Quantity, for consumption", "Exports2"],
+        products={"Imports:2": "imports", "Production": "production",
+                  "Exports2": "exports"},
+        zero=["--"], withdrawn=["W"])
 
 
 def usgs_iron_ore_call(*, resp, year, **_):
@@ -1824,8 +1345,7 @@ def usgs_iron_ore_call(*, resp, year, **_):
     :param year: year
     :return: pandas dataframe of original source data
     """
-    df_raw_data = pd.io.excel.read_excel(io.BytesIO(resp.content),
-                                         sheet_name='T1')
+    df_raw_data = read_workbook(resp.content).sheet('T1')
     df_data = pd.DataFrame(df_raw_data.loc[7:25]).reindex()
     df_data = df_data.reset_index()
     del df_data["index"]
@@ -1852,39 +1372,12 @@ def usgs_iron_ore_parse(*, df_list, source, year, **_):
     :return: df, parsed and partially formatted to flowbyactivity
         specifications
     """
-    data = {}
-    name = usgs_myb_name(source)
-    des = name
-    row_to_use = ["Gross weight", "Quantity"]
-    dataframe = pd.DataFrame()
-    for df in df_list:
-        for index, row in df.iterrows():
-
-            if df.iloc[index]["Production"].strip() == "Production:":
-                product = "production"
-            elif df.iloc[index]["Production"].strip() == "Exports:":
-                product = "exports"
-            elif df.iloc[index]["Production"].strip() == \
-                    "Imports for consumption:":
-                product = "imports"
-
-            if df.iloc[index]["Production"].strip() in row_to_use:
-                data = usgs_myb_static_variables()
-                data["SourceName"] = source
-                data["Year"] = str(year)
-                data["Unit"] = "Thousand Metric Tons"
-                data['FlowName'] = "Iron Ore " + product
-                data["Description"] = "Iron Ore"
-                data["ActivityProducedBy"] = "Iron Ore"
-                col_name = usgs_myb_year(YEARS_COVERED['ironore'], year)
-                if str(df.iloc[index][col_name]) == "--":
-                    data["FlowAmount"] = str(0)
-                else:
-                    data["FlowAmount"] = str(df.iloc[index][col_name])
-                dataframe = dataframe.append(data, ignore_index=True)
-                dataframe = assign_fips_location_system(
-                    dataframe, str(year))
-    return dataframe
+    return usgs_myb_parse_table(
+        df_list, source, year, years='ironore',
+        rows=["Gross weight", "Quantity"],
+        products={"Production:": "production", "Exports:": "exports",
+                  "Imports for consumption:": "imports"},
+        name="Iron Ore", unit="Thousand Metric Tons", zero=["--"])
 
 
 def usgs_kyanite_call(*, resp, year, **_):
@@ -1896,8 +1389,7 @@ def usgs_kyanite_call(*, resp, year, **_):
     :param year: year
     :return: pandas dataframe of original source data
     """
-    df_raw_data_one = pd.io.excel.read_excel(io.BytesIO(resp.content),
-                                             sheet_name='T1')
+    df_raw_data_one = read_workbook(resp.content).sheet('T1')
     df_data_one = pd.DataFrame(df_raw_data_one.loc[4:13]).reindex()
     df_data_one = df_data_one.reset_index()
     del df_data_one["index"]
@@ -1931,39 +1423,14 @@ def usgs_kyanite_parse(*, df_list, source, year, **_):
     :return: df, parsed and partially formatted to flowbyactivity
         specifications
     """
-    data = {}
-    row_to_use = ["Quantity", "Quantity2"]
-    prod = ""
-    name = usgs_myb_name(source)
-    des = name
-    dataframe = pd.DataFrame()
-    col_name = usgs_myb_year(YEARS_COVERED['kyanite'], year)
-    for df in df_list:
-        for index, row in df.iterrows():
-            if df.iloc[index]["Production"].strip() == \
-                    "Exports of kyanite concentrate:3":
-                prod = "exports"
-            elif df.iloc[index]["Production"].strip() == \
-                    "Imports for consumption, all kyanite minerals:3":
-                prod = "imports"
-            elif df.iloc[index]["Production"].strip() == "Production:":
-                prod = "production"
-            if df.iloc[index]["Production"].strip() in row_to_use:
-                product = df.iloc[index]["Production"].strip()
-                data = usgs_myb_static_variables()
-                data["SourceName"] = source
-                data["Year"] = str(year)
-                data["Unit"] = "Metric Tons"
-                data["FlowAmount"] = str(df.iloc[index][col_name])
-                if str(df.iloc[index][col_name]) == "W":
-                    data["FlowAmount"] = WITHDRAWN_KEYWORD
-                data["Description"] = des
-                data["ActivityProducedBy"] = name
-                data['FlowName'] = name + " " + prod
-                dataframe = dataframe.append(data, ignore_index=True)
-                dataframe = assign_fips_location_system(
-                    dataframe, str(year))
-    return dataframe
+    return usgs_myb_parse_table(
+        df_list, source, year, years='kyanite',
+        rows=["Quantity", "Quantity2"],
+        products={"Exports of kyanite concentrate:3": "exports",
+                  "Imports for consumption, all kyanite minerals:3":
+                      "imports",
+                  "Production:": "production"},
+        withdrawn=["W"])
 
 
 def usgs_lead_url_helper(*, year, **_):
@@ -1995,8 +1462,7 @@ def usgs_lead_call(*, resp, year, **_):
     :param year: year
     :return: pandas dataframe of original source data
     """
-    df = pd.read_excel(io.BytesIO(resp.content),
-                       sheet_name='T1', header=[3])
+    df = read_workbook(resp.content).sheet('T1', header=[3])
     df.columns = df.columns.astype(str).str.strip()
     df = df.rename(columns={df.columns[0]: 'Production',
                             df.columns[1]: 'Units',
@@ -2015,42 +1481,27 @@ def usgs_lead_parse(*, df_list, source, year, **_):
     :return: df, parsed and partially formatted to flowbyactivity
         specifications
     """
-    data = {}
     name = usgs_myb_name(source)
-    des = name
     row_to_use = ["Primary lead, refined content, "
                   "domestic ores and base bullion",
                   "Secondary lead, lead content",
                   "Lead ore and concentrates", "Lead in base bullion",
                   "Base bullion"]
-    import_export = ["Exports, lead content:",
-                     "Imports for consumption, lead content:"]
-    dataframe = pd.DataFrame()
-    product = "production"
+    frames = []
     for df in df_list:
-        for index, row in df.iterrows():
-            if df.iloc[index]["Production"].strip() in import_export:
-                if df.iloc[index]["Production"].strip() == \
-                        "Exports, lead content:":
-                    product = "exports"
-                elif df.iloc[index]["Production"].strip() == \
-                        "Imports for consumption, lead content:":
-                    product = "imports"
-            if df.iloc[index]["Production"].strip() in row_to_use:
-                data = usgs_myb_static_variables()
-                data["SourceName"] = source
-                data["Year"] = str(year)
-                data["Unit"] = "Metric Tons"
-                data['FlowName'] = name + " " + product
-                data["ActivityProducedBy"] = df.iloc[index]["Production"]
-                if str(df.iloc[index]["FlowAmount"]) == "--":
-                    data["FlowAmount"] = 0
-                else:
-                    data["FlowAmount"] = df.iloc[index]["FlowAmount"]
-                dataframe = pd.concat([dataframe, pd.DataFrame([data])],
-                                      ignore_index=True)
-                dataframe = assign_fips_location_system(
-                    dataframe, str(year))
+        labels = usgs_myb_labels(df)
+        product = usgs_myb_label_state(
+            labels, {"Exports, lead content:": "exports",
+                     "Imports for consumption, lead content:": "imports"},
+            "production")
+        frames.append(pd.DataFrame(
+            {"Unit": "Metric Tons",
+             "FlowName": name + " " + product,
+             "ActivityProducedBy": df["Production"],
+             "FlowAmount": df["FlowAmount"].mask(
+                 df["FlowAmount"].astype(str) == "--", 0)}
+        )[labels.isin(row_to_use)])
+    dataframe = usgs_myb_fba(pd.concat(frames), source, year)
     # standardize activityproducedby naming
     dataframe['ActivityProducedBy'] = np.where(
         dataframe['ActivityProducedBy'] == "Base bullion",
@@ -2069,8 +1520,7 @@ def usgs_lime_call(*, resp, year, **_):
     :return: pandas dataframe of original source data
     """
 
-    df_raw_data_two = pd.io.excel.read_excel(io.BytesIO(resp.content),
-                                             sheet_name='T1')
+    df_raw_data_two = read_workbook(resp.content).sheet('T1')
 
     df_data_1 = pd.DataFrame(df_raw_data_two.loc[16:16]).reindex()
     df_data_1 = df_data_1.reset_index()
@@ -2118,41 +1568,11 @@ def usgs_lime_parse(*, df_list, source, year, **_):
     :return: df, parsed and partially formatted to flowbyactivity
         specifications
     """
-    data = {}
-    row_to_use = ["Total", "Quantity"]
-    import_export = ["Exports:7", "Imports for consumption:7"]
-    name = usgs_myb_name(source)
-    des = name
-    dataframe = pd.DataFrame()
-    for df in df_list:
-        prod = "production"
-        for index, row in df.iterrows():
-            if df.iloc[index]["Production"].strip() == "Exports:7":
-                prod = "exports"
-            elif df.iloc[index]["Production"].strip() == \
-                    "Imports for consumption:7":
-                prod = "imports"
-            if df.iloc[index]["Production"].strip() in row_to_use:
-                remove_digits = str.maketrans('', '', digits)
-                product = df.iloc[index][
-                    "Production"].strip().translate(remove_digits)
-                data = usgs_myb_static_variables()
-                data["SourceName"] = source
-                data["Year"] = str(year)
-                data["Unit"] = "Thousand Metric Tons"
-                col_name = usgs_myb_year(YEARS_COVERED['lime'], year)
-                data["Description"] = des
-                data["ActivityProducedBy"] = name
-                if product.strip() == "Total":
-                    data['FlowName'] = name + " " + prod
-                elif product.strip() == "Quantity":
-                    data['FlowName'] = name + " " + prod
-
-                data["FlowAmount"] = str(df.iloc[index][col_name])
-                dataframe = dataframe.append(data, ignore_index=True)
-                dataframe = assign_fips_location_system(
-                    dataframe, str(year))
-    return dataframe
+    return usgs_myb_parse_table(
+        df_list, source, year, years='lime', rows=["Total", "Quantity"],
+        products={"Exports:7": "exports",
+                  "Imports for consumption:7": "imports"},
+        product="production", unit="Thousand Metric Tons")
 
 
 def usgs_lithium_call(*, resp, year, **_):
@@ -2164,8 +1584,7 @@ def usgs_lithium_call(*, resp, year, **_):
     :param year: year
     :return: pandas dataframe of original source data
     """
-    df_raw_data_one = pd.io.excel.read_excel(io.BytesIO(resp.content),
-                                             sheet_name='T1')
+    df_raw_data_one = read_workbook(resp.content).sheet('T1')
     df_data_one = pd.DataFrame(df_raw_data_one.loc[6:8]).reindex()
     df_data_one = df_data_one.reset_index()
     del df_data_one["index"]
@@ -2204,37 +1623,12 @@ def usgs_lithium_parse(*, df_list, source, year, **_):
     :return: df, parsed and partially formatted to flowbyactivity
         specifications
     """
-    data = {}
-    row_to_use = ["Exports3", "Imports3", "Production"]
-    prod = ""
-    name = usgs_myb_name(source)
-    des = name
-    dataframe = pd.DataFrame()
-    col_name = usgs_myb_year(YEARS_COVERED['lithium'], year)
-    for df in df_list:
-        for index, row in df.iterrows():
-            if df.iloc[index]["Production"].strip() == "Exports3":
-                prod = "exports"
-            elif df.iloc[index]["Production"].strip() == "Imports3":
-                prod = "imports"
-            elif df.iloc[index]["Production"].strip() == "Production":
-                prod = "production"
-            if df.iloc[index]["Production"].strip() in row_to_use:
-                product = df.iloc[index]["Production"].strip()
-                data = usgs_myb_static_variables()
-                data["SourceName"] = source
-                data["Year"] = str(year)
-                data["Unit"] = "Metric Tons"
-                data["FlowAmount"] = str(df.iloc[index][col_name])
-                if str(df.iloc[index][col_name]) == "W":
-                    data["FlowAmount"] = WITHDRAWN_KEYWORD
-                data["Description"] = des
-                data["ActivityProducedBy"] = name
-                data['FlowName'] = name + " " + prod
-                dataframe = dataframe.append(data, ignore_index=True)
-                dataframe = assign_fips_location_system(
-                    dataframe, str(year))
-    return dataframe
+    return usgs_myb_parse_table(
+        df_list, source, year, years='lithium',
+        rows=["Exports3", "Imports3", "Production"],
+        products={"Exports3": "exports", "Imports3": "imports",
+                  "Production": "production"},
+        withdrawn=["W"])
 
 
 def usgs_magnesium_call(*, resp, year, **_):
@@ -2246,8 +1640,7 @@ def usgs_magnesium_call(*, resp, year, **_):
     :param year: year
     :return: pandas dataframe of original source data
     """
-    df_raw_data = pd.io.excel.read_excel(io.BytesIO(resp.content),
-                                         sheet_name='T1')
+    df_raw_data = read_workbook(resp.content).sheet('T1')
     df_data = pd.DataFrame(df_raw_data.loc[7:15]).reindex()
     df_data = df_data.reset_index()
     del df_data["index"]
@@ -2275,41 +1668,13 @@ def usgs_magnesium_parse(*, df_list, source, year, **_):
     :return: df, parsed and partially formatted to flowbyactivity
         specifications
     """
-    data = {}
-    row_to_use = ["Secondary", "Primary", "Exports", "Imports for consumption"]
-    dataframe = pd.DataFrame()
-    name = usgs_myb_name(source)
-    des = name
-    for df in df_list:
-        for index, row in df.iterrows():
-            if df.iloc[index]["Production"].strip() == "Exports":
-                product = "exports"
-            elif df.iloc[index]["Production"].strip() == \
-                    "Imports for consumption":
-                product = "imports"
-            elif df.iloc[index]["Production"].strip() == "Secondary" or \
-                    df.iloc[index]["Production"].strip() == "Primary":
-                product = "production" + " " + \
-                          df.iloc[index]["Production"].strip()
-            if df.iloc[index]["Production"].strip() in row_to_use:
-                data = usgs_myb_static_variables()
-                data["SourceName"] = source
-                data["Year"] = str(year)
-                data["Unit"] = "Metric Tons"
-                data['FlowName'] = name + " " + product
-                data["Description"] = name
-                data["ActivityProducedBy"] = name
-                col_name = usgs_myb_year(YEARS_COVERED['magnesium'], year)
-                if str(df.iloc[index][col_name]) == "--":
-                    data["FlowAmount"] = str(0)
-                elif str(df.iloc[index][col_name]) == "W":
-                    data["FlowAmount"] = WITHDRAWN_KEYWORD
-                else:
-                    data["FlowAmount"] = str(df.iloc[index][col_name])
-                dataframe = dataframe.append(data, ignore_index=True)
-                dataframe = assign_fips_location_system(
-                    dataframe, str(year))
-    return dataframe
+    return usgs_myb_parse_table(
+        df_list, source, year, years='magnesium',
+        rows=["Secondary", "Primary", "Exports", "Imports for consumption"],
+        products={"Exports": "exports", "Imports for consumption": "imports",
+                  "Secondary": "production Secondary",
+                  "Primary": "production Primary"},
+        zero=["--"], withdrawn=["W"])
 
 
 def usgs_manganese_call(*, resp, year, **_):
@@ -2320,8 +1685,7 @@ def usgs_manganese_call(*, resp, year, **_):
     :param year: year
     :return: pandas dataframe of original source data
     """
-    df_raw_data = pd.io.excel.read_excel(io.BytesIO(resp.content),
-                                         sheet_name='T1')
+    df_raw_data = read_workbook(resp.content).sheet('T1')
     df_data = pd.DataFrame(df_raw_data.loc[7:9]).reindex()
     df_data = df_data.reset_index()
     del df_data["index"]
@@ -2353,40 +1717,12 @@ def usgs_manganese_parse(*, df_list, source, year, **_):
     :return: df, parsed and partially formatted to flowbyactivity
         specifications
     """
-    data = {}
-    row_to_use = ["Production", "Exports", "Imports for consumption"]
-    prod = ""
-    name = usgs_myb_name(source)
-    des = name
-    dataframe = pd.DataFrame()
-    col_name = usgs_myb_year(YEARS_COVERED['manganese'], year)
-    for df in df_list:
-        for index, row in df.iterrows():
-            if df.iloc[index]["Production"].strip() == \
-                    "Imports for consumption":
-                product = "imports"
-            elif df.iloc[index]["Production"].strip() == "Production":
-                product = "production"
-            elif df.iloc[index]["Production"].strip() == "Exports":
-                product = "exports"
-            if df.iloc[index]["Production"].strip() in row_to_use:
-                data = usgs_myb_static_variables()
-                data["SourceName"] = source
-                data["Year"] = str(year)
-                data["Unit"] = "Metric Tons"
-                data['FlowName'] = name + " " + product
-                data["Description"] = name
-                data["ActivityProducedBy"] = name
-                col_name = usgs_myb_year(YEARS_COVERED['manganese'], year)
-                if str(df.iloc[index][col_name]) == "--" or \
-                        str(df.iloc[index][col_name]) == "(3)":
-                    data["FlowAmount"] = str(0)
-                else:
-                    data["FlowAmount"] = str(df.iloc[index][col_name])
-                dataframe = dataframe.append(data, ignore_index=True)
-                dataframe = assign_fips_location_system(
-                    dataframe, str(year))
-    return dataframe
+    return usgs_myb_parse_table(
+        df_list, source, year, years='manganese',
+        rows=["Production", "Exports", "Imports for consumption"],
+        products={"Imports for consumption": "imports",
+                  "Production": "production", "Exports": "exports"},
+        zero=["--", "(3)"])
 
 
 def usgs_ma_call(*, resp, year, **_):
@@ -2399,8 +1735,7 @@ def usgs_ma_call(*, resp, year, **_):
         flowbyactivity.py ('year' and 'source')
     :return: pandas dataframe of original source data
     """
-    df_raw_data = pd.io.excel.read_excel(io.BytesIO(resp.content),
-                                         sheet_name='T2')
+    df_raw_data = read_workbook(resp.content).sheet('T2')
     df_data = pd.DataFrame(df_raw_data.loc[6:7]).reindex()
     df_data = df_data.reset_index()
     del df_data["index"]
@@ -2439,33 +1774,19 @@ def usgs_ma_parse(*, df_list, source, year, **_):
     :return: df, parsed and partially formatted to flowbyactivity
         specifications
     """
-    data = {}
-    row_to_use = ["Silicon carbide"]
-    name = usgs_myb_name(source)
-    des = name
-    dataframe = pd.DataFrame()
+    col_name = ("quality_"
+                + usgs_myb_year(YEARS_COVERED['manufacturedabrasive'], year))
+    frames = []
     for df in df_list:
-        for index, row in df.iterrows():
-            remove_digits = str.maketrans('', '', digits)
-            product = df.iloc[index][
-                "Product"].strip().translate(remove_digits)
-            if product in row_to_use:
-                data = usgs_myb_static_variables()
-                data["SourceName"] = source
-                data["Year"] = str(year)
-                data['FlowName'] = "Silicon carbide"
-                data["ActivityProducedBy"] = "Silicon carbide"
-                data["Unit"] = "Metric Tons"
-                col_name = ("quality_"
-                            + usgs_myb_year(
-                                YEARS_COVERED['manufacturedabrasive'], year))
-                col_name_array = col_name.split("_")
-                data["Description"] = product + " " + col_name_array[0]
-                data["FlowAmount"] = str(df.iloc[index][col_name])
-                dataframe = dataframe.append(data, ignore_index=True)
-                dataframe = assign_fips_location_system(
-                    dataframe, str(year))
-    return dataframe
+        product = usgs_myb_labels(df, "Product", strip_digits=True)
+        frames.append(pd.DataFrame(
+            {"Unit": "Metric Tons",
+             "FlowName": "Silicon carbide",
+             "Description": product + " " + col_name.split("_")[0],
+             "ActivityProducedBy": "Silicon carbide",
+             "FlowAmount": df[col_name].astype(str)}
+        )[product == "Silicon carbide"])
+    return usgs_myb_fba(pd.concat(frames), source, year)
 
 
 def usgs_mica_call(*, resp, source, year, **_):
@@ -2477,8 +1798,7 @@ def usgs_mica_call(*, resp, source, year, **_):
     :param year: year
     :return: pandas dataframe of original source data
     """
-    df_raw_data_one = pd.io.excel.read_excel(io.BytesIO(resp.content),
-                                             sheet_name='T1')
+    df_raw_data_one = read_workbook(resp.content).sheet('T1')
     df_data_one = pd.DataFrame(df_raw_data_one.loc[4:6]).reindex()
     df_data_one = df_data_one.reset_index()
     del df_data_one["index"]
@@ -2511,34 +1831,10 @@ def usgs_mica_parse(*, df_list, source, year, **_):
     :return: df, parsed and partially formatted to flowbyactivity
         specifications
     """
-    data = {}
-    row_to_use = ["Quantity"]
-    prod = ""
-    name = usgs_myb_name(source)
-    des = name
-    dataframe = pd.DataFrame()
-    col_name = usgs_myb_year(YEARS_COVERED['mica'], year)
-    for df in df_list:
-        for index, row in df.iterrows():
-            if df.iloc[index]["Production"].strip() == \
-                    "Production, sold or used by producers:":
-                prod = "production"
-            if df.iloc[index]["Production"].strip() in row_to_use:
-                product = df.iloc[index]["Production"].strip()
-                data = usgs_myb_static_variables()
-                data["SourceName"] = source
-                data["Year"] = str(year)
-                data["Unit"] = "Metric Tons"
-                data["FlowAmount"] = str(df.iloc[index][col_name])
-                if str(df.iloc[index][col_name]) == "W":
-                    data["FlowAmount"] = WITHDRAWN_KEYWORD
-                data["Description"] = des
-                data["ActivityProducedBy"] = name
-                data['FlowName'] = name + " " + prod
-                dataframe = dataframe.append(data, ignore_index=True)
-                dataframe = assign_fips_location_system(
-                    dataframe, str(year))
-    return dataframe
+    return usgs_myb_parse_table(
+        df_list, source, year, years='mica', rows=["Quantity"],
+        products={"Production, sold or used by producers:": "production"},
+        withdrawn=["W"])
 
 
 def usgs_molybdenum_call(*, resp, year, **_):
@@ -2550,8 +1846,7 @@ def usgs_molybdenum_call(*, resp, year, **_):
     :param year: year
     :return: pandas dataframe of original source data
     """
-    df_raw_data = pd.io.excel.read_excel(io.BytesIO(resp.content),
-                                         sheet_name='T1')
+    df_raw_data = read_workbook(resp.content).sheet('T1')
     df_data = pd.DataFrame(df_raw_data.loc[7:11]).reindex()
     df_data = df_data.reset_index()
     del df_data["index"]
@@ -2579,39 +1874,12 @@ def usgs_molybdenum_parse(*, df_list, source, year, **_):
     :return: df, parsed and partially formatted to flowbyactivity
         specifications
     """
-    data = {}
-    row_to_use = ["Production", "Imports for consumption", "Exports"]
-    dataframe = pd.DataFrame()
-    name = usgs_myb_name(source)
-    des = name
-
-    for df in df_list:
-        for index, row in df.iterrows():
-
-            if df.iloc[index]["Production"].strip() == "Exports":
-                product = "exports"
-            elif df.iloc[index]["Production"].strip() == \
-                    "Imports for consumption":
-                product = "imports"
-            elif df.iloc[index]["Production"].strip() == "Production":
-                product = "production"
-            if df.iloc[index]["Production"].strip() in row_to_use:
-                data = usgs_myb_static_variables()
-                data["SourceName"] = source
-                data["Year"] = str(year)
-                data["Unit"] = "Metric Tons"
-                data['FlowName'] = name + " " + product
-                data["Description"] = des
-                data["ActivityProducedBy"] = name
-                col_name = usgs_myb_year(YEARS_COVERED['molybdenum'], year)
-                if str(df.iloc[index][col_name]) == "--":
-                    data["FlowAmount"] = str(0)
-                else:
-                    data["FlowAmount"] = str(df.iloc[index][col_name])
-                dataframe = dataframe.append(data, ignore_index=True)
-                dataframe = assign_fips_location_system(
-                    dataframe, str(year))
-    return dataframe
+    return usgs_myb_parse_table(
+        df_list, source, year, years='molybdenum',
+        rows=["Production", "Imports for consumption", "Exports"],
+        products={"Exports": "exports", "Imports for consumption": "imports",
+                  "Production": "production"},
+        zero=["--"])
 
 
 def usgs_nickel_call(*, resp, year, **_):
@@ -2623,14 +1891,12 @@ def usgs_nickel_call(*, resp, year, **_):
     :param year: year
     :return: pandas dataframe of original source data
     """
-    df_raw_data = pd.io.excel.read_excel(io.BytesIO(resp.content),
-                                         sheet_name='T10')
+    df_raw_data = read_workbook(resp.content).sheet('T10')
     df_data_1 = pd.DataFrame(df_raw_data.loc[36:36]).reindex()
     df_data_1 = df_data_1.reset_index()
     del df_data_1["index"]
 
-    df_raw_data_two = pd.io.excel.read_excel(io.BytesIO(resp.content),
-                                             sheet_name='T1')
+    df_raw_data_two = read_workbook(resp.content).sheet('T1')
     df_data_2 = pd.DataFrame(df_raw_data_two.loc[11:16]).reindex()
     df_data_2 = df_data_2.reset_index()
     del df_data_2["index"]
@@ -2674,49 +1940,18 @@ def usgs_nickel_parse(*, df_list, source, year, **_):
     :return: df, parsed and partially formatted to flowbyactivity
         specifications
     """
-    data = {}
-    row_to_use = ["Ores and concentrates3",
-                  "United States, sulfide ore, concentrate"]
-    import_export = ["Exports:", "Imports for consumption:"]
-    name = usgs_myb_name(source)
-    des = name
-    dataframe = pd.DataFrame()
-    for df in df_list:
-        prod = "production"
-        for index, row in df.iterrows():
-            if df.iloc[index]["Production"].strip() == "Exports:":
-                prod = "exports"
-            elif df.iloc[index]["Production"].strip() == \
-                    "Imports for consumption:":
-                prod = "imports"
-            if df.iloc[index]["Production"].strip() in row_to_use:
-                remove_digits = str.maketrans('', '', digits)
-                product = df.iloc[index][
-                    "Production"].strip().translate(remove_digits)
-                data = usgs_myb_static_variables()
-                data["SourceName"] = source
-                data["Year"] = str(year)
-                data["Unit"] = "Metric Tons"
-                col_name = usgs_myb_year(YEARS_COVERED['nickel'], year)
-                if product.strip() == \
-                        "United States, sulfide ore, concentrate":
-                    data["Description"] = \
-                        "United States, sulfide ore, concentrate Nickel"
-                    data["ActivityProducedBy"] = name
-                    data['FlowName'] = name + " " + prod
-                elif product.strip() == "Ores and concentrates":
-                    data["Description"] = "Ores and concentrates Nickel"
-                    data["ActivityProducedBy"] = name
-                    data['FlowName'] = name + " " + prod
-                if str(df.iloc[index][col_name]) == "--" or \
-                        str(df.iloc[index][col_name]) == "(4)":
-                    data["FlowAmount"] = str(0)
-                else:
-                    data["FlowAmount"] = str(df.iloc[index][col_name])
-                dataframe = dataframe.append(data, ignore_index=True)
-                dataframe = assign_fips_location_system(
-                    dataframe, str(year))
-    return dataframe
+    return usgs_myb_parse_table(
+        df_list, source, year, years='nickel',
+        rows=["Ores and concentrates3",
+              "United States, sulfide ore, concentrate"],
+        products={"Exports:": "exports",
+                  "Imports for consumption:": "imports"},
+        product="production",
+        descriptions={"Ores and concentrates3":
+                          "Ores and concentrates Nickel",
+                      "United States, sulfide ore, concentrate":
+                          "United States, sulfide ore, concentrate Nickel"},
+        zero=["--", "(4)"])
 
 
 def usgs_niobium_call(*, resp, year, **_):
@@ -2728,8 +1963,7 @@ def usgs_niobium_call(*, resp, year, **_):
     :param year: year
     :return: pandas dataframe of original source data
     """
-    df_raw_data = pd.io.excel.read_excel(io.BytesIO(resp.content),
-                                         sheet_name='T1')
+    df_raw_data = read_workbook(resp.content).sheet('T1')
     df_data = pd.DataFrame(df_raw_data.loc[4:19]).reindex()
     df_data = df_data.reset_index()
     del df_data["index"]
@@ -2762,38 +1996,12 @@ def usgs_niobium_parse(*, df_list, source, year, **_):
     :return: df, parsed and partially formatted to flowbyactivity
         specifications
     """
-    data = {}
-    row_to_use = ["Total imports, Nb content", "Total exports, Nb content"]
-    prod = ""
-    name = usgs_myb_name(source)
-    des = name
-    dataframe = pd.DataFrame()
-    col_name = usgs_myb_year(YEARS_COVERED['niobium'], year)
-    for df in df_list:
-        for index, row in df.iterrows():
-            if df.iloc[index]["Production"].strip() == \
-                    "Imports for consumption:":
-                product = "imports"
-            elif df.iloc[index]["Production"].strip() == "Exports:":
-                product = "exports"
-            if df.iloc[index]["Production"].strip() in row_to_use:
-                data = usgs_myb_static_variables()
-                data["SourceName"] = source
-                data["Year"] = str(year)
-                data["Unit"] = "Metric Tons"
-                data['FlowName'] = name + " " + product
-                data["Description"] = name
-                data["ActivityProducedBy"] = name
-                col_name = usgs_myb_year(YEARS_COVERED['niobium'], year)
-                if str(df.iloc[index][col_name]) == "--" or \
-                        str(df.iloc[index][col_name]) == "(3)":
-                    data["FlowAmount"] = str(0)
-                else:
-                    data["FlowAmount"] = str(df.iloc[index][col_name])
-                dataframe = dataframe.append(data, ignore_index=True)
-                dataframe = assign_fips_location_system(
-                    dataframe, str(year))
-    return dataframe
+    return usgs_myb_parse_table(
+        df_list, source, year, years='niobium',
+        rows=["Total imports, Nb content", "Total exports, Nb content"],
+        products={"Imports for consumption:": "imports",
+                  "Exports:": "exports"},
+        zero=["--", "(3)"])
 
 
 def usgs_peat_call(*, resp, year, **_):
@@ -2807,8 +2015,7 @@ def usgs_peat_call(*, resp, year, **_):
     """
 
     """Calls the excel sheet for nickel and removes extra columns"""
-    df_raw_data_one = pd.io.excel.read_excel(io.BytesIO(resp.content),
-                                             sheet_name='T1')
+    df_raw_data_one = read_workbook(resp.content).sheet('T1')
     df_data_one = pd.DataFrame(df_raw_data_one.loc[7:18]).reindex()
     df_data_one = df_data_one.reset_index()
     del df_data_one["index"]
@@ -2847,38 +2054,12 @@ def usgs_peat_parse(*, df_list, source, year, **_):
     :return: df, parsed and partially formatted to flowbyactivity
         specifications
     """
-    data = {}
-    row_to_use = ["Production", "Exports", "Imports for consumption"]
-    prod = ""
-    name = usgs_myb_name(source)
-    des = name
-    dataframe = pd.DataFrame()
-    col_name = usgs_myb_year(YEARS_COVERED['peat'], year)
-    for df in df_list:
-        for index, row in df.iterrows():
-            if df.iloc[index]["Production"].strip() == "Production":
-                prod = "production"
-            elif df.iloc[index]["Production"].strip() == \
-                    "Imports for consumption":
-                prod = "import"
-            elif df.iloc[index]["Production"].strip() == "Exports":
-                prod = "export"
-            if df.iloc[index]["Production"].strip() in row_to_use:
-                product = df.iloc[index]["Production"].strip()
-                data = usgs_myb_static_variables()
-                data["SourceName"] = source
-                data["Year"] = str(year)
-                data["Unit"] = "Thousand Metric Tons"
-                data["FlowAmount"] = str(df.iloc[index][col_name])
-                if str(df.iloc[index][col_name]) == "W":
-                    data["FlowAmount"] = WITHDRAWN_KEYWORD
-                data["Description"] = des
-                data["ActivityProducedBy"] = name
-                data['FlowName'] = name + " " + prod
-                dataframe = dataframe.append(data, ignore_index=True)
-                dataframe = assign_fips_location_system(
-                    dataframe, str(year))
-    return dataframe
+    return usgs_myb_parse_table(
+        df_list, source, year, years='peat',
+        rows=["Production", "Exports", "Imports for consumption"],
+        products={"Production": "production",
+                  "Imports for consumption": "import", "Exports": "export"},
+        unit="Thousand Metric Tons", withdrawn=["W"])
 
 
 def usgs_perlite_call(*, resp, year, **_):
@@ -2889,8 +2070,7 @@ def usgs_perlite_call(*, resp, year, **_):
     :param year: year
     :return: pandas dataframe of original source data
     """
-    df_raw_data_one = pd.io.excel.read_excel(io.BytesIO(resp.content),
-                                             sheet_name='T1')
+    df_raw_data_one = read_workbook(resp.content).sheet('T1')
     df_data_one = pd.DataFrame(df_raw_data_one.loc[6:6]).reindex()
     df_data_one = df_data_one.reset_index()
     del df_data_one["index"]
@@ -2932,38 +2112,13 @@ def usgs_perlite_parse(*, df_list, source, year, **_):
     :return: df, parsed and partially formatted to flowbyactivity
         specifications
     """
-    data = {}
-    row_to_use = ["Quantity", "Mine production2"]
-    prod = ""
-    name = usgs_myb_name(source)
-    des = name
-    dataframe = pd.DataFrame()
-    col_name = usgs_myb_year(YEARS_COVERED['perlite'], year)
-    for df in df_list:
-        for index, row in df.iterrows():
-            if df.iloc[index]["Production"].strip() == "Mine production2":
-                prod = "production"
-            elif df.iloc[index]["Production"].strip() == \
-                    "Imports for consumption:3":
-                prod = "import"
-            elif df.iloc[index]["Production"].strip() == "Exports:3":
-                prod = "export"
-            if df.iloc[index]["Production"].strip() in row_to_use:
-                product = df.iloc[index]["Production"].strip()
-                data = usgs_myb_static_variables()
-                data["SourceName"] = source
-                data["Year"] = str(year)
-                data["Unit"] = "Thousand Metric Tons"
-                data["FlowAmount"] = str(df.iloc[index][col_name])
-                if str(df.iloc[index][col_name]) == "W":
-                    data["FlowAmount"] = WITHDRAWN_KEYWORD
-                data["Description"] = des
-                data["ActivityProducedBy"] = name
-                data['FlowName'] = name + " " + prod
-                dataframe = dataframe.append(data, ignore_index=True)
-                dataframe = assign_fips_location_system(
-                    dataframe, str(year))
-    return dataframe
+    return usgs_myb_parse_table(
+        df_list, source, year, years='perlite',
+        rows=["Quantity", "Mine production2"],
+        products={"Mine production2": "production",
+                  "Imports for consumption:3": "import",
+                  "Exports:3": "export"},
+        unit="Thousand Metric Tons", withdrawn=["W"])
 
 
 def usgs_phosphate_call(*, resp, year, **_):
@@ -2976,8 +2131,7 @@ def usgs_phosphate_call(*, resp, year, **_):
     :return: pandas dataframe of original source data
     """
 
-    df_raw_data_one = pd.io.excel.read_excel(io.BytesIO(resp.content),
-                                             sheet_name='T1')
+    df_raw_data_one = read_workbook(resp.content).sheet('T1')
     df_data_one = pd.DataFrame(df_raw_data_one.loc[7:9]).reindex()
     df_data_one = df_data_one.reset_index()
     del df_data_one["index"]
@@ -3025,38 +2179,12 @@ def usgs_phosphate_parse(*, df_list, source, year, **_):
     :return: df, parsed and partially formatted to flowbyactivity
         specifications
     """
-    data = {}
-    row_to_use = ["Gross weight", "Quantity, gross weight"]
-    prod = ""
-    name = usgs_myb_name(source)
-    des = name
-    dataframe = pd.DataFrame()
-    col_name = usgs_myb_year(YEARS_COVERED['phosphate'], year)
-    for df in df_list:
-        for index, row in df.iterrows():
-            if df.iloc[index]["Production"].strip() == \
-                    "Marketable production:":
-                prod = "production"
-            elif df.iloc[index]["Production"].strip() == \
-                    "Imports for consumption:3":
-                prod = "import"
-
-            if df.iloc[index]["Production"].strip() in row_to_use:
-                product = df.iloc[index]["Production"].strip()
-                data = usgs_myb_static_variables()
-                data["SourceName"] = source
-                data["Year"] = str(year)
-                data["Unit"] = "Thousand Metric Tons"
-                data["FlowAmount"] = str(df.iloc[index][col_name])
-                if str(df.iloc[index][col_name]) == "W":
-                    data["FlowAmount"] = WITHDRAWN_KEYWORD
-                data["Description"] = des
-                data["ActivityProducedBy"] = name
-                data['FlowName'] = name + " " + prod
-                dataframe = dataframe.append(data, ignore_index=True)
-                dataframe = assign_fips_location_system(
-                    dataframe, str(year))
-    return dataframe
+    return usgs_myb_parse_table(
+        df_list, source, year, years='phosphate',
+        rows=["Gross weight", "Quantity, gross weight"],
+        products={"Marketable production:": "production",
+                  "Imports for consumption:3": "import"},
+        unit="Thousand Metric Tons", withdrawn=["W"])
 
 
 def usgs_platinum_call(*, resp, year, **_):
@@ -3067,8 +2195,7 @@ def usgs_platinum_call(*, resp, year, **_):
     :param year: year
     :return: pandas dataframe of original source data
     """
-    df_raw_data = pd.io.excel.read_excel(io.BytesIO(resp.content),
-                                         sheet_name='T1')
+    df_raw_data = read_workbook(resp.content).sheet('T1')
     df_data_1 = pd.DataFrame(df_raw_data.loc[4:9]).reindex()
     df_data_1 = df_data_1.reset_index()
     del df_data_1["index"]
@@ -3118,53 +2245,31 @@ def usgs_platinum_parse(*, df_list, source, year, **_):
     :return: df, parsed and partially formatted to flowbyactivity
         specifications
     """
-    data = {}
     row_to_use = ["Quantity", "Palladium, Pd content",
                   "Platinum, includes coins, Pt content",
                   "Platinum, Pt content",
                   "Iridium, Ir content", "Osmium, Os content",
                   "Rhodium, Rh content", "Ruthenium, Ru content",
-                  "Iridium, osmium, and ruthenium, gross weight",
-                  "Rhodium, Rh content"]
-    dataframe = pd.DataFrame()
-
+                  "Iridium, osmium, and ruthenium, gross weight"]
+    col_name = usgs_myb_year(YEARS_COVERED['platinum'], year)
+    frames = []
     for df in df_list:
-        previous_name = ""
-        for index, row in df.iterrows():
-
-            if df.iloc[index]["Production"].strip() == "Exports, refined:":
-                product = "exports"
-            elif df.iloc[index]["Production"].strip() == \
-                    "Imports for consumption, refined:":
-                product = "imports"
-            elif df.iloc[index]["Production"].strip() == "Mine production:2":
-                product = "production"
-
-            name_array = df.iloc[index]["Production"].strip().split(",")
-
-            if product == "production":
-                name_array = previous_name.split(",")
-
-            previous_name = df.iloc[index]["Production"].strip()
-            name = name_array[0]
-
-            if df.iloc[index]["Production"].strip() in row_to_use:
-                data = usgs_myb_static_variables()
-                data["SourceName"] = source
-                data["Year"] = str(year)
-                data["Unit"] = "kilograms"
-                data['FlowName'] = name + " " + product
-                data["Description"] = name
-                data["ActivityProducedBy"] = name
-                col_name = usgs_myb_year(YEARS_COVERED['platinum'], year)
-                if str(df.iloc[index][col_name]) == "--":
-                    data["FlowAmount"] = str(0)
-                else:
-                    data["FlowAmount"] = str(df.iloc[index][col_name])
-                dataframe = dataframe.append(data, ignore_index=True)
-                dataframe = assign_fips_location_system(
-                    dataframe, str(year))
-    return dataframe
+        labels = usgs_myb_labels(df)
+        product = usgs_myb_label_state(
+            labels, {"Exports, refined:": "exports",
+                     "Imports for consumption, refined:": "imports",
+                     "Mine production:2": "production"})
+        # production rows are named by the label of the row above
+        name = labels.shift(fill_value="").where(
+            product == "production", labels).str.split(",").str[0]
+        frames.append(pd.DataFrame(
+            {"Unit": "kilograms",
+             "FlowName": name + " " + product,
+             "Description": name,
+             "ActivityProducedBy": name,
+             "FlowAmount": usgs_myb_flow_amount(df[col_name], zero=["--"])}
+        )[labels.isin(row_to_use)])
+    return usgs_myb_fba(pd.concat(frames), source, year)
 
 
 def usgs_potash_call(*, resp, year, **_):
@@ -3176,8 +2281,7 @@ def usgs_potash_call(*, resp, year, **_):
     :param year: year
     :return: pandas dataframe of original source data
     """
-    df_raw_data_one = pd.io.excel.read_excel(io.BytesIO(resp.content),
-                                             sheet_name='T1')
+    df_raw_data_one = read_workbook(resp.content).sheet('T1')
     df_data_one = pd.DataFrame(df_raw_data_one.loc[6:8]).reindex()
     df_data_one = df_data_one.reset_index()
     del df_data_one["index"]
@@ -3225,38 +2329,12 @@ def usgs_potash_parse(*, df_list, source, year, **_):
     :return: df, parsed and partially formatted to flowbyactivity
         specifications
     """
-    data = {}
-    row_to_use = ["K2O equivalent"]
-    prod = ""
-    name = usgs_myb_name(source)
-    des = name
-    dataframe = pd.DataFrame()
-    col_name = usgs_myb_year(YEARS_COVERED['potash'], year)
-    for df in df_list:
-        for index, row in df.iterrows():
-            if df.iloc[index]["Production"].strip() == "Production:3":
-                prod = "production"
-            elif df.iloc[index]["Production"].strip() == \
-                    "Imports for consumption:6":
-                prod = "import"
-            elif df.iloc[index]["Production"].strip() == "Exports:":
-                prod = "export"
-            if df.iloc[index]["Production"].strip() in row_to_use:
-                product = df.iloc[index]["Production"].strip()
-                data = usgs_myb_static_variables()
-                data["SourceName"] = source
-                data["Year"] = str(year)
-                data["Unit"] = "Thousand Metric Tons"
-                data["FlowAmount"] = str(df.iloc[index][col_name])
-                if str(df.iloc[index][col_name]) == "W":
-                    data["FlowAmount"] = WITHDRAWN_KEYWORD
-                data["Description"] = des
-                data["ActivityProducedBy"] = name
-                data['FlowName'] = name + " " + prod
-                dataframe = dataframe.append(data, ignore_index=True)
-                dataframe = assign_fips_location_system(
-                    dataframe, str(year))
-    return dataframe
+    return usgs_myb_parse_table(
+        df_list, source, year, years='potash', rows=["K2O equivalent"],
+        products={"Production:3": "production",
+                  "Imports for consumption:6": "import",
+                  "Exports:": "export"},
+        unit="Thousand Metric Tons", withdrawn=["W"])
 
 
 def usgs_pumice_call(*, resp, year, **_):
@@ -3268,8 +2346,7 @@ def usgs_pumice_call(*, resp, year, **_):
     :param year: year
     :return: pandas dataframe of original source data
     """
-    df_raw_data_one = pd.io.excel.read_excel(io.BytesIO(resp.content),
-                                             sheet_name='T1')
+    df_raw_data_one = read_workbook(resp.content).sheet('T1')
     df_data_one = pd.DataFrame(df_raw_data_one.loc[6:11]).reindex()
     df_data_one = df_data_one.reset_index()
     del df_data_one["index"]
@@ -3309,38 +2386,13 @@ def usgs_pumice_parse(*, df_list, source, year, **_):
     :return: df, parsed and partially formatted to flowbyactivity
         specifications
     """
-    data = {}
-    row_to_use = ["Quantity", "Imports for consumption3", "Exports3"]
-    prod = ""
-    name = usgs_myb_name(source)
-    des = name
-    dataframe = pd.DataFrame()
-    col_name = usgs_myb_year(YEARS_COVERED['pumice'], year)
-    for df in df_list:
-        for index, row in df.iterrows():
-            if df.iloc[index]["Production"].strip() == "Quantity":
-                prod = "production"
-            elif df.iloc[index]["Production"].strip() == \
-                    "Imports for consumption3":
-                prod = "import"
-            elif df.iloc[index]["Production"].strip() == "Exports3":
-                prod = "export"
-            if df.iloc[index]["Production"].strip() in row_to_use:
-                product = df.iloc[index]["Production"].strip()
-                data = usgs_myb_static_variables()
-                data["SourceName"] = source
-                data["Year"] = str(year)
-                data["Unit"] = "Thousand Metric Tons"
-                data["FlowAmount"] = str(df.iloc[index][col_name])
-                if str(df.iloc[index][col_name]) == "W":
-                    data["FlowAmount"] = WITHDRAWN_KEYWORD
-                data["Description"] = des
-                data["ActivityProducedBy"] = name
-                data['FlowName'] = name + " " + prod
-                dataframe = dataframe.append(data, ignore_index=True)
-                dataframe = assign_fips_location_system(
-                    dataframe, str(year))
-    return dataframe
+    return usgs_myb_parse_table(
+        df_list, source, year, years='pumice',
+        rows=["Quantity", "Imports for consumption3", "Exports3"],
+        products={"Quantity": "production",
+                  "Imports for consumption3": "import",
+                  "Exports3": "export"},
+        unit="Thousand Metric Tons", withdrawn=["W"])
 
 
 def usgs_rhenium_call(*, resp, year, **_):
@@ -3352,8 +2404,7 @@ def usgs_rhenium_call(*, resp, year, **_):
     :param year: year
     :return: pandas dataframe of original source data
     """
-    df_raw_data = pd.io.excel.read_excel(io.BytesIO(resp.content),
-                                         sheet_name='T1')
+    df_raw_data = read_workbook(resp.content).sheet('T1')
     df_data = pd.DataFrame(df_raw_data.loc[5:13]).reindex()
     df_data = df_data.reset_index()
     del df_data["index"]
@@ -3390,37 +2441,13 @@ def usgs_rhenium_parse(*, df_list, source, year, **_):
     :return: df, parsed and partially formatted to flowbyactivity
         specifications
     """
-    data = {}
-    row_to_use = ["Total, rhenium content",
-                  "Production, mine, rhenium content2"]
-    dataframe = pd.DataFrame()
-    name = usgs_myb_name(source)
-    des = name
-    for df in df_list:
-        for index, row in df.iterrows():
-            if df.iloc[index]["Production"].strip() == \
-                    "Total, rhenium content":
-                product = "imports"
-            elif df.iloc[index]["Production"].strip() == \
-                    "Production, mine, rhenium content2":
-                product = "production"
-            if df.iloc[index]["Production"].strip() in row_to_use:
-                data = usgs_myb_static_variables()
-                data["SourceName"] = source
-                data["Year"] = str(year)
-                data["Unit"] = "kilograms"
-                data['FlowName'] = name + " " + product
-                data["Description"] = des
-                data["ActivityProducedBy"] = name
-                col_name = usgs_myb_year(YEARS_COVERED['rhenium'], year)
-                if str(df.iloc[index][col_name]) == "--":
-                    data["FlowAmount"] = str(0)
-                else:
-                    data["FlowAmount"] = str(df.iloc[index][col_name])
-                dataframe = dataframe.append(data, ignore_index=True)
-                dataframe = assign_fips_location_system(
-                    dataframe, str(year))
-    return dataframe
+    return usgs_myb_parse_table(
+        df_list, source, year, years='rhenium',
+        rows=["Total, rhenium content",
+              "Production, mine, rhenium content2"],
+        products={"Total, rhenium content": "imports",
+                  "Production, mine, rhenium content2": "production"},
+        unit="kilograms", zero=["--"])
 
 
 def usgs_salt_call(*, resp, year, **_):
@@ -3432,8 +2459,7 @@ def usgs_salt_call(*, resp, year, **_):
     :param year: year
     :return: pandas dataframe of original source data
     """
-    df_raw_data_one = pd.io.excel.read_excel(io.BytesIO(resp.content),
-                                             sheet_name='T1')
+    df_raw_data_one = read_workbook(resp.content).sheet('T1')
     df_data_one = pd.DataFrame(df_raw_data_one.loc[6:11]).reindex()
     df_data_one = df_data_one.reset_index()
     del df_data_one["index"]
@@ -3481,38 +2507,12 @@ def usgs_salt_parse(*, df_list, source, year, **_):
     :return: df, parsed and partially formatted to flowbyactivity
         specifications
     """
-    data = {}
-    row_to_use = ["Quantity", "Total"]
-    prod = ""
-    name = usgs_myb_name(source)
-    des = name
-    dataframe = pd.DataFrame()
-    col_name = usgs_myb_year(YEARS_COVERED['salt'], year)
-    for df in df_list:
-        for index, row in df.iterrows():
-            if df.iloc[index]["Production"].strip() == "Production:2":
-                prod = "production"
-            elif df.iloc[index]["Production"].strip() == \
-                    "Imports for consumption:":
-                prod = "import"
-            elif df.iloc[index]["Production"].strip() == "Exports:":
-                prod = "export"
-            if df.iloc[index]["Production"].strip() in row_to_use:
-                product = df.iloc[index]["Production"].strip()
-                data = usgs_myb_static_variables()
-                data["SourceName"] = source
-                data["Year"] = str(year)
-                data["Unit"] = "Thousand Metric Tons"
-                data["FlowAmount"] = str(df.iloc[index][col_name])
-                if str(df.iloc[index][col_name]) == "W":
-                    data["FlowAmount"] = WITHDRAWN_KEYWORD
-                data["Description"] = des
-                data["ActivityProducedBy"] = name
-                data['FlowName'] = name + " " + prod
-                dataframe = dataframe.append(data, ignore_index=True)
-                dataframe = assign_fips_location_system(
-                    dataframe, str(year))
-    return dataframe
+    return usgs_myb_parse_table(
+        df_list, source, year, years='salt', rows=["Quantity", "Total"],
+        products={"Production:2": "production",
+                  "Imports for consumption:": "import",
+                  "Exports:": "export"},
+        unit="Thousand Metric Tons", withdrawn=["W"])
 
 
 def usgs_sgc_call(*, resp, year, **_):
@@ -3524,8 +2524,7 @@ def usgs_sgc_call(*, resp, year, **_):
     :param year: year
     :return: pandas dataframe of original source data
     """
-    df_raw_data_two = pd.io.excel.read_excel(io.BytesIO(resp.content),
-                                             sheet_name='T1')
+    df_raw_data_two = read_workbook(resp.content).sheet('T1')
 
     df_data_1 = pd.DataFrame(df_raw_data_two.loc[5:12]).reindex()
     df_data_1 = df_data_1.reset_index()
@@ -3555,38 +2554,13 @@ def usgs_sgc_parse(*, df_list, source, year, **_):
     :return: df, parsed and partially formatted to flowbyactivity
         specifications
     """
-    data = {}
-    row_to_use = ["Quantity"]
-    dataframe = pd.DataFrame()
-    for df in df_list:
-
-        for index, row in df.iterrows():
-            if df.iloc[index]["Production"].strip() == \
-                    "Sold or used by producers:2":
-                prod = "production"
-            elif df.iloc[index]["Production"].strip() == \
-                    "Imports for consumption:":
-                prod = "imports"
-            elif df.iloc[index]["Production"].strip() == "Exports:":
-                prod = "exports"
-            if df.iloc[index]["Production"].strip() in row_to_use:
-                remove_digits = str.maketrans('', '', digits)
-                product = df.iloc[index][
-                    "Production"].strip().translate(remove_digits)
-                data["SourceName"] = source
-                data["Year"] = str(year)
-                data["Unit"] = "Thousand Metric Tons"
-                col_name = usgs_myb_year(
-                    YEARS_COVERED['sandgravelconstruction'], year)
-                data["Description"] = "Sand Gravel Construction"
-                data["ActivityProducedBy"] = "Sand Gravel Construction"
-                if product.strip() == "Quantity":
-                    data['FlowName'] = "Sand Gravel Construction " + prod
-                data["FlowAmount"] = str(df.iloc[index][col_name])
-                dataframe = dataframe.append(data, ignore_index=True)
-                dataframe = assign_fips_location_system(
-                    dataframe, str(year))
-    return dataframe
+    return usgs_myb_parse_table(
+        df_list, source, year, years='sandgravelconstruction',
+        rows=["Quantity"],
+        products={"Sold or used by producers:2": "production",
+                  "Imports for consumption:": "imports",
+                  "Exports:": "exports"},
+        name="Sand Gravel Construction", unit="Thousand Metric Tons")
 
 
 def usgs_sgi_call(*, resp, year, **_):
@@ -3599,8 +2573,7 @@ def usgs_sgi_call(*, resp, year, **_):
     :return: pandas dataframe of original source data
     """
 
-    df_raw_data_two = pd.io.excel.read_excel(io.BytesIO(resp.content),
-                                             sheet_name='T1')
+    df_raw_data_two = read_workbook(resp.content).sheet('T1')
 
     df_data_1 = pd.DataFrame(df_raw_data_two.loc[6:10]).reindex()
     df_data_1 = df_data_1.reset_index()
@@ -3649,37 +2622,13 @@ def usgs_sgi_parse(*, df_list, source, year, **_):
     :return: df, parsed and partially formatted to flowbyactivity
         specifications
     """
-    data = {}
-    row_to_use = ["Quantity", "Total"]
-    dataframe = pd.DataFrame()
-    for df in df_list:
-
-        for index, row in df.iterrows():
-            if df.iloc[index]["Production"].strip() == "Sold or used:":
-                prod = "production"
-            elif df.iloc[index]["Production"].strip() == \
-                    "Imports for consumption:":
-                prod = "imports"
-            elif df.iloc[index]["Production"].strip() == "Exports:":
-                prod = "exports"
-            if df.iloc[index]["Production"].strip() in row_to_use:
-                remove_digits = str.maketrans('', '', digits)
-                product = df.iloc[index][
-                    "Production"].strip().translate(remove_digits)
-                data = usgs_myb_static_variables()
-                data["SourceName"] = source
-                data["Year"] = str(year)
-                data["Unit"] = "Thousand Metric Tons"
-                col_name = usgs_myb_year(YEARS_COVERED['sandgravelindustrial'],
-                                         year)
-                data["Description"] = "Sand Gravel Industrial"
-                data["ActivityProducedBy"] = "Sand Gravel Industrial"
-                data['FlowName'] = "Sand Gravel Industrial " + prod
-                data["FlowAmount"] = str(df.iloc[index][col_name])
-                dataframe = dataframe.append(data, ignore_index=True)
-                dataframe = assign_fips_location_system(
-                    dataframe, str(year))
-    return dataframe
+    return usgs_myb_parse_table(
+        df_list, source, year, years='sandgravelindustrial',
+        rows=["Quantity", "Total"],
+        products={"Sold or used:": "production",
+                  "Imports for consumption:": "imports",
+                  "Exports:": "exports"},
+        name="Sand Gravel Industrial", unit="Thousand Metric Tons")
 
 
 def usgs_silver_call(*, resp, year, **_):
@@ -3691,8 +2640,7 @@ def usgs_silver_call(*, resp, year, **_):
     :param year: year
     :return: pandas dataframe of original source data
     """
-    df_raw_data = pd.io.excel.read_excel(io.BytesIO(resp.content),
-                                         sheet_name='T1')
+    df_raw_data = read_workbook(resp.content).sheet('T1')
     df_data = pd.DataFrame(df_raw_data.loc[4:14]).reindex()
     df_data = df_data.reset_index()
     del df_data["index"]
@@ -3719,37 +2667,13 @@ def usgs_silver_parse(*, df_list, source, year, **_):
     :return: df, parsed and partially formatted to flowbyactivity
         specifications
     """
-    data = {}
-    row_to_use = ["Ore and concentrate", "Ore and concentrate2", "Quantity"]
-    dataframe = pd.DataFrame()
-    name = usgs_myb_name(source)
-    des = name
-    for df in df_list:
-        for index, row in df.iterrows():
-            if df.iloc[index]["Production"].strip() == "Ore and concentrate2":
-                product = "imports"
-            elif df.iloc[index]["Production"].strip() == "Quantity":
-                product = "production"
-            elif df.iloc[index]["Production"].strip() == "Ore and concentrate":
-                product = "exports"
-            if df.iloc[index]["Production"].strip() in row_to_use:
-                data = usgs_myb_static_variables()
-                data["SourceName"] = source
-                data["Year"] = str(year)
-                data["Unit"] = "Metric Tons"
-                data['FlowName'] = name + " " + product
-                data["Description"] = des
-                data["ActivityProducedBy"] = name
-                col_name = usgs_myb_year(YEARS_COVERED['silver'], year)
-                if str(df.iloc[index][col_name]) == "--" or \
-                        str(df.iloc[index][col_name]) == "(3)":
-                    data["FlowAmount"] = str(0)
-                else:
-                    data["FlowAmount"] = str(df.iloc[index][col_name])
-                dataframe = dataframe.append(data, ignore_index=True)
-                dataframe = assign_fips_location_system(
-                    dataframe, str(year))
-    return dataframe
+    return usgs_myb_parse_table(
+        df_list, source, year, years='silver',
+        rows=["Ore and concentrate", "Ore and concentrate2", "Quantity"],
+        products={"Ore and concentrate2": "imports",
+                  "Quantity": "production",
+                  "Ore and concentrate": "exports"},
+        zero=["--", "(3)"])
 
 
 def description(value, code):
@@ -3779,6 +2703,42 @@ def description(value, code):
     return return_val
 
 
+def soda_end_use(df, name, col_name, source, year):
+    """
+    Parse the rows of the soda ash end use table
+    :param df: df, rows of the end use table
+    :param name: str, name of the source
+    :param col_name: str, column of the FlowAmount
+    :param source: source
+    :param year: year
+    :return: df, parsed and partially formatted to flowbyactivity
+        specifications
+    """
+    consumer = pd.Series([description(value, code) for value, code in
+                          zip(df["End use"], df["NAICS code"])],
+                         index=df.index, dtype=object)
+    glass = df["End use"].str.strip() == "Glass:"
+    # the glass total is described by the NAICS code of the "Glass:" row
+    total_glass = df["NAICS code"].where(glass).ffill().fillna(0).astype(int)
+    amount = df[col_name]
+    reported = amount.notna()
+    des = pd.Series("", index=df.index, dtype=object).mask(
+        consumer == "Glass Total", total_glass)
+    des = des.mask(reported & df["NAICS code"].notna(),
+                   df["NAICS code"].astype(str))
+    return usgs_myb_fba(pd.DataFrame(
+        {"Class": "Chemicals",
+         "Compartment": "air",
+         "Unit": "Thousand metric tons",
+         "FlowName": name + " " + consumer,
+         "Description": des,
+         "ActivityProducedBy": None,
+         "ActivityConsumedBy": consumer,
+         "FlowAmount": amount.astype(str).mask(
+             reported, amount.fillna(0).astype(int))})[~glass],
+        source, year)
+
+
 def soda_url_helper(*, build_url, config, year, **_):
     """
     This helper function uses the "build_url" input from flowbyactivity.py,
@@ -3810,8 +2770,7 @@ def soda_call(*, resp, year, **_):
     col_to_use = ["Production", "NAICS code", "End use", "year_5", "total"]
     years_covered = YEARS_COVERED['sodaash_t4']
     if str(year) in years_covered:
-        df_raw_data = pd.io.excel.read_excel(io.BytesIO(resp.content),
-                                             sheet_name='T4')
+        df_raw_data = read_workbook(resp.content).sheet('T4')
         df_data_one = pd.DataFrame(df_raw_data.loc[7:25]).reindex()
         df_data_one = df_data_one.reset_index()
         del df_data_one["index"]
@@ -3829,8 +2788,7 @@ def soda_call(*, resp, year, **_):
                                    "space_6", "y1_4", "space_7", "year_5",
                                    "space_8", "space_9"]
 
-    df_raw_data_two = pd.io.excel.read_excel(io.BytesIO(resp.content),
-                                             sheet_name='T1')
+    df_raw_data_two = read_workbook(resp.content).sheet('T1')
     df_data_two = pd.DataFrame(df_raw_data_two.loc[6:18]).reindex()
     df_data_two = df_data_two.reset_index()
     del df_data_two["index"]
@@ -3868,74 +2826,29 @@ def soda_parse(*, df_list, source, year, **_):
     :return: df, parsed and partially formatted to flowbyactivity
         specifications
     """
-    total_glass = 0
-
-    data = {}
-    row_to_use = ["Quantity", "Quantity2"]
-    prod = ""
     name = usgs_myb_name(source)
-    des = name
     col_name = "year_5"
-    dataframe = pd.DataFrame()
+    frames = []
     for df in df_list:
-        for index, row in df.iterrows():
-            data = usgs_myb_static_variables()
-            data["Unit"] = "Thousand metric tons"
-            data["FlowAmount"] = str(df.iloc[index][col_name])
-            data["SourceName"] = source
-            data["Year"] = str(year)
-            data['FlowName'] = name
-
-            if str(df.iloc[index]["Production"]) != "nan":
-                des = name
-                if df.iloc[index]["Production"].strip() == "Exports:":
-                    prod = "exports"
-                elif df.iloc[index]["Production"].strip() == \
-                        "Imports for consumption:":
-                    prod = "imports"
-                elif df.iloc[index]["Production"].strip() == "Production:":
-                    prod = "production"
-                if df.iloc[index]["Production"].strip() in row_to_use:
-                    product = df.iloc[index]["Production"].strip()
-                    data["SourceName"] = source
-                    data["Year"] = str(year)
-                    data["FlowAmount"] = str(df.iloc[index][col_name])
-                    if str(df.iloc[index][col_name]) == "W":
-                        data["FlowAmount"] = WITHDRAWN_KEYWORD
-                    data["Description"] = des
-                    data["ActivityProducedBy"] = name
-                    data['FlowName'] = name + " " + prod
-                    dataframe = dataframe.append(data, ignore_index=True)
-                    dataframe = assign_fips_location_system(
-                        dataframe, str(year))
-            else:
-                data["Class"] = "Chemicals"
-                data["Context"] = None
-                data["Compartment"] = "air"
-                data["Description"] = ""
-                data['ActivityConsumedBy'] = \
-                    description(df.iloc[index]["End use"],
-                                df.iloc[index]["NAICS code"])
-                data['FlowName'] = (
-                    name + " " + description(df.iloc[index]["End use"],
-                                             df.iloc[index]["NAICS code"])
-                )
-                if df.iloc[index]["End use"].strip() == "Glass:":
-                    total_glass = int(df.iloc[index]["NAICS code"])
-                elif data['ActivityConsumedBy'] == "Glass Total":
-                    data["Description"] = total_glass
-
-                if not math.isnan(df.iloc[index][col_name]):
-                    data["FlowAmount"] = int(df.iloc[index][col_name])
-                    data["ActivityProducedBy"] = None
-                    if not math.isnan(df.iloc[index]["NAICS code"]):
-                        des_str = str(df.iloc[index]["NAICS code"])
-                        data["Description"] = des_str
-                if df.iloc[index]["End use"].strip() != "Glass:":
-                    dataframe = dataframe.append(data, ignore_index=True)
-                    dataframe = assign_fips_location_system(
-                        dataframe, str(year))
-    return dataframe
+        end_use_rows = df["Production"].astype(str) == "nan"
+        labels = usgs_myb_labels(df)
+        prod = usgs_myb_label_state(
+            labels, {"Exports:": "exports",
+                     "Imports for consumption:": "imports",
+                     "Production:": "production"})
+        frames.append(usgs_myb_fba(pd.DataFrame(
+            {"Unit": "Thousand metric tons",
+             "FlowName": name + " " + prod,
+             "Description": name,
+             "ActivityProducedBy": name,
+             "FlowAmount": usgs_myb_flow_amount(df[col_name],
+                                                withdrawn=["W"])}
+        )[~end_use_rows & labels.isin(["Quantity", "Quantity2"])],
+            source, year))
+        if end_use_rows.any():
+            frames.append(soda_end_use(df[end_use_rows], name, col_name,
+                                       source, year))
+    return pd.concat(frames, ignore_index=True)
 
 
 def usgs_stonecr_call(*, resp, year, **_):
@@ -3947,8 +2860,7 @@ def usgs_stonecr_call(*, resp, year, **_):
     :param year: year
     :return: pandas dataframe of original source data
     """
-    df_raw_data_two = pd.io.excel.read_excel(io.BytesIO(resp.content),
-                                             sheet_name='T1')
+    df_raw_data_two = read_workbook(resp.content).sheet('T1')
 
     df_data_1 = pd.DataFrame(df_raw_data_two.loc[5:15]).reindex()
     df_data_1 = df_data_1.reset_index()
@@ -3982,39 +2894,13 @@ def usgs_stonecr_parse(*, df_list, source, year, **_):
     :return: df, parsed and partially formatted to flowbyactivity
         specifications
     """
-    data = {}
-    row_to_use = ["Quantity"]
-    dataframe = pd.DataFrame()
-    for df in df_list:
-        for index, row in df.iterrows():
-            if df.iloc[index]["Production"].strip() == \
-                    "Sold or used by producers:2":
-                prod = "production"
-            elif df.iloc[index]["Production"].strip() == \
-                    "Imports for consumption:3":
-                prod = "imports"
-            elif df.iloc[index]["Production"].strip() == "Exports:":
-                prod = "exports"
-            elif df.iloc[index]["Production"].strip() == "Recycle:":
-                prod = "recycle"
-            if df.iloc[index]["Production"].strip() in row_to_use:
-                remove_digits = str.maketrans('', '', digits)
-                product = df.iloc[index][
-                    "Production"].strip().translate(remove_digits)
-                data = usgs_myb_static_variables()
-                data["SourceName"] = source
-                data["Year"] = str(year)
-                data["Unit"] = "Thousand Metric Tons"
-                col_name = usgs_myb_year(YEARS_COVERED['stonecrushed'], year)
-                data["Description"] = "Stone Crushed"
-                data["ActivityProducedBy"] = "Stone Crushed"
-                data['FlowName'] = "Stone Crushed " + prod
-                data["FlowAmount"] = str(df.iloc[index][col_name])
-                if prod != "recycle":
-                    dataframe = dataframe.append(data, ignore_index=True)
-                    dataframe = assign_fips_location_system(
-                        dataframe, str(year))
-    return dataframe
+    return usgs_myb_parse_table(
+        df_list, source, year, years='stonecrushed', rows=["Quantity"],
+        products={"Sold or used by producers:2": "production",
+                  "Imports for consumption:3": "imports",
+                  "Exports:": "exports", "Recycle:": "recycle"},
+        name="Stone Crushed", unit="Thousand Metric Tons",
+        drop_products=["recycle"])
 
 
 def usgs_stonedis_call(*, resp, year, **_):
@@ -4027,8 +2913,7 @@ def usgs_stonedis_call(*, resp, year, **_):
     :return: pandas dataframe of original source data
     """
 
-    df_raw_data_two = pd.io.excel.read_excel(io.BytesIO(resp.content),
-                                             sheet_name='T1')
+    df_raw_data_two = read_workbook(resp.content).sheet('T1')
 
     df_data_1 = pd.DataFrame(df_raw_data_two.loc[6:9]).reindex()
     df_data_1 = df_data_1.reset_index()
@@ -4057,36 +2942,12 @@ def usgs_stonedis_parse(*, df_list, source, year, **_):
     :return: df, parsed and partially formatted to flowbyactivity
         specifications
     """
-    data = {}
-    row_to_use = ["Quantity", ]
-    dataframe = pd.DataFrame()
-    for df in df_list:
-        for index, row in df.iterrows():
-            if df.iloc[index]["Production"].strip() == "Quantity":
-                prod = "production"
-            elif df.iloc[index]["Production"].strip() == \
-                    "Imports for consumption, value":
-                prod = "imports"
-            elif df.iloc[index]["Production"].strip() == "Exports, value":
-                prod = "exports"
-            if df.iloc[index]["Production"].strip() in row_to_use:
-                remove_digits = str.maketrans('', '', digits)
-                product = df.iloc[index][
-                    "Production"].strip().translate(remove_digits)
-                data = usgs_myb_static_variables()
-                data["SourceName"] = source
-                data["Year"] = str(year)
-                data["Unit"] = "Thousand Metric Tons"
-                col_name = usgs_myb_year(YEARS_COVERED['stonedimension'], year)
-                data["Description"] = "Stone Dimension"
-                data["ActivityProducedBy"] = "Stone Dimension"
-                data['FlowName'] = "Stone Dimension " + prod
-
-                data["FlowAmount"] = str(df.iloc[index][col_name])
-                dataframe = dataframe.append(data, ignore_index=True)
-                dataframe = assign_fips_location_system(
-                    dataframe, str(year))
-    return dataframe
+    return usgs_myb_parse_table(
+        df_list, source, year, years='stonedimension', rows=["Quantity"],
+        products={"Quantity": "production",
+                  "Imports for consumption, value": "imports",
+                  "Exports, value": "exports"},
+        name="Stone Dimension", unit="Thousand Metric Tons")
 
 
 def usgs_strontium_call(*, resp, year, **_):
@@ -4098,8 +2959,7 @@ def usgs_strontium_call(*, resp, year, **_):
     :param year: year
     :return: pandas dataframe of original source data
     """
-    df_raw_data = pd.io.excel.read_excel(io.BytesIO(resp.content),
-                                         sheet_name='T1')
+    df_raw_data = read_workbook(resp.content).sheet('T1')
     df_data = pd.DataFrame(df_raw_data.loc[6:13]).reindex()
     df_data = df_data.reset_index()
     del df_data["index"]
@@ -4132,50 +2992,19 @@ def usgs_strontium_parse(*, df_list, source, year, **_):
     :return: df, parsed and partially formatted to flowbyactivity
         specifications
     """
-    data = {}
-    row_to_use = ["Production, strontium minerals", "Strontium compounds3",
-                  "Celestite4", "Strontium carbonate"]
-    prod = ""
-    name = usgs_myb_name(source)
-    des = name
-    dataframe = pd.DataFrame()
-    col_name = usgs_myb_year(YEARS_COVERED['strontium'], year)
-    for df in df_list:
-        for index, row in df.iterrows():
-            if df.iloc[index]["Production"].strip() == \
-                    "Imports for consumption:2":
-                product = "imports"
-            elif df.iloc[index]["Production"].strip() == \
-                    "Production, strontium minerals":
-                product = "production"
-            elif df.iloc[index]["Production"].strip() == "Exports:2":
-                product = "exports"
-
-            if df.iloc[index]["Production"].strip() in row_to_use:
-                data = usgs_myb_static_variables()
-                data["SourceName"] = source
-                data["Year"] = str(year)
-                data["Unit"] = "Metric Tons"
-                if usgs_myb_remove_digits(
-                        df.iloc[index]["Production"].strip()) == "Celestite":
-                    data['FlowName'] = \
-                        name + " " + product + " " + usgs_myb_remove_digits(
-                            df.iloc[index]["Production"].strip())
-                else:
-                    data['FlowName'] = name + " " + product
-                data["Description"] = usgs_myb_remove_digits(
-                    df.iloc[index]["Production"].strip())
-                data["ActivityProducedBy"] = name
-                col_name = usgs_myb_year(YEARS_COVERED['strontium'], year)
-                if str(df.iloc[index][col_name]) == "--" or \
-                        str(df.iloc[index][col_name]) == "(3)":
-                    data["FlowAmount"] = str(0)
-                else:
-                    data["FlowAmount"] = str(df.iloc[index][col_name])
-                dataframe = dataframe.append(data, ignore_index=True)
-                dataframe = assign_fips_location_system(
-                    dataframe, str(year))
-    return dataframe
+    return usgs_myb_parse_table(
+        df_list, source, year, years='strontium',
+        rows=["Production, strontium minerals", "Strontium compounds3",
+              "Celestite4", "Strontium carbonate"],
+        products={"Imports for consumption:2": "imports",
+                  "Production, strontium minerals": "production",
+                  "Exports:2": "exports"},
+        descriptions={"Production, strontium minerals":
+                          "Production, strontium minerals",
+                      "Strontium compounds3": "Strontium compounds",
+                      "Celestite4": "Celestite",
+                      "Strontium carbonate": "Strontium carbonate"},
+        flowname_descriptions=["Celestite"], zero=["--", "(3)"])
 
 
 def usgs_talc_call(*, resp, year, **_):
@@ -4187,8 +3016,7 @@ def usgs_talc_call(*, resp, year, **_):
     :param year: year
     :return: pandas dataframe of original source data
     """
-    df_raw_data_one = pd.io.excel.read_excel(io.BytesIO(resp.content),
-                                             sheet_name='T1')
+    df_raw_data_one = read_workbook(resp.content).sheet('T1')
     df_data_one = pd.DataFrame(df_raw_data_one.loc[6:8]).reindex()
     df_data_one = df_data_one.reset_index()
     del df_data_one["index"]
@@ -4230,39 +3058,12 @@ def usgs_talc_parse(*, df_list, source, year, **_):
     :return: df, parsed and partially formatted to flowbyactivity
         specifications
     """
-    data = {}
-    row_to_use = ["Quantity", "Talc"]
-    prod = ""
-    name = usgs_myb_name(source)
-    des = name
-    dataframe = pd.DataFrame()
-    col_name = usgs_myb_year(YEARS_COVERED['talc'], year)
-    for df in df_list:
-        for index, row in df.iterrows():
-            if df.iloc[index]["Production"].strip() == \
-                    "Mine production, crude:":
-                prod = "production"
-            elif df.iloc[index]["Production"].strip() == \
-                    "Imports for consumption, talc:2":
-                prod = "import"
-            elif df.iloc[index]["Production"].strip() == "Exports, talc:2":
-                prod = "export"
-            if df.iloc[index]["Production"].strip() in row_to_use:
-                product = df.iloc[index]["Production"].strip()
-                data = usgs_myb_static_variables()
-                data["SourceName"] = source
-                data["Year"] = str(year)
-                data["Unit"] = "Thousand Metric Tons"
-                data["FlowAmount"] = str(df.iloc[index][col_name])
-                if str(df.iloc[index][col_name]) == "W":
-                    data["FlowAmount"] = WITHDRAWN_KEYWORD
-                data["Description"] = des
-                data["ActivityProducedBy"] = name
-                data['FlowName'] = name + " " + prod
-                dataframe = dataframe.append(data, ignore_index=True)
-                dataframe = assign_fips_location_system(
-                    dataframe, str(year))
-    return dataframe
+    return usgs_myb_parse_table(
+        df_list, source, year, years='talc', rows=["Quantity", "Talc"],
+        products={"Mine production, crude:": "production",
+                  "Imports for consumption, talc:2": "import",
+                  "Exports, talc:2": "export"},
+        unit="Thousand Metric Tons", withdrawn=["W"])
 
 
 def usgs_titanium_call(*, resp, year, **_):
@@ -4275,8 +3076,7 @@ def usgs_titanium_call(*, resp, year, **_):
         flowbyactivity.py ('year' and 'source')
     :return: pandas dataframe of original source data
     """
-    df_raw_data = pd.io.excel.read_excel(io.BytesIO(resp.content),
-                                         sheet_name='T1')
+    df_raw_data = read_workbook(resp.content).sheet('T1')
     df_data_1 = pd.DataFrame(df_raw_data.loc[4:7]).reindex()
     df_data_1 = df_data_1.reset_index()
     del df_data_1["index"]
@@ -4318,43 +3118,14 @@ def usgs_titanium_parse(*, df_list, source, year, **_):
     :return: df, parsed and partially formatted to flowbyactivity
         specifications
     """
-    data = {}
-    row_to_use = ["Production2", "Production", "Imports for consumption"]
-    dataframe = pd.DataFrame()
-    name = ""
-
-    for df in df_list:
-        for index, row in df.iterrows():
-            if df.iloc[index]["Production"].strip() == \
-                    "Imports for consumption":
-                product = "imports"
-            elif df.iloc[index]["Production"].strip() == "Production2" or \
-                    df.iloc[index]["Production"].strip() == "Production":
-                product = "production"
-            if df.iloc[index]["Production"].strip() == "Mineral concentrates:":
-                name = "Titanium"
-            elif df.iloc[index]["Production"].strip() == \
-                    "Titanium dioxide pigment:":
-                name = "Titanium dioxide"
-
-            if df.iloc[index]["Production"].strip() in row_to_use:
-                data = usgs_myb_static_variables()
-                data["SourceName"] = source
-                data["Year"] = str(year)
-                data["Unit"] = "Metric Tons"
-                data['FlowName'] = name + " " + product
-                data["Description"] = name
-                data["ActivityProducedBy"] = name
-                col_name = usgs_myb_year(YEARS_COVERED['titanium'], year)
-                if str(df.iloc[index][col_name]) == "--" or \
-                        str(df.iloc[index][col_name]) == "(3)":
-                    data["FlowAmount"] = str(0)
-                else:
-                    data["FlowAmount"] = str(df.iloc[index][col_name])
-                dataframe = dataframe.append(data, ignore_index=True)
-                dataframe = assign_fips_location_system(
-                    dataframe, str(year))
-    return dataframe
+    return usgs_myb_parse_table(
+        df_list, source, year, years='titanium',
+        rows=["Production2", "Production", "Imports for consumption"],
+        products={"Imports for consumption": "imports",
+                  "Production2": "production", "Production": "production"},
+        name="", names={"Mineral concentrates:": "Titanium",
+                        "Titanium dioxide pigment:": "Titanium dioxide"},
+        zero=["--", "(3)"])
 
 
 def usgs_tungsten_call(*, resp, year, **_):
@@ -4366,8 +3137,7 @@ def usgs_tungsten_call(*, resp, year, **_):
     :param year: year
     :return: pandas dataframe of original source data
     """
-    df_raw_data = pd.io.excel.read_excel(io.BytesIO(resp.content),
-                                         sheet_name='T1')
+    df_raw_data = read_workbook(resp.content).sheet('T1')
     df_data = pd.DataFrame(df_raw_data.loc[7:10]).reindex()
     df_data = df_data.reset_index()
     del df_data["index"]
@@ -4395,42 +3165,12 @@ def usgs_tungsten_parse(*, df_list, source, year, **_):
     :return: df, parsed and partially formatted to flowbyactivity
         specifications
     """
-    data = {}
-    row_to_use = ["Production", "Exports", "Imports for consumption"]
-    prod = ""
-    name = usgs_myb_name(source)
-    des = name
-    dataframe = pd.DataFrame()
-    col_name = usgs_myb_year(YEARS_COVERED['tungsten'], year)
-    for df in df_list:
-        for index, row in df.iterrows():
-            if df.iloc[index]["Production"].strip() == \
-                    "Imports for consumption":
-                product = "imports"
-            elif df.iloc[index]["Production"].strip() == "Production":
-                product = "production"
-            elif df.iloc[index]["Production"].strip() == "Exports":
-                product = "exports"
-
-            if df.iloc[index]["Production"].strip() in row_to_use:
-                data = usgs_myb_static_variables()
-                data["SourceName"] = source
-                data["Year"] = str(year)
-                data["Unit"] = "Metric Tons"
-                data['FlowName'] = name + " " + product
-                data["Description"] = name
-                data["ActivityProducedBy"] = name
-                col_name = usgs_myb_year(YEARS_COVERED['tungsten'], year)
-                if str(df.iloc[index][col_name]) == "--":
-                    data["FlowAmount"] = str(0)
-                elif str(df.iloc[index][col_name]) == "nan":
-                    data["FlowAmount"] = WITHDRAWN_KEYWORD
-                else:
-                    data["FlowAmount"] = str(df.iloc[index][col_name])
-                dataframe = dataframe.append(data, ignore_index=True)
-                dataframe = assign_fips_location_system(
-                    dataframe, str(year))
-    return dataframe
+    return usgs_myb_parse_table(
+        df_list, source, year, years='tungsten',
+        rows=["Production", "Exports", "Imports for consumption"],
+        products={"Imports for consumption": "imports",
+                  "Production": "production", "Exports": "exports"},
+        zero=["--"], withdrawn=["nan"])
 
 
 def usgs_vermiculite_call(*, resp, year, **_):
@@ -4442,8 +3182,7 @@ def usgs_vermiculite_call(*, resp, year, **_):
     :param year: year
     :return: pandas dataframe of original source data
     """
-    df_raw_data_one = pd.io.excel.read_excel(io.BytesIO(resp.content),
-                                             sheet_name='T1')
+    df_raw_data_one = read_workbook(resp.content).sheet('T1')
     df_data_one = pd.DataFrame(df_raw_data_one.loc[6:12]).reindex()
     df_data_one = df_data_one.reset_index()
     del df_data_one["index"]
@@ -4481,40 +3220,14 @@ def usgs_vermiculite_parse(*, df_list, source, year, **_):
     :return: df, parsed and partially formatted to flowbyactivity
         specifications
     """
-    data = {}
-    row_to_use = ["Production, concentratee, 2, 3", "Exportse, 4",
-                  "Imports for consumptione, 4"]
-    prod = ""
-    name = usgs_myb_name(source)
-    des = name
-    dataframe = pd.DataFrame()
-    col_name = usgs_myb_year(YEARS_COVERED['vermiculite'], year)
-    for df in df_list:
-        for index, row in df.iterrows():
-            if df.iloc[index]["Production"].strip() == \
-                    "Production, concentratee, 2, 3":
-                prod = "production"
-            elif df.iloc[index]["Production"].strip() == \
-                    "Imports for consumptione, 4":
-                prod = "import"
-            elif df.iloc[index]["Production"].strip() == "Exportse, 4":
-                prod = "export"
-            if df.iloc[index]["Production"].strip() in row_to_use:
-                product = df.iloc[index]["Production"].strip()
-                data = usgs_myb_static_variables()
-                data["SourceName"] = source
-                data["Year"] = str(year)
-                data["Unit"] = "Thousand Metric Tons"
-                data["FlowAmount"] = str(df.iloc[index][col_name])
-                if str(df.iloc[index][col_name]) == "W":
-                    data["FlowAmount"] = WITHDRAWN_KEYWORD
-                data["Description"] = des
-                data["ActivityProducedBy"] = name
-                data['FlowName'] = name + " " + prod
-                dataframe = dataframe.append(data, ignore_index=True)
-                dataframe = assign_fips_location_system(
-                    dataframe, str(year))
-    return dataframe
+    return usgs_myb_parse_table(
+        df_list, source, year, years='vermiculite',
+        rows=["Production, concentratee, 2, 3", "Exportse, 4",
+              "Imports for consumptione, 4"],
+        products={"Production, concentratee, 2, 3": "production",
+                  "Imports for consumptione, 4": "import",
+                  "Exportse, 4": "export"},
+        unit="Thousand Metric Tons", withdrawn=["W"])
 
 
 def usgs_zeolites_call(*, resp, year, **_):
@@ -4526,8 +3239,7 @@ def usgs_zeolites_call(*, resp, year, **_):
     :param year: year
     :return: pandas dataframe of original source data
     """
-    df_raw_data_one = pd.io.excel.read_excel(io.BytesIO(resp.content),
-                                             sheet_name='T1')
+    df_raw_data_one = read_workbook(resp.content).sheet('T1')
     df_data_one = pd.DataFrame(df_raw_data_one.loc[4:7]).reindex()
     df_data_one = df_data_one.reset_index()
     del df_data_one["index"]
@@ -4561,41 +3273,12 @@ def usgs_zeolites_parse(*, df_list, source, year, **_):
     :return: df, parsed and partially formatted to flowbyactivity
         specifications
     """
-    data = {}
-    row_to_use = ["Production", "Exportse", "Importse"]
-    prod = ""
-    name = usgs_myb_name(source)
-    des = name
-    dataframe = pd.DataFrame()
-    col_name = usgs_myb_year(YEARS_COVERED['zeolites'], year)
-    for df in df_list:
-        for index, row in df.iterrows():
-            if df.iloc[index]["Production"].strip() == "Production":
-                prod = "production"
-            elif df.iloc[index]["Production"].strip() == "Importse":
-                prod = "import"
-            elif df.iloc[index]["Production"].strip() == "Exportse":
-                prod = "export"
-
-            if df.iloc[index]["Production"].strip() in row_to_use:
-                product = df.iloc[index]["Production"].strip()
-                data = usgs_myb_static_variables()
-                data["SourceName"] = source
-                data["Year"] = str(year)
-                data["Unit"] = "Metric Tons"
-                flow_amount = str(df.iloc[index][col_name])
-                if str(df.iloc[index][col_name]) == "W":
-                    data["FlowAmount"] = WITHDRAWN_KEYWORD
-                flow_amount = flow_amount.replace("<", "")
-                flow_amount = flow_amount.replace(",", "")
-                data["FlowAmount"] = flow_amount
-                data["Description"] = des
-                data["ActivityProducedBy"] = name
-                data['FlowName'] = name + " " + prod
-                dataframe = dataframe.append(data, ignore_index=True)
-                dataframe = assign_fips_location_system(
-                    dataframe, str(year))
-    return dataframe
+    return usgs_myb_parse_table(
+        df_list, source, year, years='zeolites',
+        rows=["Production", "Exportse", "Importse"],
+        products={"Production": "production", "Importse": "import",
+                  "Exportse": "export"},
+        remove_chars="<,")
 
 
 def usgs_zinc_call(*, resp, year, **_):
@@ -4607,14 +3290,12 @@ def usgs_zinc_call(*, resp, year, **_):
     :param year: year
     :return: pandas dataframe of original source data
     """
-    df_raw_data_two = pd.io.excel.read_excel(io.BytesIO(resp.content),
-                                             sheet_name='T1')
+    df_raw_data_two = read_workbook(resp.content).sheet('T1')
     df_data_two = pd.DataFrame(df_raw_data_two.loc[9:20]).reindex()
     df_data_two = df_data_two.reset_index()
     del df_data_two["index"]
 
-    df_raw_data_one = pd.io.excel.read_excel(io.BytesIO(resp.content),
-                                             sheet_name='T9')
+    df_raw_data_one = read_workbook(resp.content).sheet('T9')
     df_data_one = pd.DataFrame(df_raw_data_one.loc[53:53]).reindex()
     df_data_one = df_data_one.reset_index()
     del df_data_one["index"]
@@ -4661,54 +3342,32 @@ def usgs_zinc_parse(*, df_list, source, year, **_):
     :return: df, parsed and partially formatted to flowbyactivity
         specifications
     """
-    data = {}
-    row_to_use = ["Quantity", "Ores and concentrates, zinc content",
-                  "United States"]
-    import_export = ["Exports:", "Imports for consumption:",
-                     "Recoverable zinc:"]
-    prod = ""
     name = usgs_myb_name(source)
-    dataframe = pd.DataFrame()
+    col_name = usgs_myb_year(YEARS_COVERED['zinc'], year)
+    frames = []
     for df in df_list:
-        for index, row in df.iterrows():
-            if df.iloc[index]["Production"].strip() == "Exports:":
-                prod = "exports"
-            elif df.iloc[index]["Production"].strip() == \
-                    "Imports for consumption:":
-                prod = "imports"
-            elif df.iloc[index]["Production"].strip() == "Recoverable zinc:":
-                prod = "production"
-            elif df.iloc[index]["Production"].strip() == "United States":
-                prod = "production"
-
-            if df.iloc[index]["Production"].strip() in row_to_use:
-                product = df.iloc[index]["Production"].strip()
-                data = usgs_myb_static_variables()
-                data["SourceName"] = source
-                data["Year"] = str(year)
-                data["Unit"] = "Metric Tons"
-                col_name = usgs_myb_year(YEARS_COVERED['zinc'], year)
-                data["FlowAmount"] = str(df.iloc[index][col_name])
-
-                if product.strip() == "Quantity":
-                    data["Description"] = "zinc in concentrate"
-                    data["ActivityProducedBy"] = "zinc in concentrate "
-                    data['FlowName'] = "zinc in concentrate " + prod
-                elif product.strip() == "Ores and concentrates, zinc content":
-                    data["Description"] = "Ores and concentrates, zinc content"
-                    data["ActivityProducedBy"] = \
-                        "Ores and concentrates, zinc content"
-                    data['FlowName'] = \
-                        "Ores and concentrates, zinc content " + prod
-                elif product.strip() == "United States":
-                    data["Description"] = "Zinc; Mine"
-                    data["ActivityProducedBy"] = name + " " + prod
-                    data['FlowName'] = "Zinc; Mine"
-
-                dataframe = dataframe.append(data, ignore_index=True)
-                dataframe = assign_fips_location_system(
-                    dataframe, str(year))
-    return dataframe
+        labels = usgs_myb_labels(df)
+        prod = usgs_myb_label_state(
+            labels, {"Exports:": "exports",
+                     "Imports for consumption:": "imports",
+                     "Recoverable zinc:": "production",
+                     "United States": "production"})
+        des = labels.map(
+            {"Quantity": "zinc in concentrate",
+             "Ores and concentrates, zinc content":
+                 "Ores and concentrates, zinc content",
+             "United States": "Zinc; Mine"})
+        mine = labels == "United States"
+        frames.append(pd.DataFrame(
+            {"Unit": "Metric Tons",
+             "FlowName": (des + " " + prod).mask(mine, "Zinc; Mine"),
+             "Description": des,
+             "ActivityProducedBy": des.mask(
+                 labels == "Quantity", "zinc in concentrate ").mask(
+                 mine, name + " " + prod),
+             "FlowAmount": df[col_name].astype(str)}
+        )[des.notna()])
+    return usgs_myb_fba(pd.concat(frames), source, year)
 
 
 def usgs_zirconium_call(*, resp, year, **_):
@@ -4720,8 +3379,7 @@ def usgs_zirconium_call(*, resp, year, **_):
     :param year: year
     :return: pandas dataframe of original source data
     """
-    df_raw_data = pd.io.excel.read_excel(io.BytesIO(resp.content),
-                                         sheet_name='T1')
+    df_raw_data = read_workbook(resp.content).sheet('T1')
     df_data_one = pd.DataFrame(df_raw_data.loc[6:10]).reindex()
     df_data_one = df_data_one.reset_index()
     del df_data_one["index"]
@@ -4767,48 +3425,14 @@ def usgs_zirconium_parse(*, df_list, source, year, **_):
     :return: df, parsed and partially formatted to flowbyactivity
         specifications
     """
-    data = {}
-    row_to_use = ["Imports for consumption3", "Concentrates", "Exports",
-                  "Hafnium, unwrought, including powder, "
-                  "imports for consumption"]
-    dataframe = pd.DataFrame()
-    name = usgs_myb_name(source)
-
-    for df in df_list:
-        for index, row in df.iterrows():
-            if df.iloc[index]["Production"].strip() == \
-                    "Imports for consumption3":
-                product = "imports"
-            elif df.iloc[index]["Production"].strip() == "Concentrates":
-                product = "production"
-            elif df.iloc[index]["Production"].strip() == "Exports":
-                product = "exports"
-
-            if df.iloc[index]["Production"].strip() == \
-                    "Hafnium, unwrought, including powder, imports for " \
-                    "consumption":
-                prod = "imports"
-                des = df.iloc[index]["Production"].strip()
-            else:
-                des = name
-
-            if df.iloc[index]["Production"].strip() in row_to_use:
-                data = usgs_myb_static_variables()
-                data["SourceName"] = source
-                data["Year"] = str(year)
-                data["Unit"] = "Metric Tons"
-                data['FlowName'] = name + " " + product
-                data["Description"] = des
-                data["ActivityProducedBy"] = name
-                col_name = usgs_myb_year(YEARS_COVERED['zirconium'], year)
-                if str(df.iloc[index][col_name]) == "--" or \
-                        str(df.iloc[index][col_name]) == "(3)":
-                    data["FlowAmount"] = str(0)
-                elif str(df.iloc[index][col_name]) == "W":
-                    data["FlowAmount"] = WITHDRAWN_KEYWORD
-                else:
-                    data["FlowAmount"] = str(df.iloc[index][col_name])
-                dataframe = dataframe.append(data, ignore_index=True)
-                dataframe = assign_fips_location_system(
-                    dataframe, str(year))
-    return dataframe
+    return usgs_myb_parse_table(
+        df_list, source, year, years='zirconium',
+        rows=["Imports for consumption3", "Concentrates", "Exports",
+              "Hafnium, unwrought, including powder, "
+              "imports for consumption"],
+        products={"Imports for consumption3": "imports",
+                  "Concentrates": "production", "Exports": "exports"},
+        descriptions={"Hafnium, unwrought, including powder, imports for "
+                      "consumption": "Hafnium, unwrought, including powder, "
+                                     "imports for consumption"},
+        zero=["--", "(3)"], withdrawn=["W"])
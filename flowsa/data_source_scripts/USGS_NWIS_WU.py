@@ -564,7 +564,8 @@ def check_golf_and_crop_irrigation_totals(df_load):
     if len(df_m3) != 0:
         df_w_missing_crop = pd.concat([df_load, df_m3], ignore_index=True)
 
-        group_cols = list(df.select_dtypes(include=['object', 'int']).columns)
+        group_cols = list(df.select_dtypes(
+            include=['object', 'string', 'int']).columns)
         df_w_missing_crop = aggregator(df_w_missing_crop, group_cols,
                                        retain_zeros=True)
 
@@ -5,8 +5,12 @@
 Common functions to clean and harmonize dataframes
 """
 
+import hashlib
 import numpy as np
-from flowsa.settings import log
+import pandas as pd
+import yaml
+import flowsa.settings
+from flowsa.settings import log, vLogDetailed, datapath
 from flowsa.literature_values import get_Canadian_to_USD_exchange_rate
 
 
@@ -38,6 +42,61 @@ def clean_df(df, flowbyfields, fill_na_dict, drop_description=True):
     return df
 
 
+# counters of the conversions between NoneType and empty cells: calls to
+# the conversion functions, and the columns and cells set to null values
+_null_conversion_stats = {'calls': 0, 'columns': 0, 'cells': 0}
+
+
+def null_conversion_info(reset=False):
+    """
+    Return counters of the conversions made by
+    replace_strings_with_NoneType() and replace_NoneType_with_empty_cells()
+    :param reset: bool, if True set the counters to 0 after returning them
+    :return: dictionary, 'calls', 'columns' and 'cells' set
+    """
+    info = dict(_null_conversion_stats)
+    if reset:
+        _null_conversion_stats.update({'calls': 0, 'columns': 0, 'cells': 0})
+    return info
+
+
+def _replace_null_cells(df, null_strings, value):
+    """
+    Replace null values and strings representing null values in the string
+    columns of a df, with a single lookup per column. Columns without null
+    values are not written.
+    :param df: df, modified in place
+    :param null_strings: list, strings that represent null values
+    :param value: None or '', value of null cells
+    :return: df
+    """
+    _null_conversion_stats['calls'] += 1
+    for y in df.columns:
+        s = df[y]
+        if isinstance(s.dtype, pd.StringDtype):
+            mask = s.isin(null_strings)
+            if value is not None:
+                mask = mask | s.isna()
+        elif s.dtype == object:
+            mask = s.isin(null_strings + [np.nan] +
+                          ([] if value is None else [None]))
+        else:
+            continue
+        n = int(mask.sum())
+        if n == 0:
+            continue
+        _null_conversion_stats['columns'] += 1
+        _null_conversion_stats['cells'] += n
+        if isinstance(s.dtype, pd.StringDtype):
+            # setting values of Arrow strings with .loc is slow
+            df[y] = s.mask(mask, value)
+        else:
+            values = s.to_numpy(copy=True)
+            values[mask.to_numpy()] = value
+            df[y] = values
+    return df
+
+
 def replace_strings_with_NoneType(df):
     """
     Ensure that cell values in columns with datatype = string remain NoneType
@@ -45,10 +104,7 @@ def replace_strings_with_NoneType(df):
     :return: A df where values are NoneType if they are supposed to be
     """
     # if datatypes are strings, ensure that Null values remain NoneType
-    for y in df.columns:
-        if df[y].dtype == object:
-            df.loc[df[y].isin(['nan', 'None', np.nan, '']), y] = None
-    return df
+    return _replace_null_cells(df, ['nan', 'None', ''], None)
 
 
 def replace_NoneType_with_empty_cells(df):
@@ -58,10 +114,7 @@ def replace_NoneType_with_empty_cells(df):
     :return: A df where values are '' when previously they were NoneType
     """
     # if datatypes are strings, change NoneType to empty cells
-    for y in df.columns:
-        if df[y].dtype == object:
-            df.loc[df[y].isin(['nan', 'None', np.nan, None]), y] = ''
-    return df
+    return _replace_null_cells(df, ['nan', 'None'], '')
 
 
 def add_missing_flow_by_fields(flowby_partial_df, flowbyfields):
@@ -77,157 +130,137 @@ def add_missing_flow_by_fields(flowby_partial_df, flowbyfields):
             flowby_partial_df[k] = None
     # convert data types to match those defined in flow_by_activity_fields
     for k, v in flowbyfields.items():
+        if v[0]['dtype'] == 'str' and \
+                isinstance(flowby_partial_df[k].dtype, pd.StringDtype):
+            continue
         flowby_partial_df.loc[:, k] = \
             flowby_partial_df[k].astype(v[0]['dtype'])
+    flowby_partial_df = set_string_dtypes(flowby_partial_df, flowbyfields)
     # Resort it so order is correct
     flowby_partial_df = flowby_partial_df[flowbyfields.keys()]
     return flowby_partial_df
 
 
+def set_string_dtypes(df, flowbyfields, string_dtype=None):
+    """
+    Store the string fields of a flowby df with the string dtype set in
+    settings.py
+    :param df: Either flowbyactivity or flowbysector df
+    :param flowbyfields: Either flow_by_activity_fields, flow_by_sector_fields,
+           or flow_by_sector_collapsed_fields
+    :param string_dtype: str, dtype of string columns, defaults to
+        FLOWBY_STRING_DTYPE in settings.py
+    :return: df, with string fields cast
+    """
+    if string_dtype is None:
+        string_dtype = flowsa.settings.FLOWBY_STRING_DTYPE
+    cols = [k for k, v in flowbyfields.items()
+            if v[0]['dtype'] == 'str' and k in df.columns]
+    for k in cols:
+        if string_dtype == 'object':
+            # df saved with another string dtype
+            if isinstance(df[k].dtype, pd.StringDtype):
+                df[k] = df[k].astype(object).where(df[k].notna(), None)
+        else:
+            # astype('str') stores nulls as 'None'
+            df[k] = df[k].astype(string_dtype)
+            df[k] = df[k].mask(df[k].isin(['None', 'nan']))
+    return df
+
+
+# unit conversions used by standardize_units(), loaded from
+# unit_conversions.yaml on first use
+_unit_conversions = {}
+
+# conversion factors that depend on the data, by the name used as 'factor'
+# in unit_conversions.yaml
+dynamic_unit_factors = {
+    'Canadian_to_USD': lambda df: 1 / float(
+        get_Canadian_to_USD_exchange_rate(str(df['Year'].unique()[0])))}
+
+
+def register_unit_conversions(conversions):
+    """
+    Add unit conversions to the registry used by standardize_units(),
+    replacing any conversions of the same source units
+    :param conversions: dictionary or str, conversions in the format of
+        unit_conversions.yaml, or the path to a yaml file
+    """
+    if isinstance(conversions, str):
+        with open(conversions, 'r') as f:
+            conversions = yaml.safe_load(f)
+    for unit, c in conversions.items():
+        if not isinstance(c.get('factor'), (int, float)) and \
+                c.get('factor') not in dynamic_unit_factors:
+            raise ValueError(f'Unit conversion factor for {unit} must be a '
+                             f'number or one of {list(dynamic_unit_factors)}')
+        _unit_conversions[unit] = c
+
+
+def get_unit_conversions():
+    """
+    Return the unit conversion registry
+    :return: dictionary, source units and their conversion
+    """
+    if not _unit_conversions:
+        register_unit_conversions(f'{datapath}unit_conversions.yaml')
+    return _unit_conversions
+
+
 def standardize_units(df):
     """
     Convert unit to standard
     Timeframe is over one year
+    Conversions are listed in unit_conversions.yaml and applied with a
+    single lookup of the distinct units and one multiplication
     :param df: df, Either flowbyactivity or flowbysector
     :return: df, with standarized units
     """
-
-    days_in_year = 365
-    sq_ft_to_sq_m_multiplier = 0.092903
-    # rounded to match USGS_NWIS_WU mapping file on FEDEFL
-    gallon_water_to_kg = 3.79
-    ac_ft_water_to_kg = 1233481.84
-    acre_to_m2 = 4046.8564224
-    mj_in_btu = .0010550559
-    ton_to_kg = 907.185
-    lb_to_kg = 0.45359
+    conversions = get_unit_conversions()
 
     # strip whitespace from units
     df['Unit'] = df['Unit'].str.strip()
 
-    # class = employment, unit = 'p'
-    # class = energy, unit = MJ
-    # class = land, unit = m2
-    df.loc[:, 'FlowAmount'] = np.where(df['Unit'].isin(['ACRES', 'Acres']),
-                                       df['FlowAmount'] * acre_to_m2,
-                                       df['FlowAmount'])
-    df.loc[:, 'Unit'] = np.where(df['Unit'].isin(['ACRES', 'Acres']),
-                                 'm2', df['Unit'])
-
-    df.loc[:, 'FlowAmount'] = \
-        np.where(df['Unit'].isin(['million sq ft', 'million square feet']),
-                 df['FlowAmount'] * sq_ft_to_sq_m_multiplier * 1000000,
-                 df['FlowAmount'])
-    df.loc[:, 'Unit'] = \
-        np.where(df['Unit'].isin(['million sq ft', 'million square feet']),
-                 'm2', df['Unit'])
-
-    df.loc[:, 'FlowAmount'] = \
-        np.where(df['Unit'].isin(['square feet']),
-                 df['FlowAmount'] * sq_ft_to_sq_m_multiplier, df['FlowAmount'])
-    df.loc[:, 'Unit'] = \
-        np.where(df['Unit'].isin(['square feet']), 'm2', df['Unit'])
-
-    # class = money, unit = USD
-    if df['Unit'].str.contains('Canadian Dollar').any():
-        exchange_rate = float(get_Canadian_to_USD_exchange_rate(
-            str(df['Year'].unique()[0])))
-        df.loc[:, 'FlowAmount'] = np.where(df['Unit'] == 'Canadian Dollar',
-                                           df['FlowAmount'] / exchange_rate,
-                                           df['FlowAmount'])
-    df.loc[:, 'FlowAmount'] = np.where(df['Unit'] == 'Thousand USD',
-                                       df['FlowAmount'] * 1000,
-                                       df['FlowAmount'])
-    df.loc[:, 'Unit'] = np.where(df['Unit'].isin(
-        ['Canadian Dollar', 'Thousand USD']), 'USD', df['Unit'])
-
-    # class = water, unit = kg
-    df.loc[:, 'FlowAmount'] = \
-        np.where(df['Unit'] == 'gallons/animal/day',
-                 (df['FlowAmount'] * gallon_water_to_kg) * days_in_year,
-                 df['FlowAmount'])
-    df.loc[:, 'Unit'] = \
-        np.where(df['Unit'] == 'gallons/animal/day', 'kg', df['Unit'])
-
-    df.loc[:, 'FlowAmount'] = \
-        np.where(df['Unit'] == 'ACRE FEET / ACRE',
-                 (df['FlowAmount'] / acre_to_m2) * ac_ft_water_to_kg,
-                 df['FlowAmount'])
-    df.loc[:, 'Unit'] = \
-        np.where(df['Unit'] == 'ACRE FEET / ACRE', 'kg/m2', df['Unit'])
-
-    df.loc[:, 'FlowAmount'] = \
-        np.where(df['Unit'] == 'Mgal',
-                 df['FlowAmount'] * 1000000 * gallon_water_to_kg,
-                 df['FlowAmount'])
-    df.loc[:, 'Unit'] = np.where(df['Unit'] == 'Mgal', 'kg', df['Unit'])
-
-    df.loc[:, 'FlowAmount'] = np.where(df['Unit'] == 'gal',
-                                       df['FlowAmount'] * gallon_water_to_kg,
-                                       df['FlowAmount'])
-    df.loc[:, 'Unit'] = np.where(df['Unit'] == 'gal', 'kg', df['Unit'])
-
-    df.loc[:, 'FlowAmount'] = np.where(df['Unit'] == 'gal/USD',
-                                       df['FlowAmount'] * gallon_water_to_kg,
-                                       df['FlowAmount'])
-    df.loc[:, 'Unit'] = np.where(df['Unit'] == 'gal/USD', 'kg/USD', df['Unit'])
-
-    df.loc[:, 'FlowAmount'] = \
-        np.where(df['Unit'] == 'Bgal/d',
-                 df['FlowAmount'] * (10**9) * gallon_water_to_kg *
-                 days_in_year,
-                 df['FlowAmount'])
-    df.loc[:, 'Unit'] = np.where(df['Unit'] == 'Bgal/d', 'kg', df['Unit'])
-
-    df.loc[:, 'FlowAmount'] = \
-        np.where(df['Unit'] == 'Mgal/d',
-                 df['FlowAmount'] * (10**6) * gallon_water_to_kg *
-                 days_in_year,
-                 df['FlowAmount'])
-    df.loc[:, 'Unit'] = np.where(df['Unit'] == 'Mgal/d', 'kg', df['Unit'])
-
-    # Convert Energy unit "Quadrillion Btu" to MJ
-    # 1 Quad = .0010550559 x 10^15
-    df.loc[:, 'FlowAmount'] = \
-        np.where(df['Unit'] == 'Quadrillion Btu',
-                 df['FlowAmount'] * mj_in_btu * (10 ** 15),
-                 df['FlowAmount'])
-    df.loc[:, 'Unit'] = \
-        np.where(df['Unit'] == 'Quadrillion Btu', 'MJ', df['Unit'])
-
-    # Convert Energy unit "Trillion Btu" to MJ
-    # 1 Tril = .0010550559 x 10^12
-    df.loc[:, 'FlowAmount'] = \
-        np.where(df['Unit'].isin(['Trillion Btu', 'TBtu']),
-                 df['FlowAmount'] * mj_in_btu * (10 ** 12),
-                 df['FlowAmount'])
-    df.loc[:, 'Unit'] = \
-        np.where(df['Unit'].isin(['Trillion Btu', 'TBtu']), 'MJ', df['Unit'])
-
-    # Convert million cubic meters to gallons (for water)
-    df.loc[:, 'FlowAmount'] = \
-        np.where(df['Unit'] == 'million Cubic metres/year',
-                 df['FlowAmount'] * 264.172 * (10**6) * gallon_water_to_kg,
-                 df['FlowAmount'])
-    df.loc[:, 'Unit'] = \
-        np.where(df['Unit'] == 'million Cubic metres/year', 'kg', df['Unit'])
-
-    # Convert mass units (LB or TON) to kg
-    df.loc[:, 'FlowAmount'] = np.where(
-        df['Unit'].isin(['TON', 'tons', 'short tons']),
-        df['FlowAmount'] * ton_to_kg, df['FlowAmount'])
-    df.loc[:, 'FlowAmount'] = np.where(df['Unit'] == 'Thousands of Tons',
-                                       df['FlowAmount'] * 1000 * ton_to_kg,
-                                       df['FlowAmount'])
-    df.loc[:, 'FlowAmount'] = np.where(df['Unit'] == 'LB',
-                                       df['FlowAmount'] * lb_to_kg,
-                                       df['FlowAmount'])
-    df.loc[:, 'FlowAmount'] = np.where(df['Unit'] == 'MT',
-                                       df['FlowAmount'] * 1000,
-                                       df['FlowAmount'])
-    df.loc[:, 'Unit'] = np.where(df['Unit'].isin(
-        ['TON', 'tons', 'short tons', 'LB', 'Thousands of Tons', 'MT']), 'kg',
-        df['Unit'])
+    units = df['Unit'].astype('category')
+    categories = units.cat.categories
+    # factor and target unit per category, the last element is used for
+    # null units (code -1)
+    factors = np.ones(len(categories) + 1)
+    targets = np.append(categories.to_numpy(dtype=object), None)
+    class_limits = {}
+    untouched = []
+    for i, unit in enumerate(categories):
+        c = conversions.get(unit)
+        if c is None:
+            untouched.append(unit)
+            continue
+        f = c['factor']
+        factors[i] = dynamic_unit_factors[f](df) if isinstance(f, str) else f
+        targets[i] = c['unit']
+        if c.get('class') is not None:
+            class_limits[i] = c['class']
+    codes = units.cat.codes.to_numpy()
+    row_factors = factors[codes]
+    row_units = targets[codes]
+    # rows of units limited to other classes are not converted
+    for i, classes in class_limits.items():
+        rows = (codes == i) & ~df['Class'].isin(
+            [classes] if isinstance(classes, str) else classes).to_numpy()
+        row_factors[rows] = 1
+        row_units[rows] = categories[i]
+    null_units = codes == -1
+    row_units[null_units] = df['Unit'].to_numpy()[null_units]
+
+    converted = [f'{unit} to {targets[i]}' for i, unit in
+                 enumerate(categories) if unit not in untouched]
+    if converted:
+        vLogDetailed.info('Converted units: %s', ', '.join(converted))
+    if untouched:
+        vLogDetailed.info('Units not converted: %s', ', '.join(untouched))
+
+    df['FlowAmount'] = df['FlowAmount'] * row_factors
+    df['Unit'] = pd.Series(row_units, index=df.index).astype(
+        df['Unit'].dtype)
 
     return df
 
@@ -264,7 +297,7 @@ def harmonize_FBS_columns(df):
     df = replace_NoneType_with_empty_cells(df)
 
     # subset all string cols of the df and drop duplicates
-    string_cols = list(df.select_dtypes(include=['object']).columns)
+    string_cols = list(df.select_dtypes(include=['object', 'string']).columns)
     df_sub = df[string_cols].drop_duplicates().reset_index(drop=True)
     # sort df
     df_sub = df_sub.sort_values(['MetaSources', 'SectorProducedBy',
@@ -319,3 +352,15 @@ def reset_fbs_dq_scores(df):
     df = df.assign(DataCollection=None)
 
     return df
+
+
+def frame_digest(df):
+    """
+    Hash the columns and values of a df, used to recognize identical
+    dataframes
+    :param df: df
+    :return: str, sha256 hex digest
+    """
+    h = hashlib.sha256(repr(list(df.columns)).encode())
+    h.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+    return h.hexdigest()
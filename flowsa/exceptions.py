@@ -42,6 +42,14 @@ class EnvError(Exception):
         super().__init__(self.message)
 
 
+class ResponseNotCachedError(Exception):
+    def __init__(self, url):
+        message = (f"Response to {url} not found in the response cache, "
+                   "which is set to only use cached responses")
+        self.message = message
+        super().__init__(self.message)
+
+
 class FBSMethodConstructionError(Exception):
     """Errors in FBS methods which result in incompatible models"""
     def __init__(self, message=None, error_type=None):
@@ -0,0 +1,385 @@
+# fbastore.py (flowsa)
+# !/usr/bin/env python3
+# coding=utf-8
+"""
+Read FlowByActivity parquets saved in the local flowsa directory, pushing
+row filters and column selections down into the parquet reader so row
+groups that can not match are skipped and unused columns are not loaded.
+
+FBAs can optionally be saved as a hive-partitioned dataset, a directory
+named for the FBA with a subdirectory per Class, geographic level of the
+Location ('national', 'state', 'county' or 'other') and Year, e.g.
+FlowByActivity/BLS_QCEW_2017/Class=Employment/LocationLevel=state/Year=2017/.
+Loading a single class or geoscale only reads the matching partitions.
+Partitions are read in directory order, so rows of a partitioned FBA are
+not returned in the order they were written.
+
+FBAs can also be kept in an in-process store, so FBAs loaded repeatedly
+with different filters are read once and filtered in memory. The least
+recently used FBAs are dropped once the FBAs in the store use more than
+FBA_CACHE_MAX_MEMORY bytes.
+"""
+
+import glob
+import os
+import shutil
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+from esupy.processed_data_mgmt import load_preprocessed_output
+from flowsa.common import fba_activity_fields
+from flowsa.dataclean import set_string_dtypes
+from flowsa.location import US_FIPS
+from flowsa.schema import flow_by_activity_fields
+import flowsa.settings
+from flowsa.settings import outputpath, paths, WRITE_FORMAT, \
+    FBA_CACHE_MAX_MEMORY
+
+# partition columns of partitioned FBAs, LocationLevel is not an FBA column
+FBA_PARTITIONING = ds.partitioning(
+    pa.schema([('Class', pa.string()), ('LocationLevel', pa.string()),
+               ('Year', pa.int64())]), flavor='hive')
+
+# in-process store of loaded FBAs, keyed by the path and modification time
+# of the file loaded, with the bytes used by each FBA
+_fba_cache = OrderedDict()
+_fba_cache_stats = {'hits': 0, 'misses': 0}
+_fba_cache_lock = threading.Lock()
+
+
+def partitioned_output_path(name, category='FlowByActivity'):
+    """
+    :param name: str, name of the dataset, e.g. 'BLS_QCEW_2017'
+    :param category: str, 'FlowByActivity' or 'FlowBySector'
+    :return: str, directory of the partitioned dataset
+    """
+    return f'{outputpath}{category}/{name}/'
+
+
+def find_latest_output(name, category):
+    """
+    Path of the most recent parquet saved for a dataset, the file loaded
+    by esupy's load_preprocessed_output(), or the directory of the
+    partitioned dataset if it was saved more recently
+    :param name: str, name of the dataset, e.g. 'USDA_CoA_Cropland_2017'
+    :param category: str, 'FlowByActivity' or 'FlowBySector'
+    :return: str, file or directory path, None if there is no parquet
+    """
+    files = glob.glob(f'{outputpath}{category}/{name}_v*.{WRITE_FORMAT}')
+    if os.path.isdir(partitioned_output_path(name, category)):
+        files.append(partitioned_output_path(name, category))
+    if len(files) == 0:
+        return None
+    return max(files, key=os.path.getmtime)
+
+
+def location_level(locations):
+    """
+    Geographic level of FIPS codes, from the number of digits before the
+    trailing zeros: '00000' is national, 'SS000' is state, 'SSCCC' is
+    county, other location codes are 'other'
+    :param locations: pandas Series, Location
+    :return: numpy array of str
+    """
+    locations = locations.astype(str)
+    fips = locations.str.fullmatch(r'\d{5}')
+    return np.select([locations == US_FIPS,
+                      fips & locations.str.endswith('000'),
+                      fips],
+                     ['national', 'state', 'county'], 'other')
+
+
+def write_partitioned_fba(df, name):
+    """
+    Save an FBA as a hive-partitioned dataset, replacing any prior dataset
+    of the same name
+    :param df: df, FBA format
+    :param name: str, name of the FBA, e.g. 'BLS_QCEW_2017'
+    :return: str, directory of the dataset
+    """
+    path = partitioned_output_path(name)
+    table = pa.Table.from_pandas(
+        df.assign(LocationLevel=location_level(df['Location']),
+                  Year=df['Year'].astype('int64')),
+        preserve_index=False)
+    tmp = f'{path[:-1]}.{os.getpid()}.tmp/'
+    ds.write_dataset(table, tmp, format='parquet',
+                     partitioning=FBA_PARTITIONING,
+                     basename_template='part-{i}.parquet',
+                     existing_data_behavior='delete_matching')
+    if os.path.isdir(path):
+        shutil.rmtree(path)
+    os.replace(tmp, path)
+    return path
+
+
+def _as_list(values):
+    return [values] if isinstance(values, str) else list(values)
+
+
+def _isin(field, values, schema=None):
+    """pyarrow can not infer the type of an empty value set, and columns
+    saved with only nulls have the null type, so are cast to strings"""
+    values = _as_list(values)
+    if len(values) == 0:
+        return ds.scalar(False)
+    if schema is not None and field in schema.names and \
+            pa.types.is_null(schema.field(field).type):
+        return ds.field(field).cast(pa.string()).isin(values)
+    return ds.field(field).isin(values)
+
+
+def _to_pandas(table):
+    """Convert a pyarrow table, with strings as FLOWBY_STRING_DTYPE"""
+    string_dtype = flowsa.settings.FLOWBY_STRING_DTYPE
+    if string_dtype == 'object':
+        return set_string_dtypes(table.to_pandas(), flow_by_activity_fields)
+    return table.to_pandas(types_mapper={
+        pa.string(): pd.api.types.pandas_dtype(string_dtype)}.get)
+
+
+def geoscale_locations(geoscale, location_systems):
+    """
+    FIPS codes at a geoscale, matching flowbyfunctions.filter_by_geoscale()
+    :param geoscale: str, 'national', 'state' or 'county'
+    :param location_systems: list, LocationSystem values in the FBA
+    :return: list, FIPS codes
+    """
+    from flowsa.flowbyfunctions import create_geoscale_list
+    if geoscale == 'national':
+        return [US_FIPS]
+    return create_geoscale_list(
+        pd.DataFrame({'LocationSystem': pd.Series(location_systems,
+                                                  dtype='object')}),
+        geoscale)
+
+
+def fba_filter_expression(flowclass=None, locations=None,
+                          location_prefix=None, activities=None,
+                          flownames=None, selection_fields=None,
+                          schema=None):
+    """
+    Build a pyarrow dataset expression from FBA filters, None if there are
+    no filters
+    :param flowclass: str or list, 'Class' values
+    :param locations: list, 'Location' values
+    :param location_prefix: str, start of the 'Location' values, e.g. a
+        state FIPS '06' to load a state and its counties
+    :param activities: list, activities in either ActivityProducedBy or
+        ActivityConsumedBy
+    :param flownames: list, 'FlowName' values
+    :param selection_fields: dictionary, column names and lists of values
+    :param schema: pyarrow schema of the dataset filtered
+    :return: pyarrow.dataset.Expression
+    """
+    fields = dict(selection_fields or {})
+    if flowclass is not None:
+        fields['Class'] = flowclass
+    if locations is not None:
+        fields['Location'] = locations
+    if flownames is not None:
+        fields['FlowName'] = flownames
+    expressions = [_isin(k, v, schema) for k, v in fields.items()]
+    if location_prefix is not None:
+        expressions.append(pc.starts_with(ds.field('Location'),
+                                          pattern=location_prefix))
+    if activities is not None:
+        expressions.append(
+            _isin(fba_activity_fields[0], activities, schema) |
+            _isin(fba_activity_fields[1], activities, schema))
+    if len(expressions) == 0:
+        return None
+    expression = expressions[0]
+    for e in expressions[1:]:
+        expression = expression & e
+    return expression
+
+
+def filter_fba_df(df, flowclass=None, locations=None, location_prefix=None,
+                  activities=None, flownames=None, selection_fields=None):
+    """
+    Apply the filters of fba_filter_expression() to a loaded dataframe
+    :return: df, filtered FBA
+    """
+    fields = dict(selection_fields or {})
+    if flowclass is not None:
+        fields['Class'] = flowclass
+    if locations is not None:
+        fields['Location'] = locations
+    if flownames is not None:
+        fields['FlowName'] = flownames
+    for k, v in fields.items():
+        df = df[df[k].isin(_as_list(v))]
+    if location_prefix is not None:
+        df = df[df['Location'].str.startswith(location_prefix)]
+    if activities is not None:
+        activities = _as_list(activities)
+        df = df[df[fba_activity_fields[0]].isin(activities) |
+                df[fba_activity_fields[1]].isin(activities)]
+    return df.reset_index(drop=True)
+
+
+def load_fba_parquet(fba_meta, geographic_level=None, columns=None,
+                     **filters):
+    """
+    Load the most recent local parquet of an FBA, reading only the rows
+    that match the filters and the columns listed
+    :param fba_meta: FileMeta of the FBA
+    :param geographic_level: str, geoscale of the rows to load
+    :param columns: list, columns to load, default loads all columns
+    :param filters: filters passed to fba_filter_expression()
+    :return: tuple, (df or None if not found locally, number of rows in
+        the unfiltered FBA)
+    """
+    path = find_latest_output(fba_meta.name_data, fba_meta.category)
+    if path is not None and os.path.isdir(path):
+        return load_partitioned_fba(path, geographic_level, columns,
+                                    **filters)
+    if path is None:
+        # file not named as expected, load and filter the whole FBA
+        df = load_preprocessed_output(fba_meta, paths)
+        if df is None:
+            return None, 0
+        n_rows = len(df)
+        if geographic_level is not None:
+            filters['locations'] = geoscale_locations(
+                geographic_level, df['LocationSystem'].unique())
+        df = filter_fba_df(df, **filters)
+        df = set_string_dtypes(df, flow_by_activity_fields)
+        if columns is not None:
+            df = df[[c for c in columns if c in df]]
+        return df, n_rows
+
+    dataset = ds.dataset(path, format='parquet')
+    n_rows = dataset.count_rows()
+    if geographic_level is not None:
+        systems = dataset.to_table(
+            columns=['LocationSystem']).column(0).unique().to_pylist()
+        filters['locations'] = geoscale_locations(geographic_level, systems)
+    if columns is not None:
+        columns = [c for c in columns if c in dataset.schema.names]
+    table = dataset.to_table(columns=columns,
+                             filter=fba_filter_expression(
+                                 **filters, schema=dataset.schema))
+    return _to_pandas(table), n_rows
+
+
+def load_partitioned_fba(path, geographic_level=None, columns=None,
+                         **filters):
+    """
+    Load the rows of a partitioned FBA that match the filters, reading only
+    the partitions of the flowclass and geographic level. Columns and dtypes
+    are those of the FBA written, rows are grouped by partition rather than
+    in the order written.
+    :param path: str, directory of the dataset
+    :param geographic_level: str, geoscale of the rows to load
+    :param columns: list, columns to load, default loads all FBA columns
+    :param filters: filters passed to fba_filter_expression()
+    :return: tuple, (df, number of rows in the unfiltered FBA)
+    """
+    dataset = ds.dataset(path, format='parquet',
+                         partitioning=FBA_PARTITIONING)
+    n_rows = dataset.count_rows()
+    expression = None
+    if geographic_level is not None:
+        systems = dataset.to_table(
+            columns=['LocationSystem']).column(0).unique().to_pylist()
+        filters['locations'] = geoscale_locations(geographic_level, systems)
+        expression = ds.field('LocationLevel') == geographic_level
+    f = fba_filter_expression(**filters, schema=dataset.schema)
+    if f is not None:
+        expression = f if expression is None else expression & f
+    # return columns in the order of the FBA schema
+    names = [c for c in dataset.schema.names if c != 'LocationLevel']
+    names = [c for c in flow_by_activity_fields if c in names] + \
+        [c for c in names if c not in flow_by_activity_fields]
+    if columns is not None:
+        names = [c for c in columns if c in names]
+    table = dataset.to_table(columns=names, filter=expression)
+    return _to_pandas(table), n_rows
+
+
+def get_cached_fba(fba_meta, max_memory=None):
+    """
+    Return a full FBA from the in-process store, loading the most recent
+    local parquet if the FBA is not stored or the file changed
+    :param fba_meta: FileMeta of the FBA
+    :param max_memory: int, bytes of FBAs kept in the store, defaults to
+        FBA_CACHE_MAX_MEMORY in settings.py
+    :return: df, the stored FBA, not a copy, None if not found locally
+    """
+    if max_memory is None:
+        max_memory = FBA_CACHE_MAX_MEMORY
+    path = find_latest_output(fba_meta.name_data, fba_meta.category)
+    if path is None:
+        return None
+    key = (path, os.path.getmtime(path))
+    with _fba_cache_lock:
+        entry = _fba_cache.get(key)
+        if entry is not None:
+            _fba_cache_stats['hits'] += 1
+            _fba_cache.move_to_end(key)
+            return entry[0]
+        _fba_cache_stats['misses'] += 1
+    df, _ = load_fba_parquet(fba_meta)
+    if df is None:
+        return None
+    nbytes = int(df.memory_usage(deep=True).sum())
+    with _fba_cache_lock:
+        # drop prior versions of the file
+        for k in [k for k in _fba_cache if k[0] == path]:
+            del _fba_cache[k]
+        if nbytes <= max_memory:
+            _fba_cache[key] = (df, nbytes)
+        while sum(v[1] for v in _fba_cache.values()) > max_memory:
+            _fba_cache.popitem(last=False)
+    return df
+
+
+def load_fba_cached(fba_meta, geographic_level=None, columns=None,
+                    **filters):
+    """
+    Load the rows of an FBA that match the filters, as load_fba_parquet(),
+    from the full FBA held in the in-process store
+    :param fba_meta: FileMeta of the FBA
+    :param geographic_level: str, geoscale of the rows to load
+    :param columns: list, columns to load, default loads all columns
+    :param filters: filters passed to filter_fba_df()
+    :return: tuple, (df or None if not found locally, number of rows in
+        the unfiltered FBA)
+    """
+    df = get_cached_fba(fba_meta)
+    if df is None:
+        return load_fba_parquet(fba_meta, geographic_level, columns,
+                                **filters)
+    n_rows = len(df)
+    if geographic_level is not None:
+        filters['locations'] = geoscale_locations(
+            geographic_level, df['LocationSystem'].unique())
+    # filter_fba_df() returns a new df, the stored FBA is not modified
+    df = filter_fba_df(df, **filters)
+    if columns is not None:
+        df = df[[c for c in columns if c in df]]
+    return df, n_rows
+
+
+def clear_fba_cache():
+    """Drop the FBAs in the in-process store and reset the counters"""
+    with _fba_cache_lock:
+        _fba_cache.clear()
+        _fba_cache_stats.update({'hits': 0, 'misses': 0})
+
+
+def fba_cache_info():
+    """
+    Return counters for the in-process FBA store
+    :return: dictionary, 'hits', 'misses', 'size' (number of FBAs) and
+        'memory' (bytes) of the store
+    """
+    with _fba_cache_lock:
+        return {**_fba_cache_stats, 'size': len(_fba_cache),
+                'memory': sum(v[1] for v in _fba_cache.values())}
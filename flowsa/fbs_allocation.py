@@ -5,6 +5,8 @@
 Functions to allocate data using additional data sources
 """
 
+import threading
+from collections import OrderedDict
 import numpy as np
 import pandas as pd
 import flowsa
@@ -14,6 +16,7 @@ from flowsa.common import fba_activity_fields, fbs_activity_fields, \
 from flowsa.location import US_FIPS
 from flowsa.schema import activity_fields
 from flowsa.settings import log
+from flowsa.profiler import profile_stage
 from flowsa.validation import check_allocation_ratios, \
     check_if_location_systems_match
 from flowsa.flowbyfunctions import collapse_activity_fields, \
@@ -22,10 +25,76 @@ from flowsa.flowbyfunctions import collapse_activity_fields, \
 from flowsa.allocation import allocate_by_sector, proportional_allocation_by_location_and_activity, \
     equally_allocate_parent_to_child_naics, equal_allocation
 from flowsa.sectormapping import get_fba_allocation_subset, add_sectors_to_flowbyactivity
-from flowsa.dataclean import replace_strings_with_NoneType
+from flowsa.dataclean import replace_strings_with_NoneType, frame_digest
 from flowsa.validation import check_if_data_exists_at_geoscale
 
+# per-build store of the allocation and helper FBAs that are loaded for
+# several activity sets, holding the FBAs with standardized units and the
+# FBAs with sectors added. Frames are stored once and copies are returned.
+# The store is emptied at the start and end of each FBS build. The store is
+# in-process: activity sets run on forked workers (n_jobs > 1) each start
+# from the store as it was when the pool was created and do not share the
+# FBAs they prepare, so parallel builds get little or no reuse.
+ALLOCATION_FBA_CACHE_MAXSIZE = 16
+_allocation_fba_cache = OrderedDict()
+_allocation_fba_cache_stats = {'hits': 0, 'misses': 0}
+_allocation_fba_lock = threading.Lock()
 
+
+def get_cached_allocation_fba(key, load_fxn):
+    """
+    Return a prepared allocation FBA from the per-build store, preparing
+    and storing the FBA on first request. The least recently used FBA is
+    dropped when the store exceeds ALLOCATION_FBA_CACHE_MAXSIZE.
+    :param key: tuple, source, year, class, geoscale and mapping that
+        determine the prepared FBA
+    :param load_fxn: function, called with no arguments to prepare the FBA
+        if it is not already stored
+    :return: df, copy of the stored FBA
+    """
+    with _allocation_fba_lock:
+        df = _allocation_fba_cache.get(key)
+        if df is not None:
+            _allocation_fba_cache_stats['hits'] += 1
+            _allocation_fba_cache.move_to_end(key)
+            return df.copy()
+        _allocation_fba_cache_stats['misses'] += 1
+    # prepared outside the lock, activity sets may run in threads
+    df = load_fxn()
+    with _allocation_fba_lock:
+        _allocation_fba_cache[key] = df
+        while len(_allocation_fba_cache) > ALLOCATION_FBA_CACHE_MAXSIZE:
+            _allocation_fba_cache.popitem(last=False)
+    return df.copy()
+
+
+def _hashable(value):
+    """Lists and dictionaries of yaml settings as tuples, for store keys"""
+    if isinstance(value, dict):
+        return tuple(sorted((k, _hashable(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple, set)):
+        return tuple(_hashable(v) for v in value)
+    return value
+
+
+def clear_allocation_fba_cache():
+    """
+    Drop all FBAs from the per-build store and reset the hit/miss counters
+    """
+    with _allocation_fba_lock:
+        _allocation_fba_cache.clear()
+        _allocation_fba_cache_stats.update({'hits': 0, 'misses': 0})
+
+
+def allocation_fba_cache_info():
+    """
+    Return counters for the per-build allocation FBA store
+    :return: dictionary, 'hits', 'misses', and 'size' of the store
+    """
+    return {**_allocation_fba_cache_stats, 'size': len(_allocation_fba_cache)}
+
+
+@profile_stage
 def direct_allocation_method(fbs, k, names, method):
     """
     Directly assign activities to sectors
@@ -60,6 +129,7 @@ def direct_allocation_method(fbs, k, names, method):
     return fbs
 
 
+@profile_stage
 def function_allocation_method(flow_subset_mapped, k, names, attr, fbs_list,
                                method):
     """
@@ -81,6 +151,7 @@ def function_allocation_method(flow_subset_mapped, k, names, attr, fbs_list,
     return fbs
 
 
+@profile_stage
 def dataset_allocation_method(flow_subset_mapped, attr, names, method,
                               k, v, aset, download_FBA_if_missing,
                               fbsconfigpath):
@@ -304,7 +375,8 @@ def dataset_allocation_method(flow_subset_mapped, attr, names, method,
         fbs = fbs.assign(ActivityProducedBy=fbs['SectorProducedBy'],
                          ActivityConsumedBy=fbs['SectorConsumedBy'])
 
-    group_cols = list(fbs.select_dtypes(include=['object', 'int']).columns)
+    group_cols = list(fbs.select_dtypes(
+        include=['object', 'string', 'int']).columns)
     fbs2 = aggregator(fbs, group_cols)
 
     fbs3 = sector_aggregation(fbs2)
@@ -547,14 +619,45 @@ def load_map_clean_fba(method, attr, fba_sourcename, df_year, flowclass,
             attr['allocation_map_to_flow_list']
     if 'allocation_fba_load_scale' in attr:
         kwargs_dict['geographic_level'] = attr['allocation_fba_load_scale']
-
+    # load relevant activities if activities are not naics-like
+    try:
+        sm = get_activitytosector_mapping(
+            fba_sourcename, fbsconfigpath=fbsconfigpath)
+        sm_list = sm['Activity'].drop_duplicates().values.tolist()
+        kwargs_dict['activities'] = sm_list
+    except FileNotFoundError:
+        sm_list = None
+
+    # push the subsets down into the parquet reader, unless flows are mapped
+    # to the flow list before subsetting
+    if not attr.get('allocation_map_to_flow_list', False):
+        if kwargs.get('flowname_subset', 'None') != 'None':
+            kwargs_dict['flownames'] = kwargs['flowname_subset']
+        selection_fields = {}
+        if kwargs.get('compartment_subset', 'None') != 'None':
+            selection_fields['Compartment'] = kwargs['compartment_subset']
+        if 'allocation_selection_fields' in kwargs:
+            selection_fields.update(
+                {k: v for k, v in
+                 attr.get('allocation_selection_fields').items()
+                 if k not in ['Unit', 'FlowAmount']})
+        if selection_fields:
+            kwargs_dict['selection_fields'] = selection_fields
+
+    # the standardized fba is shared by the activity sets loading the same
+    # source with the same subsets
     log.info("Loading allocation flowbyactivity %s for year %s",
              fba_sourcename, str(df_year))
-    fba = load_fba_w_standardized_units(datasource=fba_sourcename,
-                                        year=df_year,
-                                        flowclass=flowclass,
-                                        **kwargs_dict
-                                        )
+    fba = get_cached_allocation_fba(
+        ('standardized', fba_sourcename, str(df_year), str(flowclass),
+         kwargs_dict.get('geographic_level'),
+         kwargs_dict.get('allocation_map_to_flow_list'), fbsconfigpath,
+         _hashable(kwargs_dict.get('flownames')),
+         _hashable(kwargs_dict.get('selection_fields'))),
+        lambda: load_fba_w_standardized_units(datasource=fba_sourcename,
+                                              year=df_year,
+                                              flowclass=flowclass,
+                                              **kwargs_dict))
 
     # subset based on yaml settings
     if 'flowname_subset' in kwargs:
@@ -578,17 +681,11 @@ def load_map_clean_fba(method, attr, fba_sourcename, df_year, flowclass,
             message='Allocation dataset is length 0; check flow or '
             'compartment subset for errors')
 
-    # load relevant activities if activities are not naics-like
-    try:
-        sm = get_activitytosector_mapping(
-            fba_sourcename, fbsconfigpath=fbsconfigpath)
-        sm_list = sm['Activity'].drop_duplicates().values.tolist()
+    if sm_list is not None:
         # subset fba data by activities listed in the sector crosswalk
         fba = fba[(fba[fba_activity_fields[0]].isin(sm_list)) |
                   (fba[fba_activity_fields[1]].isin(sm_list)
                    )].reset_index(drop=True)
-    except FileNotFoundError:
-        pass
 
     # check if allocation data exists at specified geoscale to use
     log.info("Checking if allocation data exists at the %s level",
@@ -625,14 +722,19 @@ def load_map_clean_fba(method, attr, fba_sourcename, df_year, flowclass,
         activity_to_sector_mapping = kwargs.get('activity_to_sector_mapping')
     log.info("Adding sectors to %s", fba_sourcename)
 
-    fba_wsec = add_sectors_to_flowbyactivity(
-        fba2,
-        sectorsourcename=method['target_sector_source'],
-        activity_to_sector_mapping=activity_to_sector_mapping,
-        overwrite_sectorlevel=attr.get(
-            'activity_to_sector_aggregation_level'),
-        fbsconfigpath=fbsconfigpath
-    )
+    # activity sets often clean the allocation fba the same way, so the
+    # sectors are only added once for each distinct cleaned fba
+    overwrite_sectorlevel = attr.get('activity_to_sector_aggregation_level')
+    fba_wsec = get_cached_allocation_fba(
+        ('sectors', frame_digest(fba2), method['target_sector_source'],
+         activity_to_sector_mapping, overwrite_sectorlevel, fbsconfigpath),
+        lambda: add_sectors_to_flowbyactivity(
+            fba2,
+            sectorsourcename=method['target_sector_source'],
+            activity_to_sector_mapping=activity_to_sector_mapping,
+            overwrite_sectorlevel=overwrite_sectorlevel,
+            fbsconfigpath=fbsconfigpath
+        ))
 
     # call on fxn to further clean up/disaggregate the fba
     # allocation data, if exists
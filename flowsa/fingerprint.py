@@ -0,0 +1,249 @@
+# fingerprint.py (flowsa)
+# !/usr/bin/env python3
+# coding=utf-8
+"""
+Content hashes of the inputs used to generate a FlowBySector, used to skip
+regenerating an FBS when none of its inputs changed.
+
+An FBS fingerprint is a nested dictionary of sha256 hashes:
+- 'method': the resolved method yaml (after !include, !from_index and
+  !script_function, hashing the source code of referenced functions),
+  excluding the sources, the sector crosswalks and the flowsa version
+- 'sources': for each source, a 'source' hash of the source parameters,
+  the source FBA file and activity-to-sector mapping, and an
+  'activity_sets' dictionary with a hash for each activity set of the
+  activity set parameters and the allocation, helper and additional FBAs
+  and mappings used
+"""
+
+import glob
+import hashlib
+import inspect
+import json
+import os
+from flowsa.common import load_fbs_methods_additional_fbas_config, \
+    load_functions_loading_fbas_config, get_flowsa_base_name
+from flowsa.fbastore import find_latest_output
+from flowsa.settings import datapath, crosswalkpath, WRITE_FORMAT, \
+    return_pkg_version
+
+# file hashes for the session, keyed by path, modification time and size
+_file_hash_cache = {}
+
+
+def hash_file(path):
+    """
+    sha256 of a file, hashed once per session unless the file changes
+    :param path: str, file path
+    :return: str, hex digest, None if the file does not exist
+    """
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    key = (path, st.st_mtime_ns, st.st_size)
+    if key not in _file_hash_cache:
+        h = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                h.update(chunk)
+        _file_hash_cache[key] = h.hexdigest()
+    return _file_hash_cache[key]
+
+
+def _json_default(o):
+    """Represent functions loaded with !script_function by their code"""
+    if callable(o):
+        try:
+            source = inspect.getsource(o)
+        except (OSError, TypeError):
+            source = ''
+        return {'function': f'{o.__module__}.{o.__qualname__}',
+                'source': hashlib.sha256(source.encode()).hexdigest()}
+    return str(o)
+
+
+def _str_keys(obj):
+    """Yaml keys can mix years and strings, which json can not sort"""
+    if isinstance(obj, dict):
+        return {str(k): _str_keys(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_str_keys(v) for v in obj]
+    return obj
+
+
+def hash_object(obj):
+    """
+    sha256 of a yaml dictionary or other json-like object
+    :param obj: object to hash
+    :return: str, hex digest
+    """
+    s = json.dumps(_str_keys(obj), sort_keys=True, default=_json_default)
+    return hashlib.sha256(s.encode()).hexdigest()
+
+
+def hash_fba(source, year):
+    """
+    :param source: str, FBA source name
+    :param year: int or str, FBA year
+    :return: str, hex digest of the FBA parquet, None if not saved locally
+    """
+    from flowsa.flowbyactivity import set_fba_name
+    path = find_latest_output(set_fba_name(source, year), 'FlowByActivity')
+    if path is not None and os.path.isdir(path):
+        # partitioned FBA, hash the partition files
+        files = sorted(glob.glob(f'{path}**/*.{WRITE_FORMAT}',
+                                 recursive=True))
+        return hash_object({os.path.relpath(f, path): hash_file(f)
+                            for f in files})
+    return None if path is None else hash_file(path)
+
+
+def hash_activitytosector_mappings(names, fbsconfigpath=None):
+    """
+    Hash the activity-to-sector mapping files used for a list of sources,
+    found the same way as sectormapping.get_activitytosector_mapping()
+    :param names: list, source names or activity_to_sector_mapping names
+    :param fbsconfigpath: str, optional path to an FBS method outside flowsa
+        repo
+    :return: dictionary, mapping file names and their hex digest
+    """
+    hashes = {}
+    for s in names:
+        if not isinstance(s, str) or s == 'None':
+            continue
+        mapfn = f'NAICS_Crosswalk_{s}'
+        for directory in [f"{fbsconfigpath}activitytosectormapping/",
+                          crosswalkpath]:
+            fn = get_flowsa_base_name(directory, mapfn, 'csv')
+            if os.path.isfile(f'{directory}{fn}.csv'):
+                hashes[fn] = hash_file(f'{directory}{fn}.csv')
+                break
+    return hashes
+
+
+def list_source_fbas(method_name, k, v):
+    """
+    FBAs used to attribute a source of an FBS method: the source FBA and,
+    for each activity set, the allocation and helper FBAs and the FBAs
+    loaded within functions listed in fbs_methods_additional_fbas.yaml
+    :param method_name: str, FBS method name
+    :param k: str, source name
+    :param v: dictionary, source parameters
+    :return: dictionary, None or activity set names mapped to lists of
+        (source, year) tuples
+    """
+    add_fbas = load_fbs_methods_additional_fbas_config().get(method_name, {})
+    fxn_fbas = load_functions_loading_fbas_config()
+    fbas = {None: [(k, v['year'])] if v.get('data_format') == 'FBA'
+            else []}
+    for aset, attr in (v.get('activity_sets') or {}).items():
+        fbas[aset] = []
+        for s, y in [(attr.get('allocation_source'),
+                      attr.get('allocation_source_year')),
+                     (attr.get('helper_source'),
+                      attr.get('helper_source_year'))]:
+            if isinstance(s, str) and s != 'None':
+                fbas[aset].append((s, y))
+        for fxn, fba_info in add_fbas.get(k, {}).get(aset, {}).items():
+            for fba, y in fba_info.items():
+                fbas[aset].append((fxn_fbas[fxn][fba]['source'], y))
+    return fbas
+
+
+def fbs_source_fingerprint(method_name, k, v, fbsconfigpath=None):
+    """
+    Fingerprint the inputs of a source of an FBS method
+    :param method_name: str, FBS method name
+    :param k: str, source name
+    :param v: dictionary, source parameters
+    :param fbsconfigpath: str, optional path to an FBS method outside flowsa
+        repo
+    :return: dictionary, 'source' hash and 'activity_sets' hashes
+    """
+    from flowsa.metadata import getMetadata
+
+    fbas = list_source_fbas(method_name, k, v)
+    source_inputs = {
+        'config': {i: j for i, j in v.items() if i != 'activity_sets'}}
+    if v.get('data_format') == 'FBA':
+        source_inputs['fba'] = hash_fba(k, v['year'])
+        source_inputs['mappings'] = hash_activitytosector_mappings(
+            [v.get('activity_to_sector_mapping', k)], fbsconfigpath)
+    elif v.get('data_format') == 'FBS':
+        # FBS loaded in the method are fingerprinted by their own inputs
+        source_inputs['fbs'] = getMetadata(
+            k, category='FlowBySector').get(
+            'tool_meta', {}).get('fingerprint')
+    asets = {}
+    for aset, attr in (v.get('activity_sets') or {}).items():
+        aset_inputs = {'config': attr,
+                       'fbas': {f'{s}_{y}': hash_fba(s, y)
+                                for s, y in fbas[aset]}}
+        names = [attr.get('allocation_source'), attr.get('helper_source'),
+                 attr.get('activity_to_sector_mapping'),
+                 attr.get('helper_activity_to_sector_mapping')]
+        aset_inputs['mappings'] = hash_activitytosector_mappings(
+            names, fbsconfigpath)
+        asets[aset] = hash_object(aset_inputs)
+    return {'source': hash_object(source_inputs), 'activity_sets': asets}
+
+
+def fbs_method_fingerprint(method_name, method, fbsconfigpath=None):
+    """
+    Fingerprint the inputs of an FBS method
+    :param method_name: str, FBS method name
+    :param method: dictionary, resolved FBS method yaml
+    :param fbsconfigpath: str, optional path to an FBS method outside flowsa
+        repo
+    :return: dictionary, fingerprint (see module docstring)
+    """
+    crosswalks = {os.path.basename(f): hash_file(f)
+                  for f in sorted(glob.glob(f'{datapath}*.csv'))}
+    sources = {k: fbs_source_fingerprint(method_name, k, v, fbsconfigpath)
+               for k, v in method.get('source_names', {}).items()}
+
+    return {'method': hash_object({
+                'config': {i: j for i, j in method.items()
+                           if i != 'source_names'},
+                'crosswalks': crosswalks,
+                'version': return_pkg_version()}),
+            'sources': sources}
+
+
+def read_fbs_fingerprint(method_name):
+    """
+    Return the fingerprint stored in the metadata of the most recent FBS
+    :param method_name: str, FBS method name
+    :return: dictionary, fingerprint, None if the FBS parquet or the
+        fingerprint are not found locally
+    """
+    from flowsa.metadata import getMetadata
+
+    if find_latest_output(method_name, 'FlowBySector') is None:
+        return None
+    return getMetadata(method_name, category='FlowBySector').get(
+        'tool_meta', {}).get('fingerprint')
+
+
+def compare_fingerprints(old, new):
+    """
+    List the parts of an FBS method with inputs that changed
+    :param old: dictionary, fingerprint of the stored FBS
+    :param new: dictionary, fingerprint of the current inputs
+    :return: list, 'method' if method level inputs changed, otherwise
+        (source, activity set) tuples of activity sets with changed inputs,
+        with None as activity set if the source inputs changed
+    """
+    if old is None or old.get('method') != new['method'] or \
+            old.get('sources', {}).keys() != new['sources'].keys():
+        return ['method']
+    changed = []
+    for k, v in new['sources'].items():
+        old_v = old['sources'][k]
+        if old_v['source'] != v['source']:
+            changed.append((k, None))
+            continue
+        changed.extend((k, aset) for aset, h in v['activity_sets'].items()
+                       if old_v['activity_sets'].get(aset) != h)
+    return changed
@@ -9,18 +9,27 @@ EX: --year 2015 --source USGS_NWIS_WU
 """
 
 import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 import pandas as pd
 from urllib import parse
 import flowsa
 from esupy.processed_data_mgmt import write_df_to_file
-from esupy.remote import make_url_request
 from flowsa.common import load_env_file_key, sourceconfigpath, \
     load_yaml_dict, rename_log_file, get_flowsa_base_name
-from flowsa.settings import paths, log
+from flowsa.settings import paths, log, HTTP_PER_HOST_LIMIT, set_log_files, \
+    FBA_PARTITIONED, PROFILE_STAGES, PROFILE_TRACE
+from flowsa.profiler import profile_stage, set_profile_context, \
+    enable_profiling, disable_profiling, write_profile_report, \
+    call_in_worker, merge_worker_result
 from flowsa.metadata import set_fb_meta, write_metadata
 from flowsa.flowbyfunctions import fba_fill_na_dict
 from flowsa.schema import flow_by_activity_fields
 from flowsa.dataclean import clean_df
+from flowsa.fbastore import write_partitioned_fba
+from flowsa.responsecache import ResponseCache, CACHE_MODES
+from flowsa.urlfetch import URLFetcher, request_urls
+from flowsa.workbook import clear_workbooks
 
 
 def parse_args():
@@ -33,6 +42,27 @@ def parse_args():
                     help="Year for data pull and save")
     ap.add_argument("-s", "--source", required=True,
                     help="Data source code to pull and save")
+    ap.add_argument("-w", "--workers", dest="n_jobs",
+                    type=int, required=False,
+                    help="Number of urls to request at the same time.")
+    ap.add_argument("-r", "--response_cache", choices=CACHE_MODES,
+                    required=False,
+                    help="Use the cache of raw url responses: 'use' cached "
+                         "responses, 'refresh' the cache, or 'only' use "
+                         "cached responses, working offline.")
+    ap.add_argument("-p", "--year_processes", dest="year_jobs",
+                    type=int, required=False,
+                    help="Number of years of a year range to generate in "
+                         "parallel processes, each with its own log file.")
+    ap.add_argument("--partitioned", action="store_true", default=None,
+                    help="Save the FBA as a dataset partitioned by Class, "
+                         "geographic level and Year.")
+    ap.add_argument("--profile", action="store_true", default=None,
+                    help="Save the time, memory and rows of each stage "
+                         "next to the log file.")
+    ap.add_argument("--profile_trace", action="store_true", default=None,
+                    help="With --profile, also save a trace of the stages "
+                         "that can be opened as a flame graph.")
     args = vars(ap.parse_args())
     return args
 
@@ -47,6 +77,7 @@ def set_fba_name(source, year):
     return source if year is None else f'{source}_{year}'
 
 
+@profile_stage
 def assemble_urls_for_query(*, source, year, config):
     """
     Calls on helper functions defined in source.py files to
@@ -87,7 +118,9 @@ def assemble_urls_for_query(*, source, year, config):
         return [build_url]
 
 
-def call_urls(*, url_list, source, year, config):
+@profile_stage
+def call_urls(*, url_list, source, year, config, n_jobs=None,
+              response_cache=None):
     """
     This method calls all the urls that have been generated.
     It then calls the processing method to begin processing the returned data.
@@ -97,6 +130,11 @@ def call_urls(*, url_list, source, year, config):
     :param source: str, data source
     :param year: str, year
     :param config: dictionary, FBA yaml
+    :param n_jobs: int, number of urls to request at the same time, default
+        requests urls one at a time. Responses are processed in url order
+    :param response_cache: str, mode of the raw response cache, 'off',
+        'use', 'refresh' or 'only', defaults to RESPONSE_CACHE_MODE in
+        settings.py
     :return: list, dfs to concat and parse
     """
     # identify if url request requires cookies set
@@ -106,12 +144,23 @@ def call_urls(*, url_list, source, year, config):
     # create dataframes list by iterating through url list
     data_frames_list = []
     if url_list[0] is not None:
-        for url in url_list:
+        cache = None
+        if response_cache is None:
+            response_cache = flowsa.settings.RESPONSE_CACHE_MODE
+        if response_cache != 'off':
+            cache = ResponseCache(response_cache)
+        if n_jobs is not None and n_jobs > 1:
+            responses = URLFetcher(
+                n_jobs, per_host_limit=config.get('max_requests_per_host',
+                                                  HTTP_PER_HOST_LIMIT),
+                set_cookies=set_cookies, confirm_gdrive=confirm_gdrive,
+                cache=cache).fetch(url_list)
+        else:
+            responses = request_urls(url_list, set_cookies=set_cookies,
+                                     confirm_gdrive=confirm_gdrive,
+                                     cache=cache)
+        for url, resp in responses:
             df = None
-            log.info("Calling %s", url)
-            resp = make_url_request(url,
-                                    set_cookies=set_cookies,
-                                    confirm_gdrive=confirm_gdrive)
             fxn = config.get("call_response_fxn")
             if callable(fxn):
                 df = fxn(resp=resp, source=source, year=year,
@@ -123,10 +172,15 @@ def call_urls(*, url_list, source, year, config):
                 data_frames_list.append(df)
             elif isinstance(df, list):
                 data_frames_list.extend(df)
+        if cache is not None:
+            log.info('Response cache: %s hits, %s misses',
+                     cache.hits, cache.misses)
+            cache.evict()
 
     return data_frames_list
 
 
+@profile_stage
 def parse_data(*, df_list, source, year, config):
     """
     Calls on functions defined in source.py files, as parsing rules
@@ -149,7 +203,8 @@ def parse_data(*, df_list, source, year, config):
     return df
 
 
-def process_data_frame(*, df, source, year, config):
+@profile_stage
+def process_data_frame(*, df, source, year, config, partitioned=False):
     """
     Process the given dataframe, cleaning, converting data, and
     writing the final parquet. This method was written to move code into a
@@ -159,6 +214,8 @@ def process_data_frame(*, df, source, year, config):
     :param source: str, source name
     :param year: str, year
     :param config: dict, items in method yaml
+    :param partitioned: bool, save a dataset partitioned by Class,
+        geographic level and Year instead of a single parquet
     :return: df, FBA format, standardized
     """
     # log that data was retrieved
@@ -174,17 +231,77 @@ def process_data_frame(*, df, source, year, config):
     # save as parquet file
     name_data = set_fba_name(source, year)
     meta = set_fb_meta(name_data, "FlowByActivity")
-    write_df_to_file(flow_df, paths, meta)
+    if partitioned and len(flow_df) > 0:
+        path = write_partitioned_fba(flow_df, name_data)
+        log.info("Saved partitioned FBA to %s", path)
+    else:
+        write_df_to_file(flow_df, paths, meta)
     write_metadata(source, config, meta, "FlowByActivity", year=year)
     log.info("FBA generated and saved for %s", name_data)
     # rename the log file saved to local directory
     rename_log_file(name_data, meta)
 
 
+def generate_fba_for_year(source, year, config, n_jobs=None,
+                          response_cache=None, log_suffix=None,
+                          partitioned=False):
+    """
+    Request, parse and save the FBA(s) for a single year of a source
+    :param source: str, source name
+    :param year: str, year
+    :param config: dict, items in method yaml
+    :param n_jobs: int, number of urls to request at the same time
+    :param response_cache: str, mode of the raw response cache
+    :param log_suffix: str, if defined, log to separate files named with
+        the suffix, used when years are generated in parallel processes
+    :param partitioned: bool, save datasets partitioned by Class,
+        geographic level and Year
+    :return: parquet(s) saved to local directory
+    """
+    if log_suffix is not None:
+        set_log_files(log_suffix)
+    set_profile_context(source=set_fba_name(source, year))
+    # replace parts of urls with specific instructions from source.py
+    urls = assemble_urls_for_query(source=source, year=year, config=config)
+    # create a list with data from all source urls
+    df_list = call_urls(url_list=urls,
+                        source=source, year=year, config=config,
+                        n_jobs=n_jobs, response_cache=response_cache)
+    # concat the dataframes and parse data with specific
+    # instructions from source.py
+    log.info("Concat dataframe list and parse data")
+    dfs = parse_data(df_list=df_list,
+                     source=source, year=year, config=config)
+    # workbooks are not reused across years
+    clear_workbooks()
+    if isinstance(dfs, list):
+        for frame in dfs:
+            if not len(frame.index) == 0:
+                try:
+                    source_names = frame['SourceName']
+                    source_name = source_names.iloc[0]
+                except KeyError:
+                    source_name = source
+                process_data_frame(df=frame,
+                                   source=source_name, year=year,
+                                   config=config, partitioned=partitioned)
+    else:
+        process_data_frame(df=dfs, source=source, year=year, config=config,
+                           partitioned=partitioned)
+
+
 def main(**kwargs):
     """
     Generate FBA parquet(s)
-    :param kwargs: 'source' and 'year'
+    :param kwargs: 'source' and 'year', optionally 'n_jobs', the number of
+        urls to request at the same time, 'response_cache', the mode of
+        the raw response cache, and 'year_jobs', the number of years of a
+        year range (e.g. 2007-2009) to generate in parallel processes, and
+        'partitioned', to save partitioned datasets (defaults to
+        FBA_PARTITIONED in settings.py), 'profile', to save a report of the
+        time, memory and rows of each stage (defaults to PROFILE_STAGES),
+        and 'profile_trace', to also save a flame graph compatible trace
+        (defaults to PROFILE_TRACE)
     :return: parquet saved to local directory
     """
     # assign arguments
@@ -193,6 +310,18 @@ def main(**kwargs):
 
     source = kwargs['source']
     year = kwargs['year']
+    n_jobs = kwargs.get('n_jobs')
+    response_cache = kwargs.get('response_cache')
+    year_jobs = kwargs.get('year_jobs')
+    partitioned = kwargs.get('partitioned')
+    if partitioned is None:
+        partitioned = FBA_PARTITIONED
+    profile = kwargs.get('profile')
+    if profile is None:
+        profile = PROFILE_STAGES
+    profile_trace = kwargs.get('profile_trace')
+    if profile_trace is None:
+        profile_trace = PROFILE_TRACE
 
     # assign yaml parameters (common.py fxn), drop any extensions to FBA
     # filename if run into error
@@ -220,31 +349,41 @@ def main(**kwargs):
         log.warning(f'Years not listed in FBA method yaml: {years_list}, '
                     f'data might not exist')
 
-    for p_year in year_iter:
-        year = str(p_year)
-        # replace parts of urls with specific instructions from source.py
-        urls = assemble_urls_for_query(source=source, year=year, config=config)
-        # create a list with data from all source urls
-        df_list = call_urls(url_list=urls,
-                            source=source, year=year, config=config)
-        # concat the dataframes and parse data with specific
-        # instructions from source.py
-        log.info("Concat dataframe list and parse data")
-        dfs = parse_data(df_list=df_list,
-                         source=source, year=year, config=config)
-        if isinstance(dfs, list):
-            for frame in dfs:
-                if not len(frame.index) == 0:
-                    try:
-                        source_names = frame['SourceName']
-                        source_name = source_names.iloc[0]
-                    except KeyError:
-                        source_name = source
-                    process_data_frame(df=frame,
-                                       source=source_name, year=year,
-                                       config=config)
-        else:
-            process_data_frame(df=dfs, source=source, year=year, config=config)
+    if profile:
+        enable_profiling()
+    try:
+        if year_jobs is None or year_jobs <= 1 or len(year_iter) <= 1:
+            for p_year in year_iter:
+                generate_fba_for_year(source, str(p_year), config, n_jobs,
+                                      response_cache, partitioned=partitioned)
+            if profile:
+                write_profile_report(set_fba_name(source, year),
+                                     trace=profile_trace)
+            return
+
+        # each year is generated in its own process with its own log files,
+        # started with the default method of the platform as fork is not
+        # safe on all platforms (e.g. macOS)
+        mp_context = multiprocessing.get_context()
+        log.info(f"Generating {len(year_iter)} years of {source} on "
+                 f"{year_jobs} processes")
+        with ProcessPoolExecutor(max_workers=year_jobs,
+                                 mp_context=mp_context) as executor:
+            futures = {p_year: executor.submit(
+                call_in_worker, generate_fba_for_year, source, str(p_year),
+                config, n_jobs, response_cache,
+                log_suffix=f'{source}_{p_year}', partitioned=partitioned)
+                for p_year in year_iter}
+            for p_year, f in futures.items():
+                merge_worker_result(f.result())
+                log.info(f"Generated {source} {p_year}, see "
+                         f"flowsa_{source}_{p_year}.log")
+        if profile:
+            write_profile_report(set_fba_name(source, year),
+                                 trace=profile_trace)
+    finally:
+        if profile:
+            disable_profiling()
 
 
 if __name__ == '__main__':
@@ -19,9 +19,11 @@ from flowsa.dataclean import clean_df, replace_strings_with_NoneType, \
     replace_NoneType_with_empty_cells, standardize_units
 from flowsa.location import US_FIPS, get_state_FIPS, \
     get_county_FIPS, update_geoscale, fips_number_key
+from flowsa.naics import get_naics_hierarchy
 from flowsa.schema import flow_by_activity_fields, flow_by_sector_fields, \
     flow_by_sector_collapsed_fields, flow_by_activity_mapped_fields
 from flowsa.settings import log, vLogDetailed, vLog
+from flowsa.profiler import profile_stage
 
 
 def create_geoscale_list(df, geoscale, year='2015'):
@@ -194,21 +196,7 @@ def sector_ratios(df, sectorcolumn):
     return df_w_ratios
 
 
-def remove_parent_sectors_from_crosswalk(cw_load, sector_list):
-    """
-    Remove parent sectors to a list of sectors from the crosswalk
-    :return:
-    """
-    cw_filtered = cw_load.applymap(lambda x:
-                                   x in sector_list)
-    locations = cw_filtered[cw_filtered > 0].stack().index.tolist()
-    for r, i in locations:
-        col_index = cw_load.columns.get_loc(i)
-        cw_load.iloc[r, 0:col_index] = np.nan
-
-    return cw_load
-
-
+@profile_stage
 def sector_aggregation(df_load, return_all_possible_sector_combos=False,
                        sectors_to_exclude_from_agg=None):
     """
@@ -229,7 +217,8 @@ def sector_aggregation(df_load, return_all_possible_sector_combos=False,
     df = replace_NoneType_with_empty_cells(df_load)
 
     # determine grouping columns - based on datatype
-    group_cols = list(df.select_dtypes(include=['object', 'int']).columns)
+    group_cols = list(df.select_dtypes(
+        include=['object', 'string', 'int']).columns)
     sector_cols = ['SectorProducedBy', 'SectorConsumedBy']
     if 'Sector' in df.columns:
         sector_cols = ['Sector']
@@ -249,26 +238,15 @@ def sector_aggregation(df_load, return_all_possible_sector_combos=False,
             df = df[df_cols]
             df = df.reset_index(drop=True)
 
-    # load naics length crosswwalk
-    cw_load = load_crosswalk('sector_length')
-    # remove any parent sectors of sectors identified as those that should
-    # not be aggregated
-    if sectors_to_exclude_from_agg is not None:
-        # if sectors are in a dictionary create cw for sectorproducedby and
-        # sectorconsumedby otherwise single cr
-        if isinstance(sectors_to_exclude_from_agg, dict):
-            cws = {}
-            for s in sector_cols:
-                try:
-                    cw = remove_parent_sectors_from_crosswalk(
-                        cw_load, sectors_to_exclude_from_agg[s])
-                    cws[s] = cw
-                except KeyError:
-                    cws[s] = cw_load
-            cw_load = cws.copy()
-        else:
-            cw_load = remove_parent_sectors_from_crosswalk(
-                cw_load, sectors_to_exclude_from_agg)
+    # compiled naics hierarchy for each sector column, removing any parent
+    # sectors of sectors identified as those that should not be aggregated.
+    # Dictionary if separate lists for SectorProducedBy and SectorConsumedBy
+    if isinstance(sectors_to_exclude_from_agg, dict):
+        naics = {s: get_naics_hierarchy(sectors_to_exclude_from_agg.get(s))
+                 for s in sector_cols}
+    else:
+        naics = {s: get_naics_hierarchy(sectors_to_exclude_from_agg)
+                 for s in sector_cols}
 
     # find the longest length sector
     length = df[sector_cols].apply(lambda x: x.str.len()).max().max()
@@ -278,9 +256,9 @@ def sector_aggregation(df_load, return_all_possible_sector_combos=False,
     for i in range(length, 2, -1):
         if return_all_possible_sector_combos:
             for j in range(1, i-1):
-                df = append_new_sectors(df, i, j, cw_load, group_cols)
+                df = append_new_sectors(df, i, j, naics, group_cols)
         else:
-            df = append_new_sectors(df, i, 1, cw_load, group_cols)
+            df = append_new_sectors(df, i, 1, naics, group_cols)
 
     if 'ActivityProducedBy' in df_load.columns:
         # if activities are source-like, set col values as
@@ -296,59 +274,30 @@ def sector_aggregation(df_load, return_all_possible_sector_combos=False,
     return df
 
 
-def append_new_sectors(df, i, j, cw_load, group_cols):
+def append_new_sectors(df, i, j, naics, group_cols):
     """
     Function to append new sectors at more aggregated levels
     :param df: df, FBS
     :param i: numeric, sector length to aggregate
     :param j: numeric, value to subtract from sector length for new sector
     length to add
-    :param cw_load: df, sector crosswalk
+    :param naics: dict, NAICSHierarchy for each sector column
     :param group_cols: list, cols to group by
-    :param sectors_to_exclude_from_agg: list, sectors that should not be
-    aggregated beyond the sector level provided
     :return:
     """
-
-    # load crosswalk
-    sector_merge = 'NAICS_' + str(i)
-    sector_add = 'NAICS_' + str(i - j)
-
-    cw_dict = {}
-    if 'Sector' in df.columns:
-        cw_dict['Sector'] = cw_load[
-            [sector_merge, sector_add]].drop_duplicates()
-    else:
-        if isinstance(cw_load, dict):
-            for s in ['Produced', 'Consumed']:
-                cw = cw_load[f'Sector{s}By'][[sector_merge,
-                                              sector_add]].drop_duplicates()
-                cw_dict[s] = cw
-        else:
-            cw_dict['SectorProducedBy'] = cw_load[
-                [sector_merge, sector_add]].drop_duplicates()
-            cw_dict['SectorConsumedBy'] = cw_load[
-                [sector_merge, sector_add]].drop_duplicates()
-
-    cw_melt = load_sector_length_cw_melt()
-    cw_sub = cw_melt[cw_melt['SectorLength'] == i]
-    sector_list = cw_sub['Sector'].drop_duplicates().values.tolist()
+    cols = [e for e in df.columns if e in
+            ['FlowName', 'Flowable', 'Class', 'SectorProducedBy',
+             'SectorConsumedBy', 'Sector', 'Compartment', 'Context',
+             'Location', 'Unit', 'FlowType', 'Year']]
 
     # loop through and add additional sectors
-    if 'Sector' in df.columns:
-        sectype_list = ['Sector']
-    else:
-        sectype_list = ['SectorProducedBy', 'SectorConsumedBy']
-    for s in sectype_list:
-        dfm = df[df[s].isin(sector_list)]
-        dfm = dfm.merge(cw_dict[s], how='left', left_on=[s],
-                        right_on=sector_merge)
-        # replace sector column with matched sector add
-        dfm[s] = np.where(
-            ~dfm[sector_add].isnull(), dfm[sector_add],
-            dfm[s])
-        dfm = dfm.drop(columns=[sector_merge, sector_add])
-        dfm = replace_NoneType_with_empty_cells(dfm)
+    for s, hierarchy in naics.items():
+        dfm = df[df[s].isin(hierarchy.sectors_at_level(i))]
+        if len(dfm) == 0:
+            continue
+        # replace sector column with the parent sector, if one exists
+        dfm = dfm.assign(**{s: dfm[s].map(
+            hierarchy.parent_map(i, i - j)).fillna(dfm[s])})
 
         # aggregate the new sector flow amounts
         if 'FlowAmount' in dfm.columns:
@@ -360,21 +309,18 @@ def append_new_sectors(df, i, j, cw_load, group_cols):
                 .sum().reset_index()
         # append to df
         agg_sectors = replace_NoneType_with_empty_cells(agg_sectors)
-        cols = [e for e in df.columns if e in
-                ['FlowName', 'Flowable', 'Class', 'SectorProducedBy',
-                 'SectorConsumedBy', 'Sector', 'Compartment', 'Context',
-                 'Location', 'Unit', 'FlowType', 'Year']]
-        # get copies where the indices are the columns of interest
-        df_2 = df.set_index(cols)
-        agg_sectors_2 = agg_sectors.set_index(cols)
-        # Look for index overlap, ~
-        dfi = agg_sectors[~agg_sectors_2.index.isin(df_2.index)]
+        # only append sectors that do not already exist in the df, the only
+        # rows that can overlap are those sharing a sector value
+        df_2 = df[df[s].isin(agg_sectors[s].unique())]
+        dfi = agg_sectors[~pd.MultiIndex.from_frame(agg_sectors[cols]).isin(
+            pd.MultiIndex.from_frame(df_2[cols]))]
         df = pd.concat([df, dfi], ignore_index=True).reset_index(
             drop=True)
 
     return df
 
 
+@profile_stage
 def sector_disaggregation(df_load):
     """
     function to disaggregate sectors if there is only one
@@ -829,7 +775,7 @@ def equally_allocate_suppressed_parent_to_child_naics(
     cw_load = load_crosswalk('sector_length')
     df_sup = df_sup.assign(SectorMatchFlow=np.nan)
     merge_cols = list(df_sup.select_dtypes(
-        include=['object', 'int']).columns)
+        include=['object', 'string', 'int']).columns)
     # also drop sector and description cols
     merge_cols = [c for c in merge_cols
                   if c not in ['SectorConsumedBy', 'SectorProducedBy',
@@ -1022,7 +968,8 @@ def load_fba_w_standardized_units(datasource, year, **kwargs):
     :param datasource: string, FBA source name
     :param year: int, year of data
     :param kwargs: optional parameters include flowclass, geographic_level,
-           download_if_missing, allocation_map_to_flow_list
+           download_if_missing, allocation_map_to_flow_list and the filters
+           of getFlowByActivity() (activities, flownames, selection_fields)
     :return: fba df with standardized units
     """
 
@@ -1030,14 +977,14 @@ def load_fba_w_standardized_units(datasource, year, **kwargs):
 
     # determine if any addtional parameters required to load a Flow-By-Activity
     # add parameters to dictionary if exist in method yaml
-    fba_dict = {}
-    if 'flowclass' in kwargs:
-        fba_dict['flowclass'] = kwargs['flowclass']
-    if 'geographic_level' in kwargs:
-        fba_dict['geographic_level'] = kwargs['geographic_level']
-    if 'download_FBA_if_missing' in kwargs:
-        fba_dict['download_FBA_if_missing'] = kwargs['download_FBA_if_missing']
-    # load the allocation FBA
+    fba_dict = {k: kwargs[k] for k in
+                ['flowclass', 'geographic_level', 'download_FBA_if_missing',
+                 'location_prefix', 'activities', 'flownames',
+                 'selection_fields'] if k in kwargs}
+    # load the allocation FBA, the filters are applied while reading the
+    # parquet, so only the matching rows are loaded. The whole FBA is not
+    # kept in the in-process FBA store, prepared allocation FBAs are reused
+    # across activity sets by fbs_allocation.get_cached_allocation_fba()
     fba = flowsa.getFlowByActivity(
         datasource, year, **fba_dict).reset_index(drop=True)
     # convert to standardized units either by mapping to federal
@@ -1178,7 +1125,8 @@ def subset_and_merge_df_by_sector_lengths(
                                   df2["SectorConsumedBy"], df2["SCB_tmp"])
 
     # merge the dfs
-    merge_cols = list(df1.select_dtypes(include=['object', 'int']).columns)
+    merge_cols = list(df1.select_dtypes(
+        include=['object', 'string', 'int']).columns)
     # also drop activity and description cols
     merge_cols = [c for c in merge_cols
                   if c not in ['SectorConsumedBy', 'SectorProducedBy',
@@ -21,29 +21,44 @@ you need functions to clean up the FBA
 """
 
 import argparse
+import multiprocessing
+import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, \
+    Future
 import pandas as pd
 from esupy.processed_data_mgmt import write_df_to_file
 import flowsa
 from flowsa.allocation import equally_allocate_parent_to_child_naics
+from flowsa.checkpoint import checkpoint_name, find_checkpoint, \
+    write_checkpoint, load_checkpoints, clear_checkpoints, \
+    prune_checkpoints
 from flowsa.common import check_activities_sector_like, str2bool, \
     fba_activity_fields, rename_log_file, fba_fill_na_dict, fbs_fill_na_dict, \
     fbs_default_grouping_fields, fbs_grouping_fields_w_activities, \
-    logoutputpath, load_yaml_dict
+    logoutputpath, load_yaml_dict, crosswalk_cache_info
 from flowsa.dataclean import clean_df, harmonize_FBS_columns, \
-    reset_fbs_dq_scores
+    reset_fbs_dq_scores, null_conversion_info
 from flowsa.fbs_allocation import direct_allocation_method, \
-    function_allocation_method, dataset_allocation_method
+    function_allocation_method, dataset_allocation_method, \
+    clear_allocation_fba_cache, allocation_fba_cache_info
+from flowsa.fbastore import find_latest_output
+from flowsa.fingerprint import fbs_method_fingerprint, \
+    fbs_source_fingerprint, list_source_fbas, read_fbs_fingerprint, \
+    compare_fingerprints, hash_object
 from flowsa.flowbyfunctions import agg_by_geoscale, sector_aggregation, \
     aggregator, subset_df_by_geoscale, sector_disaggregation, \
     update_geoscale, subset_df_by_sector_list, add_attribution_sources_col
-from flowsa.location import merge_urb_cnty_pct
+from flowsa.location import merge_urb_cnty_pct, US_FIPS
 from flowsa.metadata import set_fb_meta, write_metadata
 from flowsa.schema import flow_by_activity_fields, flow_by_sector_fields, \
     flow_by_sector_fields_w_activity
 from flowsa.sectormapping import add_sectors_to_flowbyactivity, \
     map_fbs_flows, get_sector_list, append_material_code, \
     map_to_material_crosswalk
-from flowsa.settings import log, vLog, paths
+from flowsa.settings import log, vLog, paths, PROFILE_STAGES, PROFILE_TRACE
+from flowsa.profiler import profile_stage, stage, set_profile_context, \
+    enable_profiling, disable_profiling, write_profile_report, \
+    call_in_worker, merge_worker_result
 from flowsa.validation import compare_activity_to_sector_flowamounts, \
     compare_fba_geo_subset_and_fbs_output_totals, compare_geographic_totals,\
     replace_naics_w_naics_from_another_year, check_for_negative_flowamounts, \
@@ -68,10 +83,27 @@ def parse_args():
                     type=str2bool, required=False,
                     help="Option to download any FBAs not saved locally "
                          "rather than generating the FBAs in FLOWSA.")
+    ap.add_argument("-w", "--workers", dest="n_jobs",
+                    type=int, required=False,
+                    help="Number of workers used to attribute the activity "
+                         "sets of a source in parallel. Workers do not "
+                         "reuse the allocation FBAs prepared by other "
+                         "workers.")
+    ap.add_argument("-f", "--force_rebuild",
+                    type=str2bool, required=False,
+                    help="Option to regenerate the FBS even if none of "
+                         "the inputs changed since it was last generated.")
+    ap.add_argument("--profile", action="store_true", default=None,
+                    help="Save the time, memory and rows of each stage "
+                         "next to the log file.")
+    ap.add_argument("--profile_trace", action="store_true", default=None,
+                    help="With --profile, also save a trace of the stages "
+                         "that can be opened as a flame graph.")
     args = vars(ap.parse_args())
     return args
 
 
+@profile_stage
 def load_source_dataframe(method, sourcename, source_dict,
                           download_FBA_if_missing, fbsconfigpath=None):
     """
@@ -125,6 +157,331 @@ def load_source_dataframe(method, sourcename, source_dict,
     return flows_df
 
 
+def process_activity_set(flows_subset, flows_mapped, k, v, aset, attr,
+                         method, fbs_list, download_FBA_if_missing,
+                         fbsconfigpath=None):
+    """
+    Attribute a single activity set of a FlowByActivity to sectors
+    :param flows_subset: df, mapped FBA subset to the activity set names
+    :param flows_mapped: df, national flows of the mapped FBA for the
+        activity set names, used to check for data loss when subsetting by
+        geoscale
+    :param k: str, the datasource name
+    :param v: dictionary, the datasource parameters
+    :param aset: str, activity set name
+    :param attr: dictionary, activity set parameters
+    :param method: dictionary, FBS method
+    :param fbs_list: list, FBS dfs created for prior activity sets
+    :param download_FBA_if_missing: bool, if True will download FBAs from
+       Data Commons
+    :param fbsconfigpath, str, optional path to an FBS method outside flowsa
+        repo
+    :return: df, FBS for the activity set, None if no data remain
+    """
+    names = attr['names']
+
+    vLog.info(f"Preparing to handle {aset} in {k}")
+    if len(flows_subset) == 0:
+        log.warning(f"no data found for flows in {aset}")
+        return None
+    if len(flows_subset[flows_subset['FlowAmount'] != 0]) == 0:
+        log.warning(f"all flow data for {aset} is 0")
+        return None
+    flows_subset = flows_subset.reset_index(drop=True)
+    # if activities are sector-like, check sectors are valid
+    if check_activities_sector_like(flows_subset):
+        flows_subset2 = replace_naics_w_naics_from_another_year(
+            flows_subset, method['target_sector_source'])
+
+        # check impact on df FlowAmounts
+        vLog.info('Calculate FlowAmount difference caused by '
+                  'replacing NAICS Codes with %s, saving '
+                  'difference in Validation log',
+                  method['target_sector_source'],)
+        calculate_flowamount_diff_between_dfs(
+            flows_subset, flows_subset2)
+    else:
+        flows_subset2 = flows_subset.copy()
+
+    # extract relevant geoscale data or aggregate existing data
+    geoscale_to_use = attr.get('geoscale_to_use')
+    if geoscale_to_use is None:
+        geoscale_to_use = v['geoscale_to_use']
+    flows_subset_geo = subset_df_by_geoscale(
+        flows_subset2, geoscale_to_use, v['geoscale_to_use'])
+    # if loading data subnational geoscale, check for data loss
+    if attr['allocation_from_scale'] != 'national':
+        compare_geographic_totals(
+            flows_subset_geo, flows_mapped, k, attr, aset, names)
+
+    # Add sectors to df activity, depending on level
+    # of specified sector aggregation
+    log.info("Adding sectors to %s", k)
+    flows_subset_wsec = add_sectors_to_flowbyactivity(
+        flows_subset_geo, v.get('activity_to_sector_mapping'),
+        sectorsourcename=method['target_sector_source'],
+        allocationmethod=attr['allocation_method'],
+        fbsconfigpath=fbsconfigpath)
+    # clean up fba with sectors, if specified in yaml
+    if "clean_fba_w_sec_df_fxn" in v:
+        vLog.info("Cleaning up %s FlowByActivity with sectors", k)
+        flows_subset_wsec = v["clean_fba_w_sec_df_fxn"](
+            flows_subset_wsec,
+            attr=attr,
+            method=method
+        )
+    # check for activities at geoscale - return any missing
+    # locations for an activity
+    check_if_data_exists_at_geoscale(flows_subset_geo,
+                                     attr['allocation_from_scale'])
+    # add column of data sources
+    flows_subset_wsec = add_attribution_sources_col(
+        flows_subset_wsec, attr)
+
+    # rename SourceName to MetaSources and drop columns
+    flows_mapped_wsec = flows_subset_wsec.\
+        rename(columns={'SourceName': 'MetaSources'}).\
+        drop(columns=['FlowName', 'Compartment'])
+
+    # if allocation method is "direct", then no need
+    # to create alloc ratios, else need to use allocation
+    # dataframe to create sector allocation ratios
+    if attr['allocation_method'] == 'direct':
+        fbs = direct_allocation_method(
+            flows_mapped_wsec, k, names, method)
+    # if allocation method for an activity set requires a specific
+    # function due to the complicated nature
+    # of the allocation, call on function here
+    elif attr['allocation_method'] == 'allocation_function':
+        fbs = function_allocation_method(
+            flows_mapped_wsec, k, names, attr, fbs_list, method)
+    else:
+        fbs = dataset_allocation_method(
+            flows_mapped_wsec, attr, names, method, k, v, aset,
+            download_FBA_if_missing, fbsconfigpath)
+
+    # drop rows where flowamount = 0
+    # (although this includes dropping suppressed data)
+    fbs = fbs[fbs['FlowAmount'] != 0].reset_index(drop=True)
+
+    if len(fbs) == 0:
+        log.warning(f"after allocation, no data remain in FBS for "
+                    f"activity set {aset}")
+        return None
+
+    # define grouping columns dependent on sectors
+    # being activity-like or not
+    if check_activities_sector_like(fbs) is False:
+        groupingcols = fbs_grouping_fields_w_activities
+        groupingdict = flow_by_sector_fields_w_activity
+    else:
+        groupingcols = fbs_default_grouping_fields
+        groupingdict = flow_by_sector_fields
+
+    # clean df
+    fbs = clean_df(fbs, groupingdict, fbs_fill_na_dict)
+
+    # aggregate df geographically, if necessary
+    log.info("Aggregating flowbysector to %s level",
+             method['target_geoscale'])
+
+    fbs_geo_agg = agg_by_geoscale(
+        fbs, geoscale_to_use, method['target_geoscale'],
+        groupingcols)
+
+    # aggregate data to every sector level
+    log.info("Aggregating flowbysector to all sector levels")
+    fbs_sec_agg = sector_aggregation(fbs_geo_agg)
+    # add missing naics5/6 when only one naics5/6
+    # associated with a naics4
+    fbs_agg = sector_disaggregation(fbs_sec_agg)
+
+    # check if any sector information is lost before reaching
+    # the target sector length, if so,
+    # allocate values equally to disaggregated sectors
+    vLog.info('Searching for and allocating FlowAmounts for any '
+              'parent NAICS dropped while subsetting the '
+              'dataframe')
+    fbs_agg_2 = equally_allocate_parent_to_child_naics(
+        fbs_agg, method)
+
+    # compare child sectors to parent sectors flow amounts
+    compare_child_to_parent_sectors_flowamounts(fbs)
+
+    # compare flowbysector with flowbyactivity
+    compare_activity_to_sector_flowamounts(
+        flows_mapped_wsec, fbs_agg_2, aset, method, v, attr)
+
+    # return sector level specified in method yaml
+    # load the crosswalk linking sector lengths
+    secondary_sector_level = \
+        method.get('target_subset_sector_level')
+    sector_list = get_sector_list(
+        method['target_sector_level'],
+        secondary_sector_level_dict=secondary_sector_level)
+
+    # subset df, necessary because not all of the sectors are
+    # NAICS and can get duplicate rows
+    fbs_sector_subset = subset_df_by_sector_list(
+        fbs_agg_2, sector_list)
+
+    # drop activity columns
+    fbs_sector_subset = fbs_sector_subset.drop(
+        ['ActivityProducedBy', 'ActivityConsumedBy'], axis=1,
+        errors='ignore')
+
+    # save comparison of FBA total to FBS total for an activity set
+    compare_fba_geo_subset_and_fbs_output_totals(
+        flows_subset_geo, fbs_sector_subset, aset, k, v, attr,
+        method)
+
+    if 'append_material_codes' in v:
+        fbs_sector_subset = append_material_code(
+            fbs_sector_subset, v, attr)
+
+    log.info(f"Completed flowbysector for {aset}")
+    return fbs_sector_subset
+
+
+def checkpoint_activity_set(method_name, key, *args):
+    """
+    Run process_activity_set() and save the result to the checkpoint store
+    :param method_name: str, FBS method name
+    :param key: str, fingerprint of the activity set inputs
+    :param args: arguments to process_activity_set()
+    :return: str, checkpoint name
+    """
+    name = checkpoint_name(args[2], args[4])
+    with stage('process_activity_set', rows_in=len(args[0]),
+               source=args[2], activity_set=args[4]) as record:
+        fbs = process_activity_set(*args)
+        record['rows_out'] = None if fbs is None else len(fbs)
+    write_checkpoint(fbs, method_name, name, key)
+    return name
+
+
+def ensure_source_fbas(method_name, k, v, download_FBA_if_missing):
+    """
+    Generate or download the FBAs used to attribute a source that are not
+    saved locally, so the checkpoint keys of its activity sets are
+    computed from the FBA files that are used
+    :param method_name: str, FBS method name
+    :param k: str, the datasource name
+    :param v: dictionary, the datasource parameters
+    :param download_FBA_if_missing: bool, if True will download FBAs from
+       Data Commons
+    """
+    for fbas in list_source_fbas(method_name, k, v).values():
+        for s, y in fbas:
+            if find_latest_output(flowsa.flowbyactivity.set_fba_name(s, y),
+                                  'FlowByActivity') is None:
+                # only a single column is loaded
+                flowsa.getFlowByActivity(
+                    s, y, columns=['Year'],
+                    download_FBA_if_missing=download_FBA_if_missing)
+
+
+def activity_set_checkpoint_keys(k, v, fingerprint, prior_keys):
+    """
+    Checkpoint keys for the activity sets of a source, from the fingerprint
+    of the method, the source and the activity set. Activity set subsets
+    depend on the names in prior activity sets and activity sets allocated
+    with an 'allocation_function' depend on the FBS of all prior activity
+    sets, so their keys include these.
+    :param k: str, the datasource name
+    :param v: dictionary, the datasource parameters
+    :param fingerprint: dictionary, fingerprint of the method inputs
+    :param prior_keys: list, keys of the prior sources and activity sets
+    :return: list, keys in activity set order
+    """
+    source_fp = fingerprint['sources'][k]
+    keys = []
+    ml_act = []
+    for aset, attr in v['activity_sets'].items():
+        parts = [fingerprint['method'], source_fp['source'],
+                 source_fp['activity_sets'][aset], ml_act]
+        if attr['allocation_method'] == 'allocation_function':
+            parts.extend(prior_keys + keys)
+        keys.append(hash_object(parts))
+        if v.get('retain_activity_names') is None:
+            ml_act = ml_act + attr['names']
+    return keys
+
+
+def run_activity_sets(method_name, aset_args, keys, fbs_list,
+                      download_FBA_if_missing, fbsconfigpath=None,
+                      n_jobs=None):
+    """
+    Run process_activity_set() for each activity set of a source without a
+    checkpoint for its key, optionally on a pool of worker processes, and
+    save the results to the checkpoint store. Activity sets allocated with
+    an 'allocation_function' can depend on the FBS of all prior activity
+    sets, so the pool is drained and these activity sets are run in the
+    main process.
+    :param method_name: str, FBS method name
+    :param aset_args: list, tuples of the first seven arguments to
+        process_activity_set()
+    :param keys: list, fingerprint of the inputs of each activity set
+    :param fbs_list: list, checkpoint names of prior sources
+    :param download_FBA_if_missing: bool, if True will download FBAs from
+       Data Commons
+    :param fbsconfigpath, str, optional path to an FBS method outside flowsa
+        repo
+    :param n_jobs: int, number of workers, runs in the main process if None
+        or 1. Uses forked processes on Linux, otherwise threads, as fork is
+        not safe on all platforms (e.g. macOS) and spawned processes would
+        not inherit the state of the build. Any allocation FBAs missing
+        locally should be generated or downloaded prior to running in
+        parallel. Forked workers do not share the allocation FBAs they
+        prepare, see fbs_allocation
+    :return: list, checkpoint names of the activity sets, in activity set
+        order
+    """
+    def drain(results):
+        return [merge_worker_result(r.result()) if isinstance(r, Future)
+                else r for r in results]
+
+    executor = None
+    if n_jobs is not None and n_jobs > 1 and len(aset_args) > 1:
+        if sys.platform.startswith('linux'):
+            executor = ProcessPoolExecutor(
+                max_workers=n_jobs,
+                mp_context=multiprocessing.get_context('fork'))
+        else:
+            executor = ThreadPoolExecutor(max_workers=n_jobs)
+        log.info(f"Running {len(aset_args)} activity sets on "
+                 f"{n_jobs} workers")
+    results = []
+    try:
+        for args, key in zip(aset_args, keys):
+            k, aset, attr = args[2], args[4], args[5]
+            if find_checkpoint(method_name, checkpoint_name(k, aset),
+                               key) is not None:
+                log.info(f"Loading {aset} in {k} from checkpoint")
+                results.append(checkpoint_name(k, aset))
+            elif attr['allocation_method'] == 'allocation_function':
+                # wait for all prior activity sets to complete
+                results = drain(results)
+                results.append(checkpoint_activity_set(
+                    method_name, key, *args,
+                    list(load_checkpoints(method_name, fbs_list + results)),
+                    download_FBA_if_missing, fbsconfigpath))
+            elif executor is None:
+                results.append(checkpoint_activity_set(
+                    method_name, key, *args, [],
+                    download_FBA_if_missing, fbsconfigpath))
+            else:
+                results.append(executor.submit(
+                    call_in_worker, checkpoint_activity_set, method_name,
+                    key, *args, [], download_FBA_if_missing, fbsconfigpath))
+        results = drain(results)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    return results
+
+
 def main(**kwargs):
     """
     Creates a flowbysector dataset
@@ -132,6 +489,15 @@ def main(**kwargs):
         "method": the name of method corresponding to flowbysector
         "fbsconfigpath":
         "download_FBAs_if_missing":
+        "n_jobs": number of workers used to attribute activity sets in
+            parallel, default runs activity sets sequentially
+        "force_rebuild": if True, delete the checkpoints and regenerate
+            the FBS even if the fingerprint of its inputs matches the
+            stored FBS
+        "profile": if True, save a report of the time, memory and rows of
+            each stage, defaults to PROFILE_STAGES in settings.py
+        "profile_trace": if True, also save the stages as a flame graph
+            compatible trace, defaults to PROFILE_TRACE in settings.py
     :return: parquet, FBS save to local folder
     """
     if len(kwargs) == 0:
@@ -140,8 +506,10 @@ def main(**kwargs):
     method_name = kwargs['method']
     fbsconfigpath = kwargs.get('fbsconfigpath')
     download_FBA_if_missing = kwargs.get('download_FBAs_if_missing')
+    n_jobs = kwargs.get('n_jobs')
     # assign arguments
     vLog.info(f"Initiating flowbysector creation for {method_name}")
+    null_conversion_info(reset=True)
     # call on method
     method = load_yaml_dict(method_name, flowbytype='FBS',
                             filepath=fbsconfigpath)
@@ -152,9 +520,90 @@ def main(**kwargs):
         log.error("parameter 'source_names' not found in method. "
                   f"FBS for {method_name} can not be generated.")
         return
-    # Create empty list for storing fbs files
+    # skip generating the FBS if none of the inputs changed
+    fingerprint = fbs_method_fingerprint(method_name, method, fbsconfigpath)
+    changed = compare_fingerprints(read_fbs_fingerprint(method_name),
+                                   fingerprint)
+    if not changed and not kwargs.get('force_rebuild'):
+        log.info(f'Inputs to {method_name} are unchanged since the FBS was '
+                 'last generated, skipping. Use force_rebuild to regenerate')
+        return
+    if kwargs.get('force_rebuild'):
+        clear_checkpoints(method_name)
+    profile = kwargs.get('profile')
+    if profile is None:
+        profile = PROFILE_STAGES
+    if profile:
+        enable_profiling()
+    try:
+        generate_fbs(method_name, method, fingerprint, changed,
+                     fbsconfigpath=fbsconfigpath,
+                     download_FBA_if_missing=download_FBA_if_missing,
+                     n_jobs=n_jobs, profile=profile,
+                     profile_trace=kwargs.get('profile_trace'))
+    finally:
+        if profile:
+            disable_profiling()
+
+
+def generate_fbs(method_name, method, fingerprint, changed,
+                 fbsconfigpath=None, download_FBA_if_missing=None,
+                 n_jobs=None, profile=False, profile_trace=None):
+    """
+    Attribute the sources of an FBS method to sectors and save the FBS
+    :param method_name: str, name of the FBS method
+    :param method: dictionary, FBS method yaml
+    :param fingerprint: dictionary, fbs_method_fingerprint() of the method
+    :param changed: list, inputs changed since the FBS was last generated,
+        from compare_fingerprints(), activity sets with unchanged inputs
+        are loaded from their checkpoints
+    :param fbsconfigpath: str, optional path to an FBS method outside flowsa
+        repo
+    :param download_FBA_if_missing: bool, download FBAs not saved locally
+    :param n_jobs: int, number of workers attributing activity sets
+    :param profile: bool, save a report of the stages recorded
+    :param profile_trace: bool, also save a flame graph compatible trace,
+        defaults to PROFILE_TRACE in settings.py
+    :return: parquet, FBS save to local folder
+    """
+    fb = method['source_names']
+    clear_allocation_fba_cache()
+    # the checkpoint keys of the activity sets are derived from the
+    # fingerprint, so only the changed sources and activity sets (and the
+    # activity sets depending on them) are attributed again
+    if changed == ['method']:
+        log.info('Inputs changed for the method, regenerating all sources')
+    elif changed:
+        log.info('Inputs changed for %s, reusing the checkpoints of the '
+                 'other activity sets', ', '.join(
+                     k if aset is None else f'{k} {aset}'
+                     for k, aset in changed))
+    # Create empty lists for storing the checkpoint names and keys of the
+    # fbs files
     fbs_list = []
+    fbs_keys = []
     for k, v in fb.items():
+        set_profile_context(source=k)
+        # skip loading the source if all results are checkpointed
+        if v['data_format'] == 'FBA':
+            # FBAs missing at the start of the build were fingerprinted
+            # without a file hash, fingerprint the source again once its
+            # FBAs exist so the keys match when resuming the build
+            ensure_source_fbas(method_name, k, v, download_FBA_if_missing)
+            fingerprint['sources'][k] = fbs_source_fingerprint(
+                method_name, k, v, fbsconfigpath)
+            keys = activity_set_checkpoint_keys(k, v, fingerprint, fbs_keys)
+            names = [checkpoint_name(k, aset) for aset in v['activity_sets']]
+        else:
+            keys = [hash_object([fingerprint['method'],
+                                 fingerprint['sources'][k]['source']])]
+            names = [checkpoint_name(k)]
+        fbs_keys.extend(keys)
+        if all(find_checkpoint(method_name, n, key) is not None
+               for n, key in zip(names, keys)):
+            log.info(f"Loading {k} from checkpoints")
+            fbs_list.extend(names)
+            continue
         # pull fba data for allocation
         flows = load_source_dataframe(method, k, v, download_FBA_if_missing,
                                       fbsconfigpath)
@@ -201,7 +650,10 @@ def main(**kwargs):
             ml_act = []
             # create dictionary of allocation datasets for different activities
             activities = v['activity_sets']
-            # subset activity data and allocate to sector
+            # subset activity data by activity set, the subsets depend on
+            # the order of the activity sets but not on the results,
+            # so can be created prior to allocating to sectors
+            aset_args = []
             for aset, attr in activities.items():
                 # subset by named activities
                 names = attr['names']
@@ -218,177 +670,31 @@ def main(**kwargs):
                           )].reset_index(drop=True)
                     ml_act.extend(names)
 
-                vLog.info(f"Preparing to handle {aset} in {k}")
                 # subset fba data by activity
                 flows_subset = flows_mapped[
                     (flows_mapped[fba_activity_fields[0]].isin(names)) |
                     (flows_mapped[fba_activity_fields[1]].isin(names)
                      )].reset_index(drop=True)
 
+                # the national flows of the activity set names are only
+                # used to check for data loss in subnational activity sets,
+                # so the full mapped flows are not passed to the workers
+                if attr['allocation_from_scale'] != 'national':
+                    aset_flows_mapped = flows_subset[
+                        flows_subset['Location'] == US_FIPS
+                        ].reset_index(drop=True)
+                else:
+                    aset_flows_mapped = None
+
                 # subset by flowname if exists
                 if 'source_flows' in attr:
                     flows_subset = flows_subset[flows_subset['FlowName']
                                                 .isin(attr['source_flows'])]
-                if len(flows_subset) == 0:
-                    log.warning(f"no data found for flows in {aset}")
-                    continue
-                if len(flows_subset[flows_subset['FlowAmount'] != 0]) == 0:
-                    log.warning(f"all flow data for {aset} is 0")
-                    continue
-                flows_subset = flows_subset.reset_index(drop=True)
-                # if activities are sector-like, check sectors are valid
-                if check_activities_sector_like(flows_subset):
-                    flows_subset2 = replace_naics_w_naics_from_another_year(
-                        flows_subset, method['target_sector_source'])
-
-                    # check impact on df FlowAmounts
-                    vLog.info('Calculate FlowAmount difference caused by '
-                              'replacing NAICS Codes with %s, saving '
-                              'difference in Validation log',
-                              method['target_sector_source'],)
-                    calculate_flowamount_diff_between_dfs(
-                        flows_subset, flows_subset2)
-                else:
-                    flows_subset2 = flows_subset.copy()
-
-                # extract relevant geoscale data or aggregate existing data
-                geoscale_to_use = attr.get('geoscale_to_use')
-                if geoscale_to_use is None:
-                    geoscale_to_use = v['geoscale_to_use']
-                flows_subset_geo = subset_df_by_geoscale(
-                    flows_subset2, geoscale_to_use, v['geoscale_to_use'])
-                # if loading data subnational geoscale, check for data loss
-                if attr['allocation_from_scale'] != 'national':
-                    compare_geographic_totals(
-                        flows_subset_geo, flows_mapped, k, attr, aset, names)
-
-                # Add sectors to df activity, depending on level
-                # of specified sector aggregation
-                log.info("Adding sectors to %s", k)
-                flows_subset_wsec = add_sectors_to_flowbyactivity(
-                    flows_subset_geo, v.get('activity_to_sector_mapping'),
-                    sectorsourcename=method['target_sector_source'],
-                    allocationmethod=attr['allocation_method'],
-                    fbsconfigpath=fbsconfigpath)
-                # clean up fba with sectors, if specified in yaml
-                if "clean_fba_w_sec_df_fxn" in v:
-                    vLog.info("Cleaning up %s FlowByActivity with sectors", k)
-                    flows_subset_wsec = v["clean_fba_w_sec_df_fxn"](
-                        flows_subset_wsec,
-                        attr=attr,
-                        method=method
-                    )
-                # check for activities at geoscale - return any missing
-                # locations for an activity
-                check_if_data_exists_at_geoscale(flows_subset_geo,
-                                                 attr['allocation_from_scale'])
-                # add column of data sources
-                flows_subset_wsec = add_attribution_sources_col(
-                    flows_subset_wsec, attr)
-
-                # rename SourceName to MetaSources and drop columns
-                flows_mapped_wsec = flows_subset_wsec.\
-                    rename(columns={'SourceName': 'MetaSources'}).\
-                    drop(columns=['FlowName', 'Compartment'])
-
-                # if allocation method is "direct", then no need
-                # to create alloc ratios, else need to use allocation
-                # dataframe to create sector allocation ratios
-                if attr['allocation_method'] == 'direct':
-                    fbs = direct_allocation_method(
-                        flows_mapped_wsec, k, names, method)
-                # if allocation method for an activity set requires a specific
-                # function due to the complicated nature
-                # of the allocation, call on function here
-                elif attr['allocation_method'] == 'allocation_function':
-                    fbs = function_allocation_method(
-                        flows_mapped_wsec, k, names, attr, fbs_list, method)
-                else:
-                    fbs = dataset_allocation_method(
-                        flows_mapped_wsec, attr, names, method, k, v, aset,
-                        download_FBA_if_missing, fbsconfigpath)
-
-                # drop rows where flowamount = 0
-                # (although this includes dropping suppressed data)
-                fbs = fbs[fbs['FlowAmount'] != 0].reset_index(drop=True)
-
-                if len(fbs) == 0:
-                    log.warning(f"after allocation, no data remain in FBS for "
-                                f"activity set {aset}")
-                    continue
-
-                # define grouping columns dependent on sectors
-                # being activity-like or not
-                if check_activities_sector_like(fbs) is False:
-                    groupingcols = fbs_grouping_fields_w_activities
-                    groupingdict = flow_by_sector_fields_w_activity
-                else:
-                    groupingcols = fbs_default_grouping_fields
-                    groupingdict = flow_by_sector_fields
-
-                # clean df
-                fbs = clean_df(fbs, groupingdict, fbs_fill_na_dict)
-
-                # aggregate df geographically, if necessary
-                log.info("Aggregating flowbysector to %s level",
-                         method['target_geoscale'])
-
-                fbs_geo_agg = agg_by_geoscale(
-                    fbs, geoscale_to_use, method['target_geoscale'],
-                    groupingcols)
-
-                # aggregate data to every sector level
-                log.info("Aggregating flowbysector to all sector levels")
-                fbs_sec_agg = sector_aggregation(fbs_geo_agg)
-                # add missing naics5/6 when only one naics5/6
-                # associated with a naics4
-                fbs_agg = sector_disaggregation(fbs_sec_agg)
-
-                # check if any sector information is lost before reaching
-                # the target sector length, if so,
-                # allocate values equally to disaggregated sectors
-                vLog.info('Searching for and allocating FlowAmounts for any '
-                          'parent NAICS dropped while subsetting the '
-                          'dataframe')
-                fbs_agg_2 = equally_allocate_parent_to_child_naics(
-                    fbs_agg, method)
-
-                # compare child sectors to parent sectors flow amounts
-                compare_child_to_parent_sectors_flowamounts(fbs)
-
-                # compare flowbysector with flowbyactivity
-                compare_activity_to_sector_flowamounts(
-                    flows_mapped_wsec, fbs_agg_2, aset, method, v, attr)
-
-                # return sector level specified in method yaml
-                # load the crosswalk linking sector lengths
-                secondary_sector_level = \
-                    method.get('target_subset_sector_level')
-                sector_list = get_sector_list(
-                    method['target_sector_level'],
-                    secondary_sector_level_dict=secondary_sector_level)
-
-                # subset df, necessary because not all of the sectors are
-                # NAICS and can get duplicate rows
-                fbs_sector_subset = subset_df_by_sector_list(
-                    fbs_agg_2, sector_list)
-
-                # drop activity columns
-                fbs_sector_subset = fbs_sector_subset.drop(
-                    ['ActivityProducedBy', 'ActivityConsumedBy'], axis=1,
-                    errors='ignore')
-
-                # save comparison of FBA total to FBS total for an activity set
-                compare_fba_geo_subset_and_fbs_output_totals(
-                    flows_subset_geo, fbs_sector_subset, aset, k, v, attr,
-                    method)
-
-                if 'append_material_codes' in v:
-                    fbs_sector_subset = append_material_code(
-                        fbs_sector_subset, v, attr)
-
-                log.info(f"Completed flowbysector for {aset}")
-                fbs_list.append(fbs_sector_subset)
+                aset_args.append((flows_subset, aset_flows_mapped, k, v,
+                                  aset, attr, method))
+            fbs_list.extend(run_activity_sets(
+                method_name, aset_args, keys, fbs_list,
+                download_FBA_if_missing, fbsconfigpath, n_jobs))
         else:
             fxn = v.get("clean_fbs_df_fxn")
             if callable(fxn):
@@ -402,10 +708,13 @@ def main(**kwargs):
             log.info(f"Append {k} to FBS list")
             # ensure correct field datatypes and add any missing fields
             flows = clean_df(flows, flow_by_sector_fields, fbs_fill_na_dict)
-            fbs_list.append(flows)
-    # create single df of all activities
+            write_checkpoint(flows, method_name, names[0], keys[0])
+            fbs_list.extend(names)
+    set_profile_context(source=None)
+    # create single df of all activities, loading one checkpoint at a time
     log.info("Concat data for all activities")
-    fbss = pd.concat(fbs_list, ignore_index=True, sort=False)
+    fbss = pd.concat(load_checkpoints(method_name, fbs_list),
+                     ignore_index=True, sort=False)
     log.info("Clean final dataframe")
     # add missing fields, ensure correct data type,
     # add missing columns, reorder columns
@@ -429,7 +738,26 @@ def main(**kwargs):
     # save parquet file
     meta = set_fb_meta(method_name, "FlowBySector")
     write_df_to_file(fbss, paths, meta)
-    write_metadata(method_name, method, meta, "FlowBySector")
+    # fingerprint again, FBAs may have been generated or downloaded
+    write_metadata(method_name, method, meta, "FlowBySector",
+                   fingerprint=fbs_method_fingerprint(
+                       method_name, method, fbsconfigpath))
+    # keep the checkpoints of this build, so the next build only
+    # attributes the activity sets with changed inputs
+    prune_checkpoints(method_name, dict(zip(fbs_list, fbs_keys)))
+    cw_info = crosswalk_cache_info()
+    log.info('Crosswalk registry: %s hits, %s misses',
+             cw_info['hits'], cw_info['misses'])
+    alloc_info = allocation_fba_cache_info()
+    log.info('Allocation FBA store: %s hits, %s misses',
+             alloc_info['hits'], alloc_info['misses'])
+    clear_allocation_fba_cache()
+    null_info = null_conversion_info()
+    log.info('Null value conversions: %s calls, %s columns, %s cells',
+             null_info['calls'], null_info['columns'], null_info['cells'])
+    if profile:
+        write_profile_report(method_name, trace=PROFILE_TRACE
+                             if profile_trace is None else profile_trace)
     # rename the log file saved to local directory
     rename_log_file(method_name, meta)
     log.info('See the Validation log for detailed assessment of '
@@ -1,14 +1,23 @@
 from typing import IO, Callable
+import copy
+import os
+import threading
 import yaml
 import flowsa.settings
 from os import path
 import csv
 import importlib
 
+# parsed yaml files and activity set indices, keyed by path, with the
+# modification times of the files they were read from
+_parsed = {}
+_indices = {}
+_lock = threading.Lock()
 
-class FlowsaLoader(yaml.SafeLoader):
+
+class FlowsaConstructors:
     '''
-    Custom YAML loader implementing !include: tag to allow inheriting
+    Custom YAML constructors implementing !include: tag to allow inheriting
     arbitrary nodes from other yaml files.
     '''
     def __init__(self, stream: IO) -> None:
@@ -19,6 +28,8 @@ class FlowsaLoader(yaml.SafeLoader):
         self.add_constructor('!external_config', self.external_config)
         self.external_paths_to_search = []
         self.external_path_to_pass = None
+        # modification times of the files included or indexed
+        self.dependencies = {}
 
     @staticmethod
     def include(loader: 'FlowsaLoader', suffix: str, node: yaml.Node) -> dict:
@@ -35,8 +46,8 @@ class FlowsaLoader(yaml.SafeLoader):
         else:
             raise FileNotFoundError(f'{file} not found')
 
-        with open(file) as f:
-            branch = load(f, loader.external_path_to_pass)
+        branch, dependencies = _load_file(file, loader.external_path_to_pass)
+        loader.dependencies.update(dependencies)
 
         while keys:
             branch = branch[keys.pop(0)]
@@ -94,12 +105,12 @@ class FlowsaLoader(yaml.SafeLoader):
 
         activity_set = loader.construct_scalar(node)
 
-        with open(file, 'r', encoding='utf-8-sig', newline='') as f:
-            index = csv.DictReader(f)
-            return [
-                row['name'] for row in index
-                if row['activity_set'] == activity_set
-            ]
+        index, mtime = _load_index(file)
+        loader.dependencies[file] = mtime
+        return [
+            row['name'] for row in index
+            if row['activity_set'] == activity_set
+        ]
 
     @staticmethod
     def script_function(
@@ -118,12 +129,86 @@ class FlowsaLoader(yaml.SafeLoader):
         return getattr(module, loader.construct_scalar(node))
 
 
-def load(stream: IO, external_path: str = None) -> dict:
-    loader = FlowsaLoader(stream)
+class FlowsaLoader(FlowsaConstructors, yaml.SafeLoader):
+    '''Flowsa YAML loader based on the python SafeLoader'''
+
+
+if yaml.__with_libyaml__:
+    class FlowsaCLoader(FlowsaConstructors, yaml.CSafeLoader):
+        '''Flowsa YAML loader based on the libyaml CSafeLoader'''
+else:
+    FlowsaCLoader = FlowsaLoader
+
+
+def _loader_class():
+    if flowsa.settings.YAML_USE_LIBYAML:
+        return FlowsaCLoader
+    return FlowsaLoader
+
+
+def _parse(stream: IO, external_path: str = None) -> tuple:
+    loader = _loader_class()(stream)
     if external_path:
         loader.external_paths_to_search.append(external_path)
         loader.external_path_to_pass = external_path
     try:
-        return loader.get_single_data()
+        return loader.get_single_data(), loader.dependencies
     finally:
         loader.dispose()
+
+
+def load(stream: IO, external_path: str = None) -> dict:
+    return _parse(stream, external_path)[0]
+
+
+def _load_index(file: str) -> tuple:
+    '''Rows of an activity set index csv, read once per modification'''
+    mtime = os.path.getmtime(file)
+    with _lock:
+        cached = _indices.get(file)
+    if cached is not None and cached[1] == mtime:
+        return cached
+    with open(file, 'r', encoding='utf-8-sig', newline='') as f:
+        cached = (list(csv.DictReader(f)), mtime)
+    with _lock:
+        _indices[file] = cached
+    return cached
+
+
+def _load_file(file: str, external_path: str = None) -> tuple:
+    '''
+    Parsed contents of a yaml file, parsed once while neither the file nor
+    the files it includes are modified. Returns a copy of the contents and
+    the modification times of the file and its dependencies.
+    '''
+    file = path.abspath(file)
+    key = (file, external_path, _loader_class())
+    with _lock:
+        cached = _parsed.get(key)
+    if cached is not None and all(
+            path.exists(f) and os.path.getmtime(f) == mtime
+            for f, mtime in cached[1].items()):
+        return copy.deepcopy(cached[0]), dict(cached[1])
+    mtime = os.path.getmtime(file)
+    with open(file) as f:
+        data, dependencies = _parse(f, external_path)
+    dependencies[file] = mtime
+    with _lock:
+        _parsed[key] = (data, dependencies)
+    return copy.deepcopy(data), dict(dependencies)
+
+
+def load_file(file: str, external_path: str = None) -> dict:
+    '''
+    Load a yaml file, reusing the parsed contents of the file if neither it
+    nor the files it includes were modified since it was last loaded. The
+    returned dictionary is a copy and can be modified.
+    '''
+    return _load_file(file, external_path)[0]
+
+
+def clear_cache() -> None:
+    '''Drop the parsed yaml files and activity set indices'''
+    with _lock:
+        _parsed.clear()
+        _indices.clear()
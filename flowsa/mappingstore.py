@@ -0,0 +1,247 @@
+# mappingstore.py (flowsa)
+# !/usr/bin/env python3
+# coding=utf-8
+"""
+Compiled store of the activity-to-sector mappings.
+
+The NAICS_Crosswalk_*.csv files of an activitytosectormapping directory are
+compiled into a single parquet, saved in the local flowsa directory with
+the names, sizes and modification times of the csvs it was compiled from.
+The store is loaded once per session, and recompiled if any csv was added,
+removed or modified, then mappings are looked up in memory by mapping file,
+ActivitySourceName and SectorSourceName.
+
+Mappings saved with an FBS method outside the flowsa repo (fbsconfigpath)
+are compiled into their own store, and are used in place of the flowsa
+mappings of the same name.
+
+Values are stored as strings, with the dtypes of each csv as read by
+pandas, so mappings are returned with the dtypes of a csv read, e.g.
+float64 for columns without values.
+"""
+
+import glob
+import hashlib
+import json
+import os
+import threading
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from flowsa.settings import log, mappingstorepath
+
+MAPPING_FILE_PREFIX = 'NAICS_Crosswalk_'
+
+# dtypes of the csv columns that are always read as strings
+MAPPING_DTYPES = {'Activity': 'str', 'Sector': 'str'}
+
+# in-process stores, keyed by the directory the csvs were compiled from
+_mapping_stores = {}
+_mapping_store_lock = threading.Lock()
+
+
+def _csv_signature(directory):
+    """
+    :param directory: str, activitytosectormapping directory
+    :return: dictionary, mapping file name and (size, modification time)
+    """
+    signature = {}
+    for f in sorted(glob.glob(f'{directory}{MAPPING_FILE_PREFIX}*.csv')):
+        stat = os.stat(f)
+        signature[os.path.basename(f)[:-4]] = [stat.st_size,
+                                               stat.st_mtime_ns]
+    return signature
+
+
+def _store_path(directory):
+    """
+    :param directory: str, activitytosectormapping directory
+    :return: str, path of the compiled store of the directory
+    """
+    digest = hashlib.sha256(
+        os.path.abspath(directory).encode()).hexdigest()[:16]
+    return f'{mappingstorepath}activitytosectormapping_{digest}.parquet'
+
+
+def _as_strings(series):
+    """
+    Values of a csv column as strings, floats as their shortest repr so
+    they are restored exactly, missing values as None
+    """
+    if series.dtype == object:
+        return series.where(series.notna(), None)
+    return series.astype(object).map(
+        lambda x: None if pd.isna(x) else repr(x))
+
+
+def _restore_dtypes(df, dtypes):
+    """
+    :param df: df, string columns of a mapping file
+    :param dtypes: dictionary, column names and dtypes of the csv read
+    :return: df, columns with the dtypes of the csv read
+    """
+    for c, dtype in dtypes.items():
+        if dtype == 'bool':
+            df[c] = df[c].map({'True': True, 'False': False}).astype(bool)
+        elif dtype != 'object':
+            df[c] = df[c].astype(dtype)
+    return df
+
+
+def compile_mapping_store(directory, signature=None):
+    """
+    Compile the mapping csvs of a directory into a single parquet. All
+    columns are stored as strings, the columns and dtypes of each csv are
+    saved with the store.
+    :param directory: str, activitytosectormapping directory
+    :param signature: dictionary, _csv_signature() of the directory
+    :return: tuple, (df of all mappings with a 'MappingFile' column,
+        dictionary of the signature, columns and dtypes of each mapping
+        file)
+    """
+    if signature is None:
+        signature = _csv_signature(directory)
+    frames, columns, dtypes = [], {}, {}
+    for name in signature:
+        df = pd.read_csv(f'{directory}{name}.csv', dtype=MAPPING_DTYPES)
+        columns[name] = list(df.columns)
+        dtypes[name] = {c: str(t) for c, t in df.dtypes.items()}
+        df = pd.DataFrame({c: _as_strings(df[c]) for c in df.columns},
+                          index=df.index)
+        frames.append(df.assign(MappingFile=name))
+    df = (pd.concat(frames, ignore_index=True, sort=False) if frames
+          else pd.DataFrame({'MappingFile': []}, dtype=object))
+    manifest = {'signature': signature, 'columns': columns,
+                'dtypes': dtypes}
+    path = _store_path(directory)
+    try:
+        os.makedirs(mappingstorepath, exist_ok=True)
+        table = pa.Table.from_pandas(df.astype(object), preserve_index=False)
+        table = table.replace_schema_metadata(
+            {**(table.schema.metadata or {}),
+             b'flowsa_manifest': json.dumps(manifest).encode()})
+        # unique temporary name, sessions may compile the same store
+        tmp = f'{path}.{os.getpid()}_{threading.get_ident()}.tmp'
+        pq.write_table(table, tmp)
+        os.replace(tmp, path)
+        log.info('Compiled %s activity-to-sector mappings from %s to %s',
+                 len(signature), directory, path)
+    except OSError as e:
+        log.warning('Unable to save the activity-to-sector mapping store '
+                    '%s: %s', path, e)
+    return df, manifest
+
+
+def _read_mapping_store(directory, signature):
+    """
+    :return: tuple, (df, manifest) of the saved store, None if the store is
+        missing or was compiled from other csvs
+    """
+    path = _store_path(directory)
+    if not os.path.isfile(path):
+        return None
+    try:
+        metadata = pq.read_schema(path).metadata or {}
+        manifest = json.loads(metadata[b'flowsa_manifest'])
+    except (KeyError, ValueError, OSError, pa.ArrowException):
+        return None
+    # stores saved without the dtypes of the csvs are compiled again
+    if manifest['signature'] != signature or 'dtypes' not in manifest:
+        return None
+    return pd.read_parquet(path), manifest
+
+
+def load_mapping_store(directory):
+    """
+    Load the compiled mappings of a directory, compiling the csvs if the
+    saved store is missing or out of date
+    :param directory: str, activitytosectormapping directory
+    :return: dictionary, 'files' (set of mapping file names) and
+        'mappings' (df of each mapping file)
+    """
+    with _mapping_store_lock:
+        store = _mapping_stores.get(directory)
+        if store is not None:
+            return store
+        signature = _csv_signature(directory)
+        loaded = _read_mapping_store(directory, signature)
+        df, manifest = (compile_mapping_store(directory, signature)
+                        if loaded is None else loaded)
+        # missing values are NaN, as when reading the csvs
+        df = df.where(df.notna(), np.nan)
+        groups = dict(list(df.groupby('MappingFile', sort=False)))
+        mappings = {
+            name: _restore_dtypes(
+                groups[name][columns].reset_index(drop=True)
+                if name in groups else pd.DataFrame(columns=columns),
+                manifest['dtypes'][name])
+            for name, columns in manifest['columns'].items()}
+        store = {'files': set(manifest['signature']), 'mappings': mappings}
+        _mapping_stores[directory] = store
+        return store
+
+
+def find_mapping_file(store, source):
+    """
+    Name of the mapping file of a source in a store, dropping strings after
+    each underscore until the name is found, as common.get_flowsa_base_name()
+    :param store: dictionary, load_mapping_store()
+    :param source: str, the data source name
+    :return: str, mapping file name, None if not in the store
+    """
+    name = f'{MAPPING_FILE_PREFIX}{source}'
+    while '_' in name:
+        if name in store['files']:
+            return name
+        name, _ = name.rsplit('_', 1)
+    return name if name in store['files'] else None
+
+
+def get_compiled_mapping(source, fbsconfigpath=None, sectorsourcename=None):
+    """
+    Look up the activity-to-sector mapping of a source in the compiled
+    stores, using the mappings saved with an FBS method outside the flowsa
+    repo if there is one for the source
+    :param source: str, the data source name
+    :param fbsconfigpath: str, optional path to an FBS method outside flowsa
+        repo
+    :param sectorsourcename: str, optional SectorSourceName to subset
+    :return: df, the rows of the mapping file for the ActivitySourceName,
+        or all rows if there are none
+    """
+    from flowsa.settings import crosswalkpath
+    directory, store, name = crosswalkpath, None, None
+    external_mappingpath = f"{fbsconfigpath}activitytosectormapping/"
+    if fbsconfigpath is not None and os.path.isdir(external_mappingpath):
+        store = load_mapping_store(external_mappingpath)
+        name = find_mapping_file(store, source)
+        if name is not None:
+            log.info(f"Loading {name}.csv from {external_mappingpath}")
+            directory = external_mappingpath
+    if directory == crosswalkpath:
+        store = load_mapping_store(crosswalkpath)
+        name = find_mapping_file(store, source)
+    if name is None:
+        raise FileNotFoundError(
+            f'No activity-to-sector mapping for {source} in {directory}')
+    mapping = store['mappings'][name]
+    # some mapping tables will have data for multiple sources, while other
+    # mapping tables are used for multiple sources (like EPA_NEI or BEA)
+    # so if find the exact source name in the ActivitySourceName column use
+    # those rows, otherwise use all rows of the mapping file
+    mapping2 = mapping[mapping['ActivitySourceName'] == source]
+    if len(mapping2) > 0:
+        mapping = mapping2
+    if sectorsourcename is not None:
+        mapping = mapping[mapping['SectorSourceName'] == sectorsourcename]
+    return mapping.reset_index(drop=True)
+
+
+def clear_mapping_store():
+    """
+    Drop the compiled mappings from memory, necessary if the mapping csvs
+    are modified during a session
+    """
+    with _mapping_store_lock:
+        _mapping_stores.clear()
@@ -11,8 +11,8 @@ from esupy.processed_data_mgmt import FileMeta, write_metadata_to_file, \
     read_source_metadata
 from flowsa.common import load_functions_loading_fbas_config, \
     load_fbs_methods_additional_fbas_config, return_true_source_catalog_name
-from flowsa.settings import paths, PKG, PKG_VERSION_NUMBER, WRITE_FORMAT, \
-    GIT_HASH, GIT_HASH_LONG, log
+from flowsa.settings import paths, PKG, WRITE_FORMAT, log, \
+    return_pkg_version, return_git_hash, return_git_hash_long
 
 
 def set_fb_meta(name_data, category):
@@ -26,8 +26,8 @@ def set_fb_meta(name_data, category):
     fb_meta.tool = PKG
     fb_meta.category = category
     fb_meta.name_data = name_data
-    fb_meta.tool_version = PKG_VERSION_NUMBER
-    fb_meta.git_hash = GIT_HASH
+    fb_meta.tool_version = return_pkg_version()
+    fb_meta.git_hash = return_git_hash()
     fb_meta.ext = WRITE_FORMAT
     fb_meta.date_created = \
         pd.to_datetime('today').strftime('%Y-%m-%d %H:%M:%S')
@@ -42,7 +42,8 @@ def write_metadata(source_name, config, fb_meta, category, **kwargs):
     :param fb_meta: object, metadata
     :param category: string, 'FlowBySector' or 'FlowByActivity'
     :param kwargs: additional parameters, if running for FBA, define
-        "year" of data
+        "year" of data, if running for FBS, optionally define the
+        "fingerprint" of the method inputs
     :return: object, metadata that includes methodology for FBAs
     """
 
@@ -58,7 +59,8 @@ def return_fb_meta_data(source_name, config, category, **kwargs):
     :param source_name: string, FBA or FBS method name
     :param config: dictionary, FBA or FBS method
     :param category: string, "FlowByActivity" or "FlowBySector"
-    :param kwargs: additional parameters, if running for FBA, define "year"
+    :param kwargs: additional parameters, if running for FBA, define "year",
+        for FBS optionally define "fingerprint"
     :return: object, metadata for FBA or FBS method
     """
 
@@ -77,10 +79,12 @@ def return_fb_meta_data(source_name, config, category, **kwargs):
     fb_dict = {}
     # add url of FlowBy method at time of commit
     fb_dict['method_url'] = \
-        f'https://github.com/USEPA/flowsa/blob/{GIT_HASH_LONG}/flowsa/' \
-        f'methods/{category.lower()}methods/{source_name}.yaml'
+        f'https://github.com/USEPA/flowsa/blob/{return_git_hash_long()}/' \
+        f'flowsa/methods/{category.lower()}methods/{source_name}.yaml'
 
     fb_dict.update(method_data)
+    if kwargs.get('fingerprint') is not None:
+        fb_dict['fingerprint'] = kwargs['fingerprint']
 
     return fb_dict
 
@@ -0,0 +1,117 @@
+# naics.py (flowsa)
+# !/usr/bin/env python3
+# coding=utf-8
+"""
+Compiled index of the NAICS sector hierarchy, used to look up parent
+sectors without merging dataframes against the sector length crosswalk
+"""
+
+import numpy as np
+import pandas as pd
+from flowsa.common import load_crosswalk, get_cached_crosswalk
+
+
+class NAICSHierarchy:
+    """
+    Integer-coded index of a sector length crosswalk (NAICS_2 - NAICS_7).
+
+    Every sector found in a sector level column is a node. For each node the
+    index stores the node of its ancestor at every more aggregated sector
+    level (-1 if there is no ancestor). Non-NAICS codes (household and
+    government sectors) are repeated across levels in the crosswalk and are
+    a separate node at each level.
+    """
+
+    def __init__(self, cw):
+        """
+        :param cw: df, sector length crosswalk with 'NAICS_#' columns
+        """
+        self.levels = [int(c.replace('NAICS_', '')) for c in cw.columns]
+        cw = cw.reset_index(drop=True)
+
+        # node id for each cell of the crosswalk, -1 where the cell is empty
+        cells = np.full(cw.shape, -1, dtype=np.int64)
+        sectors = []
+        levels = []
+        for n, (col, level) in enumerate(zip(cw.columns, self.levels)):
+            values = cw[col]
+            present = values.notna().to_numpy()
+            codes, uniques = pd.factorize(values[present])
+            cells[present, n] = codes + len(sectors)
+            sectors.extend(uniques)
+            levels.extend([level] * len(uniques))
+        self.sectors = np.array(sectors, dtype=object)
+        self.level = np.array(levels, dtype=np.int64)
+
+        # ancestor node at each sector level, indexed by sector length
+        self.ancestors = np.full((len(self.sectors), max(self.levels) + 1),
+                                 -1, dtype=np.int64)
+        for n in range(cw.shape[1]):
+            for m in range(n):
+                rows = (cells[:, n] >= 0) & (cells[:, m] >= 0)
+                self.ancestors[cells[rows, n], self.levels[m]] = \
+                    cells[rows, m]
+
+    def sectors_at_level(self, sector_level):
+        """
+        :param sector_level: int, sector length
+        :return: array, sectors at the sector level
+        """
+        return self.sectors[self.level == sector_level]
+
+    def parent_map(self, sector_level, parent_level):
+        """
+        Series to map sectors at one level to their ancestor at a more
+        aggregated level. Sectors without an ancestor at the parent level
+        are not included.
+        :param sector_level: int, sector length to map from
+        :param parent_level: int, sector length to map to
+        :return: pd.Series, index of sectors, values of parent sectors
+        """
+        nodes = np.flatnonzero(self.level == sector_level)
+        parents = self.ancestors[nodes, parent_level]
+        nodes = nodes[parents >= 0]
+        parents = parents[parents >= 0]
+        return pd.Series(self.sectors[parents], index=self.sectors[nodes])
+
+
+def remove_parent_sectors_from_crosswalk(cw_load, sector_list):
+    """
+    Remove parent sectors to a list of sectors from the crosswalk, so the
+    sectors in the list are not aggregated to more aggregated levels
+    :param cw_load: df, sector length crosswalk
+    :param sector_list: list, sectors that should not be aggregated
+    :return: df, crosswalk with parent sectors set to null
+    """
+    hit = cw_load.isin(sector_list).to_numpy()
+    # column of the least aggregated excluded sector in each row
+    last = np.where(hit.any(axis=1),
+                    hit.shape[1] - 1 - np.argmax(hit[:, ::-1], axis=1), 0)
+    drop = np.arange(hit.shape[1]) < last[:, None]
+
+    return cw_load.mask(drop)
+
+
+def _compile_naics_hierarchy(sectors_to_exclude_from_agg):
+    cw = load_crosswalk('sector_length')
+    if sectors_to_exclude_from_agg:
+        cw = remove_parent_sectors_from_crosswalk(
+            cw, list(sectors_to_exclude_from_agg))
+    return NAICSHierarchy(cw)
+
+
+def get_naics_hierarchy(sectors_to_exclude_from_agg=None):
+    """
+    Return the compiled NAICS hierarchy, compiled once per session for each
+    list of excluded sectors and stored in the crosswalk registry
+    :param sectors_to_exclude_from_agg: list, sectors that should not be
+        aggregated beyond the sector level provided
+    :return: NAICSHierarchy
+    """
+    if sectors_to_exclude_from_agg is None:
+        key = ()
+    else:
+        key = tuple(sorted(set(sectors_to_exclude_from_agg)))
+    return get_cached_crosswalk(
+        'naics_hierarchy_' + '_'.join(key),
+        lambda: _compile_naics_hierarchy(key), copy=False)
@@ -0,0 +1,118 @@
+# pdftables.py (flowsa)
+# !/usr/bin/env python3
+# coding=utf-8
+"""
+Extract tables from the PDFs of FlowByActivity sources with tabula, saving
+the extracted tables on disk so regenerating an FBA, e.g. to fix the
+parsing of a source, does not extract the PDF again.
+
+Tables are cached per page, keyed by the hash of the PDF content, the page
+number and the tabula options. Pages missing from the cache are extracted
+together: with guess=False tabula returns one table per page, so all the
+pages are read in a single call (and a single java session). With guessed
+table areas, a page can hold any number of tables, so those pages are
+extracted one call at a time.
+"""
+
+import hashlib
+import io
+import json
+import os
+import pickle
+import threading
+import flowsa.settings
+from flowsa.settings import log, pdftablecachepath
+
+
+def pdf_table_key(content_hash, page, options):
+    """
+    :param content_hash: str, sha256 hex digest of the PDF
+    :param page: int, page number
+    :param options: dictionary, tabula options
+    :return: str, hex digest identifying the tables of the page
+    """
+    s = json.dumps([content_hash, page, options], sort_keys=True,
+                   default=str)
+    return hashlib.sha256(s.encode()).hexdigest()
+
+
+def _cache_file(key):
+    return f'{pdftablecachepath}{key}.pkl'
+
+
+def _load_cached(key):
+    try:
+        with open(_cache_file(key), 'rb') as f:
+            return pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except (pickle.UnpicklingError, EOFError):
+        log.warning('Ignoring unreadable PDF table cache file '
+                    f'{_cache_file(key)}')
+        return None
+
+
+def _save_cached(key, tables):
+    os.makedirs(pdftablecachepath, exist_ok=True)
+    # unique temporary name, pages may be saved from several threads
+    tmp = f'{_cache_file(key)}.{os.getpid()}_{threading.get_ident()}.tmp'
+    with open(tmp, 'wb') as f:
+        pickle.dump(tables, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, _cache_file(key))
+
+
+def _extract(pdf, pages, options):
+    """
+    Extract the tables of pages with tabula
+    :return: dictionary, page number and list of the tables on the page
+    """
+    # tabula starts java, so only import it when pages are extracted
+    from tabula.io import read_pdf
+    if not options.get('guess', True) and len(pages) > 1:
+        tables = read_pdf(io.BytesIO(pdf), pages=list(pages), **options)
+        if len(tables) == len(pages):
+            return {p: [t] for p, t in zip(pages, tables)}
+        log.debug(f'tabula returned {len(tables)} tables for {len(pages)} '
+                  'pages, extracting the pages separately')
+    return {p: read_pdf(io.BytesIO(pdf), pages=p, **options) for p in pages}
+
+
+def read_pdf_pages(pdf, pages, cache=None, **options):
+    """
+    Extract the tables of the pages of a PDF, using cached tables
+    :param pdf: bytes of the PDF, e.g. resp.content
+    :param pages: list of int, page numbers
+    :param cache: bool, read and save the extracted tables in the cache,
+        defaults to PDF_TABLE_CACHE in settings.py
+    :param options: options of tabula.io.read_pdf(), e.g. stream, guess
+    :return: dictionary, page number and list of the tables on the page,
+        the tables are copies and can be modified
+    """
+    if cache is None:
+        cache = flowsa.settings.PDF_TABLE_CACHE
+    pages = list(dict.fromkeys(pages))
+    content_hash = hashlib.sha256(pdf).hexdigest()
+    keys = {p: pdf_table_key(content_hash, p, options) for p in pages}
+    tables = {}
+    if cache:
+        for p in pages:
+            cached = _load_cached(keys[p])
+            if cached is not None:
+                tables[p] = cached
+    missing = [p for p in pages if p not in tables]
+    if missing:
+        log.info(f'Extracting tables from {len(missing)} PDF page(s)')
+        extracted = _extract(pdf, missing, options)
+        for p in missing:
+            tables[p] = extracted[p]
+            if cache:
+                _save_cached(keys[p], extracted[p])
+    return {p: [t.copy() for t in tables[p]] for p in pages}
+
+
+def clear_pdf_table_cache():
+    """Delete the cached PDF tables"""
+    if not os.path.isdir(pdftablecachepath):
+        return
+    for file in os.listdir(pdftablecachepath):
+        os.remove(os.path.join(pdftablecachepath, file))
@@ -0,0 +1,245 @@
+# profiler.py (flowsa)
+# !/usr/bin/env python3
+# coding=utf-8
+"""
+Stage level profiling of FBA and FBS builds.
+
+When profiling is enabled, each stage records its wall time, CPU time,
+growth of the peak resident memory of the process, and the number of rows
+in its input and output dataframes. Records are labeled with the source
+and activity set being processed, and with the enclosing stage, so nested
+stages (e.g. sector_aggregation within process_activity_set) can be
+separated.
+
+Stages are functions decorated with @profile_stage or blocks run in
+"with stage(name):". The records are saved next to the log files as
+'<name>_profile.json' and '<name>_profile.csv' and, optionally, as
+'<name>_trace.json', a Chrome trace event file that can be opened as a
+flame graph in speedscope, Perfetto or chrome://tracing.
+
+Stages run in worker processes are returned to the main process with
+call_in_worker().
+"""
+
+import contextvars
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+import pandas as pd
+from flowsa.settings import log, logoutputpath
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+PROFILE_FIELDS = ['stage', 'parent', 'source', 'activity_set', 'rows_in',
+                  'rows_out', 'start', 'wall', 'cpu', 'peak_rss_delta_mb',
+                  'pid', 'thread']
+
+_enabled = False
+_origin = time.perf_counter()
+_records = []
+_lock = threading.Lock()
+# source, activity set and stage of the code being run
+_context = contextvars.ContextVar('profile_context', default={})
+# list collecting the records of a call_in_worker() call
+_sink = contextvars.ContextVar('profile_sink', default=None)
+
+
+def enable_profiling():
+    """Start recording stages, dropping any prior records"""
+    global _enabled, _origin
+    with _lock:
+        _records.clear()
+    _origin = time.perf_counter()
+    _enabled = True
+
+
+def disable_profiling():
+    """Stop recording stages"""
+    global _enabled
+    _enabled = False
+
+
+def profiling_enabled():
+    """:return: bool, True if stages are recorded"""
+    return _enabled
+
+
+def set_profile_context(**context):
+    """
+    Label the stages run after this call, e.g. with the source being
+    processed
+    :param context: 'source' and/or 'activity_set'
+    """
+    _context.set({**_context.get(), **context})
+
+
+def _peak_rss_mb():
+    """Peak resident memory of the process in MB, None if unknown"""
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on linux, bytes on macOS
+    return rss / 1024 ** 2 if sys.platform == 'darwin' else rss / 1024
+
+
+def _rows(obj):
+    """Number of rows of a df, or of the first df in a tuple"""
+    if isinstance(obj, tuple) and len(obj) > 0:
+        obj = obj[0]
+    return len(obj) if isinstance(obj, pd.DataFrame) else None
+
+
+def _add_record(record):
+    sink = _sink.get()
+    if sink is not None:
+        sink.append(record)
+    else:
+        with _lock:
+            _records.append(record)
+
+
+@contextmanager
+def stage(name, rows_in=None, **context):
+    """
+    Record a block of code as a stage
+    :param name: str, stage name
+    :param rows_in: int, rows in the input of the stage
+    :param context: 'source' and/or 'activity_set' labels, also applied to
+        the stages nested in the block
+    :return: dictionary, the record of the stage, 'rows_out' can be set
+        within the block
+    """
+    if not _enabled:
+        yield {}
+        return
+    parent = _context.get()
+    token = _context.set({**parent, **context, 'stage': name})
+    record = {'stage': name, 'parent': parent.get('stage'),
+              'source': context.get('source', parent.get('source')),
+              'activity_set': context.get('activity_set',
+                                          parent.get('activity_set')),
+              'rows_in': rows_in, 'rows_out': None}
+    rss = _peak_rss_mb()
+    cpu = time.process_time()
+    t0 = time.perf_counter()
+    try:
+        yield record
+    finally:
+        wall = time.perf_counter() - t0
+        record.update({
+            'start': round(t0 - _origin, 6),
+            'wall': round(wall, 6),
+            'cpu': round(time.process_time() - cpu, 6),
+            'peak_rss_delta_mb': None if rss is None
+            else round(_peak_rss_mb() - rss, 1),
+            'pid': os.getpid(),
+            'thread': threading.get_ident()})
+        _context.reset(token)
+        _add_record(record)
+
+
+def profile_stage(fxn):
+    """
+    Decorator recording each call of a function as a stage named for the
+    function, rows are counted for the first argument and the result
+    """
+    @functools.wraps(fxn)
+    def wrapper(*args, **kwargs):
+        if not _enabled:
+            return fxn(*args, **kwargs)
+        rows_in = _rows(args[0]) if args else None
+        with stage(fxn.__name__, rows_in=rows_in) as record:
+            result = fxn(*args, **kwargs)
+            record['rows_out'] = _rows(result)
+        return result
+    return wrapper
+
+
+def call_in_worker(fxn, *args, **kwargs):
+    """
+    Run a function in a worker thread or process, returning the records
+    of its stages with the result. Pass the returned tuple to
+    merge_worker_result() in the main process.
+    :return: tuple, (result of fxn, list of records)
+    """
+    records = []
+    token = _sink.set(records)
+    try:
+        return fxn(*args, **kwargs), records
+    finally:
+        _sink.reset(token)
+
+
+def merge_worker_result(result):
+    """
+    Add the records returned by call_in_worker() to the records of the
+    main process
+    :param result: tuple, (result, list of records)
+    :return: the result of the function run in the worker
+    """
+    value, records = result
+    with _lock:
+        _records.extend(records)
+    return value
+
+
+def profile_records():
+    """:return: df, one row per recorded stage"""
+    with _lock:
+        return pd.DataFrame(list(_records), columns=PROFILE_FIELDS)
+
+
+def write_trace(records, path):
+    """
+    Save records as Chrome trace events, complete ('X') events with
+    timestamps and durations in microseconds, nested by start and end time
+    within each process and thread
+    :param records: df, profile_records()
+    :param path: str, file path
+    """
+    events = []
+    for r in records.to_dict('records'):
+        label = ' '.join(str(v) for v in (r['source'], r['activity_set'])
+                         if v is not None and not pd.isna(v))
+        events.append({
+            'name': r['stage'], 'cat': label or 'flowsa', 'ph': 'X',
+            'ts': round(r['start'] * 1e6), 'dur': round(r['wall'] * 1e6),
+            'pid': int(r['pid']), 'tid': int(r['thread']),
+            'args': {k: (None if pd.isna(r[k]) else r[k])
+                     for k in ('source', 'activity_set', 'rows_in',
+                               'rows_out', 'cpu', 'peak_rss_delta_mb')}})
+    with open(path, 'w') as f:
+        json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+
+
+def write_profile_report(name, trace=False):
+    """
+    Save the recorded stages to the log directory
+    :param name: str, name of the dataset, used in the file names
+    :param trace: bool, also save a flame graph compatible trace
+    :return: list, paths of the files saved
+    """
+    records = profile_records()
+    base = f'{logoutputpath}{name}'
+    paths = [f'{base}_profile.json', f'{base}_profile.csv']
+    records.to_json(paths[0], orient='records', indent=1)
+    records.to_csv(paths[1], index=False)
+    if trace:
+        paths.append(f'{base}_trace.json')
+        write_trace(records, paths[-1])
+    if len(records) > 0:
+        top = (records[records['parent'].isna()]
+               .groupby('stage')['wall'].sum()
+               .sort_values(ascending=False))
+        log.info('Profiled %s stages, top level wall time (s): %s',
+                 len(records), ', '.join(f'{k} {v:.1f}'
+                                         for k, v in top.items()))
+    log.info('Saved profile of %s to %s', name, ', '.join(paths))
+    return paths
@@ -0,0 +1,203 @@
+# responsecache.py (flowsa)
+# !/usr/bin/env python3
+# coding=utf-8
+"""
+On-disk cache of the raw http responses requested when generating
+FlowByActivity datasets, so an FBA can be re-parsed without downloading
+the source data again.
+
+Response bodies are stored once per content hash in 'objects/'. An index
+file per request (hash of the url and request options) in 'index/' holds
+the content hash, status, headers and the time the response was saved.
+Entries older than the time-to-live are ignored, and the least recently
+used entries are evicted when the bodies exceed the size limit.
+
+Cache modes:
+- 'off': no caching (default)
+- 'use': return cached responses, request and save the others
+- 'refresh': request all urls and save the responses
+- 'only': offline, return cached responses and raise
+  ResponseNotCachedError for the others
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+import requests
+from requests.structures import CaseInsensitiveDict
+import flowsa.exceptions
+from flowsa.settings import log, responsecachepath, RESPONSE_CACHE_TTL, \
+    RESPONSE_CACHE_MAX_SIZE
+
+CACHE_MODES = ('off', 'use', 'refresh', 'only')
+# seconds an unreferenced response body is kept, as the index entry of a
+# body saved by another process or thread may not be written yet
+EVICT_GRACE_PERIOD = 600
+
+
+def _remove(path):
+    """Delete a file, unless already deleted by another process"""
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+class ResponseCache:
+    """Content-addressed store of raw http responses"""
+
+    def __init__(self, mode='use', path=responsecachepath,
+                 ttl=RESPONSE_CACHE_TTL, max_size=RESPONSE_CACHE_MAX_SIZE):
+        """
+        :param mode: str, one of CACHE_MODES
+        :param path: str, cache directory
+        :param ttl: float, days a response is used for, None for no limit
+        :param max_size: int, bytes of response bodies to keep, None for no
+            limit
+        """
+        if mode not in CACHE_MODES:
+            raise ValueError(f'Response cache mode must be one of '
+                             f'{CACHE_MODES}, not {mode}')
+        self.mode = mode
+        self.path = path
+        self.ttl = ttl
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        for d in ('index', 'objects'):
+            os.makedirs(f'{self.path}{d}', exist_ok=True)
+
+    @staticmethod
+    def request_key(url, **options):
+        """
+        :param url: str, url including query parameters
+        :param options: request options that change the response
+        :return: str, hex digest identifying the request
+        """
+        s = json.dumps([url, options], sort_keys=True)
+        return hashlib.sha256(s.encode()).hexdigest()
+
+    def _index_file(self, key):
+        return f'{self.path}index/{key}.json'
+
+    def _object_file(self, content_hash):
+        return f'{self.path}objects/{content_hash}'
+
+    def get(self, url, **options):
+        """
+        Return the cached response to a request
+        :param url: str, url including query parameters
+        :param options: request options that change the response
+        :return: requests.Response, None if not cached or expired
+        """
+        if self.mode in ('off', 'refresh'):
+            return None
+        key = self.request_key(url, **options)
+        try:
+            with open(self._index_file(key), 'r') as f:
+                entry = json.load(f)
+            if self.ttl is not None and \
+                    time.time() - entry['saved'] > self.ttl * 86400:
+                raise FileNotFoundError
+            with open(self._object_file(entry['content']), 'rb') as f:
+                content = f.read()
+        except (FileNotFoundError, ValueError):
+            self.misses += 1
+            if self.mode == 'only':
+                raise flowsa.exceptions.ResponseNotCachedError(url)
+            return None
+        self.hits += 1
+        # record use of the entry for least recently used eviction
+        os.utime(self._index_file(key))
+        resp = requests.Response()
+        resp._content = content
+        resp.status_code = entry['status']
+        resp.headers = CaseInsensitiveDict(entry['headers'])
+        resp.encoding = entry['encoding']
+        resp.url = entry['url']
+        log.info("Loaded %s from response cache", url)
+        return resp
+
+    def put(self, url, resp, **options):
+        """
+        Save a successful response to the cache
+        :param url: str, url including query parameters
+        :param resp: requests.Response
+        :param options: request options that change the response
+        """
+        if self.mode in ('off', 'only') or not resp.ok:
+            return
+        content_hash = hashlib.sha256(resp.content).hexdigest()
+        object_file = self._object_file(content_hash)
+        # responses can be saved from several threads
+        tmp = f'{os.getpid()}_{threading.get_ident()}.tmp'
+        index_file = self._index_file(self.request_key(url, **options))
+        try:
+            if not os.path.isfile(object_file):
+                with open(f'{object_file}.{tmp}', 'wb') as f:
+                    f.write(resp.content)
+                os.replace(f'{object_file}.{tmp}', object_file)
+            with open(f'{index_file}.{tmp}', 'w') as f:
+                json.dump({'content': content_hash,
+                           'status': resp.status_code,
+                           'headers': dict(resp.headers),
+                           'encoding': resp.encoding,
+                           'url': resp.url,
+                           'saved': time.time()}, f)
+            os.replace(f'{index_file}.{tmp}', index_file)
+        except FileNotFoundError as e:
+            # temporary file deleted while evicting from another process
+            log.warning('Response to %s not saved to the cache: %s', url, e)
+
+    def evict(self):
+        """
+        Delete expired entries, then the least recently used entries until
+        the response bodies fit in the size limit, then any bodies no longer
+        referenced by an entry. Files being written and bodies saved within
+        EVICT_GRACE_PERIOD are kept, as other processes may be using the
+        cache.
+        """
+        entries = []
+        for fn in os.listdir(f'{self.path}index'):
+            if not fn.endswith('.json'):
+                continue
+            index_file = f'{self.path}index/{fn}'
+            try:
+                with open(index_file, 'r') as f:
+                    entry = json.load(f)
+                mtime = os.path.getmtime(index_file)
+            except FileNotFoundError:
+                continue
+            except ValueError:
+                _remove(index_file)
+                continue
+            if self.ttl is not None and \
+                    time.time() - entry['saved'] > self.ttl * 86400:
+                _remove(index_file)
+                continue
+            entries.append((mtime, index_file, entry['content']))
+        sizes = {c: os.path.getsize(self._object_file(c))
+                 for c in {e[2] for e in entries}
+                 if os.path.isfile(self._object_file(c))}
+        total = sum(sizes.values())
+        refs = {}
+        for e in entries:
+            refs[e[2]] = refs.get(e[2], 0) + 1
+        for _, index_file, c in sorted(entries):
+            if self.max_size is None or total <= self.max_size:
+                break
+            _remove(index_file)
+            refs[c] -= 1
+            if refs[c] == 0:
+                total -= sizes.get(c, 0)
+        for c in os.listdir(f'{self.path}objects'):
+            if c.endswith('.tmp') or refs.get(c, 0) > 0:
+                continue
+            try:
+                age = time.time() - os.path.getmtime(self._object_file(c))
+            except FileNotFoundError:
+                continue
+            if age > EVICT_GRACE_PERIOD:
+                _remove(self._object_file(c))
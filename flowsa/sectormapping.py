@@ -4,60 +4,35 @@
 """
 Contains mapping functions
 """
-import os.path
 import pandas as pd
 import numpy as np
 from esupy.mapping import apply_flow_mapping
 import flowsa
-from flowsa.common import get_flowsa_base_name, load_env_file_key, \
+from flowsa.common import load_env_file_key, \
     return_true_source_catalog_name, check_activities_sector_like, \
-    load_yaml_dict, fba_activity_fields, SECTOR_SOURCE_NAME
-from flowsa.dataclean import standardize_units
+    load_yaml_dict, fba_activity_fields, get_cached_crosswalk, \
+    SECTOR_SOURCE_NAME
+from flowsa.dataclean import standardize_units, frame_digest
 from flowsa.flowbyfunctions import fbs_activity_fields, load_crosswalk
+from flowsa.mappingstore import get_compiled_mapping
 from flowsa.schema import activity_fields, dq_fields
 from flowsa.settings import log
+from flowsa.profiler import profile_stage
 from flowsa.validation import replace_naics_w_naics_from_another_year
 
 
 def get_activitytosector_mapping(source, fbsconfigpath=None):
     """
-    Gets  the activity-to-sector mapping
+    Gets  the activity-to-sector mapping from the compiled mapping store
     :param source: str, the data source name
+    :param fbsconfigpath: str, optional path to an FBS method outside flowsa
+        repo, with mappings in an activitytosectormapping subdirectory
     :return: a pandas df for a standard ActivitytoSector mapping
     """
-    from flowsa.settings import crosswalkpath
-    # identify mapping file name
-    mapfn = f'NAICS_Crosswalk_{source}'
-
-    # if FBS method file loaded from outside the flowsa directory, check if
-    # there is also a crosswalk
-    external_mappingpath = f"{fbsconfigpath}activitytosectormapping/"
-    if os.path.exists(external_mappingpath):
-        activity_mapping_source_name = get_flowsa_base_name(
-            external_mappingpath, mapfn, 'csv')
-        if os.path.isfile(f"{external_mappingpath}"
-                          f"{activity_mapping_source_name}.csv"):
-            log.info(f"Loading {activity_mapping_source_name}.csv "
-                     f"from {external_mappingpath}")
-            crosswalkpath = external_mappingpath
-    activity_mapping_source_name = get_flowsa_base_name(
-        crosswalkpath, mapfn, 'csv')
-    mapping = pd.read_csv(f'{crosswalkpath}{activity_mapping_source_name}.csv',
-                          dtype={'Activity': 'str', 'Sector': 'str'})
-    # some mapping tables will have data for multiple sources, while other
-    # mapping tables are used for multiple sources (like EPA_NEI or BEA
-    # mentioned above) so if find the exact source name in the
-    # ActivitySourceName column use those rows if the mapping file returns
-    # empty, use the original mapping file subset df to keep rows where
-    # ActivitySourceName matches source name
-    mapping2 = mapping[mapping['ActivitySourceName'] == source].reset_index(
-        drop=True)
-    if len(mapping2) > 0:
-        return mapping2
-    else:
-        return mapping
+    return get_compiled_mapping(source, fbsconfigpath=fbsconfigpath)
 
 
+@profile_stage
 def add_sectors_to_flowbyactivity(
     flowbyactivity_df,
     activity_to_sector_mapping=None,
@@ -163,38 +138,73 @@ def add_sectors_to_flowbyactivity(
     return flowbyactivity_wsector_df
 
 
+def _load_naics_prefix_index(sectorsourcename):
+    """
+    Sort the sectors of the master crosswalk for a sector source name, so
+    all sectors sharing a prefix are a contiguous range
+    :param sectorsourcename: str, sectorsourcename for naics year
+    :return: df, sorted 'Sector' with the 'Position' of each sector in the
+        crosswalk
+    """
+    cw = load_crosswalk('sector_timeseries')
+    sectors = cw[sectorsourcename].drop_duplicates().dropna()
+    # drop hyphenated sectors and ensure 'None' not added to sectors
+    sectors = sectors[~sectors.str.contains("-")]
+    sectors = sectors[sectors != "None"]
+    return (pd.DataFrame({'Sector': sectors.values,
+                          'Position': np.arange(len(sectors))})
+            .sort_values('Sector', kind='stable')
+            .reset_index(drop=True))
+
+
+def get_naics_prefix_matches(prefixes, sectorsourcename):
+    """
+    Find the sectors in the master crosswalk that start with each prefix,
+    using a sorted index of the crosswalk built once per sector source name
+    :param prefixes: list-like, sectors to expand
+    :param sectorsourcename: str, sectorsourcename for naics year
+    :return: df, the matched sectors in the sectorsourcename column and the
+        prefixes in 'Sector', ordered by prefix and then by crosswalk order
+    """
+    index = get_cached_crosswalk(
+        f'naics_prefix_index_{sectorsourcename}',
+        lambda: _load_naics_prefix_index(sectorsourcename))
+    codes = index['Sector'].values.astype(str)
+    prefixes = [p for p in pd.unique(pd.Series(prefixes, dtype=object))
+                if isinstance(p, str)]
+    # sectors starting with a prefix sort between the prefix and the prefix
+    # with its last character incremented
+    upper = [p[:-1] + chr(ord(p[-1]) + 1) if p else None for p in prefixes]
+    lo = np.searchsorted(codes, np.array(prefixes, dtype=str))
+    hi = np.array([len(codes) if u is None else np.searchsorted(codes, u)
+                   for u in upper], dtype=np.int64)
+    counts = hi - lo
+    group = np.repeat(np.arange(len(prefixes)), counts)
+    rows = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts,
+                                               counts) + lo[group]
+    order = np.lexsort((index['Position'].values[rows], group))
+    return pd.DataFrame({
+        sectorsourcename: codes[rows[order]],
+        'Sector': np.array(prefixes, dtype=object)[group[order]]})
+
+
 def expand_naics_list(df, sectorsourcename):
     """
-    Add disaggregated sectors to the crosswalks.
+    Add disaggregated sectors to the crosswalks. The expanded crosswalks are
+    stored in the crosswalk registry by sector source name and contents.
     :param df: df, with sector columns
     :param sectorsourcename: str, sectorsourcename for naics year
     :return: df with additional rows for expanded sector list
     """
+    return get_cached_crosswalk(
+        f'expanded_{sectorsourcename}_{frame_digest(df)}',
+        lambda: _expand_naics_list(df, sectorsourcename))
 
-    # load master crosswalk
-    cw = load_crosswalk('sector_timeseries')
-    sectors = cw.loc[:, [sectorsourcename]]
-    # drop duplicates
-    sectors = sectors.drop_duplicates().dropna()
-    # drop rows that contain hyphenated sectors
-    sectors = sectors[
-        ~sectors[sectorsourcename].str.contains("-")].reset_index(drop=True)
-    # Ensure 'None' not added to sectors
-    sectors = sectors[sectors[sectorsourcename] != "None"]
-
-    # create list of sectors that exist in original df, which,
-    # if created when expanding sector list cannot be added
-    existing_sectors = df[['Sector']]
-    existing_sectors = existing_sectors.drop_duplicates()
-
-    naics_df = pd.DataFrame([])
-    for i in existing_sectors['Sector']:
-        dig = len(str(i))
-        n = sectors.loc[
-            sectors[sectorsourcename].apply(lambda x: x[0:dig]) == i]
-        if len(n) != 0:
-            n = n.assign(Sector=i)
-            naics_df = pd.concat([naics_df, n])
+
+def _expand_naics_list(df, sectorsourcename):
+    # sectors that exist in the original df, each expanded to the sectors
+    # in the crosswalk that share its digits
+    naics_df = get_naics_prefix_matches(df['Sector'], sectorsourcename)
 
     # merge df to retain activityname/sectortype info
     naics_expanded = df.merge(naics_df, how='left')
@@ -302,10 +312,10 @@ def convert_units_to_annual(df):
     :return: df with annual FlowAmounts
     """
     # convert unit per day to year
-    df['FlowAmount'] = np.where(df['Unit'].str.contains('/d'),
-                                df['FlowAmount'] * 365,
+    daily = df['Unit'].str.contains('/d', regex=False, na=False)
+    df['FlowAmount'] = np.where(daily, df['FlowAmount'] * 365,
                                 df['FlowAmount'])
-    df['Unit'] = df['Unit'].apply(lambda x: x.replace('/d', ""))
+    df['Unit'] = df['Unit'].str.replace('/d', '', regex=False)
 
     return df
 
@@ -367,6 +377,7 @@ def map_flows(fba, from_fba_source, flow_type='ELEMENTARY_FLOW',
     return mapped_df
 
 
+@profile_stage
 def map_fbs_flows(fbs, from_fba_source, v, **kwargs):
     """
     Identifies the mapping file and applies mapping to fbs flows
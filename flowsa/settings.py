@@ -2,6 +2,7 @@ import sys
 import os
 import logging
 import subprocess
+from functools import lru_cache
 from importlib.metadata import version
 from pathlib import Path
 from esupy.processed_data_mgmt import Paths, create_paths_if_missing
@@ -34,6 +35,10 @@ fbsoutputpath = outputpath + 'FlowBySector/'
 biboutputpath = outputpath + 'Bibliography/'
 logoutputpath = outputpath + 'Log/'
 diffpath = outputpath + 'FBSComparisons/'
+checkpointpath = outputpath + 'FBSCheckpoints/'
+responsecachepath = outputpath + 'RawResponseCache/'
+pdftablecachepath = outputpath + 'PDFTableCache/'
+mappingstorepath = outputpath + 'ActivityToSectorMapping/'
 plotoutputpath = outputpath + 'Plots/'
 
 # ensure directories exist
@@ -42,6 +47,48 @@ create_paths_if_missing(plotoutputpath)
 
 DEFAULT_DOWNLOAD_IF_MISSING = False
 
+# url requests when generating FBAs with multiple workers: maximum requests
+# to a host at the same time (FBA yamls can set 'max_requests_per_host'),
+# attempts per url, seconds to wait before the first retry and seconds to
+# wait for the server to connect or send data before a request times out
+HTTP_PER_HOST_LIMIT = 4
+HTTP_MAX_ATTEMPTS = 3
+HTTP_BACKOFF = 1.0
+HTTP_TIMEOUT = 60
+
+# cache of raw url responses used to generate FBAs: default mode ('off',
+# 'use', 'refresh' or 'only'), days a response is used for and maximum
+# bytes of responses kept
+RESPONSE_CACHE_MODE = 'off'
+RESPONSE_CACHE_TTL = 30
+RESPONSE_CACHE_MAX_SIZE = 20 * 1024 ** 3
+
+# save the tables extracted from source PDFs with tabula, so FBAs can be
+# regenerated without extracting the PDFs again
+PDF_TABLE_CACHE = True
+
+# bytes of FBAs kept in memory by getFlowByActivities() and by
+# getFlowByActivity(use_cache=True), least recently used FBAs are dropped
+FBA_CACHE_MAX_MEMORY = 2 * 1024 ** 3
+
+# save generated FBAs as datasets partitioned by Class, geographic level
+# and Year instead of a single parquet
+FBA_PARTITIONED = False
+
+# save a report of the time, memory and rows of each stage of FBA and FBS
+# builds next to the log files, and a flame graph compatible trace
+PROFILE_STAGES = False
+PROFILE_TRACE = False
+
+# parse yaml files with the libyaml based loader, when pyyaml was built
+# with libyaml
+YAML_USE_LIBYAML = False
+
+# dtype of the string columns of FBA and FBS dataframes, 'object' or
+# 'string[pyarrow]' to store them as Arrow strings, which use a fraction of
+# the memory of python string objects
+FLOWBY_STRING_DTYPE = 'object'
+
 # paths to scripts
 scriptpath = \
     os.path.dirname(os.path.dirname(os.path.abspath(__file__))
@@ -75,12 +122,13 @@ vLogDetailed.propagate = False
 
 # create handlers
 # create handler for overall logger
+# log files are opened when the first record is written
 log_fh = logging.FileHandler(logoutputpath + 'flowsa.log',
-                             mode='w', encoding='utf-8')
+                             mode='w', encoding='utf-8', delay=True)
 log_fh.setFormatter(formatter)
 # create handler for general validation information
 vLog_fh = logging.FileHandler(logoutputpath + 'validation_flowsa.log',
-                              mode='w', encoding='utf-8')
+                              mode='w', encoding='utf-8', delay=True)
 vLog_fh.setFormatter(formatter)
 # create console handler
 ch = logging.StreamHandler(sys.stdout)
@@ -98,8 +146,43 @@ vLog.addHandler(vLog_fh)
 vLogDetailed.addHandler(vLog_fh)
 
 
+def set_log_files(suffix=None):
+    """
+    Point the file handlers of the loggers to new log files, used to keep
+    separate logs for datasets generated in parallel processes
+    :param suffix: str, appended to the log file names, None for the
+        default 'flowsa.log' and 'validation_flowsa.log'
+    """
+    global log_fh, vLog_fh
+    ext = '' if suffix is None else f'_{suffix}'
+    new_log_fh = logging.FileHandler(f'{logoutputpath}flowsa{ext}.log',
+                                     mode='w', encoding='utf-8', delay=True)
+    new_log_fh.setFormatter(formatter)
+    new_vLog_fh = logging.FileHandler(
+        f'{logoutputpath}validation_flowsa{ext}.log',
+        mode='w', encoding='utf-8', delay=True)
+    new_vLog_fh.setFormatter(formatter)
+    for logger, old, new in [(log, log_fh, new_log_fh),
+                             (vLog, log_fh, new_log_fh),
+                             (vLog, vLog_fh, new_vLog_fh),
+                             (vLogDetailed, vLog_fh, new_vLog_fh)]:
+        logger.removeHandler(old)
+        logger.addHandler(new)
+    log_fh.close()
+    vLog_fh.close()
+    log_fh, vLog_fh = new_log_fh, new_vLog_fh
+
+
+def get_log_files():
+    """
+    :return: tuple, paths of the current general and validation log files
+    """
+    return log_fh.baseFilename, vLog_fh.baseFilename
+
+
+@lru_cache(maxsize=None)
 def return_pkg_version():
-    # return version with git describe
+    # return version with git describe, run once when first needed
     try:
         # set path to flowsa repository, necessary if running method files
         # outside the flowsa repo
@@ -138,14 +221,32 @@ def get_memory():
     return free_memory
 
 
+@lru_cache(maxsize=None)
+def return_git_hash_long():
+    return os.environ.get('GITHUB_SHA') or get_git_hash('long')
+
+
+def return_git_hash():
+    git_hash_long = return_git_hash_long()
+    return git_hash_long[0:7] if git_hash_long else None
+
+
 # metadata
 PKG = "flowsa"
-PKG_VERSION_NUMBER = return_pkg_version()
-GIT_HASH_LONG = os.environ.get('GITHUB_SHA') or get_git_hash('long')
-if GIT_HASH_LONG:
-    GIT_HASH = GIT_HASH_LONG[0:7]
-else:
-    GIT_HASH = None
+
+
+def __getattr__(name):
+    # the package version and git hash run git, so they are looked up when
+    # first used instead of when flowsa is imported
+    if name == 'PKG_VERSION_NUMBER':
+        return return_pkg_version()
+    if name == 'GIT_HASH_LONG':
+        return return_git_hash_long()
+    if name == 'GIT_HASH':
+        return return_git_hash()
+    raise AttributeError(f"module 'flowsa.settings' has no attribute "
+                         f"'{name}'")
+
 
 # Common declaration of write format for package data products
 WRITE_FORMAT = "parquet"
@@ -6,6 +6,7 @@ import sys
 import pytest
 import os
 import flowsa
+import flowsa.buildplan
 from flowsa import seeAvailableFlowByModels
 from flowsa.settings import diffpath, memory_limit
 from flowsa.common import check_method_status
@@ -14,18 +15,20 @@ from flowsa.test_single_FBS import compare_single_FBS_against_remote
 
 @pytest.mark.generate_fbs
 def test_generate_fbs():
-    """Generate all FBS from methods in repo."""
-    for m in flowsa.seeAvailableFlowByModels("FBS", print_method=False):
-        if m not in ['BEA_summary_target',
-                     'Electricity_gen_emissions_national_2016',
-                     'Employment_common',
-                     'GHG_national_m1',
-                     'USEEIO_summary_target'
-                     ]:
-            print("--------------------------------\n"
-                  f"Method: {m}\n"
-                  "--------------------------------")
-            flowsa.flowbysector.main(method=m, download_FBAs_if_missing=True)
+    """Generate all FBS from methods in repo, generating each FBA used in
+    the methods once."""
+    methods = [m for m in seeAvailableFlowByModels("FBS", print_method=False)
+               if m not in ['BEA_summary_target',
+                            'Electricity_gen_emissions_national_2016',
+                            'Employment_common',
+                            'GHG_national_m1',
+                            'USEEIO_summary_target'
+                            ]]
+    status = flowsa.buildplan.main(methods=methods,
+                                   download_FBAs_if_missing=True)
+    error_list = [n[1] for n, s in status.items() if s != 'built']
+    if error_list:
+        pytest.fail(f"Error generating: {', '.join(error_list)}")
 
 
 @pytest.mark.skip(reason="Perform targeted test for compare_FBS on PR")
@@ -0,0 +1,65 @@
+"""
+Test building the dependency graph of FBS methods
+"""
+import multiprocessing
+import pytest
+import flowsa.exceptions
+import flowsa.flowbysector
+import flowsa.settings
+from flowsa.buildplan import build_dependency_graph, check_for_cycles, \
+    list_buildable_methods, list_fbs_method_dependencies, fba_node, \
+    fbs_node, run_build_plan
+from flowsa.settings import log
+
+
+def test_method_dependencies():
+    graph = build_dependency_graph(['Water_national_2015_m1'])
+    deps = graph[fbs_node('Water_national_2015_m1')]
+    assert fba_node('USGS_NWIS_WU', 2015) in deps
+    assert all(graph[n] == [] for n in deps)
+
+
+def test_included_method_without_years():
+    # the base GHG method is only used through !include, its FBA sources
+    # do not have a year
+    nodes = list_fbs_method_dependencies('GHG_national_m1')
+    assert all(n[2] != 'None' for n in nodes if n[0] == 'FBA')
+    assert 'GHG_national_m1' not in list_buildable_methods()
+
+
+def test_full_build_plan():
+    methods = list_buildable_methods()
+    assert 'GHG_national_2016_m1' in methods
+    graph = build_dependency_graph(methods)
+    assert all(fbs_node(m) in graph for m in methods)
+    assert all(n[0] in ('FBA', 'FBS', 'Literature') for n in graph)
+
+
+def test_circular_dependency():
+    with pytest.raises(flowsa.exceptions.FBSMethodConstructionError):
+        check_for_cycles({fbs_node('a'): [fbs_node('b')],
+                          fbs_node('b'): [fbs_node('a')]})
+
+
+def fake_fbs_main(method, **kwargs):
+    log.info('Generating %s, force_rebuild=%s', method,
+             kwargs['force_rebuild'])
+
+
+@pytest.mark.skipif('fork' not in multiprocessing.get_all_start_methods(),
+                    reason='the stubbed FBS main is only seen by forked '
+                           'workers')
+def test_parallel_nodes_log_to_own_files(tmp_path, monkeypatch):
+    monkeypatch.setattr(flowsa.settings, 'logoutputpath', f'{tmp_path}/')
+    monkeypatch.setattr(flowsa.flowbysector, 'main', fake_fbs_main)
+    get_context = multiprocessing.get_context
+    monkeypatch.setattr(multiprocessing, 'get_context',
+                        lambda method=None: get_context('fork'))
+    graph = {fbs_node('a'): [], fbs_node('b'): []}
+    status = run_build_plan(graph, n_jobs=2, force_rebuild=True)
+    assert set(status.values()) == {'built'}
+    for method, other in (('a', 'b'), ('b', 'a')):
+        with open(f'{tmp_path}/flowsa_{method}.log') as f:
+            text = f.read()
+        assert f'Generating {method}, force_rebuild=True' in text
+        assert f'Generating {other}' not in text
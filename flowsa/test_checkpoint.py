@@ -0,0 +1,117 @@
+"""
+Test writing, resuming and invalidating the checkpoints of FBS builds
+"""
+import os
+import pandas as pd
+import pytest
+import flowsa
+from flowsa import checkpoint, fbastore, fingerprint
+from flowsa.checkpoint import write_checkpoint, find_checkpoint, \
+    load_checkpoints, clear_checkpoints, prune_checkpoints
+from flowsa.flowbysector import activity_set_checkpoint_keys, \
+    ensure_source_fbas
+from flowsa.fingerprint import fbs_method_fingerprint, \
+    fbs_source_fingerprint
+
+SOURCE = {'data_format': 'FBA', 'year': 2017,
+          'activity_sets': {
+              'a1': {'names': ['x'], 'allocation_method': 'proportional',
+                     'allocation_source': 'ALLOC',
+                     'allocation_source_year': 2017},
+              'a2': {'names': ['y'], 'allocation_method': 'direct'},
+              'a3': {'names': ['z'],
+                     'allocation_method': 'allocation_function'}}}
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(checkpoint, 'checkpointpath', f'{tmp_path}/')
+    return tmp_path
+
+
+def test_write_and_resume(store):
+    df = pd.DataFrame({'Flowable': ['a', 'b'], 'FlowAmount': [1.0, 2.0]})
+    write_checkpoint(df, 'M', 'TEST_a1', 'key1')
+    write_checkpoint(None, 'M', 'TEST_a2', 'key2')
+    # object columns of mixed types are pickled
+    mixed = pd.DataFrame({'Flowable': ['a', 1], 'FlowAmount': [3.0, 4.0]})
+    write_checkpoint(mixed, 'M', 'TEST_a3', 'key3')
+    assert find_checkpoint('M', 'TEST_a1', 'key1')['rows'] == 2
+    assert find_checkpoint('M', 'TEST_a2', 'key2')['empty']
+    assert find_checkpoint('M', 'TEST_a3', 'key3')['format'] == 'pkl'
+    dfs = list(load_checkpoints('M', ['TEST_a1', 'TEST_a2', 'TEST_a3']))
+    assert len(dfs) == 2
+    pd.testing.assert_frame_equal(dfs[0], df)
+    pd.testing.assert_frame_equal(dfs[1], mixed)
+
+
+def test_invalidated_checkpoints(store):
+    df = pd.DataFrame({'FlowAmount': [1.0]})
+    write_checkpoint(df, 'M', 'TEST_a1', 'key1')
+    # a different key
+    assert find_checkpoint('M', 'TEST_a1', 'key2') is None
+    # overwritten with a new key
+    write_checkpoint(df, 'M', 'TEST_a1', 'key2')
+    assert find_checkpoint('M', 'TEST_a1', 'key1') is None
+    # missing data file
+    os.remove(f'{store}/M/TEST_a1.parquet')
+    assert find_checkpoint('M', 'TEST_a1', 'key2') is None
+    write_checkpoint(df, 'M', 'TEST_a1', 'key2')
+    clear_checkpoints('M')
+    assert find_checkpoint('M', 'TEST_a1', 'key2') is None
+
+
+def test_prune_stale_checkpoints(store):
+    df = pd.DataFrame({'FlowAmount': [1.0]})
+    write_checkpoint(df, 'M', 'TEST_a1', 'key1')
+    write_checkpoint(df, 'M', 'TEST_a2', 'key2')
+    write_checkpoint(None, 'M', 'TEST_a3', 'key3')
+    write_checkpoint(df, 'M', 'OLD_a1', 'key4')
+    # a2 changed and OLD is no longer a source of the method
+    prune_checkpoints('M', {'TEST_a1': 'key1', 'TEST_a2': 'new',
+                            'TEST_a3': 'key3'})
+    assert sorted(os.listdir(f'{store}/M')) == [
+        'TEST_a1.json', 'TEST_a1.parquet', 'TEST_a3.json']
+    assert find_checkpoint('M', 'TEST_a1', 'key1') is not None
+    assert find_checkpoint('M', 'TEST_a3', 'key3')['empty']
+    # methods without checkpoints
+    prune_checkpoints('N', {})
+
+
+def test_activity_set_keys():
+    fp = {'method': 'm',
+          'sources': {'TEST': {'source': 's', 'activity_sets': {
+              'a1': '1', 'a2': '2', 'a3': '3'}}}}
+    keys = activity_set_checkpoint_keys('TEST', SOURCE, fp, ['prior'])
+    assert keys == activity_set_checkpoint_keys('TEST', SOURCE, fp,
+                                                ['prior'])
+    fp['sources']['TEST']['activity_sets']['a1'] = 'changed'
+    new_keys = activity_set_checkpoint_keys('TEST', SOURCE, fp, ['prior'])
+    # allocation functions depend on the results of prior activity sets
+    assert [k == n for k, n in zip(keys, new_keys)] == [False, True, False]
+
+
+def test_keys_of_generated_fbas(tmp_path, monkeypatch):
+    """FBAs generated during a build do not change the keys on resume"""
+    os.makedirs(tmp_path / 'FlowByActivity')
+    monkeypatch.setattr(fbastore, 'outputpath', f'{tmp_path}/')
+    monkeypatch.setattr(fingerprint, 'crosswalkpath', f'{tmp_path}/')
+    generated = []
+
+    def generate(datasource, year, **_):
+        generated.append(datasource)
+        with open(f'{tmp_path}/FlowByActivity/{datasource}_{year}_v1'
+                  '.parquet', 'w') as f:
+            f.write(datasource)
+    monkeypatch.setattr(flowsa, 'getFlowByActivity', generate)
+    method = {'source_names': {'TEST': SOURCE}}
+
+    start = fbs_method_fingerprint('M', method)
+    ensure_source_fbas('M', 'TEST', SOURCE, False)
+    assert generated == ['TEST', 'ALLOC']
+    first = fbs_source_fingerprint('M', 'TEST', SOURCE)
+    assert first != start['sources']['TEST']
+    # resuming, all FBAs exist
+    ensure_source_fbas('M', 'TEST', SOURCE, False)
+    assert generated == ['TEST', 'ALLOC']
+    assert fbs_method_fingerprint('M', method)['sources']['TEST'] == first
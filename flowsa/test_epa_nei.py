@@ -0,0 +1,70 @@
+"""
+Test reading EPA NEI zip archives in chunks
+"""
+import io
+from types import SimpleNamespace
+from zipfile import ZipFile
+import pandas as pd
+import flowsa.data_source_scripts.EPA_NEI as EPA_NEI
+from flowsa.dataclean import standardize_units
+
+COL_DICT = {'FlowName': 'pollutant desc',
+            'FlowAmount': 'total emissions',
+            'ActivityProducedBy': 'scc',
+            'Location': 'fips code',
+            'Unit': 'emissions uom',
+            'Description': 'pollutant code'}
+
+
+def nei_csv(fips):
+    return pd.DataFrame({
+        'fips code': fips,
+        'state': 'XX',
+        'scc': [f'21030020{i:02d}' for i in range(len(fips))],
+        'pollutant code': 'NOX',
+        'pollutant desc': 'Nitrogen Oxides',
+        'total emissions': [float(i) + 0.5 for i in range(len(fips))],
+        'emissions uom': ['TON', 'LB'] * (len(fips) // 2) +
+                         ['TON'] * (len(fips) % 2),
+    }).to_csv(index=False)
+
+
+def nei_zip():
+    buffer = io.BytesIO()
+    with ZipFile(buffer, 'w') as z:
+        # territories and '777' counties are excluded, leading zeros of
+        # the FIPS are kept whether or not they were saved
+        z.writestr('nonpoint_1.csv', nei_csv(
+            ['06037', '6001', '78010', '01001', '85001', '06777', '00000']))
+        z.writestr('nonpoint_2.csv', nei_csv(['01003', '88000', '36061']))
+        z.writestr('readme.txt', 'not a csv')
+    return buffer.getvalue()
+
+
+def single_read(content):
+    """All rows of each csv read at once"""
+    df_list = []
+    with ZipFile(io.BytesIO(content)) as z:
+        for name in z.namelist():
+            if not name.endswith('.csv'):
+                continue
+            df = pd.read_csv(z.open(name), dtype={'fips code': str})
+            df = df.rename(columns={v: k for k, v in COL_DICT.items()})
+            df['Location'] = df['Location'].str.zfill(5)
+            df = df[~(df['Location'].str[0:2].isin(['78', '85', '88']) |
+                      df['Location'].str[-3:].isin(['777']))]
+            df_list.append(standardize_units(
+                df[[c for c in df.columns if c in COL_DICT]].copy()))
+    return pd.concat(df_list, ignore_index=True)
+
+
+def test_epa_nei_call_in_chunks(monkeypatch):
+    resp = SimpleNamespace(content=nei_zip())
+    config = {'col_dict': {'2017': COL_DICT}}
+    expected = single_read(resp.content)
+    assert list(expected['Location']) == [
+        '06037', '06001', '01001', '00000', '01003', '36061']
+    for chunksize in (2, 3, 100):
+        monkeypatch.setattr(EPA_NEI, 'NEI_CHUNKSIZE', chunksize)
+        df = EPA_NEI.epa_nei_call(resp=resp, year='2017', config=config)
+        pd.testing.assert_frame_equal(df, expected)
@@ -0,0 +1,171 @@
+"""
+Test loading FBAs in batches through the in-process FBA store
+"""
+import os
+import pandas as pd
+import pytest
+import flowsa
+import flowsa.fbastore as fbastore
+from flowsa.dataclean import clean_df
+from flowsa.flowbyfunctions import fba_fill_na_dict, filter_by_geoscale
+from flowsa.schema import flow_by_activity_fields
+
+
+@pytest.fixture
+def local_fbas(tmp_path, monkeypatch):
+    monkeypatch.setattr(fbastore, 'outputpath', f'{tmp_path}/')
+    os.makedirs(f'{tmp_path}/FlowByActivity')
+    df = pd.DataFrame({
+        'Class': ['Water', 'Water', 'Land', 'Water'],
+        'SourceName': 'TEST',
+        'FlowName': 'flow',
+        'FlowAmount': [1.0, 2.0, 3.0, 4.0],
+        'Unit': 'kg',
+        'ActivityProducedBy': ['a', 'b', 'a', 'b'],
+        'ActivityConsumedBy': None,
+        'Location': ['00000', '06000', '06000', '06037'],
+        'LocationSystem': 'FIPS_2015',
+        'Year': 2017})
+    df = clean_df(df, flow_by_activity_fields, fba_fill_na_dict,
+                  drop_description=False)
+    for source in ('TEST_A', 'TEST_B'):
+        df.to_parquet(f'{tmp_path}/FlowByActivity/{source}_2017_v1.parquet',
+                      index=False)
+    fbastore.clear_fba_cache()
+    yield
+    fbastore.clear_fba_cache()
+
+
+def test_getFlowByActivities(local_fbas):
+    requests = [('TEST_A', 2017),
+                ('TEST_A', 2017, {'flowclass': 'Water',
+                                  'geographic_level': 'state'}),
+                ('TEST_B', 2017, {'activities': ['a']}),
+                ('TEST_A', 2017)]
+    fbas = flowsa.getFlowByActivities(requests, n_jobs=2)
+    assert list(fbas) == [
+        ('TEST_A', 2017),
+        ('TEST_A', 2017, (('flowclass', 'Water'),
+                          ('geographic_level', 'state'))),
+        ('TEST_B', 2017, (('activities', ('a',)),))]
+    # each FBA is read once
+    assert fbastore.fba_cache_info()['misses'] == 2
+    for r in requests[1:3]:
+        pd.testing.assert_frame_equal(
+            fbas[flowsa._fba_request_key(*r)],
+            flowsa.getFlowByActivity(*r[:2], **r[2]))
+    # results are copies of the stored FBAs
+    fbas[('TEST_A', 2017)]['FlowAmount'] = 0
+    df = flowsa.getFlowByActivities(requests, concat=True)
+    assert len(df) == 4 + 1 + 2
+    assert df['FlowAmount'].sum() == 10 + 2 + 4
+
+
+@pytest.fixture
+def local_fba(tmp_path, monkeypatch):
+    """An FBA with national, state, county, territory and non-FIPS rows"""
+    monkeypatch.setattr(fbastore, 'outputpath', f'{tmp_path}/')
+    os.makedirs(f'{tmp_path}/FlowByActivity')
+    df = pd.DataFrame({
+        'Class': ['Water', 'Water', 'Land', 'Water', 'Water', 'Land'],
+        'SourceName': 'TEST',
+        'FlowName': ['f1', 'f2', 'f1', 'f1', 'f2', 'f2'],
+        'FlowAmount': [1.0, 2.0, 3.0, 4.0, 5.0, 6.0],
+        'Unit': 'kg',
+        'ActivityProducedBy': ['a', 'b', 'a', 'b', 'a', None],
+        'ActivityConsumedBy': [None, None, None, 'a', None, 'c'],
+        'Compartment': ['air', 'water', 'air', 'air', 'water', 'air'],
+        'Location': ['00000', '06000', '06000', '06037', '72000', '01001'],
+        'LocationSystem': 'FIPS_2015',
+        'Year': 2017})
+    df = clean_df(df, flow_by_activity_fields, fba_fill_na_dict,
+                  drop_description=False)
+    df.to_parquet(f'{tmp_path}/FlowByActivity/TEST_2017_v1.parquet',
+                  index=False)
+    fbastore.clear_fba_cache()
+    yield df
+    fbastore.clear_fba_cache()
+
+
+@pytest.mark.parametrize('geoscale', ['national', 'state', 'county'])
+def test_geoscale_pushdown_matches_filter_by_geoscale(local_fba, geoscale):
+    df = flowsa.getFlowByActivity('TEST', 2017, geographic_level=geoscale)
+    pd.testing.assert_frame_equal(df,
+                                  filter_by_geoscale(local_fba, geoscale))
+
+
+def test_filter_pushdown_matches_in_memory_subsets(local_fba):
+    fba = local_fba
+    subsets = [
+        ({'flowclass': 'Water'}, fba['Class'] == 'Water'),
+        ({'flowclass': ['Water', 'Land']}, fba['Class'].isin(['Water',
+                                                             'Land'])),
+        ({'flownames': ['f2']}, fba['FlowName'] == 'f2'),
+        ({'activities': ['a']}, (fba['ActivityProducedBy'] == 'a') |
+                                (fba['ActivityConsumedBy'] == 'a')),
+        ({'location_prefix': '06'}, fba['Location'].str.startswith('06')),
+        ({'selection_fields': {'Compartment': ['air']}},
+         fba['Compartment'] == 'air'),
+        ({'flowclass': 'Water', 'flownames': ['f1'],
+          'selection_fields': {'Compartment': ['air']}},
+         (fba['Class'] == 'Water') & (fba['FlowName'] == 'f1') &
+         (fba['Compartment'] == 'air')),
+        ({'activities': []}, pd.Series(False, index=fba.index)),
+    ]
+    for filters, subset in subsets:
+        expected = fba[subset].reset_index(drop=True)
+        for use_cache in (False, True):
+            df = flowsa.getFlowByActivity('TEST', 2017, use_cache=use_cache,
+                                          **filters)
+            pd.testing.assert_frame_equal(df, expected)
+
+
+def _sort_rows(df):
+    return df.sort_values('FlowAmount').reset_index(drop=True)
+
+
+def test_partitioned_round_trip(local_fba):
+    path = fbastore.write_partitioned_fba(local_fba, 'TEST_2017')
+    # load the partitioned dataset in place of the single parquet
+    mtime = os.path.getmtime(
+        f'{fbastore.outputpath}FlowByActivity/TEST_2017_v1.parquet')
+    os.utime(path, (mtime + 10, mtime + 10))
+    assert fbastore.find_latest_output('TEST_2017', 'FlowByActivity') == path
+
+    df = flowsa.getFlowByActivity('TEST', 2017)
+    assert list(df.columns) == list(local_fba.columns)
+    pd.testing.assert_series_equal(df.dtypes, local_fba.dtypes)
+    # partitions are read in directory order, not the written row order
+    pd.testing.assert_frame_equal(_sort_rows(df), _sort_rows(local_fba))
+
+    for geoscale in ('national', 'state', 'county'):
+        pd.testing.assert_frame_equal(
+            _sort_rows(flowsa.getFlowByActivity(
+                'TEST', 2017, geographic_level=geoscale)),
+            _sort_rows(filter_by_geoscale(local_fba, geoscale)))
+    df = flowsa.getFlowByActivity('TEST', 2017, flowclass='Land',
+                                  columns=['FlowAmount', 'Location'])
+    assert list(df.columns) == ['FlowAmount', 'Location']
+    assert sorted(df['FlowAmount']) == [3.0, 6.0]
+
+
+def test_allocation_fbas_are_not_stored(local_fba):
+    from flowsa.flowbyfunctions import load_fba_w_standardized_units
+    df = load_fba_w_standardized_units('TEST', 2017, flowclass='Water',
+                                       flownames=['f1'])
+    assert sorted(df['FlowAmount']) == [1.0, 4.0]
+    # allocation FBAs are read with the filters pushed down, the whole FBA
+    # is not kept in the FBA store
+    assert fbastore.fba_cache_info()['size'] == 0
+
+
+def test_string_dtype_setting_read_at_load(local_fba, monkeypatch):
+    import flowsa.settings
+    monkeypatch.setattr(flowsa.settings, 'FLOWBY_STRING_DTYPE',
+                        'string[pyarrow]')
+    df = flowsa.getFlowByActivity('TEST', 2017)
+    assert isinstance(df['FlowName'].dtype, pd.StringDtype)
+    df = clean_df(df, flow_by_activity_fields, fba_fill_na_dict)
+    assert isinstance(df['FlowName'].dtype, pd.StringDtype)
+    monkeypatch.setattr(flowsa.settings, 'FLOWBY_STRING_DTYPE', 'object')
+    assert flowsa.getFlowByActivity('TEST', 2017)['FlowName'].dtype == object
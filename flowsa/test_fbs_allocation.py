@@ -0,0 +1,95 @@
+"""
+Test the per-build store of prepared allocation FBAs
+"""
+import pandas as pd
+import pytest
+from flowsa import fbs_allocation
+from flowsa.dataclean import frame_digest
+from flowsa.fbs_allocation import get_cached_allocation_fba, \
+    allocation_fba_cache_info, clear_allocation_fba_cache
+
+
+def test_allocation_fba_store():
+    clear_allocation_fba_cache()
+    calls = []
+
+    def prepare():
+        calls.append(1)
+        return pd.DataFrame({'FlowAmount': [1.0, 2.0]})
+
+    key = ('standardized', 'TEST', '2017', 'Water', None, None, None)
+    df = get_cached_allocation_fba(key, prepare)
+    # returned frames are copies of the stored FBA
+    df['FlowAmount'] = 0
+    df = get_cached_allocation_fba(key, prepare)
+    assert list(df['FlowAmount']) == [1.0, 2.0]
+    assert len(calls) == 1
+    assert allocation_fba_cache_info() == {'hits': 1, 'misses': 1,
+                                           'size': 1}
+    clear_allocation_fba_cache()
+    assert allocation_fba_cache_info() == {'hits': 0, 'misses': 0,
+                                           'size': 0}
+
+
+def test_allocation_fba_store_is_bounded(monkeypatch):
+    monkeypatch.setattr(fbs_allocation, 'ALLOCATION_FBA_CACHE_MAXSIZE', 2)
+    clear_allocation_fba_cache()
+    for year in ('2015', '2016', '2017'):
+        get_cached_allocation_fba(('standardized', 'TEST', year),
+                                  pd.DataFrame)
+    assert allocation_fba_cache_info()['size'] == 2
+    clear_allocation_fba_cache()
+
+
+def test_frame_digest():
+    df = pd.DataFrame({'Activity': ['a', None], 'FlowAmount': [1.0, 2.0]})
+    assert frame_digest(df) == frame_digest(df.copy())
+    assert frame_digest(df) != frame_digest(df.assign(FlowAmount=3.0))
+    assert frame_digest(df) != frame_digest(
+        df.rename(columns={'Activity': 'ActivityProducedBy'}))
+
+
+def test_standardized_fba_keyed_by_subsets(monkeypatch):
+    class Loaded(Exception):
+        pass
+    loads = []
+
+    def load(**kwargs):
+        loads.append(kwargs)
+        return pd.DataFrame({'FlowName': ['f1', 'f2'],
+                             'Compartment': ['air', 'water'],
+                             'Description': None,
+                             'ActivityProducedBy': 'a',
+                             'ActivityConsumedBy': None,
+                             'Location': '00000'})
+
+    def stop(fba, geoscale):
+        raise Loaded(list(fba['FlowName']))
+
+    def no_mapping(*args, **kwargs):
+        raise FileNotFoundError
+    monkeypatch.setattr(fbs_allocation, 'load_fba_w_standardized_units',
+                        load)
+    monkeypatch.setattr(fbs_allocation, 'check_if_data_exists_at_geoscale',
+                        stop)
+    monkeypatch.setattr('flowsa.sectormapping.get_activitytosector_mapping',
+                        no_mapping)
+    clear_allocation_fba_cache()
+
+    def load_map_clean(**kwargs):
+        with pytest.raises(Loaded) as e:
+            fbs_allocation.load_map_clean_fba(
+                {}, {}, 'TEST', 2017, 'Water', 'national', 'national',
+                download_FBA_if_missing=False, **kwargs)
+        return e.value.args[0]
+
+    assert load_map_clean(flowname_subset=['f1']) == ['f1']
+    assert load_map_clean(flowname_subset=['f2']) == ['f2']
+    assert load_map_clean(flowname_subset=['f2']) == ['f2']
+    assert load_map_clean(compartment_subset=['air']) == ['f1']
+    # the subsets are pushed down into the reader and are part of the key
+    assert [d.get('flownames') for d in loads] == [['f1'], ['f2'], None]
+    assert loads[2]['selection_fields'] == {'Compartment': ['air']}
+    assert allocation_fba_cache_info() == {'hits': 1, 'misses': 3,
+                                           'size': 3}
+    clear_allocation_fba_cache()
@@ -0,0 +1,86 @@
+"""
+Test that FBS fingerprints change with the method, crosswalks and FBAs
+used, and only with those
+"""
+import copy
+import os
+import pytest
+from flowsa import fbastore, fingerprint
+from flowsa.fingerprint import fbs_method_fingerprint, compare_fingerprints
+
+METHOD = {
+    'target_sector_level': 'NAICS_6',
+    'source_names': {
+        'TEST': {'data_format': 'FBA', 'year': 2017,
+                 'activity_sets': {
+                     'a1': {'names': ['x'], 'allocation_source': 'ALLOC',
+                            'allocation_source_year': 2017},
+                     'a2': {'names': ['y']}}}}}
+
+
+def write(file, text, mtime):
+    with open(file, 'w') as f:
+        f.write(text)
+    os.utime(file, (mtime, mtime))
+
+
+@pytest.fixture
+def inputs(tmp_path, monkeypatch):
+    for d in ('data', 'mapping', 'output/FlowByActivity'):
+        os.makedirs(tmp_path / d)
+    monkeypatch.setattr(fingerprint, 'datapath', f'{tmp_path}/data/')
+    monkeypatch.setattr(fingerprint, 'crosswalkpath', f'{tmp_path}/mapping/')
+    monkeypatch.setattr(fbastore, 'outputpath', f'{tmp_path}/output/')
+    write(f'{tmp_path}/data/NAICS_2012_Crosswalk.csv', 'a,b\n1,2\n', 1e9)
+    write(f'{tmp_path}/mapping/NAICS_Crosswalk_TEST.csv', 'a\nx\n', 1e9)
+    for s in ('TEST', 'ALLOC'):
+        write(f'{tmp_path}/output/FlowByActivity/{s}_2017_v1.parquet', s,
+              1e9)
+    return tmp_path
+
+
+def test_unchanged_inputs(inputs):
+    old = fbs_method_fingerprint('TEST', METHOD)
+    assert compare_fingerprints(old, fbs_method_fingerprint(
+        'TEST', copy.deepcopy(METHOD))) == []
+    # a missing stored fingerprint requires a full build
+    assert compare_fingerprints(None, old) == ['method']
+
+
+def test_changed_method(inputs):
+    old = fbs_method_fingerprint('TEST', METHOD)
+    method = copy.deepcopy(METHOD)
+    method['target_sector_level'] = 'NAICS_4'
+    assert compare_fingerprints(
+        old, fbs_method_fingerprint('TEST', method)) == ['method']
+    method = copy.deepcopy(METHOD)
+    method['source_names']['TEST']['activity_sets']['a2']['names'] = ['z']
+    assert compare_fingerprints(
+        old, fbs_method_fingerprint('TEST', method)) == [('TEST', 'a2')]
+
+
+def test_changed_files(inputs):
+    old = fbs_method_fingerprint('TEST', METHOD)
+    write(f'{inputs}/output/FlowByActivity/ALLOC_2017_v1.parquet', 'new',
+          2e9)
+    assert compare_fingerprints(
+        old, fbs_method_fingerprint('TEST', METHOD)) == [('TEST', 'a1')]
+    old = fbs_method_fingerprint('TEST', METHOD)
+    write(f'{inputs}/output/FlowByActivity/TEST_2017_v1.parquet', 'new',
+          2e9)
+    assert compare_fingerprints(
+        old, fbs_method_fingerprint('TEST', METHOD)) == [('TEST', None)]
+    old = fbs_method_fingerprint('TEST', METHOD)
+    write(f'{inputs}/mapping/NAICS_Crosswalk_TEST.csv', 'a\ny\n', 2e9)
+    assert compare_fingerprints(
+        old, fbs_method_fingerprint('TEST', METHOD)) == [('TEST', None)]
+    old = fbs_method_fingerprint('TEST', METHOD)
+    write(f'{inputs}/data/NAICS_2012_Crosswalk.csv', 'a,b\n1,3\n', 2e9)
+    assert compare_fingerprints(
+        old, fbs_method_fingerprint('TEST', METHOD)) == ['method']
+
+
+def test_hash_fba(inputs):
+    assert fingerprint.hash_fba('TEST', 2017) == fingerprint.hash_file(
+        f'{inputs}/output/FlowByActivity/TEST_2017_v1.parquet')
+    assert fingerprint.hash_fba('MISSING', 2017) is None
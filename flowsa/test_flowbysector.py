@@ -0,0 +1,132 @@
+"""
+Test running the activity sets of an FBS source
+"""
+import copy
+import os
+import threading
+import pandas as pd
+import pytest
+import flowsa.flowbysector as flowbysector
+import flowsa.validation as validation
+from flowsa import checkpoint
+from flowsa.fingerprint import fbs_method_fingerprint, \
+    compare_fingerprints
+from flowsa.location import US_FIPS
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(checkpoint, 'checkpointpath', f'{tmp_path}/')
+    return tmp_path
+
+
+def aset_args(asets):
+    attrs = {aset: {'names': [aset], 'allocation_method': 'direct',
+                    'allocation_from_scale': 'state'} for aset in asets}
+    flows = pd.DataFrame({'ActivityProducedBy': asets,
+                          'FlowAmount': 1.0})
+    return [(flows[flows['ActivityProducedBy'] == aset], None, 'SRC',
+             {'activity_sets': attrs}, aset, attrs[aset], {})
+            for aset in asets]
+
+
+def test_activity_sets_on_threads_off_linux(store, monkeypatch):
+    threads = []
+
+    def process(flows_subset, *args):
+        threads.append(threading.get_ident())
+        return pd.DataFrame({'FlowAmount': flows_subset['FlowAmount']})
+    monkeypatch.setattr(flowbysector, 'process_activity_set', process)
+    monkeypatch.setattr(flowbysector.sys, 'platform', 'darwin')
+    names = flowbysector.run_activity_sets(
+        'M', aset_args(['a', 'b', 'c']), ['k1', 'k2', 'k3'], [], False,
+        n_jobs=2)
+    assert names == ['SRC_a', 'SRC_b', 'SRC_c']
+    # fork is only used on Linux, elsewhere activity sets run on threads
+    assert len(threads) == 3
+    assert threading.get_ident() not in threads
+
+
+def test_only_changed_activity_sets_regenerated(store, monkeypatch):
+    method = {'target_geoscale': 'national', 'source_names': {'SRC': {
+        'data_format': 'FBA', 'year': 2017, 'activity_sets': {
+            aset: {'names': [aset], 'allocation_method': 'direct',
+                   'allocation_from_scale': 'national'}
+            for aset in ['a', 'b', 'c']}}}}
+    fba = pd.DataFrame({'ActivityProducedBy': ['a', 'b', 'c'],
+                        'FlowName': ['f', 'f', 'g'], 'Location': US_FIPS,
+                        'Unit': 'kg', 'Year': 2017,
+                        'FlowAmount': [1.0, 2.0, 3.0]})
+    processed = []
+
+    def process(flows_subset, flows_mapped, k, v, aset, *args):
+        processed.append(aset)
+        return pd.DataFrame({'Flowable': flows_subset['FlowName'],
+                             'SectorProducedBy': aset, 'Unit': 'kg',
+                             'Location': US_FIPS, 'Year': 2017,
+                             'FlowAmount': flows_subset['FlowAmount']})
+    monkeypatch.setattr(flowbysector, 'process_activity_set', process)
+    monkeypatch.setattr(flowbysector, 'ensure_source_fbas',
+                        lambda *args: None)
+    monkeypatch.setattr(flowbysector, 'load_source_dataframe',
+                        lambda *args: fba.copy())
+    monkeypatch.setattr(flowbysector, 'map_fbs_flows',
+                        lambda flows, *args, **kwargs: (flows, None))
+    saved = []
+    monkeypatch.setattr(flowbysector, 'write_df_to_file',
+                        lambda df, *args: saved.append(df))
+    monkeypatch.setattr(flowbysector, 'write_metadata', lambda *a, **k: None)
+    monkeypatch.setattr(flowbysector, 'rename_log_file', lambda *args: None)
+
+    def generate(method, old_fingerprint):
+        fingerprint = fbs_method_fingerprint('M', method)
+        flowbysector.generate_fbs(
+            'M', method, fingerprint,
+            compare_fingerprints(old_fingerprint, fingerprint))
+        return fingerprint
+
+    first = generate(method, None)
+    assert processed == ['a', 'b', 'c']
+    # edit the inputs of one activity set
+    edited = copy.deepcopy(method)
+    edited['source_names']['SRC']['activity_sets']['b'][
+        'source_flows'] = ['g']
+    processed.clear()
+    generate(edited, first)
+    assert processed == ['b']
+    assert saved[0]['FlowAmount'].sum() == 6.0
+    assert saved[1]['FlowAmount'].sum() == 4.0
+    # the checkpoints are kept for the next build
+    assert sorted(os.listdir(f'{store}/M')) == [
+        f'SRC_{aset}.{ext}' for aset in ['a', 'b', 'c']
+        for ext in ['json', 'parquet']]
+
+
+def test_geographic_totals_from_national_subset(monkeypatch):
+    messages = []
+    for logger in (validation.vLog, validation.vLogDetailed):
+        monkeypatch.setattr(logger, 'info',
+                            lambda msg, *args: messages.append(
+                                msg % args if '%' in msg else
+                                msg.format(*args)))
+    fba = pd.DataFrame({
+        'Class': 'Water', 'SourceName': 'SRC', 'FlowName': 'f',
+        'Unit': 'kg', 'FlowType': 'ELEMENTARY_FLOW',
+        'ActivityProducedBy': ['a', 'a', 'a', 'b', 'b'],
+        'ActivityConsumedBy': None, 'Compartment': 'water',
+        'Location': [US_FIPS, '01000', '06000', US_FIPS, '06000'],
+        'LocationSystem': 'FIPS_2015', 'Year': 2017,
+        'FlowAmount': [10.0, 4.0, 5.0, 7.0, 7.0]})
+    subset = fba[(fba['ActivityProducedBy'] == 'a') &
+                 (fba['Location'] != US_FIPS)]
+    attr = {'allocation_from_scale': 'state'}
+    national = fba[(fba['Location'] == US_FIPS) &
+                   fba['ActivityProducedBy'].isin(['a'])]
+    for df_load in (fba, national.reset_index(drop=True)):
+        validation.compare_geographic_totals(subset, df_load, 'SRC', attr,
+                                             'a1', ['a'])
+    # the same data loss is found from the national rows of the activity
+    # set as from the whole FBA
+    assert len(messages) == 4
+    assert messages[:2] == messages[2:]
+    assert 'data differences' in messages[0]
@@ -0,0 +1,37 @@
+"""
+Test the cache of parsed yaml files
+"""
+import os
+import flowsa.settings
+from flowsa import flowsa_yaml
+
+
+def write(file, text, mtime):
+    with open(file, 'w') as f:
+        f.write(text)
+    os.utime(file, (mtime, mtime))
+
+
+def test_load_file_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(flowsa.settings, 'flowbysectoractivitysetspath',
+                        f'{tmp_path}/')
+    base, method = f'{tmp_path}/base.yaml', f'{tmp_path}/method.yaml'
+    write(base, 'a: 1\nb: [1]\n', 1e9)
+    write(f'{tmp_path}/index.csv', 'activity_set,name\ns1,x\ns1,y\n', 1e9)
+    write(method, 'm: !include:base.yaml\n  c: 2\n'
+          'names: !from_index:index.csv s1\n', 1e9)
+    monkeypatch.setattr(flowsa.settings, 'sourceconfigpath', f'{tmp_path}/')
+    flowsa_yaml.clear_cache()
+
+    data = flowsa_yaml.load_file(method)
+    assert data == {'m': {'a': 1, 'b': [1], 'c': 2}, 'names': ['x', 'y']}
+    # returned data are copies
+    data['m']['b'].append(2)
+    assert flowsa_yaml.load_file(method)['m']['b'] == [1]
+    assert flowsa_yaml.load_file(base) == {'a': 1, 'b': [1]}
+
+    # modifying an included file or index reloads the method
+    write(base, 'a: 3\nb: [1]\n', 2e9)
+    assert flowsa_yaml.load_file(method)['m']['a'] == 3
+    write(f'{tmp_path}/index.csv', 'activity_set,name\ns1,z\n', 2e9)
+    assert flowsa_yaml.load_file(method)['names'] == ['z']
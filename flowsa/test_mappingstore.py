@@ -0,0 +1,113 @@
+"""
+Test the compiled store of activity-to-sector mappings
+"""
+import os
+import threading
+import pandas as pd
+import pytest
+import flowsa.settings
+from flowsa import mappingstore
+from flowsa.sectormapping import get_activitytosector_mapping
+
+
+def write(file, text, mtime):
+    with open(file, 'w') as f:
+        f.write(text)
+    os.utime(file, (mtime, mtime))
+
+
+@pytest.fixture
+def mapping_dirs(tmp_path, monkeypatch):
+    flowsa_dir = tmp_path / 'activitytosectormapping'
+    method_dir = tmp_path / 'method' / 'activitytosectormapping'
+    os.makedirs(flowsa_dir)
+    os.makedirs(method_dir)
+    monkeypatch.setattr(flowsa.settings, 'crosswalkpath', f'{flowsa_dir}/')
+    monkeypatch.setattr(mappingstore, 'mappingstorepath',
+                        f'{tmp_path}/store/')
+    header = 'ActivitySourceName,Activity,SectorSourceName,Sector,SectorType'
+    write(f'{flowsa_dir}/NAICS_Crosswalk_TEST.csv',
+          f'{header}\nTEST_A,a,NAICS_2012_Code,111,\n'
+          f'TEST_B,b,NAICS_2012_Code,0112,I\n', 1e9)
+    write(f'{flowsa_dir}/NAICS_Crosswalk_OTHER.csv',
+          f'{header},Notes\nOTHER,c,NAICS_2012_Code,2,,note\n', 1e9)
+    write(f'{method_dir}/NAICS_Crosswalk_OTHER.csv',
+          f'{header}\nOTHER,d,NAICS_2012_Code,3,\n', 1e9)
+    mappingstore.clear_mapping_store()
+    yield flowsa_dir, f'{tmp_path}/method/'
+    mappingstore.clear_mapping_store()
+
+
+def test_mapping_lookup(mapping_dirs):
+    flowsa_dir, fbsconfigpath = mapping_dirs
+    df = get_activitytosector_mapping('TEST_B')
+    pd.testing.assert_frame_equal(df, pd.read_csv(
+        f'{flowsa_dir}/NAICS_Crosswalk_TEST.csv',
+        dtype={'Activity': 'str', 'Sector': 'str'}).iloc[[1]].reset_index(
+        drop=True))
+    # all rows of the mapping file are used for other source names
+    assert list(get_activitytosector_mapping('TEST_C')['Activity']) == \
+        ['a', 'b']
+    assert list(get_activitytosector_mapping('OTHER').columns)[-1] == 'Notes'
+    # mappings saved with an FBS method are used in place of flowsa mappings
+    assert list(get_activitytosector_mapping(
+        'OTHER', fbsconfigpath=fbsconfigpath)['Activity']) == ['d']
+    assert list(get_activitytosector_mapping(
+        'TEST_A', fbsconfigpath=fbsconfigpath)['Activity']) == ['a']
+    with pytest.raises(FileNotFoundError):
+        get_activitytosector_mapping('MISSING')
+
+
+def test_store_is_recompiled(mapping_dirs):
+    flowsa_dir, _ = mapping_dirs
+    get_activitytosector_mapping('TEST_A')
+    path = mappingstore._store_path(f'{flowsa_dir}/')
+    assert os.path.isfile(path)
+    # the saved store is used in new sessions
+    mappingstore.clear_mapping_store()
+    os.utime(path, (2e9, 2e9))
+    get_activitytosector_mapping('TEST_A')
+    assert os.path.getmtime(path) == 2e9
+    # modified csvs are compiled again
+    write(f'{flowsa_dir}/NAICS_Crosswalk_TEST.csv',
+          'ActivitySourceName,Activity,SectorSourceName,Sector,SectorType\n'
+          'TEST_A,e,NAICS_2012_Code,111,\n', 3e9)
+    mappingstore.clear_mapping_store()
+    assert list(get_activitytosector_mapping('TEST_A')['Activity']) == ['e']
+
+
+def test_mappings_keep_csv_dtypes(mapping_dirs):
+    flowsa_dir, _ = mapping_dirs
+    write(f'{flowsa_dir}/NAICS_Crosswalk_TYPES.csv',
+          'ActivitySourceName,Activity,Sector,SectorType,Level,Share,Flag\n'
+          'TYPES,1,011,,2,0.1,True\nTYPES,b,2,,3,1e-17,False\n', 1e9)
+    mappingstore.clear_mapping_store()
+    expected = pd.read_csv(f'{flowsa_dir}/NAICS_Crosswalk_TYPES.csv',
+                           dtype={'Activity': 'str', 'Sector': 'str'})
+    assert expected['SectorType'].dtype == 'float64'
+    for _ in range(2):
+        # compiled, then loaded from the saved store
+        pd.testing.assert_frame_equal(
+            get_activitytosector_mapping('TYPES'), expected)
+        mappingstore.clear_mapping_store()
+    # files with only a header keep their columns
+    write(f'{flowsa_dir}/NAICS_Crosswalk_EMPTY.csv',
+          'ActivitySourceName,Activity,Sector\n', 1e9)
+    mappingstore.clear_mapping_store()
+    assert list(get_activitytosector_mapping('EMPTY').columns) == [
+        'ActivitySourceName', 'Activity', 'Sector']
+
+
+def test_store_name_is_unique_while_writing(mapping_dirs, monkeypatch):
+    flowsa_dir, _ = mapping_dirs
+    written = []
+    write_table = mappingstore.pq.write_table
+
+    def record(table, path):
+        written.append(path)
+        write_table(table, path)
+    monkeypatch.setattr(mappingstore.pq, 'write_table', record)
+    mappingstore.compile_mapping_store(f'{flowsa_dir}/')
+    assert written[0].endswith(
+        f'.{os.getpid()}_{threading.get_ident()}.tmp')
+    assert os.path.isfile(mappingstore._store_path(f'{flowsa_dir}/'))
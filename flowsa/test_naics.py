@@ -0,0 +1,84 @@
+"""
+Test that the compiled NAICS hierarchy matches the sector length crosswalk
+merges previously used in sector_aggregation()
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from flowsa.common import load_crosswalk, clear_crosswalk_cache, \
+    crosswalk_cache_info
+from flowsa.naics import NAICSHierarchy, get_naics_hierarchy, \
+    remove_parent_sectors_from_crosswalk
+
+EXCLUDED = ['1111', '31', '562212', '3312', '221']
+
+
+def previous_remove_parent_sectors(cw_load, sector_list):
+    """Implementation used by sector_aggregation() before naics.py"""
+    cw_filtered = cw_load.isin(sector_list)
+    locations = cw_filtered[cw_filtered > 0].stack().index.tolist()
+    for r, i in locations:
+        col_index = cw_load.columns.get_loc(i)
+        cw_load.iloc[r, 0:col_index] = np.nan
+    return cw_load
+
+
+def previous_parents(cw_load, i, j):
+    """Sector to parent mapping from the crosswalk merge previously used in
+    append_new_sectors()"""
+    cw = cw_load[[f'NAICS_{i}', f'NAICS_{i - j}']].drop_duplicates()
+    cw = cw[cw[f'NAICS_{i}'].notna() & cw[f'NAICS_{i - j}'].notna()]
+    # each sector is merged to a single parent
+    assert not cw[f'NAICS_{i}'].duplicated().any()
+    return cw.set_index(f'NAICS_{i}')[f'NAICS_{i - j}']
+
+
+def test_remove_parent_sectors_from_crosswalk():
+    cw = load_crosswalk('sector_length')
+    pd.testing.assert_frame_equal(
+        remove_parent_sectors_from_crosswalk(cw, EXCLUDED),
+        previous_remove_parent_sectors(cw.copy(), EXCLUDED))
+
+
+@pytest.mark.parametrize('excluded', [None, EXCLUDED])
+def test_hierarchy_matches_crosswalk(excluded):
+    cw = load_crosswalk('sector_length')
+    if excluded is not None:
+        cw = previous_remove_parent_sectors(cw, excluded)
+    naics = NAICSHierarchy(cw)
+    for i in range(7, 2, -1):
+        assert set(naics.sectors_at_level(i)) == \
+            set(cw[f'NAICS_{i}'].dropna())
+        for j in range(1, i - 1):
+            expected = previous_parents(cw, i, j)
+            parents = naics.parent_map(i, i - j)
+            pd.testing.assert_series_equal(
+                parents.sort_index(), expected.sort_index(),
+                check_names=False, check_index_type=False)
+
+
+def test_hierarchy_is_stored_in_crosswalk_registry():
+    clear_crosswalk_cache()
+    naics = get_naics_hierarchy(EXCLUDED)
+    assert get_naics_hierarchy(list(reversed(EXCLUDED))) is naics
+    assert crosswalk_cache_info()['hits'] >= 1
+    clear_crosswalk_cache()
+    assert get_naics_hierarchy(EXCLUDED) is not naics
+
+
+def test_sector_aggregation():
+    from flowsa.flowbyfunctions import sector_aggregation
+    df = pd.DataFrame({'Flowable': 'x', 'Context': 'c', 'Location': '00000',
+                       'Unit': 'kg',
+                       'SectorProducedBy': ['111110', '111120', '1111'],
+                       'SectorConsumedBy': None,
+                       'FlowAmount': [1.0, 2.0, 10.0]})
+    agg = sector_aggregation(df)
+    # values reported at a parent level take precedence over the sum of
+    # their children
+    assert dict(zip(agg['SectorProducedBy'], agg['FlowAmount'])) == {
+        '111110': 1.0, '111120': 2.0, '1111': 10.0, '11111': 1.0,
+        '11112': 2.0, '111': 10.0, '11': 10.0}
+    agg = sector_aggregation(df, sectors_to_exclude_from_agg=['111120'])
+    assert '11112' not in set(agg['SectorProducedBy'])
+    assert len(agg) == 6
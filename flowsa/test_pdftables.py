@@ -0,0 +1,76 @@
+"""
+Test the on-disk cache of tables extracted from PDFs, without running
+tabula
+"""
+import os
+import threading
+import pandas as pd
+import flowsa.settings
+import flowsa.pdftables as pdftables
+
+
+def test_read_pdf_pages_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(pdftables, 'pdftablecachepath', f'{tmp_path}/')
+    extracted = []
+
+    def extract(pdf, pages, options):
+        extracted.append(list(pages))
+        return {p: [pd.DataFrame({'one': [f'page {p}']})] for p in pages}
+    monkeypatch.setattr(pdftables, '_extract', extract)
+
+    tables = pdftables.read_pdf_pages(b'pdf', [3, 1, 3], guess=False)
+    assert list(tables) == [3, 1]
+    assert tables[1][0].loc[0, 'one'] == 'page 1'
+    # tables are returned as copies
+    tables[1][0].loc[0, 'one'] = 'changed'
+
+    tables = pdftables.read_pdf_pages(b'pdf', [1, 2], guess=False)
+    assert tables[1][0].loc[0, 'one'] == 'page 1'
+    # other options, content or pages are extracted
+    pdftables.read_pdf_pages(b'pdf', [1], guess=True)
+    pdftables.read_pdf_pages(b'other', [1], guess=False)
+    assert extracted == [[3, 1], [2], [1], [1]]
+
+    pdftables.clear_pdf_table_cache()
+    pdftables.read_pdf_pages(b'pdf', [1], guess=False)
+    assert extracted[-1] == [1]
+
+
+def test_read_pdf_pages_cache_setting(tmp_path, monkeypatch):
+    monkeypatch.setattr(pdftables, 'pdftablecachepath', f'{tmp_path}/')
+    extracted = []
+
+    def extract(pdf, pages, options):
+        extracted.append(list(pages))
+        return {p: [pd.DataFrame({'one': [p]})] for p in pages}
+    monkeypatch.setattr(pdftables, '_extract', extract)
+
+    # the setting is read when tables are extracted, not at import
+    monkeypatch.setattr(flowsa.settings, 'PDF_TABLE_CACHE', False)
+    pdftables.read_pdf_pages(b'pdf', [1])
+    pdftables.read_pdf_pages(b'pdf', [1])
+    assert extracted == [[1], [1]]
+    assert not list(tmp_path.iterdir())
+    monkeypatch.setattr(flowsa.settings, 'PDF_TABLE_CACHE', True)
+    pdftables.read_pdf_pages(b'pdf', [1])
+    pdftables.read_pdf_pages(b'pdf', [1])
+    assert extracted == [[1], [1], [1]]
+    # an explicit argument overrides the setting
+    pdftables.read_pdf_pages(b'pdf', [1], cache=False)
+    assert extracted == [[1], [1], [1], [1]]
+
+
+def test_cache_files_written_under_unique_names(tmp_path, monkeypatch):
+    monkeypatch.setattr(pdftables, 'pdftablecachepath', f'{tmp_path}/')
+    monkeypatch.setattr(pdftables, '_extract', lambda pdf, pages, options: {
+        p: [pd.DataFrame({'one': [p]})] for p in pages})
+    replaced = []
+    replace = os.replace
+
+    def record(src, dst):
+        replaced.append(src)
+        replace(src, dst)
+    monkeypatch.setattr(pdftables.os, 'replace', record)
+    pdftables.read_pdf_pages(b'pdf', [1], cache=True)
+    assert replaced[0].endswith(
+        f'.{os.getpid()}_{threading.get_ident()}.tmp')
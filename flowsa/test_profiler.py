@@ -0,0 +1,104 @@
+"""
+Test the stage profiler and its reports
+"""
+import json
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+import pytest
+import flowsa.profiler as profiler
+from flowsa.profiler import profile_stage, stage, set_profile_context, \
+    call_in_worker, merge_worker_result
+
+
+@profile_stage
+def double(df):
+    return pd.concat([df, df])
+
+
+def run_activity_set(df):
+    with stage('process_activity_set', rows_in=len(df), source='src',
+               activity_set='aset'):
+        return double(df)
+
+
+@pytest.fixture
+def profiling():
+    profiler.enable_profiling()
+    yield
+    profiler.disable_profiling()
+
+
+def test_stages_are_nested_and_labeled(profiling):
+    set_profile_context(source='src')
+    double(pd.DataFrame({'a': [1, 2]}))
+    run_activity_set(pd.DataFrame({'a': [1]}))
+    set_profile_context(source=None)
+    df = profiler.profile_records()
+    assert list(df['stage']) == ['double', 'double', 'process_activity_set']
+    assert list(df['rows_in']) == [2, 1, 1]
+    assert list(df['rows_out'].fillna(-1)) == [4, 2, -1]
+    assert list(df['parent'].fillna('')) == ['', 'process_activity_set', '']
+    assert list(df['activity_set'].fillna('')) == ['', 'aset', 'aset']
+    assert (df['source'] == 'src').all()
+    assert (df['wall'] >= 0).all()
+
+
+def test_worker_records_are_merged(profiling):
+    if 'fork' not in multiprocessing.get_all_start_methods():
+        pytest.skip('worker processes inherit profiling when forked')
+    with ProcessPoolExecutor(
+            2, mp_context=multiprocessing.get_context('fork')) as executor:
+        futures = [executor.submit(call_in_worker, run_activity_set,
+                                   pd.DataFrame({'a': range(n)}))
+                   for n in (1, 3)]
+        results = [merge_worker_result(f.result()) for f in futures]
+    assert [len(r) for r in results] == [2, 6]
+    df = profiler.profile_records()
+    assert sorted(df.loc[df['stage'] == 'double', 'rows_in']) == [1, 3]
+
+
+def test_disabled_records_nothing():
+    profiler.enable_profiling()
+    profiler.disable_profiling()
+    double(pd.DataFrame({'a': [1]}))
+    assert len(profiler.profile_records()) == 0
+
+
+def test_write_profile_report(profiling, tmp_path, monkeypatch):
+    monkeypatch.setattr(profiler, 'logoutputpath', f'{tmp_path}/')
+    run_activity_set(pd.DataFrame({'a': [1]}))
+    paths = profiler.write_profile_report('FBS', trace=True)
+    assert len(pd.read_csv(paths[1])) == 2
+    with open(paths[2]) as f:
+        events = json.load(f)['traceEvents']
+    assert {e['name'] for e in events} == {'double',
+                                            'process_activity_set'}
+    assert all(e['ph'] == 'X' for e in events)
+
+
+def test_failed_builds_stop_profiling(monkeypatch):
+    import flowsa.flowbyactivity as flowbyactivity
+    import flowsa.flowbysector as flowbysector
+
+    def fail(*args, **kwargs):
+        assert profiler.profiling_enabled()
+        raise ValueError('build failed')
+
+    monkeypatch.setattr(flowbyactivity, 'load_yaml_dict',
+                        lambda *args, **kwargs: {'years': [2017]})
+    monkeypatch.setattr(flowbyactivity, 'generate_fba_for_year', fail)
+    with pytest.raises(ValueError):
+        flowbyactivity.main(source='TEST', year='2017', profile=True)
+    assert not profiler.profiling_enabled()
+
+    monkeypatch.setattr(flowbysector, 'load_yaml_dict',
+                        lambda *args, **kwargs: {'source_names': {}})
+    monkeypatch.setattr(flowbysector, 'fbs_method_fingerprint',
+                        lambda *args: {})
+    monkeypatch.setattr(flowbysector, 'read_fbs_fingerprint',
+                        lambda *args: None)
+    monkeypatch.setattr(flowbysector, 'generate_fbs', fail)
+    with pytest.raises(ValueError):
+        flowbysector.main(method='TEST', profile=True)
+    assert not profiler.profiling_enabled()
@@ -0,0 +1,36 @@
+"""
+Test the expansion of aggregated sectors to the sectors sharing their digits
+"""
+import pandas as pd
+from flowsa.common import load_crosswalk
+from flowsa.sectormapping import get_naics_prefix_matches, expand_naics_list
+
+
+def test_naics_prefix_matches():
+    ssn = 'NAICS_2012_Code'
+    cw = load_crosswalk('sector_timeseries')[ssn].drop_duplicates().dropna()
+    cw = cw[~cw.str.contains('-') & (cw != 'None')]
+    prefixes = ['31', '3112', '111110', '562', '9999', None]
+    df = get_naics_prefix_matches(prefixes, ssn)
+    for p in prefixes[:-1]:
+        assert list(df.loc[df['Sector'] == p, ssn]) == \
+            [s for s in cw if s.startswith(p)]
+    assert list(df['Sector'].drop_duplicates()) == ['31', '3112', '111110',
+                                                    '562']
+
+
+def test_expand_naics_list():
+    mapping = pd.DataFrame({'ActivitySourceName': 'TEST',
+                            'Activity': ['a', 'b', 'c'],
+                            'Sector': ['1111', '111110', '9999'],
+                            'SectorType': None})
+    df = expand_naics_list(mapping, 'NAICS_2012_Code')
+    sectors = df.loc[df['Activity'] == 'a', 'Sector']
+    assert len(sectors) > 1 and sectors.str.startswith('1111').all()
+    assert list(df.loc[df['Activity'] == 'b', 'Sector']) == ['111110']
+    # sectors not in the crosswalk are not mapped
+    assert df.loc[df['Activity'] == 'c', 'Sector'].isna().all()
+    # expanded mappings are copies of the stored mappings
+    df['Sector'] = None
+    df = expand_naics_list(mapping, 'NAICS_2012_Code')
+    assert df['Sector'].notna().sum() == len(sectors) + 1
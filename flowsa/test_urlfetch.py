@@ -0,0 +1,145 @@
+"""
+Test concurrent url requests and the response cache against a local http
+server
+"""
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+import pandas as pd
+import pytest
+import requests
+from flowsa.exceptions import ResponseNotCachedError
+from flowsa.flowbyactivity import call_urls
+from flowsa import responsecache
+from flowsa.responsecache import ResponseCache
+from flowsa.urlfetch import URLFetcher, request_urls
+
+
+class Handler(BaseHTTPRequestHandler):
+    """Return the path, after a delay for even numbered paths. Paths
+    starting with /flaky fail with 503 on the first request, paths starting
+    with /stalled respond after a second on the first request and paths
+    starting with /slow always respond after a second."""
+    active = 0
+    max_active = 0
+    requested = set()
+    lock = threading.Lock()
+
+    def do_GET(self):
+        with self.lock:
+            Handler.active += 1
+            Handler.max_active = max(Handler.max_active, Handler.active)
+            first = self.path not in Handler.requested
+            Handler.requested.add(self.path)
+        n = int(self.path.rsplit('/', 1)[1])
+        time.sleep(0.05 if n % 2 == 0 else 0)
+        if self.path.startswith('/slow') or \
+                (self.path.startswith('/stalled') and first):
+            time.sleep(1)
+        with self.lock:
+            Handler.active -= 1
+        if self.path.startswith('/flaky') and first:
+            self.send_response(503)
+            self.end_headers()
+            return
+        body = self.path.encode()
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+        except ConnectionError:
+            # the client timed out
+            pass
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    Handler.max_active = 0
+    Handler.requested = set()
+    yield f'http://127.0.0.1:{httpd.server_port}'
+    httpd.shutdown()
+
+
+def test_fetch_in_url_order(server):
+    urls = [f'{server}/ok/{n}' for n in range(20)]
+    fetcher = URLFetcher(8, per_host_limit=3, backoff=0)
+    responses = list(fetcher.fetch(urls))
+    assert [url for url, _ in responses] == urls
+    assert [r.text for _, r in responses] == [f'/ok/{n}' for n in range(20)]
+    assert 1 < Handler.max_active <= 3
+
+
+def test_fetch_retries(server):
+    urls = [f'{server}/flaky/{n}' for n in range(4)]
+    responses = list(URLFetcher(4, backoff=0).fetch(urls))
+    assert [r.status_code for _, r in responses] == [200] * 4
+
+
+def test_fetch_timeout(server):
+    urls = [f'{server}/stalled/{n}' for n in range(2)]
+    t0 = time.perf_counter()
+    responses = list(URLFetcher(2, backoff=0, timeout=0.2).fetch(urls))
+    assert [r.text for _, r in responses] == [f'/stalled/{n}'
+                                              for n in range(2)]
+    assert time.perf_counter() - t0 < 1
+    with pytest.raises(requests.exceptions.Timeout):
+        URLFetcher(1, max_attempts=2, backoff=0, timeout=0.2).request(
+            f'{server}/slow/1')
+
+
+def test_call_urls_concurrently(server):
+    urls = [f'{server}/ok/{n}' for n in range(10)]
+    config = {'call_response_fxn': lambda resp, url, **_: pd.DataFrame(
+        {'url': [url], 'text': [resp.text]})}
+    df_list = call_urls(url_list=urls, source='test', year='2020',
+                        config=config, n_jobs=4)
+    df = pd.concat(df_list)
+    assert list(df['url']) == urls
+    assert list(df['text']) == [f'/ok/{n}' for n in range(10)]
+
+
+def test_response_cache(server, tmp_path, monkeypatch):
+    urls = [f'{server}/ok/{n}' for n in range(3)]
+    cache = ResponseCache('use', path=f'{tmp_path}/')
+    first = [r.text for _, r in request_urls(urls, cache=cache)]
+    assert cache.misses == 3
+
+    offline = ResponseCache('only', path=f'{tmp_path}/')
+    second = [r.text for _, r in URLFetcher(2, cache=offline).fetch(urls)]
+    assert second == first
+    assert offline.hits == 3
+    with pytest.raises(ResponseNotCachedError):
+        list(request_urls([f'{server}/ok/99'], cache=offline))
+
+    monkeypatch.setattr(responsecache, 'EVICT_GRACE_PERIOD', 0)
+    ResponseCache('use', path=f'{tmp_path}/', max_size=0).evict()
+    assert list((tmp_path / 'objects').iterdir()) == []
+
+
+def test_evict_keeps_files_being_written(server, tmp_path):
+    cache = ResponseCache('use', path=f'{tmp_path}/', max_size=0)
+    # body of another writer, saved before its index entry
+    (tmp_path / 'objects' / 'abc').write_bytes(b'body')
+    (tmp_path / 'objects' / 'def.123_456.tmp').write_bytes(b'body')
+    cache.evict()
+    assert sorted(f.name for f in (tmp_path / 'objects').iterdir()) == \
+        ['abc', 'def.123_456.tmp']
+    # a temporary file deleted before it is renamed is not saved
+    resp = requests.get(f'{server}/ok/1')
+    real_replace = os.replace
+
+    def replace(src, dst):
+        os.remove(src)
+        real_replace(src, dst)
+    with mock.patch('flowsa.responsecache.os.replace', replace):
+        cache.put(f'{server}/ok/1', resp)
+    assert cache.get(f'{server}/ok/1') is None
@@ -0,0 +1,77 @@
+"""
+Test extracting yaml-declared tables from Excel workbooks
+"""
+import io
+import pandas as pd
+import pytest
+from flowsa.workbook import read_workbook, extract_tables, clear_workbooks
+
+pytest.importorskip('openpyxl')
+
+
+@pytest.fixture
+def workbook_bytes():
+    buffer = io.BytesIO()
+    with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
+        pd.DataFrame({'Item': ['Title', 'Ball clay', 'Bentonite', 'Total'],
+                      'Note': [None, 'e', None, None],
+                      '2016': [None, 10, 20, 30],
+                      '2017': [None, 11, 21, 32]}
+                     ).to_excel(writer, sheet_name='T1', index=False)
+        pd.DataFrame({'Item': ['Kaolin'], '2017': [5]}
+                     ).to_excel(writer, sheet_name='T2', index=False)
+    clear_workbooks()
+    yield buffer.getvalue()
+    clear_workbooks()
+
+
+def test_extract_tables(workbook_bytes):
+    tables = [
+        # rows are kept by label, columns renamed positionally
+        {'sheet': 'T1', 'read': {'header': 0}, 'rows': [1, 2],
+         'columns': ['Description', 'space', 'y2016', 'y2017'],
+         'assign': {'Unit': 'Metric Tons'},
+         'melt': {'id_vars': ['Description', 'Unit'],
+                  'value_vars': ['y2016', 'y2017'],
+                  'var_name': 'Year', 'value_name': 'FlowAmount'}},
+        # sheet by position
+        {'sheet': 1, 'columns': ['Description', 'y2017'],
+         'assign': {'Unit': 'Metric Tons', 'Year': 'y2017'}},
+    ]
+    df = extract_tables(workbook_bytes, tables,
+                        columns=['Description', 'Unit', 'Year',
+                                 'FlowAmount', 'y2017'])
+    assert list(df.columns) == ['Description', 'Unit', 'Year',
+                                'FlowAmount', 'y2017']
+    assert list(df['Description']) == ['Ball clay', 'Bentonite',
+                                       'Ball clay', 'Bentonite', 'Kaolin']
+    assert list(df['Year']) == ['y2016', 'y2016', 'y2017', 'y2017', 'y2017']
+    assert list(df['FlowAmount'].iloc[:4]) == [10, 20, 11, 21]
+    assert df['y2017'].iloc[4] == 5
+    assert (df['Unit'] == 'Metric Tons').all()
+
+
+def test_workbook_sheets_parsed_once(workbook_bytes, monkeypatch):
+    calls = []
+    parse = pd.ExcelFile.parse
+
+    def counting_parse(self, sheet_name=0, **kwargs):
+        calls.append(sheet_name)
+        return parse(self, sheet_name, **kwargs)
+
+    monkeypatch.setattr(pd.ExcelFile, 'parse', counting_parse)
+    tables = [{'sheet': 'T1', 'rows': [1, 1],
+               'columns': ['Description', 'space', 'y2016', 'y2017']},
+              {'sheet': 'T1', 'rows': [2, 2],
+               'columns': ['Description', 'space', 'y2016', 'y2017']}]
+    df = extract_tables(workbook_bytes, tables)
+    assert list(df['Description']) == ['Ball clay', 'Bentonite']
+    # the workbook is reused for the same bytes, so is each parsed sheet
+    extract_tables(workbook_bytes, tables)
+    assert read_workbook(workbook_bytes) is read_workbook(workbook_bytes)
+    assert calls == ['T1']
+    # parsed sheets are copied, edits do not change the stored sheet
+    workbook = read_workbook(workbook_bytes)
+    sheet = workbook.sheet('T1')
+    sheet['Item'] = None
+    assert workbook.sheet('T1')['Item'].iloc[1] == 'Ball clay'
@@ -0,0 +1,159 @@
+# urlfetch.py (flowsa)
+# !/usr/bin/env python3
+# coding=utf-8
+"""
+Concurrent fetching of the urls used to generate a FlowByActivity, with a
+limit on the number of requests made to each host at the same time,
+retries with exponential backoff and pooled connections, optionally
+through a cache of raw responses
+"""
+
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from urllib import parse
+import requests
+from requests.adapters import HTTPAdapter
+from esupy.remote import make_url_request
+from flowsa.settings import log, HTTP_PER_HOST_LIMIT, HTTP_MAX_ATTEMPTS, \
+    HTTP_BACKOFF, HTTP_TIMEOUT
+
+# http status codes that are retried
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+
+def request_urls(url_list, set_cookies=False, confirm_gdrive=False,
+                 cache=None):
+    """
+    Generator of the responses to a list of urls, requested one at a time
+    :param url_list: list, urls
+    :param set_cookies: bool, request each url twice to set cookies
+    :param confirm_gdrive: bool, confirm google drive downloads
+    :param cache: ResponseCache, optional cache of raw responses
+    :return: generator of (url, requests.Response)
+    """
+    options = {'set_cookies': set_cookies, 'confirm_gdrive': confirm_gdrive}
+    for url in url_list:
+        resp = None if cache is None else cache.get(url, **options)
+        if resp is None:
+            log.info("Calling %s", url)
+            resp = make_url_request(url, **options)
+            if cache is not None:
+                cache.put(url, resp, **options)
+        yield url, resp
+
+
+class URLFetcher:
+    """
+    Fetch urls on a pool of threads sharing one requests session. Requests
+    that need cookies set, a google drive confirmation or ftp are passed to
+    esupy's make_url_request().
+    """
+
+    def __init__(self, n_jobs, per_host_limit=HTTP_PER_HOST_LIMIT,
+                 max_attempts=HTTP_MAX_ATTEMPTS, backoff=HTTP_BACKOFF,
+                 timeout=HTTP_TIMEOUT, set_cookies=False,
+                 confirm_gdrive=False, cache=None):
+        """
+        :param n_jobs: int, number of threads
+        :param per_host_limit: int, maximum number of requests to a host at
+            the same time
+        :param max_attempts: int, number of times a url is requested before
+            raising the error
+        :param backoff: float, seconds to wait before the first retry,
+            doubled on each further retry
+        :param timeout: float, seconds to wait for the server to connect or
+            send data before the request times out and is retried
+        :param set_cookies: bool, request each url twice to set cookies
+        :param confirm_gdrive: bool, confirm google drive downloads
+        :param cache: ResponseCache, optional cache of raw responses
+        """
+        self.n_jobs = n_jobs
+        self.per_host_limit = per_host_limit
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.timeout = timeout
+        self.set_cookies = set_cookies
+        self.confirm_gdrive = confirm_gdrive
+        self.cache = cache
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=n_jobs, pool_maxsize=n_jobs)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self._host_locks = defaultdict(
+            lambda: threading.BoundedSemaphore(self.per_host_limit))
+        self._lock = threading.Lock()
+
+    def _host_semaphore(self, url):
+        with self._lock:
+            return self._host_locks[parse.urlsplit(url).netloc]
+
+    def _get(self, url):
+        if self.set_cookies or self.confirm_gdrive or \
+                not url.startswith('http'):
+            return make_url_request(url, set_cookies=self.set_cookies,
+                                    confirm_gdrive=self.confirm_gdrive)
+        response = self.session.get(url, timeout=self.timeout)
+        response.raise_for_status()
+        return response
+
+    def request(self, url):
+        """
+        Request a url, retrying connection errors, timeouts and http status
+        codes in RETRY_STATUS_CODES
+        :param url: str, url
+        :return: requests.Response
+        """
+        options = {'set_cookies': self.set_cookies,
+                   'confirm_gdrive': self.confirm_gdrive}
+        if self.cache is not None:
+            resp = self.cache.get(url, **options)
+            if resp is not None:
+                return resp
+        resp = self._request(url)
+        if self.cache is not None:
+            self.cache.put(url, resp, **options)
+        return resp
+
+    def _request(self, url):
+        for attempt in range(1, self.max_attempts + 1):
+            wait = self.backoff * 2 ** (attempt - 1)
+            try:
+                with self._host_semaphore(url):
+                    log.info("Calling %s", url)
+                    return self._get(url)
+            except requests.exceptions.HTTPError as err:
+                status = err.response.status_code
+                if status not in RETRY_STATUS_CODES or \
+                        attempt == self.max_attempts:
+                    raise
+                retry_after = err.response.headers.get('Retry-After', '')
+                if retry_after.isdigit():
+                    wait = max(wait, int(retry_after))
+            except (requests.exceptions.ConnectionError,
+                    requests.exceptions.Timeout):
+                if attempt == self.max_attempts:
+                    raise
+            log.warning('Request %s of %s failed for %s, retrying in %s s',
+                        attempt, self.max_attempts, url, wait)
+            time.sleep(wait)
+
+    def fetch(self, url_list):
+        """
+        Generator of the responses to a list of urls, in url order. The urls
+        are requested concurrently, responses are yielded as soon as all
+        prior responses have been yielded.
+        :param url_list: list, urls
+        :return: generator of (url, requests.Response)
+        """
+        with ThreadPoolExecutor(max_workers=self.n_jobs) as executor, \
+                self.session:
+            futures = [executor.submit(self.request, url)
+                       for url in url_list]
+            try:
+                for url, f in zip(url_list, futures):
+                    yield url, f.result()
+            finally:
+                for f in futures:
+                    f.cancel()
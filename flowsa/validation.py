@@ -18,6 +18,7 @@ from flowsa.common import sector_level_key, \
     fba_default_grouping_fields, check_activities_sector_like
 from flowsa.location import US_FIPS, fips_number_key
 from flowsa.settings import log, vLog, vLogDetailed
+from flowsa.profiler import profile_stage
 
 
 def check_flow_by_fields(flowby_df, flowbyfields):
@@ -61,6 +62,7 @@ def check_if_activities_match_sectors(fba):
         return activities_missing_sectors
 
 
+@profile_stage
 def check_if_data_exists_at_geoscale(df_load, geoscale):
     """
     Check if an activity or a sector exists at the specified geoscale
@@ -254,6 +256,7 @@ def check_allocation_ratios(flow_alloc_df_load, activity_set, config, attr):
                           activity_set)
 
 
+@profile_stage
 def calculate_flowamount_diff_between_dfs(dfa_load, dfb_load):
     """
     Calculate the differences in FlowAmounts between two dfs
@@ -347,6 +350,7 @@ def calculate_flowamount_diff_between_dfs(dfa_load, dfb_load):
                           '\n {}'.format(dfagg2.to_string(), index=False))
 
 
+@profile_stage
 def compare_activity_to_sector_flowamounts(fba_load, fbs_load,
                                            activity_set, config, v, attr, **_):
     """
@@ -475,6 +479,7 @@ def compare_activity_to_sector_flowamounts(fba_load, fbs_load,
                               '\n {}'.format(df_v.to_string()), activity_set)
 
 
+@profile_stage
 def compare_fba_geo_subset_and_fbs_output_totals(
         fba_load, fbs_load, activity_set, source_name, source_attr,
         activity_attr, method):
@@ -682,6 +687,7 @@ def compare_summation_at_sector_lengths_between_two_dfs(df1, df2):
                           'length')
 
 
+@profile_stage
 def compare_child_to_parent_sectors_flowamounts(df_load):
     """
     Sum child sectors up to one sector and compare to parent sector values
@@ -761,6 +767,7 @@ def check_for_nonetypes_in_sector_col(df):
     return df
 
 
+@profile_stage
 def check_for_negative_flowamounts(df):
     """
     Check for negative FlowAmounts in a dataframe 'FlowAmount' column
@@ -853,6 +860,7 @@ def melt_naics_crosswalk():
     return cw_replacement_2
 
 
+@profile_stage
 def replace_naics_w_naics_from_another_year(df_load, sectorsourcename):
     """
     Replace any non sectors with sectors.
@@ -976,7 +984,7 @@ def compare_FBS_results(fbs1, fbs2, ignore_metasources=False,
     df2 = replace_strings_with_NoneType(df2)
     # compare df
     merge_cols = list(df2.select_dtypes(include=[
-        'object', 'int']).columns)
+        'object', 'string', 'int']).columns)
     if ignore_metasources:
         for e in ['MetaSources', 'AttributionSources']:
             try:
@@ -993,11 +1001,11 @@ def compare_FBS_results(fbs1, fbs2, ignore_metasources=False,
     # dropping metasources/attribution sources
     df1 = aggregator(df1[merge_cols + ['FlowAmount_fbs1']],
                      groupbycols=list(df1.select_dtypes(include=[
-                         'object', 'int']).columns),
+                         'object', 'string', 'int']).columns),
                      flowcolname='FlowAmount_fbs1')
     df2 = aggregator(df2[merge_cols + ['FlowAmount_fbs2']],
                      groupbycols=list(df2.select_dtypes(include=[
-                         'object', 'int']).columns),
+                         'object', 'string', 'int']).columns),
                      flowcolname='FlowAmount_fbs2')
     # check units
     compare_df_units(df1, df2)
@@ -1022,6 +1030,7 @@ def compare_FBS_results(fbs1, fbs2, ignore_metasources=False,
     return df_m
 
 
+@profile_stage
 def compare_geographic_totals(
         df_subset, df_load, sourcename, attr, activity_set, activity_names):
     """
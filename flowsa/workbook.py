@@ -0,0 +1,134 @@
+# workbook.py (flowsa)
+# !/usr/bin/env python3
+# coding=utf-8
+"""
+Read the Excel workbooks of FlowByActivity sources once and extract the
+tables declared in the FBA method yamls.
+
+read_workbook() opens a workbook from the bytes of a url response or from
+a file path. The most recently opened workbooks are kept, along with each
+sheet parsed from them, so a call function reading several sheets, or
+several tables of the same sheet, parses the file and each sheet once.
+
+Tables are declared in the method yaml as a list, e.g.
+
+tables:
+  - sheet: T3            # sheet name or position
+    read: {header: 0}    # optional pandas.read_excel() options
+    rows: [19, 19]       # first and last row labels kept, as in df.loc
+    columns: [Production, space_1, year_1]  # names for all the columns
+    assign: {type: Ball clay}   # optional columns of constant values
+    melt:                # optional, options of pandas.melt() to reshape
+      id_vars: [Production]     # a wide table to one value per row
+      var_name: Year
+      value_name: FlowAmount
+"""
+
+import hashlib
+import io
+import os
+import threading
+from collections import OrderedDict
+import pandas as pd
+
+# number of workbooks kept open
+WORKBOOK_CACHE_SIZE = 4
+
+_workbooks = OrderedDict()
+_lock = threading.Lock()
+
+
+class Workbook:
+    """Excel workbook that parses each sheet once"""
+
+    def __init__(self, source):
+        """
+        :param source: bytes of the workbook or str, file path
+        """
+        if isinstance(source, bytes):
+            source = io.BytesIO(source)
+        self.excel = pd.ExcelFile(source)
+        self._sheets = {}
+
+    @property
+    def sheet_names(self):
+        """:return: list, names of the sheets"""
+        return self.excel.sheet_names
+
+    def sheet(self, sheet_name=0, **kwargs):
+        """
+        Parse a sheet, sheets are parsed once for each set of options
+        :param sheet_name: str or int, sheet name or position
+        :param kwargs: options of pandas.read_excel(), e.g. header
+        :return: df, copy of the parsed sheet
+        """
+        key = (sheet_name, repr(sorted(kwargs.items())))
+        if key not in self._sheets:
+            self._sheets[key] = self.excel.parse(sheet_name, **kwargs)
+        return self._sheets[key].copy()
+
+
+def read_workbook(source):
+    """
+    Open a workbook, reusing the workbook if it was recently opened
+    :param source: bytes of the workbook, e.g. resp.content, or str, file
+        path
+    :return: Workbook
+    """
+    if isinstance(source, bytes):
+        key = hashlib.sha256(source).hexdigest()
+    else:
+        key = (os.path.abspath(source), os.path.getmtime(source))
+    with _lock:
+        workbook = _workbooks.pop(key, None)
+        if workbook is None:
+            workbook = Workbook(source)
+        _workbooks[key] = workbook
+        while len(_workbooks) > WORKBOOK_CACHE_SIZE:
+            _workbooks.popitem(last=False)
+    return workbook
+
+
+def clear_workbooks():
+    """Close the open workbooks and drop their parsed sheets"""
+    with _lock:
+        for workbook in _workbooks.values():
+            workbook.excel.close()
+        _workbooks.clear()
+
+
+def extract_table(workbook, table):
+    """
+    Extract a table declared in a method yaml from a workbook
+    :param workbook: Workbook
+    :param table: dictionary, 'sheet', 'read', 'rows', 'columns', 'assign'
+        and 'melt' items described in the module docstring
+    :return: df
+    """
+    df = workbook.sheet(table.get('sheet', 0), **table.get('read', {}))
+    if 'rows' in table:
+        first, last = table['rows']
+        df = df.loc[first:last]
+    df = df.reset_index(drop=True)
+    if 'columns' in table:
+        df.columns = table['columns']
+    df = df.assign(**table.get('assign', {}))
+    if 'melt' in table:
+        df = df.melt(**table['melt'])
+    return df
+
+
+def extract_tables(source, tables, columns=None):
+    """
+    Extract and concat the tables declared in a method yaml
+    :param source: bytes of the workbook or str, file path
+    :param tables: list of table dictionaries, see extract_table()
+    :param columns: list, columns to keep, default keeps all columns
+    :return: df
+    """
+    workbook = read_workbook(source)
+    df = pd.concat([extract_table(workbook, t) for t in tables],
+                   ignore_index=True)
+    if columns is not None:
+        df = df[[c for c in df.columns if c in columns]]
+    return df
@@ -0,0 +1,67 @@
+# benchmark_import_time.py (scripts)
+# !/usr/bin/env python3
+# coding=utf-8
+
+"""
+Measures the time of a bare 'import flowsa' in fresh python processes.
+
+- Prints the fastest, median and slowest wall time of the import.
+- Prints the modules with the largest cumulative import time, from
+  python's -X importtime report of the fastest run.
+- Optional modules (e.g. seaborn, bibtexparser, tabula, stewi) should not
+  be listed, they are imported when first used.
+
+EX: python benchmark_import_time.py --runs 10 --top 15
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+
+
+def time_import(module='flowsa'):
+    """
+    Import a module in a new python process
+    :param module: str, module to import
+    :return: tuple, (float, seconds of the process, str, importtime report)
+    """
+    t0 = time.perf_counter()
+    p = subprocess.run([sys.executable, '-X', 'importtime', '-c',
+                        f'import {module}'],
+                       capture_output=True, text=True, check=True)
+    return time.perf_counter() - t0, p.stderr
+
+
+def slowest_imports(report, top=15):
+    """
+    :param report: str, -X importtime output
+    :param top: int, number of modules listed
+    :return: list of tuples, (cumulative seconds, module)
+    """
+    rows = []
+    for line in report.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, module = line[len('import time:'):].split('|')
+        rows.append((int(cumulative) / 1e6, module.strip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+if __name__ == '__main__':
+    ap = argparse.ArgumentParser()
+    ap.add_argument("-r", "--runs", type=int, default=5,
+                    help="Number of imports timed")
+    ap.add_argument("-t", "--top", type=int, default=15,
+                    help="Number of slowest modules listed")
+    ap.add_argument("-m", "--module", default='flowsa',
+                    help="Module to import")
+    args = vars(ap.parse_args())
+    results = [time_import(args['module']) for _ in range(args['runs'])]
+    times = [t for t, _ in results]
+    print(f"import {args['module']}: fastest {min(times):.2f} s, median "
+          f"{statistics.median(times):.2f} s, slowest {max(times):.2f} s")
+    print('slowest modules (cumulative s):')
+    for seconds, module in slowest_imports(min(results)[1], args['top']):
+        print(f'  {seconds:8.3f}  {module}')
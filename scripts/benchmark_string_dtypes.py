@@ -0,0 +1,119 @@
+# benchmark_string_dtypes.py (scripts)
+# !/usr/bin/env python3
+# coding=utf-8
+
+"""
+Compares the memory use and aggregation time of a county level
+Flow-By-Activity with string columns stored as python objects (default),
+Arrow strings ('string[pyarrow]', see FLOWBY_STRING_DTYPE in settings.py)
+and pandas categoricals.
+
+- The FBA is synthetic, shaped like BLS_QCEW: each county has a row per
+  activity and flow.
+- Prints a table of the deep memory use of the df, the time of
+  clean_df() and the time of aggregator() grouping by the FBA fields.
+
+EX: python benchmark_string_dtypes.py --rows 2000000
+"""
+
+import argparse
+import time
+import numpy as np
+import pandas as pd
+import flowsa.settings
+from flowsa.common import fba_default_grouping_fields
+from flowsa.dataclean import clean_df, set_string_dtypes
+from flowsa.flowbyfunctions import aggregator, fba_fill_na_dict
+from flowsa.schema import flow_by_activity_fields
+
+
+def synthetic_fba(n_rows, seed=0):
+    """
+    County level FBA with repeated descriptive values
+    :param n_rows: int, number of rows
+    :param seed: int, random seed
+    :return: df, FBA format with object string columns
+    """
+    rng = np.random.default_rng(seed)
+    counties = np.array([f'{s:02d}{c:03d}' for s in range(1, 57)
+                         for c in range(1, 60, 2)])
+    activities = np.array([str(n) for n in range(111110, 111110 + 1200)])
+    flows = np.array(['Number of employees', 'Annual payroll',
+                      'Number of establishments'])
+    df = pd.DataFrame({
+        'Class': 'Employment',
+        'SourceName': 'BLS_QCEW',
+        'FlowName': rng.choice(flows, n_rows),
+        'FlowAmount': rng.random(n_rows) * 1000,
+        'Unit': 'p',
+        'FlowType': 'ELEMENTARY_FLOW',
+        'ActivityProducedBy': rng.choice(activities, n_rows),
+        'Compartment': None,
+        'Location': rng.choice(counties, n_rows),
+        'LocationSystem': 'FIPS_2015',
+        'Year': 2017,
+        'DataReliability': 5,
+        'DataCollection': 5,
+        'Description': 'Synthetic'})
+    return clean_df(df, flow_by_activity_fields, fba_fill_na_dict)
+
+
+def benchmark(df, string_dtype, repeat=3):
+    """
+    Time clean_df() and aggregator() with string columns cast to a dtype.
+    FLOWBY_STRING_DTYPE is set to the dtype for the run, so clean_df()
+    keeps the string columns in that dtype
+    :param df: df, FBA format with object string columns
+    :param string_dtype: str, 'object', 'string[pyarrow]' or 'category'
+    :param repeat: int, number of timed runs, the fastest is reported
+    :return: dictionary of results
+    """
+    fields = {k: v for k, v in flow_by_activity_fields.items()
+              if k in df.columns}
+    if string_dtype == 'category':
+        cast = df.astype({k: 'category' for k, v in fields.items()
+                          if v[0]['dtype'] == 'str'})
+    else:
+        cast = set_string_dtypes(df.copy(), fields, string_dtype)
+    clean_times = []
+    agg_times = []
+    setting = flowsa.settings.FLOWBY_STRING_DTYPE
+    if string_dtype != 'category':
+        flowsa.settings.FLOWBY_STRING_DTYPE = string_dtype
+    try:
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            if string_dtype == 'category':
+                # clean_df() and aggregator() fill nulls with '', which is
+                # not a category, so only the groupby is timed for
+                # categoricals
+                cast.groupby(fba_default_grouping_fields, observed=True,
+                             dropna=False).agg({'FlowAmount': ['sum']})
+                agg_times.append(time.perf_counter() - t0)
+                continue
+            cleaned = clean_df(cast.copy(), flow_by_activity_fields,
+                               fba_fill_na_dict)
+            clean_times.append(time.perf_counter() - t0)
+            # the columns are not cast back to objects while timed
+            assert cleaned['FlowName'].dtype == cast['FlowName'].dtype
+            t0 = time.perf_counter()
+            aggregator(cast.copy(), fba_default_grouping_fields)
+            agg_times.append(time.perf_counter() - t0)
+    finally:
+        flowsa.settings.FLOWBY_STRING_DTYPE = setting
+    return {'dtype': string_dtype,
+            'memory (MB)': round(cast.memory_usage(deep=True).sum() / 1e6, 1),
+            'clean_df (s)': round(min(clean_times), 2) if clean_times
+            else None,
+            'aggregator (s)': round(min(agg_times), 2)}
+
+
+if __name__ == '__main__':
+    ap = argparse.ArgumentParser()
+    ap.add_argument("-n", "--rows", type=int, default=1000000,
+                    help="Number of rows in the synthetic FBA")
+    args = vars(ap.parse_args())
+    fba = synthetic_fba(args['rows'])
+    results = pd.DataFrame([benchmark(fba, d) for d in
+                            ['object', 'string[pyarrow]', 'category']])
+    print(results.to_string(index=False))